@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Generate profiling report for `cardano-cli` sub-commands."""
+
+import argparse
+import copy
+import json
+import logging
+import pathlib as pl
+import sys
+
+from cardano_node_tests.utils import custom_clusterlib
+from cardano_node_tests.utils import helpers
+
+LOGGER = logging.getLogger(__name__)
+
+PERCENTILES = (50, 95, 99)
+
+
+def get_args() -> argparse.Namespace:
+    """Get script command line arguments."""
+    parser = argparse.ArgumentParser(description=(__doc__ or "").split("\n", maxsplit=1)[0])
+    parser.add_argument(
+        "-i",
+        "--input-files",
+        required=True,
+        nargs="+",
+        type=helpers.check_file_arg,
+        help="Path to profiling files.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-file",
+        help="File where to save profiling results.",
+    )
+    parser.add_argument(
+        "-p",
+        "--print-report",
+        action="store_true",
+        help="Print profiling report.",
+    )
+    return parser.parse_args()
+
+
+def merge_profile(dict_a: dict, dict_b: dict) -> dict:
+    """Merge dict_b into dict_a."""
+    addable = (int, float)
+    for key, value in dict_b.items():
+        if key not in dict_a:
+            dict_a[key] = copy.deepcopy(value)
+        elif isinstance(value, addable) and isinstance(dict_a[key], addable):
+            dict_a[key] += value
+        elif isinstance(value, dict) and isinstance(dict_a[key], dict):
+            merge_profile(dict_a[key], value)
+
+    return dict_a
+
+
+def get_profile(profile_files: list[pl.Path]) -> dict:
+    """Get profiling info by merging available data."""
+    profile_dict: dict = {}
+    for in_profile in profile_files:
+        with open(in_profile, encoding="utf-8") as infile:
+            profile = json.load(infile)
+
+        if not all(
+            isinstance(v, dict) and "histogram" in v
+            for k, v in profile.items()
+            if k != custom_clusterlib.QUERY_CACHE_STATS_KEY
+        ):
+            LOGGER.warning(f"Data in '{in_profile}' doesn't seem to be in proper profiling format")
+            continue
+
+        profile_dict = merge_profile(profile_dict, profile)
+
+    return profile_dict
+
+
+def get_percentile_sec(histogram: dict, percentile: int) -> float:
+    """Get upper bound of the histogram bucket that contains the percentile, in seconds."""
+    buckets = sorted((int(k), v) for k, v in histogram.items())
+    total = sum(v for __, v in buckets)
+    threshold = total * percentile / 100
+    cumulative = 0
+    for bucket, count in buckets:
+        cumulative += count
+        if cumulative >= threshold:
+            return float(10 ** (bucket / custom_clusterlib.CLI_PROFILE_BUCKETS_PER_DECADE) / 1000)
+    return 0.0
+
+
+def get_report(profile: dict) -> dict:
+    """Generate profiling report, sub-commands are sorted by total time."""
+    report: dict = {}
+    query_cache_stats = profile.pop(custom_clusterlib.QUERY_CACHE_STATS_KEY, {})
+    for subcommand, rec in sorted(profile.items(), key=lambda i: i[1]["total_sec"], reverse=True):
+        count = rec["count"]
+        report[subcommand] = {
+            "count": count,
+            "failed": rec["failed"],
+            "timed_out": rec["timed_out"],
+            "total_sec": round(rec["total_sec"], 3),
+            "mean_sec": round(rec["total_sec"] / count, 4) if count else 0,
+            **{f"p{p}_sec": round(get_percentile_sec(rec["histogram"], p), 4) for p in PERCENTILES},
+            "stdout_bytes": rec["stdout_bytes"],
+            "stderr_bytes": rec["stderr_bytes"],
+            "exit_codes": rec.get("exit_codes") or {},
+        }
+
+    # Hits of query cache are CLI calls that were saved
+    if query_cache_stats:
+        report[custom_clusterlib.QUERY_CACHE_STATS_KEY] = {
+            query: {**stats, "hit_ratio": round(stats["hits"] / (sum(stats.values()) or 1), 3)}
+            for query, stats in sorted(query_cache_stats.items())
+        }
+    return report
+
+
+def format_report(report: dict) -> str:
+    """Format profiling report as a text table."""
+    query_cache_stats = report.get(custom_clusterlib.QUERY_CACHE_STATS_KEY, {})
+    commands = {k: v for k, v in report.items() if k != custom_clusterlib.QUERY_CACHE_STATS_KEY}
+    total_sec = sum(r["total_sec"] for r in commands.values()) or 1
+    lines = [
+        f"{'sub-command':<60} {'count':>8} {'total':>10} {'share':>6} {'p50':>8} {'p95':>8}"
+        f" {'p99':>8} {'failed':>6}"
+    ]
+    lines.extend(
+        f"{subcommand:<60} {r['count']:>8} {r['total_sec']:>9.1f}s"
+        f" {100 * r['total_sec'] / total_sec:>5.1f}% {r['p50_sec']:>7.3f}s {r['p95_sec']:>7.3f}s"
+        f" {r['p99_sec']:>7.3f}s {r['failed'] + r['timed_out']:>6}"
+        for subcommand, r in commands.items()
+    )
+
+    if query_cache_stats:
+        lines.append("")
+        lines.append(f"{'cached query':<60} {'hits':>8} {'misses':>8} {'ratio':>6}")
+        lines.extend(
+            f"{query:<60} {s['hits']:>8} {s['misses']:>8} {s['hit_ratio']:>6.1%}"
+            for query, s in query_cache_stats.items()
+        )
+    return "\n".join(lines)
+
+
+def main() -> int:
+    logging.basicConfig(format="%(levelname)s:%(message)s", level=logging.INFO)
+    args = get_args()
+
+    if not (args.output_file or args.print_report):
+        LOGGER.error("One of --output-file or --print-report is needed")
+        return 1
+
+    profile = get_profile(profile_files=args.input_files)
+    report = get_report(profile=profile)
+
+    if args.output_file:
+        helpers.write_json(out_file=args.output_file, content=report)
+    if args.print_report:
+        print(format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
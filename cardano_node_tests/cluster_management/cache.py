@@ -1,8 +1,19 @@
 import dataclasses
+import logging
+import os
+import pathlib as pl
+import pickle
+import shutil
 import typing as tp
 
 from cardano_clusterlib import clusterlib
 
+from cardano_node_tests.utils import temptools
+
+LOGGER = logging.getLogger(__name__)
+
+SHARED_CACHE_DIR_NAME = "fixture_cache"
+
 
 @dataclasses.dataclass
 class ClusterManagerCache:
@@ -36,3 +47,46 @@ class CacheManager:
             instance_cache = ClusterManagerCache()
             cls.cache[instance_num] = instance_cache
         return instance_cache
+
+
+def get_shared_cache_file(*, instance_num: int, checksum: str, key_hash: int) -> pl.Path:
+    """Return path to file with fixture value shared by all pytest workers.
+
+    The values are stored separately for each start of the cluster instance, identified by
+    the checksum of cluster instance data, so values from before respin are never used.
+    """
+    cache_dir = (
+        temptools.get_pytest_shared_tmp() / SHARED_CACHE_DIR_NAME / f"c{instance_num}" / checksum
+    )
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir / f"{key_hash:x}.pickle"
+
+
+def load_shared_value(cache_file: pl.Path) -> tp.Any:
+    """Load shared fixture value, return `None` if the value was not cached yet."""
+    try:
+        with open(cache_file, "rb") as in_fp:
+            return pickle.load(in_fp)
+    except FileNotFoundError:
+        return None
+
+
+def save_shared_value(cache_file: pl.Path, value: tp.Any) -> None:
+    """Save shared fixture value."""
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_file, "wb") as out_fp:
+        pickle.dump(value, out_fp)
+    tmp_file.replace(cache_file)
+
+
+def clean_shared_cache(*, instance_num: int, checksum: str) -> None:
+    """Remove shared fixture values cached before respin of the cluster instance."""
+    instance_cache_dir = (
+        temptools.get_pytest_shared_tmp() / SHARED_CACHE_DIR_NAME / f"c{instance_num}"
+    )
+    if not instance_cache_dir.exists():
+        return
+    for cache_dir in instance_cache_dir.iterdir():
+        if cache_dir.name != checksum:
+            LOGGER.debug(f"Removing stale fixture cache '{cache_dir}'.")
+            shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,276 @@
+"""Snapshots of chain state for fast respin of local cluster instances.
+
+Starting a local cluster instance from genesis takes minutes. The start script needs to wait
+for the initial registration of pools, committee members and DReps, and then the faucet
+addresses need to be funded. When `CHAIN_SNAPSHOTS` is set, a snapshot of the cluster instance
+is taken once per testing session, right after the first start of the instance. The snapshot
+includes the state dir (with node databases) and the faucet addresses data. Later respins of
+the instance restore the snapshot instead of starting the cluster from genesis.
+
+A snapshot can be restored only on the cluster instance where it was taken, as the instance
+number, ports and paths are part of the state dir.
+
+The nodes cannot continue a chain whose tip is further in the past than the stability window,
+as they would not be able to forecast the ledger view for the current slot. Therefore the start
+time in the genesis files is shifted by the time that passed since the snapshot was taken, and
+the genesis hashes in the node configs are updated. The Byron genesis hash is part of the chain
+when there are Byron blocks, so only instances that skip the Byron era (use the "shortcut") are
+snapshotted.
+
+The db-sync database would need to be restored as well, and db-sync checks the genesis hashes,
+so snapshots are not used when db-sync is enabled. When restoring a snapshot fails, the cluster
+instance is started from genesis.
+"""
+
+import datetime
+import json
+import logging
+import pathlib as pl
+import shutil
+import time
+
+from cardano_node_tests.cluster_management import common
+from cardano_node_tests.utils import cluster_nodes
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import faucet
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import readiness
+from cardano_node_tests.utils import temptools
+from cardano_node_tests.utils import utxo_index
+
+LOGGER = logging.getLogger(__name__)
+
+SNAPSHOTS_DIR_NAME = "chain_snapshots"
+METADATA_FILE = "snapshot.json"
+CAPTURE_FAILED_FILE = ".capture_failed"
+STATE_DIR_NAME = "state"
+ADDRS_DATA_DIR_NAME = "addrs_data"
+
+# Logs of the snapshotted cluster instance are not restored, so the logs of a restored
+# cluster instance are not checked for errors and collected twice.
+_EXCLUDED_GLOBS = ("*.std*", common.START_CLUSTER_LOG)
+
+_SYSTEM_START_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def is_enabled() -> bool:
+    """Check if snapshots of chain state are used for respin of cluster instances."""
+    return (
+        configuration.CHAIN_SNAPSHOTS
+        and not configuration.HAS_DBSYNC
+        and cluster_nodes.get_cluster_type().type == cluster_nodes.ClusterType.LOCAL
+    )
+
+
+def get_snapshot_dir(instance_num: int) -> pl.Path:
+    """Return dir with the snapshot of the cluster instance."""
+    return temptools.get_pytest_root_tmp() / SNAPSHOTS_DIR_NAME / f"cluster{instance_num}"
+
+
+def needs_capture(instance_num: int) -> bool:
+    """Check if the snapshot of the cluster instance was not taken yet."""
+    snapshot_dir = get_snapshot_dir(instance_num=instance_num)
+    return not (
+        (snapshot_dir / METADATA_FILE).exists() or (snapshot_dir / CAPTURE_FAILED_FILE).exists()
+    )
+
+
+def _copy_tree(*, src: pl.Path, dst: pl.Path) -> None:
+    """Copy directory tree, use reflinks (copy-on-write) when the file system supports it."""
+    helpers.run_command(["cp", "-a", "--reflink=auto", str(src), str(dst)])
+
+
+def _clean_state_copy(state_dir: pl.Path) -> None:
+    """Remove files that must not be restored from the copy of the state dir."""
+    for glob in _EXCLUDED_GLOBS:
+        for f in state_dir.glob(glob):
+            f.unlink()
+    for f in state_dir.rglob("*"):
+        if f.is_socket():
+            f.unlink()
+
+
+def _get_genesis_hash(*, genesis_file: pl.Path, byron: bool = False) -> str:
+    cmd = (
+        ["cardano-cli", "byron", "genesis", "print-genesis-hash", "--genesis-json"]
+        if byron
+        else ["cardano-cli", "latest", "genesis", "hash", "--genesis"]
+    )
+    return helpers.run_command([*cmd, str(genesis_file)]).decode().strip()
+
+
+def shift_genesis_start(*, state_dir: pl.Path, shift_sec: int) -> None:
+    """Shift the start time in genesis files and update the genesis hashes in node configs."""
+    byron_genesis_file = state_dir / "byron" / "genesis.json"
+    byron_genesis = json.loads(byron_genesis_file.read_text(encoding="utf-8"))
+    byron_genesis["startTime"] += shift_sec
+    byron_genesis_file.write_text(json.dumps(byron_genesis, indent=4), encoding="utf-8")
+
+    shelley_genesis_file = state_dir / "shelley" / "genesis.json"
+    shelley_genesis = json.loads(shelley_genesis_file.read_text(encoding="utf-8"))
+    system_start = datetime.datetime.strptime(
+        shelley_genesis["systemStart"], _SYSTEM_START_FORMAT
+    ).replace(tzinfo=datetime.UTC) + datetime.timedelta(seconds=shift_sec)
+    shelley_genesis["systemStart"] = system_start.strftime(_SYSTEM_START_FORMAT)
+    shelley_genesis_file.write_text(json.dumps(shelley_genesis, indent=4), encoding="utf-8")
+
+    start_time_file = state_dir / "cluster_start_time"
+    if start_time_file.exists():
+        start_time_file.write_text(f"{byron_genesis['startTime']}\n", encoding="utf-8")
+
+    byron_hash = _get_genesis_hash(genesis_file=byron_genesis_file, byron=True)
+    shelley_hash = _get_genesis_hash(genesis_file=shelley_genesis_file)
+    for config_file in state_dir.glob("*.json"):
+        config = json.loads(config_file.read_text(encoding="utf-8"))
+        if not (isinstance(config, dict) and "ShelleyGenesisHash" in config):
+            continue
+        config["ByronGenesisHash"] = byron_hash
+        config["ShelleyGenesisHash"] = shelley_hash
+        config_file.write_text(json.dumps(config, indent=4), encoding="utf-8")
+
+
+def _stop_cluster(*, state_dir: pl.Path, ignore_fail: bool = False) -> None:
+    cluster_pids = cluster_nodes.get_cluster_pids()
+    LOGGER.info(f"Stopping cluster with `{state_dir / 'stop-cluster'}`.")
+    helpers.run_command(str(state_dir / "stop-cluster"), ignore_fail=ignore_fail)
+    # The node databases must not be copied while the nodes are still writing to them
+    cluster_nodes.wait_for_cluster_stop(pids=cluster_pids, timeout=10)
+
+
+def _resume_cluster(*, captured_at: float, services: list[str]) -> None:
+    """Start the stopped cluster instance so it continues the chain.
+
+    Wait until new blocks are created on the chain.
+    """
+    cluster_env = cluster_nodes.get_cluster_env()
+    state_dir = cluster_env.state_dir
+
+    # The tip of the chain is at the slot that was current when the cluster instance was stopped.
+    # Round the shift down, so the current slot will not be before the tip.
+    shift_genesis_start(state_dir=state_dir, shift_sec=int(time.time() - captured_at))
+
+    LOGGER.info(f"Resuming cluster with `{state_dir / 'supervisord_start'}`.")
+    helpers.run_command(str(state_dir / "supervisord_start"))
+    if not readiness.poll(
+        lambda: readiness.is_socket_available(cluster_env.socket_path), timeout=30
+    ):
+        msg = f"Socket '{cluster_env.socket_path}' is not available."
+        raise RuntimeError(msg)
+
+    # Services that are not started automatically by supervisor
+    if services:
+        cluster_nodes.run_supervisorctl(args=["start", *services], ignore_fail=True)
+
+    cluster_nodes.get_cluster_type().get_cluster_obj().wait_for_new_block(new_blocks=2)
+
+
+def _forget_faucet_utxos(instance_num: int) -> None:
+    """Forget faucet UTxOs that were tracked on the chain that was replaced by the snapshot.
+
+    The restored cluster instance has the same faucet addresses, but their UTxOs are rolled back.
+    """
+    for rec in cluster_nodes.load_addrs_data().values():
+        if "payment" in rec:
+            faucet.forget_tracked_utxos(rec["payment"].address)
+    utxo_index.invalidate(instance_num=instance_num)
+
+
+def capture(*, addrs_data_dir: pl.Path) -> bool:
+    """Take a snapshot of the freshly started cluster instance.
+
+    The cluster instance is stopped while the snapshot is taken, and then it is resumed.
+
+    Returns:
+        bool: True if the snapshot was taken.
+    """
+    cluster_env = cluster_nodes.get_cluster_env()
+    state_dir = cluster_env.state_dir
+    snapshot_dir = get_snapshot_dir(instance_num=cluster_env.instance_num)
+    snapshot_dir.parent.mkdir(parents=True, exist_ok=True)
+
+    if not cluster_nodes.get_cluster_type().uses_shortcut:
+        LOGGER.info("Not taking chain snapshot, the chain contains Byron blocks.")
+        snapshot_dir.mkdir(exist_ok=True)
+        (snapshot_dir / CAPTURE_FAILED_FILE).touch()
+        return False
+
+    services = [
+        s.name
+        for s in cluster_nodes.services_status()
+        if s.status == "RUNNING" and not s.name.startswith("nodes:")
+    ]
+
+    LOGGER.info(f"Taking chain snapshot of cluster instance '{cluster_env.instance_num}'.")
+    tmp_snapshot_dir = snapshot_dir.with_name(f"{snapshot_dir.name}_{helpers.get_rand_str(8)}")
+    _stop_cluster(state_dir=state_dir)
+    captured_at = time.time()
+    captured = False
+    try:
+        tmp_snapshot_dir.mkdir()
+        _copy_tree(src=state_dir, dst=tmp_snapshot_dir / STATE_DIR_NAME)
+        _clean_state_copy(tmp_snapshot_dir / STATE_DIR_NAME)
+        _copy_tree(src=addrs_data_dir, dst=tmp_snapshot_dir / ADDRS_DATA_DIR_NAME)
+        metadata = {
+            "captured_at": captured_at,
+            "addrs_data_dir": str(addrs_data_dir),
+            "services": services,
+        }
+        (tmp_snapshot_dir / METADATA_FILE).write_text(json.dumps(metadata), encoding="utf-8")
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        tmp_snapshot_dir.rename(snapshot_dir)
+        captured = True
+    except Exception:
+        LOGGER.exception("Failed to take chain snapshot.")
+        shutil.rmtree(tmp_snapshot_dir, ignore_errors=True)
+        snapshot_dir.mkdir(exist_ok=True)
+        (snapshot_dir / CAPTURE_FAILED_FILE).touch()
+    finally:
+        try:
+            _resume_cluster(captured_at=captured_at, services=services)
+        except Exception:
+            # The snapshot would not be possible to resume either
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+            snapshot_dir.mkdir(exist_ok=True)
+            (snapshot_dir / CAPTURE_FAILED_FILE).touch()
+            raise
+
+    return captured
+
+
+def restore() -> bool:
+    """Restore the snapshot of the cluster instance.
+
+    Called when the cluster instance is stopped and its state dir is removed.
+
+    Returns:
+        bool: True if the cluster instance was restored and it is running, False if the cluster
+            instance needs to be started from genesis.
+    """
+    cluster_env = cluster_nodes.get_cluster_env()
+    state_dir = cluster_env.state_dir
+    snapshot_dir = get_snapshot_dir(instance_num=cluster_env.instance_num)
+    metadata_file = snapshot_dir / METADATA_FILE
+    if not metadata_file.exists():
+        return False
+
+    LOGGER.info(f"Restoring chain snapshot of cluster instance '{cluster_env.instance_num}'.")
+    try:
+        metadata = json.loads(metadata_file.read_text(encoding="utf-8"))
+        _copy_tree(src=snapshot_dir / STATE_DIR_NAME, dst=state_dir)
+
+        # Faucet addresses data refers to key files in the original dir
+        addrs_data_dir = pl.Path(metadata["addrs_data_dir"])
+        if not addrs_data_dir.exists():
+            addrs_data_dir.parent.mkdir(parents=True, exist_ok=True)
+            _copy_tree(src=snapshot_dir / ADDRS_DATA_DIR_NAME, dst=addrs_data_dir)
+
+        _resume_cluster(captured_at=metadata["captured_at"], services=metadata["services"])
+        _forget_faucet_utxos(instance_num=cluster_env.instance_num)
+    except Exception:
+        LOGGER.exception("Failed to restore chain snapshot, the cluster will start from genesis.")
+        if (state_dir / "stop-cluster").exists():
+            _stop_cluster(state_dir=state_dir, ignore_fail=True)
+        shutil.rmtree(state_dir, ignore_errors=True)
+        return False
+
+    return True
@@ -21,7 +21,6 @@ import logging
 import os
 import pathlib as pl
 import random
-import shutil
 import time
 import typing as tp
 
@@ -29,19 +28,25 @@ import pytest
 from _pytest.config import Config
 from cardonnay import local_scripts as cardonnay_local
 
+from cardano_node_tests.cluster_management import chain_snapshots
 from cardano_node_tests.cluster_management import common
-from cardano_node_tests.cluster_management import netstat_tools
 from cardano_node_tests.cluster_management import resources
 from cardano_node_tests.cluster_management import resources_management
+from cardano_node_tests.cluster_management import respin
+from cardano_node_tests.cluster_management import spare_instances
 from cardano_node_tests.cluster_management import status_files
-from cardano_node_tests.utils import artifacts
+from cardano_node_tests.cluster_management import status_watcher
 from cardano_node_tests.utils import cluster_nodes
 from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import framework_log
 from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import key_pool
 from cardano_node_tests.utils import locking
+from cardano_node_tests.utils import logfiles
 from cardano_node_tests.utils import temptools
+from cardano_node_tests.utils import timings
 from cardano_node_tests.utils import types as ttypes
+from cardano_node_tests.utils import utxo_index
 
 LOGGER = logging.getLogger(__name__)
 
@@ -94,6 +99,7 @@ class ClusterGetter:
         self.pytest_config = pytest_config
         self.worker_id = worker_id
         self.num_of_instances = num_of_instances
+        self.num_of_spares = spare_instances.get_spares_count()
         self.log = log_func
 
         self.pytest_tmp_dir = temptools.get_pytest_root_tmp()
@@ -133,6 +139,23 @@ class ClusterGetter:
             instance_num=self.cluster_instance_num
         )
 
+    def _get_status_watcher(self, available_instances: list[int]) -> status_watcher.StatusWatcher:
+        """Return watcher of status files that will be used for waiting between checks."""
+        instance_dirs = [status_files.get_instance_dir(instance_num=i) for i in available_instances]
+        for d in instance_dirs:
+            d.mkdir(exist_ok=True)
+        return status_watcher.StatusWatcher(dirs=[self.pytest_tmp_dir, *instance_dirs])
+
+    def _wait_for_status_change(
+        self, watcher: status_watcher.StatusWatcher | None, timeout: float
+    ) -> float:
+        """Wait before next check of status files, return the time spent waiting."""
+        if watcher is None:
+            start = time.monotonic()
+            _xdist_sleep(timeout)
+            return time.monotonic() - start
+        return watcher.wait(timeout=timeout)
+
     def _create_startup_files_dir(self, instance_num: int) -> pl.Path:
         inst_dir = status_files.get_instance_dir(instance_num=instance_num)
         rand_str = helpers.get_rand_str(8)
@@ -140,7 +163,8 @@ class ClusterGetter:
         startup_files_dir.mkdir(exist_ok=True, parents=True)
         return startup_files_dir
 
-    def _respin(self, scriptsdir: ttypes.FileType = "") -> bool:  # noqa: C901
+    @timings.span("respin")
+    def _respin(self, scriptsdir: ttypes.FileType = "") -> bool:
         """Respin cluster.
 
         Not called under global lock!
@@ -165,18 +189,13 @@ class ClusterGetter:
 
         self.log(f"c{self.cluster_instance_num}: called `_respin`, scriptsdir='{scriptsdir}'")
 
-        state_dir = cluster_nodes.get_cluster_env().state_dir
+        respin.check_started_by_framework()
 
-        if (
-            state_dir.exists()
-            and not status_files.get_started_by_framework_file(state_dir=state_dir).exists()
-        ):
-            self.log(
-                f"c{self.cluster_instance_num}: ERROR: state dir exists but cluster "
-                "was not started by the framework"
-            )
-            msg = "Cannot respin cluster when it was not started by the framework."
-            raise RuntimeError(msg)
+        # The logs watcher of the old cluster instance would only race with the respin
+        logfiles.stop_logs_watcher(instance_num=self.cluster_instance_num)
+        utxo_index.invalidate(instance_num=self.cluster_instance_num)
+        # Key pairs are not generated in the background while the cluster instance is respun
+        key_pool.stop_and_save_cli_coverage(pytest_config=self.pytest_config)
 
         startup_files = cluster_nodes.get_cluster_type().cluster_scripts.prepare_scripts_files(
             destdir=self._create_startup_files_dir(self.cluster_instance_num),
@@ -189,125 +208,32 @@ class ClusterGetter:
             f"scriptsdir='{startup_files.start_script.parent}', "
         )
 
-        def _netstat_log_func(msg: str) -> None:
-            self.log(f"c{self.cluster_instance_num}: {msg}")
-
-        excp: Exception | None = None
-        netstat_out = ""
-        ports = self.ports
-        cluster_obj = None
-        for i in range(2):
-            if i > 0:
-                self.log(
-                    f"c{self.cluster_instance_num}: failed to start cluster:\n{excp}\nretrying"
-                )
-                time.sleep(0.2)
-
-            try:
-                LOGGER.info(f"Stopping cluster with `{startup_files.stop_script}`.")
-                helpers.run_command(str(startup_files.stop_script))
-            except Exception as err:
-                self.log(f"c{self.cluster_instance_num}: failed to stop cluster:\n{err}")
-
-            # Give the cluster time to stop
-            time.sleep(10)
-
-            # Kill the leftover processes
-            netstat_tools.kill_old_cluster(
-                instance_num=self.cluster_instance_num, log_func=_netstat_log_func
-            )
-
-            # Save artifacts only when produced during this test run
-            if cluster_running_file.exists() or i > 0:
-                artifacts.save_start_script_coverage(
-                    log_file=state_dir / common.START_CLUSTER_LOG,
-                    pytest_config=self.pytest_config,
-                )
-                artifacts.save_cluster_artifacts(save_dir=self.pytest_tmp_dir, state_dir=state_dir)
-
-            shutil.rmtree(state_dir, ignore_errors=True)
-
-            _cluster_started = False
-            try:
-                cluster_obj = cluster_nodes.start_cluster(
-                    cmd=str(startup_files.start_script), args=startup_files.start_script_args
-                )
-                _cluster_started = True
-            except Exception as err:
-                LOGGER.error(f"Failed to start cluster: {err}")  # noqa: TRY400
-                excp = err
-            finally:
-                if state_dir.exists():
-                    status_files.create_started_by_framework_file(state_dir=state_dir)
-            # `else` cannot be used together with `finally`
-            if _cluster_started:
-                break
-
-            netstat_out = netstat_tools.get_netstat_conn()
-            self.log(
-                f"c{self.cluster_instance_num}: failed to start cluster:\n{excp}"
-                f"\nports:\n{ports}"
-                f"\nnetstat:\n{netstat_out}"
-            )
-        else:
-            self.log(f"c{self.cluster_instance_num}: cluster dead")
-            framework_log.framework_logger().error(
-                "Failed to start cluster instance 'c%s':\n%s\nports:\n%s\nnetstat:\n%s",
-                self.cluster_instance_num,
-                excp,
-                ports,
-                netstat_out,
-            )
-            if not configuration.IS_XDIST:
-                pytest.exit(reason="Failed to start cluster", returncode=1)
-            status_files.create_cluster_dead_file(instance_num=self.cluster_instance_num)
-            return False
-
-        if cluster_obj is None:
-            # Should never reach this
-            self.log(f"c{self.cluster_instance_num}: failed to start cluster")
-            return False
-
-        # Generate ID for the new cluster instance so it is possible to match log entries with
-        # cluster instance files saved as artifacts.
-        cluster_instance_id = helpers.get_rand_str(8)
-        with open(
-            state_dir / artifacts.CLUSTER_INSTANCE_ID_FILENAME, "w", encoding="utf-8"
-        ) as fp_out:
-            fp_out.write(cluster_instance_id)
-        self.log(f"c{self.cluster_instance_num}: started cluster instance '{cluster_instance_id}'")
-
-        # Create dir for faucet addresses data among tests artifacts, so it can be accessed
-        # during testnet cleanup.
-        addr_data_dir = (
-            temptools.get_pytest_worker_tmp() / f"{common.ADDRS_DATA_DIRNAME}_"
-            f"ci{self.cluster_instance_num}_{cluster_instance_id}"
-        )
-        addr_data_dir.mkdir(parents=True, exist_ok=True)
-
-        # Setup faucet addresses
         try:
-            cluster_nodes.setup_test_addrs(cluster_obj=cluster_obj, destination_dir=addr_data_dir)
-        except Exception as err:
-            self.log(
-                f"c{self.cluster_instance_num}: failed to setup test addresses:\n{err}\n"
-                "cluster dead"
-            )
-            framework_log.framework_logger().error(
-                "Failed to setup test addresses on instance 'c%s':\n%s",
-                self.cluster_instance_num,
-                excp,
+            respin.respin_instance(
+                instance_num=self.cluster_instance_num,
+                startup_files=startup_files,
+                # Save artifacts only when produced during this test run
+                save_artifacts=cluster_running_file.exists(),
+                # Custom cluster scripts are specific to the test, the chain snapshot cannot
+                # be used
+                use_snapshots=not scriptsdir and chain_snapshots.is_enabled(),
+                log_func=self.log,
+                pytest_config=self.pytest_config,
             )
+        except respin.RespinError as err:
+            self.log(f"c{self.cluster_instance_num}: {err}\ncluster dead")
+            framework_log.framework_logger().error("%s", err)
             if not configuration.IS_XDIST:
-                pytest.exit(
-                    reason=f"Failed to setup test addresses, exception: {err}", returncode=1
-                )
+                pytest.exit(reason=str(err).split("\n", maxsplit=1)[0], returncode=1)
             status_files.create_cluster_dead_file(instance_num=self.cluster_instance_num)
             return False
 
         # Create file that indicates that the cluster is running
         cluster_running_file.touch()
 
+        if configuration.LOGS_WATCHER:
+            logfiles.start_logs_watcher(cluster_env=cluster_nodes.get_cluster_env())
+
         return True
 
     def _is_dev_cluster_ready(self) -> bool:
@@ -580,7 +506,7 @@ class ClusterGetter:
 
     def _check_dead_fraction(self, max_dead_fraction: float) -> None:
         """Fail if the fraction of dead cluster instances is too high."""
-        total = self.num_of_instances
+        total = self.num_of_instances + self.num_of_spares
         if total == 0:
             msg = "Number of cluster instances must be greater than 0."
             raise ValueError(msg)
@@ -638,6 +564,25 @@ class ClusterGetter:
             self.log(f"c{cget_status.instance_num}: tests are running, cannot respin")
             return False
 
+        # Swap in a spare instance that is ready, and respin this instance in the background.
+        # Custom cluster scripts are specific to the test, so the respin needs to happen here.
+        if (
+            self.num_of_spares
+            and not self._test_needs_respin(cget_status)
+            and spare_instances.swap_in_spare(
+                instance_num=cget_status.instance_num,
+                num_of_instances=self.num_of_instances,
+                worker_id=self.worker_id,
+                pytest_config=self.pytest_config,
+                log_func=self.log,
+            )
+            != -1
+        ):
+            if cget_status.selected_instance == cget_status.instance_num:
+                cget_status.selected_instance = -1
+            cget_status.sleep_delay = 0
+            return False
+
         self.log(f"c{cget_status.instance_num}: setting 'respin in progress'")
 
         # Cluster respin will be performed by this worker.
@@ -748,8 +693,9 @@ class ClusterGetter:
         instances. Earlier instances would otherwise fill up with light tests, leaving
         heavy tests unable to find a free instance.
         """
-        tail_size = min(2, self.num_of_instances)
-        head_size = self.num_of_instances - tail_size
+        num_of_instances = len(available_instances)
+        tail_size = min(2, num_of_instances)
+        head_size = num_of_instances - tail_size
         head_sample = random.sample(available_instances[:head_size], head_size)
         # Iterate tail instances in fixed order so light tests pack onto the first
         # tail instance up to `configuration.MAX_TESTS_PER_CLUSTER` before spilling
@@ -780,7 +726,7 @@ class ClusterGetter:
 
         return use_resources
 
-    def get_cluster_instance(  # noqa: C901
+    def get_cluster_instance(
         self,
         mark: str = "",
         lock_resources: resources_management.ResourcesType = (),
@@ -842,7 +788,7 @@ class ClusterGetter:
 
             available_instances = [cluster_nodes.get_cluster_env().instance_num]
         else:
-            available_instances = list(range(self.num_of_instances))
+            available_instances = list(range(self.num_of_instances + self.num_of_spares))
 
         if configuration.FORBID_RESTART and scriptsdir:
             msg = "Cannot use custom cluster scripts when 'FORBID_RESTART' is set."
@@ -868,11 +814,44 @@ class ClusterGetter:
             scriptsdir=scriptsdir,
             current_test=os.environ.get("PYTEST_CURRENT_TEST") or "",
         )
-        marked_tests_cache: dict[int, dict[str, int]] = {}
 
         self.log(f"want to run test '{cget_status.current_test}'")
 
-        # Iterate until it is possible to start the test. Timeout after grace period.
+        # In event-driven mode, wake up as soon as a status file changes instead of waiting for
+        # the whole sleep interval. The status files are still checked the same way, so the
+        # sleep interval serves as an upper bound in case an event is missed.
+        watcher = (
+            self._get_status_watcher(available_instances=available_instances)
+            if configuration.IS_XDIST and configuration.EVENT_DRIVEN_SCHEDULING
+            else None
+        )
+        try:
+            instance_num = self._get_cluster_instance_loop(
+                cget_status=cget_status,
+                available_instances=available_instances,
+                watcher=watcher,
+            )
+        finally:
+            if watcher is not None:
+                watcher.close()
+
+        return instance_num
+
+    def _get_cluster_instance_loop(  # noqa: C901
+        self,
+        cget_status: _ClusterGetStatus,
+        available_instances: list[int],
+        watcher: status_watcher.StatusWatcher | None,
+    ) -> int:
+        """Iterate until it is possible to start the test. Timeout after grace period."""
+        mark = cget_status.mark
+        lock_resources = list(cget_status.lock_resources)
+        use_resources = list(cget_status.use_resources)
+        prio = cget_status.prio
+        scriptsdir = cget_status.scriptsdir
+        marked_tests_cache: dict[int, dict[str, int]] = {}
+        waited_sec = 0.0
+
         now = time.monotonic()
         deadline_soft = now + self.grace_period_soft
         deadline_hard = now + self.grace_period_hard
@@ -894,7 +873,9 @@ class ClusterGetter:
                 self._respin(scriptsdir=scriptsdir)
 
             # Sleep for a while to avoid too many checks in a short time
-            _xdist_sleep(random.uniform(0.6, 1.2) * cget_status.sleep_delay)
+            waited_sec += self._wait_for_status_change(
+                watcher=watcher, timeout=random.uniform(0.6, 1.2) * cget_status.sleep_delay
+            )
             cget_status.sleep_delay = max(cget_status.sleep_delay, 1)
 
             # Compute the instance iteration order outside the lock to keep the locked
@@ -907,11 +888,31 @@ class ClusterGetter:
 
             # Nothing time consuming can go under this lock as all other workers will need to wait
             with locking.FileLockIfXdist(self.cluster_lock):
+                # Status changes made until now will be seen by the checks below
+                if watcher is not None:
+                    watcher.clear()
+
                 if self._is_already_running():
                     return self.cluster_instance_num
 
                 self._fail_on_dead_clusters(remaining_time_sec=remaining_soft)
 
+                # Tests don't run on spare instances. Roles of cluster instances change only
+                # under the cluster lock, so the spare instances are filtered out here.
+                if self.num_of_spares:
+                    spare_instances.init_spares(
+                        num_of_instances=self.num_of_instances,
+                        worker_id=self.worker_id,
+                        pytest_config=self.pytest_config,
+                        log_func=self.log,
+                    )
+                    spares = spare_instances.list_spares(instances=available_instances)
+                    instances_order = self._make_instances_order(
+                        available_instances=[i for i in available_instances if i not in spares],
+                        lock_resources=lock_resources,
+                        use_resources=use_resources,
+                    )
+
                 if mark:
                     # Check if tests with my mark are already locked to any cluster instance
                     cget_status.marked_running_my_anywhere = status_files.list_curr_mark_files(
@@ -1052,4 +1053,10 @@ class ClusterGetter:
                 # Cluster instance is ready, we can start the test
                 break
 
+        if watcher is not None:
+            self.log(
+                f"c{instance_num}: waited {waited_sec:.1f}s for cluster instance, "
+                f"{watcher.wakeups} early wake ups saved {watcher.saved_sec:.1f}s of polling"
+            )
+
         return instance_num
@@ -27,16 +27,20 @@ from cardano_node_tests.cluster_management import cache
 from cardano_node_tests.cluster_management import cluster_getter
 from cardano_node_tests.cluster_management import common
 from cardano_node_tests.cluster_management import resources_management
+from cardano_node_tests.cluster_management import spare_instances
 from cardano_node_tests.cluster_management import status_files
 from cardano_node_tests.utils import artifacts
 from cardano_node_tests.utils import cluster_nodes
 from cardano_node_tests.utils import cluster_scripts
 from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import key_pool
 from cardano_node_tests.utils import locking
 from cardano_node_tests.utils import logfiles
 from cardano_node_tests.utils import temptools
+from cardano_node_tests.utils import timings
 from cardano_node_tests.utils import types as ttypes
+from cardano_node_tests.utils import utxo_index
 
 LOGGER = logging.getLogger(__name__)
 
@@ -120,6 +124,7 @@ class ClusterManager:
         call `_reload_cluster_obj` and thus save CLI coverage of the old `cluster_obj` instance.
         """
         self.log("called `save_worker_cli_coverage`")
+        key_pool.stop_and_save_cli_coverage(pytest_config=self.pytest_config)
         worker_cache = cache.CacheManager.get_cache()
         for cache_instance in worker_cache.values():
             cluster_obj = cache_instance.cluster_obj
@@ -151,8 +156,11 @@ class ClusterManager:
 
         return True
 
-    def save_all_clusters_artifacts(self) -> None:
-        """Save artifacts of all cluster instances."""
+    def save_all_clusters_artifacts(self, *, keeps_running: bool = False) -> None:
+        """Save artifacts of all cluster instances.
+
+        Set `keeps_running` when the cluster instances are not going to be stopped afterwards.
+        """
         self.log("called `save_all_clusters_artifacts`")
 
         if configuration.DEV_CLUSTER_RUNNING:
@@ -163,7 +171,7 @@ class ClusterManager:
 
         work_dir = cluster_nodes.get_cluster_env().work_dir
 
-        for instance_num in range(self.num_of_instances):
+        for instance_num in range(self.num_of_instances + spare_instances.get_spares_count()):
             state_dir = work_dir / f"{cluster_nodes.STATE_CLUSTER}{instance_num}"
             if not self._is_valid_cluster_instance(work_dir=work_dir, instance_num=instance_num):
                 continue
@@ -172,7 +180,9 @@ class ClusterManager:
                 log_file=state_dir / common.START_CLUSTER_LOG,
                 pytest_config=self.pytest_config,
             )
-            artifacts.save_cluster_artifacts(save_dir=self.pytest_tmp_dir, state_dir=state_dir)
+            artifacts.save_cluster_artifacts(
+                save_dir=self.pytest_tmp_dir, state_dir=state_dir, keeps_running=keeps_running
+            )
 
     def stop_all_clusters(self) -> None:
         """Stop all cluster instances."""
@@ -185,7 +195,7 @@ class ClusterManager:
 
         work_dir = cluster_nodes.get_cluster_env().work_dir
 
-        for instance_num in range(self.num_of_instances):
+        for instance_num in range(self.num_of_instances + spare_instances.get_spares_count()):
             state_dir = work_dir / f"{cluster_nodes.STATE_CLUSTER}{instance_num}"
             if not self._is_valid_cluster_instance(work_dir=work_dir, instance_num=instance_num):
                 continue
@@ -224,17 +234,45 @@ class ClusterManager:
             raise
 
     @contextlib.contextmanager
-    def cache_fixture(self, key: str = "") -> tp.Iterator[FixtureCache[tp.Any]]:
-        """Cache fixture value - context manager."""
+    def cache_fixture(
+        self, key: str = "", shared: bool = False
+    ) -> tp.Iterator[FixtureCache[tp.Any]]:
+        """Cache fixture value - context manager.
+
+        The value is cached for the pytest worker. With `shared`, the value is cached also for
+        other pytest workers that use the same cluster instance (when `SHARED_FIXTURE_CACHE` is
+        set). The first worker creates the value while holding a lock and the other workers wait
+        for it. Shared value must be picklable and it must be ready for use by the end of
+        the `with` block, e.g. it cannot be registered on chain only after the block.
+        """
         key_str = key or _get_manager_fixture_line_str()
         key_hash = int(hashlib.sha1(key_str.encode("utf-8")).hexdigest(), 16)
         cached_value = self.cache.test_data.get(key_hash)
-        container: FixtureCache[tp.Any] = FixtureCache(value=cached_value)
 
-        yield container
+        if cached_value is not None or not (shared and configuration.SHARED_FIXTURE_CACHE):
+            container: FixtureCache[tp.Any] = FixtureCache(value=cached_value)
+
+            yield container
+
+            if container.value != cached_value:
+                self.cache.test_data[key_hash] = container.value
+            return
+
+        shared_file = cache.get_shared_cache_file(
+            instance_num=self.cluster_instance_num,
+            checksum=self.cache.last_checksum,
+            key_hash=key_hash,
+        )
+        with locking.FileLockIfXdist(f"{shared_file}.lock"):
+            shared_value = cache.load_shared_value(shared_file)
+            container = FixtureCache(value=shared_value)
 
-        if container.value != cached_value:
-            self.cache.test_data[key_hash] = container.value
+            yield container
+
+            if container.value != shared_value:
+                cache.save_shared_value(shared_file, container.value)
+
+        self.cache.test_data[key_hash] = container.value
 
     def get_logfiles_errors(self) -> str:
         """Get errors found in cluster artifacts."""
@@ -242,7 +280,8 @@ class ClusterManager:
             return ""
 
         self.log(f"c{self._cluster_instance_num}: called `get_logfiles_errors`")
-        return logfiles.get_logfiles_errors()
+        with timings.span("get_logfiles_errors"):
+            return logfiles.get_logfiles_errors()
 
     def on_test_stop(self) -> None:
         """Perform actions after a test is finished."""
@@ -333,6 +372,9 @@ class ClusterManager:
     def _save_cli_coverage(self) -> None:
         """Save CLI coverage info collected by this `cluster_obj` instance."""
         self.log("called `_save_cli_coverage`")
+        # The background threads of the key pool must not run CLI commands while the coverage
+        # is being saved
+        key_pool.stop_and_save_cli_coverage(pytest_config=self.pytest_config)
         cluster_obj = self.cache.cluster_obj
         if not cluster_obj:
             return
@@ -342,6 +384,11 @@ class ClusterManager:
     def _reload_cluster_obj(self, state_dir: pl.Path) -> None:
         """Reload cluster instance data if necessary."""
         addrs_data_checksum = helpers.checksum(state_dir / cluster_nodes.ADDRS_DATA)
+        # Cluster instance restored from a chain snapshot has the same addresses data as the
+        # snapshotted cluster instance, but a new cluster instance ID
+        instance_id_file = state_dir / artifacts.CLUSTER_INSTANCE_ID_FILENAME
+        if instance_id_file.exists():
+            addrs_data_checksum = f"{addrs_data_checksum}_{instance_id_file.read_text().strip()}"
         # The checksum will not match when cluster was respun
         if addrs_data_checksum == self.cache.last_checksum:
             return
@@ -349,12 +396,20 @@ class ClusterManager:
         # Save CLI coverage collected by the old `cluster_obj` instance
         self._save_cli_coverage()
 
+        # The UTxOs indexed by this worker are not valid on the respun cluster instance
+        utxo_index.invalidate(instance_num=self.cluster_instance_num)
+
         # Replace the old `cluster_obj` instance and reload data
         self.cache.cluster_obj = cluster_nodes.get_cluster_type().get_cluster_obj()
         self.cache.test_data = {}
         self.cache.addrs_data = cluster_nodes.load_addrs_data()
         self.cache.last_checksum = addrs_data_checksum
 
+        if configuration.SHARED_FIXTURE_CACHE:
+            cache.clean_shared_cache(
+                instance_num=self.cluster_instance_num, checksum=addrs_data_checksum
+            )
+
     def init(
         self,
         mark: str = "",
@@ -371,19 +426,20 @@ class ClusterManager:
         **IMPORTANT**: This method must be called before any other method of this class.
         """
         # Get number of initialized cluster instance once it is possible to start a test
-        instance_num = cluster_getter.ClusterGetter(
-            worker_id=self.worker_id,
-            pytest_config=self.pytest_config,
-            num_of_instances=self.num_of_instances,
-            log_func=self.log,
-        ).get_cluster_instance(
-            mark=mark,
-            lock_resources=lock_resources,
-            use_resources=use_resources,
-            prio=prio,
-            cleanup=cleanup,
-            scriptsdir=scriptsdir,
-        )
+        with timings.span("get_cluster_instance", mark=mark):
+            instance_num = cluster_getter.ClusterGetter(
+                worker_id=self.worker_id,
+                pytest_config=self.pytest_config,
+                num_of_instances=self.num_of_instances,
+                log_func=self.log,
+            ).get_cluster_instance(
+                mark=mark,
+                lock_resources=lock_resources,
+                use_resources=use_resources,
+                prio=prio,
+                cleanup=cleanup,
+                scriptsdir=scriptsdir,
+            )
         self._cluster_instance_num = instance_num
 
         # Reload cluster instance data if necessary
@@ -399,6 +455,9 @@ class ClusterManager:
         cluster_obj._cluster_manager = self  # type: ignore
         self._initialized = True
 
+        # Pre-generate key pairs while the test is running
+        key_pool.refill()
+
     def get(
         self,
         mark: str = "",
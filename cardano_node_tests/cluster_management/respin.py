@@ -0,0 +1,184 @@
+"""Respin of a cluster instance.
+
+The respin is shared by the cluster instances used by tests (see `cluster_getter`) and by the
+spare instances that are respun in the background (see `spare_instances`). The cluster
+environment must be set for the cluster instance that is being respun.
+"""
+
+import logging
+import shutil
+import time
+import typing as tp
+
+from _pytest.config import Config
+from cardonnay import local_scripts as cardonnay_local
+
+from cardano_node_tests.cluster_management import chain_snapshots
+from cardano_node_tests.cluster_management import common
+from cardano_node_tests.cluster_management import netstat_tools
+from cardano_node_tests.cluster_management import status_files
+from cardano_node_tests.utils import artifacts
+from cardano_node_tests.utils import cluster_nodes
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import temptools
+
+LOGGER = logging.getLogger(__name__)
+
+
+class RespinError(Exception):
+    """The cluster instance failed to respin and it is dead."""
+
+
+def check_started_by_framework() -> None:
+    """Check that the existing cluster instance was started by the framework."""
+    state_dir = cluster_nodes.get_cluster_env().state_dir
+    if (
+        state_dir.exists()
+        and not status_files.get_started_by_framework_file(state_dir=state_dir).exists()
+    ):
+        msg = "Cannot respin cluster when it was not started by the framework."
+        raise RuntimeError(msg)
+
+
+def respin_instance(  # noqa: C901
+    *,
+    instance_num: int,
+    startup_files: cardonnay_local.InstanceFiles,
+    save_artifacts: bool,
+    use_snapshots: bool,
+    log_func: tp.Callable[[str], None],
+    pytest_config: Config | None = None,
+) -> str:
+    """Respin the cluster instance.
+
+    Stop the cluster and save its artifacts, start a new cluster or restore it from the chain
+    snapshot, and set up faucet addresses. The chain snapshot is taken after the first start
+    of the cluster instance.
+
+    Args:
+        instance_num: A number of the cluster instance.
+        startup_files: Scripts for starting and stopping the cluster instance.
+        save_artifacts: Whether to save artifacts of the stopped cluster. The artifacts are
+            always saved when the first start of the cluster failed.
+        use_snapshots: Whether to use the chain snapshot.
+        log_func: A function for logging progress of the respin.
+        pytest_config: A Pytest config, needed for saving coverage of the start script
+            (optional).
+
+    Returns:
+        str: An ID of the new cluster instance.
+    """
+    check_started_by_framework()
+    state_dir = cluster_nodes.get_cluster_env().state_dir
+
+    def _netstat_log_func(msg: str) -> None:
+        log_func(f"c{instance_num}: {msg}")
+
+    ports = cluster_nodes.get_cluster_type().cluster_scripts.get_instance_ports(
+        instance_num=instance_num
+    )
+    restored = False
+    excp: Exception | None = None
+    netstat_out = ""
+    cluster_obj = None
+    for i in range(2):
+        if i > 0:
+            log_func(f"c{instance_num}: failed to start cluster:\n{excp}\nretrying")
+            time.sleep(0.2)
+
+        cluster_pids = cluster_nodes.get_cluster_pids(instance_num=instance_num)
+        try:
+            LOGGER.info(f"Stopping cluster with `{startup_files.stop_script}`.")
+            helpers.run_command(str(startup_files.stop_script))
+        except Exception as err:
+            log_func(f"c{instance_num}: failed to stop cluster:\n{err}")
+
+        # Give the cluster time to stop
+        cluster_nodes.wait_for_cluster_stop(
+            pids=cluster_pids, instance_num=instance_num, timeout=10
+        )
+
+        # Kill the leftover processes
+        netstat_tools.kill_old_cluster(instance_num=instance_num, log_func=_netstat_log_func)
+
+        if (save_artifacts or i > 0) and state_dir.exists():
+            if pytest_config:
+                artifacts.save_start_script_coverage(
+                    log_file=state_dir / common.START_CLUSTER_LOG, pytest_config=pytest_config
+                )
+            artifacts.save_cluster_artifacts(
+                save_dir=temptools.get_pytest_root_tmp(), state_dir=state_dir, cluster_stopped=True
+            )
+
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+        if i == 0 and use_snapshots and chain_snapshots.restore():
+            log_func(f"c{instance_num}: restored cluster from chain snapshot")
+            restored = True
+            cluster_obj = cluster_nodes.get_cluster_type().get_cluster_obj()
+            break
+
+        try:
+            cluster_obj = cluster_nodes.start_cluster(
+                cmd=str(startup_files.start_script), args=startup_files.start_script_args
+            )
+        except Exception as err:
+            LOGGER.error(f"Failed to start cluster: {err}")  # noqa: TRY400
+            excp = err
+        finally:
+            if state_dir.exists():
+                status_files.create_started_by_framework_file(state_dir=state_dir)
+        # `else` cannot be used together with `finally`
+        if cluster_obj:
+            break
+
+        netstat_out = netstat_tools.get_netstat_conn()
+        log_func(
+            f"c{instance_num}: failed to start cluster:\n{excp}"
+            f"\nports:\n{ports}"
+            f"\nnetstat:\n{netstat_out}"
+        )
+
+    if cluster_obj is None:
+        msg = (
+            f"Failed to start cluster instance 'c{instance_num}':\n{excp}"
+            f"\nports:\n{ports}\nnetstat:\n{netstat_out}"
+        )
+        raise RespinError(msg) from excp
+
+    # Generate ID for the new cluster instance so it is possible to match log entries with
+    # cluster instance files saved as artifacts.
+    cluster_instance_id = helpers.get_rand_str(8)
+    (state_dir / artifacts.CLUSTER_INSTANCE_ID_FILENAME).write_text(
+        cluster_instance_id, encoding="utf-8"
+    )
+    log_func(f"c{instance_num}: started cluster instance '{cluster_instance_id}'")
+
+    # Create dir for faucet addresses data among tests artifacts, so it can be accessed
+    # during testnet cleanup.
+    addrs_data_dir = (
+        temptools.get_pytest_worker_tmp()
+        / f"{common.ADDRS_DATA_DIRNAME}_ci{instance_num}_{cluster_instance_id}"
+    )
+
+    # Setup faucet addresses, unless they were restored together with the chain snapshot
+    if not restored:
+        try:
+            addrs_data_dir.mkdir(parents=True, exist_ok=True)
+            cluster_nodes.setup_test_addrs(cluster_obj=cluster_obj, destination_dir=addrs_data_dir)
+        except Exception as err:
+            msg = f"Failed to setup test addresses on instance 'c{instance_num}':\n{err}"
+            raise RespinError(msg) from err
+
+    # Take the chain snapshot after the first start of the cluster instance
+    if use_snapshots and chain_snapshots.needs_capture(instance_num):
+        try:
+            chain_snapshots.capture(addrs_data_dir=addrs_data_dir)
+        except Exception as err:
+            msg = (
+                f"Failed to resume cluster instance 'c{instance_num}' after taking "
+                f"chain snapshot:\n{err}"
+            )
+            raise RespinError(msg) from err
+
+    return cluster_instance_id
@@ -0,0 +1,336 @@
+"""Spare cluster instances that hide the latency of cluster respin.
+
+Respin of a cluster instance (stopping the cluster, saving artifacts, starting a new cluster and
+setting up faucet addresses) takes minutes, and all tests that want to run on the instance wait
+for it. When `SPARE_CLUSTERS` is set, that many extra cluster instances are started in the
+background. The spare instances have instance numbers following the `CLUSTERS_COUNT` instances,
+so they have their own ports and state dirs. Tests never run on a spare instance.
+
+When a cluster instance needs respin and a spare instance is ready, the two instances swap their
+roles under the cluster lock. The spare instance accepts tests right away, and the old instance
+becomes a spare instance that is respun in the background. The number of running cluster
+instances never exceeds `CLUSTERS_COUNT` + `SPARE_CLUSTERS`.
+
+The role of a cluster instance is recorded by the "spare instance" status file. Cluster
+environment is set process-wide through env variables, so the background respin runs in
+a subprocess (see `main`) with the environment of the spare instance.
+
+Spare instances are not used for respins with custom cluster scripts, as the scripts are specific
+to the test that needs them.
+
+The respin itself is the same as the respin of cluster instances used by tests, see `respin`.
+"""
+
+import argparse
+import concurrent.futures
+import functools
+import logging
+import pathlib as pl
+import subprocess
+import sys
+import threading
+import typing as tp
+
+from _pytest.config import Config
+
+from cardano_node_tests.cluster_management import chain_snapshots
+from cardano_node_tests.cluster_management import common
+from cardano_node_tests.cluster_management import respin
+from cardano_node_tests.cluster_management import status_files
+from cardano_node_tests.utils import artifacts
+from cardano_node_tests.utils import cluster_nodes
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import locking
+from cardano_node_tests.utils import logfiles
+from cardano_node_tests.utils import temptools
+from cardano_node_tests.utils import utxo_index
+
+LOGGER = logging.getLogger(__name__)
+
+SPARES_INITIALIZED_FILE = ".spares_initialized"
+RESPIN_LOG_TEMPLATE = "spare_respin_{}.log"
+
+
+class SpareInstances:
+    """Background respins of spare instances started by this pytest worker."""
+
+    futures: tp.ClassVar[list[concurrent.futures.Future]] = []
+    lock: tp.ClassVar[threading.Lock] = threading.Lock()
+    # The spare instances were already initialized, as seen by this pytest worker
+    initialized: tp.ClassVar[bool] = False
+
+
+def get_spares_count() -> int:
+    """Return number of spare cluster instances."""
+    if (
+        not configuration.IS_XDIST
+        or configuration.DEV_CLUSTER_RUNNING
+        or configuration.FORBID_RESTART
+        or configuration.BOOTSTRAP_DIR
+    ):
+        return 0
+    return max(configuration.SPARE_CLUSTERS, 0)
+
+
+@functools.cache
+def _get_executor() -> concurrent.futures.Executor:
+    return concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(get_spares_count(), 1), thread_name_prefix="spare-respin"
+    )
+
+
+def is_spare(instance_num: int) -> bool:
+    """Check if the cluster instance is a spare instance."""
+    return status_files.get_spare_instance_file(instance_num=instance_num).exists()
+
+
+def _is_ready(instance_num: int) -> bool:
+    return (
+        is_spare(instance_num)
+        and status_files.get_cluster_running_file(instance_num=instance_num).exists()
+        and not status_files.get_cluster_dead_file(instance_num=instance_num).exists()
+        and not status_files.list_respin_progress_files(instance_num=instance_num)
+        and not status_files.list_respin_needed_files(instance_num=instance_num)
+    )
+
+
+def _needs_respin(instance_num: int) -> bool:
+    return (
+        is_spare(instance_num)
+        and not status_files.get_cluster_dead_file(instance_num=instance_num).exists()
+        and not status_files.list_respin_progress_files(instance_num=instance_num)
+        and (
+            not status_files.get_cluster_running_file(instance_num=instance_num).exists()
+            or bool(status_files.list_respin_needed_files(instance_num=instance_num))
+        )
+    )
+
+
+def list_spares(*, instances: tp.Iterable[int]) -> set[int]:
+    """Return the spare instances among the given cluster instances.
+
+    Roles of the cluster instances change under the cluster lock, so the result is valid only
+    while the lock is held. Called under the cluster lock.
+    """
+    return {i for i in instances if is_spare(i)}
+
+
+def init_spares(
+    *, num_of_instances: int, worker_id: str, pytest_config: Config, log_func: tp.Callable
+) -> None:
+    """Mark the instances following the `num_of_instances` instances as spare instances.
+
+    The spare instances are started in the background. Done once per testing session, later
+    respins of spare instances are started by `swap_in_spare`. Called under the cluster lock.
+    """
+    if SpareInstances.initialized:
+        return
+
+    initialized_file = temptools.get_pytest_root_tmp() / SPARES_INITIALIZED_FILE
+    if not initialized_file.exists():
+        for instance_num in range(num_of_instances, num_of_instances + get_spares_count()):
+            status_files.get_instance_dir(instance_num=instance_num).mkdir(exist_ok=True)
+            status_files.create_spare_instance_file(instance_num=instance_num)
+        start_spares(
+            num_of_instances=num_of_instances,
+            worker_id=worker_id,
+            pytest_config=pytest_config,
+            log_func=log_func,
+        )
+        initialized_file.touch()
+
+    SpareInstances.initialized = True
+
+
+def _respin_in_subprocess(
+    *, instance_num: int, worker_id: str, pytest_config: Config, log_func: tp.Callable
+) -> None:
+    """Respin the spare instance in a subprocess and update its status files."""
+    state_dir = cluster_nodes.get_cluster_env(instance_num=instance_num).state_dir
+    instance_dir = status_files.get_instance_dir(instance_num=instance_num)
+    rand_str = helpers.get_rand_str(8)
+
+    # Save artifacts only when produced during this test run
+    save_artifacts = status_files.get_cluster_running_file(instance_num=instance_num).exists()
+    if save_artifacts:
+        artifacts.save_start_script_coverage(
+            log_file=state_dir / common.START_CLUSTER_LOG, pytest_config=pytest_config
+        )
+
+    startup_files_dir = instance_dir / "startup_files" / rand_str
+    startup_files_dir.mkdir(parents=True, exist_ok=True)
+    cmd = [
+        sys.executable,
+        "-m",
+        __name__,
+        "--instance-num",
+        str(instance_num),
+        "--startup-files-dir",
+        str(startup_files_dir),
+        "--pytest-root-tmp",
+        str(temptools.get_pytest_root_tmp()),
+        "--pytest-worker-tmp",
+        str(temptools.get_pytest_worker_tmp()),
+        *(["--save-artifacts"] if save_artifacts else []),
+    ]
+    respin_log = instance_dir / RESPIN_LOG_TEMPLATE.format(rand_str)
+    with open(respin_log, "w", encoding="utf-8") as fp_out:
+        returncode = subprocess.run(
+            cmd, stdout=fp_out, stderr=subprocess.STDOUT, check=False
+        ).returncode
+
+    with locking.FileLockIfXdist(common.get_cluster_lock_file()):
+        status_files.rm_respin_progress_files(instance_num=instance_num, worker_id=worker_id)
+        if returncode != 0:
+            log_func(f"c{instance_num}: failed to respin spare instance, see '{respin_log}'")
+            status_files.create_cluster_dead_file(instance_num=instance_num)
+            return
+        status_files.rm_respin_needed_files(instance_num=instance_num)
+        status_files.get_cluster_running_file(instance_num=instance_num).touch()
+        log_func(f"c{instance_num}: spare instance is ready")
+
+    if configuration.LOGS_WATCHER:
+        logfiles.start_logs_watcher(
+            cluster_env=cluster_nodes.get_cluster_env(instance_num=instance_num)
+        )
+
+
+def _respin_in_background(
+    *, instance_num: int, worker_id: str, pytest_config: Config, log_func: tp.Callable
+) -> None:
+    log_func(f"c{instance_num}: respinning spare instance in the background")
+    status_files.create_respin_progress_file(instance_num=instance_num, worker_id=worker_id)
+
+    # The logs watcher of the old cluster instance would only race with the respin
+    logfiles.stop_logs_watcher(instance_num=instance_num)
+    utxo_index.invalidate(instance_num=instance_num)
+
+    future = _get_executor().submit(
+        _respin_in_subprocess,
+        instance_num=instance_num,
+        worker_id=worker_id,
+        pytest_config=pytest_config,
+        log_func=log_func,
+    )
+    with SpareInstances.lock:
+        SpareInstances.futures.append(future)
+
+
+def start_spares(
+    *, num_of_instances: int, worker_id: str, pytest_config: Config, log_func: tp.Callable
+) -> None:
+    """Respin spare instances that are not running or that need respin, in the background.
+
+    Called when the spare instances are initialized and when the set of spare instances
+    changes. Called under the cluster lock.
+    """
+    for instance_num in range(num_of_instances + get_spares_count()):
+        if _needs_respin(instance_num):
+            _respin_in_background(
+                instance_num=instance_num,
+                worker_id=worker_id,
+                pytest_config=pytest_config,
+                log_func=log_func,
+            )
+
+
+def swap_in_spare(
+    *,
+    instance_num: int,
+    num_of_instances: int,
+    worker_id: str,
+    pytest_config: Config,
+    log_func: tp.Callable,
+) -> int:
+    """Swap a ready spare instance in place of the cluster instance that needs respin.
+
+    The cluster instance becomes a spare instance and it is respun in the background.
+    Called under the cluster lock.
+
+    Returns:
+        int: A number of the swapped in spare instance, -1 if no spare instance is ready.
+    """
+    spare_num = next((i for i in range(num_of_instances + get_spares_count()) if _is_ready(i)), -1)
+    if spare_num == -1:
+        return -1
+
+    status_files.rm_spare_instance_file(instance_num=spare_num)
+    status_files.create_spare_instance_file(instance_num=instance_num)
+    log_func(f"c{instance_num}: swapped with spare instance c{spare_num}")
+
+    # Remove mark status files as these will not be valid after respin
+    status_files.rm_curr_mark_files(instance_num=instance_num)
+    status_files.rm_respin_after_mark_files(instance_num=instance_num)
+
+    _respin_in_background(
+        instance_num=instance_num,
+        worker_id=worker_id,
+        pytest_config=pytest_config,
+        log_func=log_func,
+    )
+    # The set of spare instances changed, respin also other spare instances that need it
+    start_spares(
+        num_of_instances=num_of_instances,
+        worker_id=worker_id,
+        pytest_config=pytest_config,
+        log_func=log_func,
+    )
+    return spare_num
+
+
+def wait_for_respins() -> None:
+    """Wait for background respins started by this pytest worker."""
+    with SpareInstances.lock:
+        futures = list(SpareInstances.futures)
+        SpareInstances.futures.clear()
+    concurrent.futures.wait(futures)
+
+
+def get_args() -> argparse.Namespace:
+    """Get script command line arguments."""
+    parser = argparse.ArgumentParser(description="Respin a spare cluster instance.")
+    parser.add_argument("--instance-num", required=True, type=int, help="Cluster instance number.")
+    parser.add_argument(
+        "--startup-files-dir", required=True, type=pl.Path, help="Dir for cluster scripts."
+    )
+    parser.add_argument(
+        "--pytest-root-tmp", required=True, type=pl.Path, help="Root Pytest temporary dir."
+    )
+    parser.add_argument(
+        "--pytest-worker-tmp", required=True, type=pl.Path, help="Pytest worker temporary dir."
+    )
+    parser.add_argument(
+        "--save-artifacts", action="store_true", help="Save artifacts of the stopped cluster."
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    logging.basicConfig(format="%(asctime)s %(levelname)s:%(message)s", level=logging.INFO)
+    args = get_args()
+
+    cluster_nodes.set_cluster_env(instance_num=args.instance_num)
+    # The respin runs outside of Pytest, use temporary dirs of the Pytest worker
+    temptools.PytestTempDirs.pytest_root_tmp = args.pytest_root_tmp
+    temptools.PytestTempDirs.pytest_worker_tmp = args.pytest_worker_tmp
+    temptools.PytestTempDirs.pytest_shared_tmp = args.pytest_root_tmp / "tmp"
+    try:
+        startup_files = cluster_nodes.get_cluster_type().cluster_scripts.prepare_scripts_files(
+            destdir=args.startup_files_dir, instance_num=args.instance_num
+        )
+        respin.respin_instance(
+            instance_num=args.instance_num,
+            startup_files=startup_files,
+            save_artifacts=args.save_artifacts,
+            use_snapshots=chain_snapshots.is_enabled(),
+            log_func=LOGGER.info,
+        )
+    except Exception:
+        LOGGER.exception(f"Failed to respin spare cluster instance 'c{args.instance_num}'.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
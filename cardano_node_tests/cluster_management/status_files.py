@@ -10,10 +10,17 @@ Common components of status file names:
 * `_@@<resource_name>@@_`: resource name
 * `_%%<mark>%%_`: test mark
 * `_<worker_id>`: pytest worker ID
+
+The status files are listed through the `StatusIndex`, so the checks done repeatedly by
+all workers don't need to glob the shared temp directory over and over again.
 """
 
+import dataclasses
+import fnmatch
+import os
 import pathlib as pl
 import re
+import time
 import typing as tp
 
 from cardano_node_tests.utils import temptools
@@ -32,8 +39,24 @@ CLUSTER_RUNNING_FILE = ".cluster_running"
 CLUSTER_STOPPED_FILE = ".cluster_stopped"
 CLUSTER_DEAD_FILE = ".cluster_dead"
 CLUSTER_STARTED_BY_FRAMEWORK = ".cluster_started_by_cnt"
+SPARE_INSTANCE_FILE = ".spare_instance"
 
 RE_RESNAME = re.compile("_@@(.+)@@_")
+RE_INSTANCE_DIR = re.compile(f"{CLUSTER_DIR_TEMPLATE}([0-9]+)")
+
+_STATUS_KINDS = (
+    RESOURCE_LOCKED_GLOB,
+    RESOURCE_IN_USE_GLOB,
+    TEST_CURR_MARK_GLOB,
+    RESPIN_NEEDED_GLOB,
+    RESPIN_IN_PROGRESS_GLOB,
+    RESPIN_AFTER_MARK_GLOB,
+    PRIO_IN_PROGRESS_GLOB,
+    TEST_RUNNING_GLOB,
+)
+_STATUS_KINDS_NO_WORKER = frozenset(
+    (CLUSTER_RUNNING_FILE, CLUSTER_STOPPED_FILE, CLUSTER_DEAD_FILE, SPARE_INSTANCE_FILE)
+)
 
 
 def get_instance_dir(instance_num: int) -> pl.Path:
@@ -66,6 +89,12 @@ def get_cluster_dead_file(instance_num: int) -> pl.Path:
     return instance_dir / CLUSTER_DEAD_FILE
 
 
+def get_spare_instance_file(instance_num: int) -> pl.Path:
+    """Return the status file that indicates that the cluster instance is a spare instance."""
+    instance_dir = get_instance_dir(instance_num=instance_num)
+    return instance_dir / SPARE_INSTANCE_FILE
+
+
 def get_respin_needed_file(instance_num: int, worker_id: str) -> pl.Path:
     """Return the status file that indicates that the cluster instance needs respin."""
     instance_dir = get_instance_dir(instance_num=instance_num)
@@ -106,15 +135,225 @@ def get_test_running_file(instance_num: int, worker_id: str, mark: str = "") ->
     return instance_dir / f"{TEST_RUNNING_GLOB}{mark_str}_{worker_id}"
 
 
+@dataclasses.dataclass(frozen=True, slots=True)
+class StatusRecord:
+    """Parsed name of a status file."""
+
+    kind: str
+    path: pl.Path
+    instance_num: int | None = None
+    worker_id: str = ""
+    mark: str = ""
+    resource: str = ""
+
+
+@dataclasses.dataclass(slots=True)
+class _DirRecords:
+    """Status records found in a single directory."""
+
+    mtime_ns: int
+    racy: bool
+    records: list[StatusRecord]
+    instance_nums: list[int]
+
+
+def _parse_status_name(
+    name: str, dir_path: pl.Path, instance_num: int | None
+) -> StatusRecord | None:
+    """Parse the name of a status file into a `StatusRecord`.
+
+    Return `None` if the file is not a status file.
+    """
+    if name in _STATUS_KINDS_NO_WORKER:
+        return StatusRecord(kind=name, path=dir_path / name, instance_num=instance_num)
+
+    kind = next((k for k in _STATUS_KINDS if name.startswith(f"{k}_")), "")
+    if not kind:
+        return None
+
+    rest = name[len(kind) :]
+    # The name enclosed in "@@" is a mark for some kinds of status files and resource name
+    # for the others
+    at_name = ""
+    if rest.startswith("_@@"):
+        end = rest.find("@@", 3)
+        if end == -1:
+            return None
+        at_name = rest[3:end]
+        rest = rest[end + 2 :]
+
+    mark = ""
+    if rest.startswith("_%%"):
+        end = rest.find("%%", 3)
+        if end == -1:
+            return None
+        mark = rest[3:end]
+        rest = rest[end + 2 :]
+
+    if not rest.startswith("_") or len(rest) == 1:
+        return None
+
+    if kind in (RESOURCE_LOCKED_GLOB, RESOURCE_IN_USE_GLOB):
+        resource = at_name
+    else:
+        resource = ""
+        mark = at_name
+
+    return StatusRecord(
+        kind=kind,
+        path=dir_path / name,
+        instance_num=instance_num,
+        worker_id=rest[1:],
+        mark=mark,
+        resource=resource,
+    )
+
+
+def _match_mark(record_mark: str, mark: str | None) -> bool:
+    """Check if the mark of a status record matches the `mark` filter.
+
+    If `mark` is `None`, match regardless whether any mark is present or not.
+    If `mark` is `*`, match records that have any mark.
+    If `mark` is an empty string, match records that don't have mark.
+    """
+    if mark is None:
+        return True
+    if not mark:
+        return not record_mark
+    return bool(record_mark) and fnmatch.fnmatchcase(record_mark, mark)
+
+
+class StatusIndex:
+    """In-memory index of status files.
+
+    The status files are listed with a single `os.scandir` pass per directory and parsed into
+    `StatusRecord` records. A directory is scanned again only when its mtime changes, i.e. when
+    a status file was created or deleted in it, so most queries don't touch the directory
+    contents at all.
+    """
+
+    # Changes that happen within this interval after a directory was modified might not change
+    # the directory mtime, because of the granularity of file system timestamps. Directories
+    # modified this recently are always scanned again. Some file systems have only 1 second
+    # granularity of timestamps.
+    RACY_NS = 1_000_000_000
+
+    def __init__(self, root_dir: pl.Path) -> None:
+        self.root_dir = root_dir
+        self._dirs: dict[pl.Path, _DirRecords] = {}
+        self.scans = 0
+
+    def _scan_dir(self, dir_path: pl.Path, instance_num: int | None) -> _DirRecords:
+        try:
+            mtime_ns = dir_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._dirs.pop(dir_path, None)
+            return _DirRecords(mtime_ns=0, racy=True, records=[], instance_nums=[])
+
+        cached = self._dirs.get(dir_path)
+        if cached and cached.mtime_ns == mtime_ns and not cached.racy:
+            return cached
+
+        scan_ns = time.time_ns()
+        records = []
+        instance_nums = []
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith("."):
+                    record = _parse_status_name(
+                        name=name, dir_path=dir_path, instance_num=instance_num
+                    )
+                    if record:
+                        records.append(record)
+                elif instance_num is None and (m := RE_INSTANCE_DIR.fullmatch(name)):
+                    instance_nums.append(int(m.group(1)))
+
+        self.scans += 1
+        dir_records = _DirRecords(
+            mtime_ns=mtime_ns,
+            racy=mtime_ns >= scan_ns - self.RACY_NS,
+            records=records,
+            instance_nums=sorted(instance_nums),
+        )
+        self._dirs[dir_path] = dir_records
+        return dir_records
+
+    def get_records(self, instance_num: int | None = None) -> list[StatusRecord]:
+        """Return records of status files of the given cluster instance, or of all instances."""
+        if instance_num is not None:
+            instance_dir = self.root_dir / f"{CLUSTER_DIR_TEMPLATE}{instance_num}"
+            return self._scan_dir(instance_dir, instance_num=instance_num).records
+
+        instance_nums = self._scan_dir(self.root_dir, instance_num=None).instance_nums
+        return [
+            r
+            for i in instance_nums
+            for r in self._scan_dir(
+                self.root_dir / f"{CLUSTER_DIR_TEMPLATE}{i}", instance_num=i
+            ).records
+        ]
+
+    def get_root_records(self) -> list[StatusRecord]:
+        """Return records of status files that are not specific to a cluster instance."""
+        return self._scan_dir(self.root_dir, instance_num=None).records
+
+    def query(
+        self,
+        kind: str,
+        instance_num: int | None = None,
+        worker_id: str = "*",
+        mark: str | None = None,
+    ) -> list[StatusRecord]:
+        """Return records of the given kind that match the filters.
+
+        It is possible to use glob patterns for `worker_id` and `mark`. See `_match_mark` for
+        the meaning of `mark` values.
+        """
+        records = (
+            self.get_root_records()
+            if kind == PRIO_IN_PROGRESS_GLOB
+            else self.get_records(instance_num=instance_num)
+        )
+        return [
+            r
+            for r in records
+            if r.kind == kind
+            and (worker_id == "*" or fnmatch.fnmatchcase(r.worker_id, worker_id))
+            and _match_mark(record_mark=r.mark, mark=mark)
+        ]
+
+
+_STATUS_INDEXES: dict[pl.Path, StatusIndex] = {}
+
+
+def get_status_index() -> StatusIndex:
+    """Return the index of status files for the current pytest session."""
+    pytest_tmp_dir = temptools.get_pytest_root_tmp()
+    index = _STATUS_INDEXES.get(pytest_tmp_dir)
+    if index is None:
+        index = StatusIndex(root_dir=pytest_tmp_dir)
+        _STATUS_INDEXES[pytest_tmp_dir] = index
+    return index
+
+
+def _query_paths(
+    kind: str, instance_num: int | None = None, worker_id: str = "*", mark: str | None = None
+) -> list[pl.Path]:
+    return [
+        r.path
+        for r in get_status_index().query(
+            kind=kind, instance_num=instance_num, worker_id=worker_id, mark=mark
+        )
+    ]
+
+
 def get_marks_in_progress(instance_num: int | None = None, worker_id: str = "*") -> list[str]:
     """Return list of marks that are in progress."""
-    instance_num_str = str(instance_num) if instance_num is not None else "*"
-    worker_id_str = "" if worker_id == "*" else f"_{worker_id}"
-    pytest_tmp_dir = temptools.get_pytest_root_tmp()
-    files = pytest_tmp_dir.glob(
-        f"{CLUSTER_DIR_TEMPLATE}{instance_num_str}/{TEST_RUNNING_GLOB}_@@*{worker_id_str}"
+    records = get_status_index().query(
+        kind=TEST_RUNNING_GLOB, instance_num=instance_num, worker_id=worker_id, mark="*"
     )
-    marks_in_progress = [f.name.split("@@")[1] for f in files]
+    marks_in_progress = [r.mark for r in records]
     return marks_in_progress
 
 
@@ -127,28 +366,10 @@ def list_test_running_files(
     If `mark` is `*`, list all status files that have any mark.
     If `mark` is an empty string, list all status files that don't have mark.
     """
-    if mark == "":
-        mark_str = ""
-    elif mark is None:
-        mark_str = "*"
-    else:
-        mark_str = f"_@@{mark}@@"
-
-    instance_num_str = str(instance_num) if instance_num is not None else "*"
-    pytest_tmp_dir = temptools.get_pytest_root_tmp()
-
-    files = list(
-        pytest_tmp_dir.glob(
-            f"{CLUSTER_DIR_TEMPLATE}{instance_num_str}/{TEST_RUNNING_GLOB}{mark_str}_{worker_id}"
-        )
+    return _query_paths(
+        kind=TEST_RUNNING_GLOB, instance_num=instance_num, worker_id=worker_id, mark=mark
     )
 
-    if mark == "" and worker_id == "*":
-        # Filter out all paths that contain marks
-        files = [f for f in files if "_@@" not in f.name]
-
-    return files
-
 
 def get_test_names(
     instance_num: int | None = None, worker_id: str = "*", mark: str | None = None
@@ -168,62 +389,37 @@ def get_test_names(
 
 def list_prio_in_progress_files(worker_id: str = "*") -> list[pl.Path]:
     """List all "priority test in progress" status files."""
-    pytest_tmp_dir = temptools.get_pytest_root_tmp()
-    files = list(pytest_tmp_dir.glob(f"{PRIO_IN_PROGRESS_GLOB}_{worker_id}"))
-    return files
+    return _query_paths(kind=PRIO_IN_PROGRESS_GLOB, worker_id=worker_id)
 
 
 def list_cluster_dead_files(instance_num: int | None = None) -> list[pl.Path]:
     """List all "cluster dead" status files."""
-    instance_num_str = str(instance_num) if instance_num is not None else "*"
-    pytest_tmp_dir = temptools.get_pytest_root_tmp()
-    files = list(
-        pytest_tmp_dir.glob(f"{CLUSTER_DIR_TEMPLATE}{instance_num_str}/{CLUSTER_DEAD_FILE}")
-    )
-    return files
+    return _query_paths(kind=CLUSTER_DEAD_FILE, instance_num=instance_num)
 
 
 def list_respin_needed_files(
     instance_num: int | None = None, worker_id: str = "*"
 ) -> list[pl.Path]:
     """List all "needs respin" status files."""
-    instance_num_str = str(instance_num) if instance_num is not None else "*"
-    pytest_tmp_dir = temptools.get_pytest_root_tmp()
-    files = list(
-        pytest_tmp_dir.glob(
-            f"{CLUSTER_DIR_TEMPLATE}{instance_num_str}/{RESPIN_NEEDED_GLOB}_{worker_id}"
-        )
-    )
-    return files
+    return _query_paths(kind=RESPIN_NEEDED_GLOB, instance_num=instance_num, worker_id=worker_id)
 
 
 def list_respin_progress_files(
     instance_num: int | None = None, worker_id: str = "*"
 ) -> list[pl.Path]:
     """List all "respin in progress" status files."""
-    instance_num_str = str(instance_num) if instance_num is not None else "*"
-    pytest_tmp_dir = temptools.get_pytest_root_tmp()
-    files = list(
-        pytest_tmp_dir.glob(
-            f"{CLUSTER_DIR_TEMPLATE}{instance_num_str}/{RESPIN_IN_PROGRESS_GLOB}_{worker_id}"
-        )
+    return _query_paths(
+        kind=RESPIN_IN_PROGRESS_GLOB, instance_num=instance_num, worker_id=worker_id
     )
-    return files
 
 
 def list_respin_after_mark_files(
     instance_num: int | None = None, worker_id: str = "*", mark: str = "*"
 ) -> list[pl.Path]:
     """List all "respin after mark" status files."""
-    instance_num_str = str(instance_num) if instance_num is not None else "*"
-    pytest_tmp_dir = temptools.get_pytest_root_tmp()
-    files = list(
-        pytest_tmp_dir.glob(
-            f"{CLUSTER_DIR_TEMPLATE}{instance_num_str}/"
-            f"{RESPIN_AFTER_MARK_GLOB}_@@{mark}@@_{worker_id}"
-        )
+    return _query_paths(
+        kind=RESPIN_AFTER_MARK_GLOB, instance_num=instance_num, worker_id=worker_id, mark=mark
     )
-    return files
 
 
 def list_resource_locked_files(
@@ -235,29 +431,10 @@ def list_resource_locked_files(
     If `mark` is `*`, list all status files that have any mark.
     If `mark` is an empty string, list all status files that don't have mark.
     """
-    if mark == "":
-        mark_str = ""
-    elif mark is None:
-        mark_str = "*"
-    else:
-        mark_str = f"_%%{mark}%%"
-
-    instance_num_str = str(instance_num) if instance_num is not None else "*"
-    pytest_tmp_dir = temptools.get_pytest_root_tmp()
-
-    files = list(
-        pytest_tmp_dir.glob(
-            f"{CLUSTER_DIR_TEMPLATE}{instance_num_str}/"
-            f"{RESOURCE_LOCKED_GLOB}_@@*@@{mark_str}_{worker_id}"
-        )
+    return _query_paths(
+        kind=RESOURCE_LOCKED_GLOB, instance_num=instance_num, worker_id=worker_id, mark=mark
     )
 
-    if mark == "" and worker_id == "*":
-        # Filter out all paths that contain marks
-        files = [f for f in files if "_%%" not in f.name]
-
-    return files
-
 
 def list_resource_used_files(
     instance_num: int | None = None, worker_id: str = "*", mark: str | None = None
@@ -268,42 +445,18 @@ def list_resource_used_files(
     If `mark` is `*`, list all status files that have any mark.
     If `mark` is an empty string, list all status files that don't have mark.
     """
-    if mark == "":
-        mark_str = ""
-    elif mark is None:
-        mark_str = "*"
-    else:
-        mark_str = f"_%%{mark}%%"
-
-    instance_num_str = str(instance_num) if instance_num is not None else "*"
-    pytest_tmp_dir = temptools.get_pytest_root_tmp()
-
-    files = list(
-        pytest_tmp_dir.glob(
-            f"{CLUSTER_DIR_TEMPLATE}{instance_num_str}/"
-            f"{RESOURCE_IN_USE_GLOB}_@@*@@{mark_str}_{worker_id}"
-        )
+    return _query_paths(
+        kind=RESOURCE_IN_USE_GLOB, instance_num=instance_num, worker_id=worker_id, mark=mark
     )
 
-    if mark == "" and worker_id == "*":
-        # Filter out all paths that contain marks
-        files = [f for f in files if "_%%" not in f.name]
-
-    return files
-
 
 def list_curr_mark_files(
     instance_num: int | None = None, worker_id: str = "*", mark: str = "*"
 ) -> list[pl.Path]:
     """List all "current mark" status files."""
-    instance_num_str = str(instance_num) if instance_num is not None else "*"
-    pytest_tmp_dir = temptools.get_pytest_root_tmp()
-    files = list(
-        pytest_tmp_dir.glob(
-            f"{CLUSTER_DIR_TEMPLATE}{instance_num_str}/{TEST_CURR_MARK_GLOB}_@@{mark}@@_{worker_id}"
-        )
+    return _query_paths(
+        kind=TEST_CURR_MARK_GLOB, instance_num=instance_num, worker_id=worker_id, mark=mark
     )
-    return files
 
 
 def create_respin_needed_file(instance_num: int, worker_id: str) -> pl.Path:
@@ -358,6 +511,13 @@ def create_cluster_stopped_file(instance_num: int) -> pl.Path:
     return file
 
 
+def create_spare_instance_file(instance_num: int) -> pl.Path:
+    """Create the status file that indicates that the cluster instance is a spare instance."""
+    file = get_spare_instance_file(instance_num=instance_num)
+    file.touch()
+    return file
+
+
 def create_started_by_framework_file(state_dir: pl.Path) -> pl.Path:
     """Create the status file that indicates the cluster instance was started by test framework."""
     file = get_started_by_framework_file(state_dir=state_dir)
@@ -508,3 +668,8 @@ def rm_respin_needed_files(instance_num: int | None = None, worker_id: str = "*"
     for f in files:
         f.unlink()
     return files
+
+
+def rm_spare_instance_file(instance_num: int) -> None:
+    """Delete the status file that indicates that the cluster instance is a spare instance."""
+    get_spare_instance_file(instance_num=instance_num).unlink(missing_ok=True)
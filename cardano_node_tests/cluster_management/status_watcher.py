@@ -0,0 +1,176 @@
+"""Waiting for changes of cluster instance status files.
+
+Workers waiting for a cluster instance normally poll the status files in a loop and sleep
+between the checks. The `StatusWatcher` makes it possible to wake up as soon as a relevant status
+file is created or deleted (a test finished, respin completed, resource was unlocked, ...).
+
+The watcher uses Linux inotify through `ctypes`, so it has no additional dependencies. The status
+files themselves stay the only source of truth. When inotify is not available, the watcher falls
+back to plain sleep, which is the same behavior as the polling mode.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import pathlib as pl
+import select
+import struct
+import time
+import typing as tp
+
+LOGGER = logging.getLogger(__name__)
+
+# inotify constants, see `inotify(7)`
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_EVENT_STRUCT = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+
+def _is_status_file_name(name: str) -> bool:
+    """Check if the file name looks like a status file.
+
+    All status files are hidden files. Lock files are ignored, as they are opened and closed
+    all the time by all workers and would cause a wake up on every lock acquisition.
+    """
+    return name.startswith(".") and not name.endswith(".lock")
+
+
+class StatusWatcher:
+    """Wait for changes of status files in the given directories.
+
+    If inotify is not available, the `wait` method just sleeps for the given time.
+    """
+
+    def __init__(self, dirs: tp.Iterable[pl.Path]) -> None:
+        self.dirs = list(dirs)
+        self._fd = -1
+        self._watched: dict[int, pl.Path] = {}
+        # Time that was not spent sleeping thanks to early wake ups
+        self.saved_sec = 0.0
+        self.wakeups = 0
+
+        self._init_inotify()
+
+    @property
+    def is_active(self) -> bool:
+        return self._fd >= 0
+
+    def _init_inotify(self) -> None:
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            LOGGER.debug("libc not found, status watcher falls back to polling.")
+            return
+
+        try:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError) as err:
+            LOGGER.debug(f"inotify not available, status watcher falls back to polling: {err}")
+            return
+
+        if fd < 0:
+            LOGGER.debug(
+                "Failed to initialize inotify, status watcher falls back to polling: "
+                f"{os.strerror(ctypes.get_errno())}"
+            )
+            return
+
+        self._libc = libc
+        self._fd = fd
+        for d in self.dirs:
+            self._add_watch(d)
+
+    def _add_watch(self, dir_path: pl.Path) -> None:
+        if not self.is_active or dir_path in self._watched.values():
+            return
+
+        wd = self._libc.inotify_add_watch(self._fd, str(dir_path).encode(), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            # The dir can be created later, try again on next `wait`
+            if err != errno.ENOENT:
+                LOGGER.debug(f"Failed to watch '{dir_path}': {os.strerror(err)}")
+            return
+
+        self._watched[wd] = dir_path
+
+    def _drain(self) -> bool:
+        """Read all pending events, return True if any of them was for a status file."""
+        relevant = False
+        while True:
+            try:
+                buf = os.read(self._fd, _READ_SIZE)
+            except BlockingIOError:
+                break
+            if not buf:
+                break
+
+            offset = 0
+            while offset + _EVENT_STRUCT.size <= len(buf):
+                __, __, __, name_len = _EVENT_STRUCT.unpack_from(buf, offset)
+                offset += _EVENT_STRUCT.size
+                name = buf[offset : offset + name_len].rstrip(b"\0").decode(errors="replace")
+                offset += name_len
+                if _is_status_file_name(name):
+                    relevant = True
+
+        return relevant
+
+    def clear(self) -> None:
+        """Discard pending events.
+
+        Meant to be called right after the status files were checked under the cluster lock,
+        so the changes that were already seen don't cause a wake up.
+        """
+        if self.is_active:
+            self._drain()
+
+    def wait(self, timeout: float) -> float:
+        """Wait until a status file changes, or until timeout expires.
+
+        Return the time spent waiting.
+        """
+        start = time.monotonic()
+        if timeout <= 0:
+            return 0.0
+
+        if not self.is_active:
+            time.sleep(timeout)
+            return time.monotonic() - start
+
+        # Watch dirs that didn't exist when the watcher was created
+        for d in self.dirs:
+            self._add_watch(d)
+
+        deadline = start + timeout
+        while (remaining := deadline - time.monotonic()) > 0:
+            ready, __, __ = select.select([self._fd], [], [], remaining)
+            if ready and self._drain():
+                self.wakeups += 1
+                self.saved_sec += max(deadline - time.monotonic(), 0.0)
+                break
+
+        return time.monotonic() - start
+
+    def close(self) -> None:
+        if self.is_active:
+            os.close(self._fd)
+            self._fd = -1
+            self._watched = {}
+
+    def __enter__(self) -> "StatusWatcher":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
@@ -15,6 +15,7 @@ from cardano_node_tests.utils import clusterlib_utils
 from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import helpers
 from cardano_node_tests.utils import pytest_utils
+from cardano_node_tests.utils import utxo_index
 from cardano_node_tests.utils.versions import VERSIONS
 
 LOGGER = logging.getLogger(__name__)
@@ -457,9 +458,12 @@ def _get_funded_addresses(
     # Fund source addresses
     selected_addrs = addrs if fund_idx is None else [addrs[i] for i in fund_idx]
     # The `selected_addrs` can be both `AddressRecord`s or `PoolUser`s
-    payment_addrs = ((sa.payment if hasattr(sa, "payment") else sa) for sa in selected_addrs)
+    payment_addrs = [(sa.payment if hasattr(sa, "payment") else sa) for sa in selected_addrs]
+    balances = utxo_index.get_balances(
+        cluster_obj=cluster_obj, addresses=[a.address for a in payment_addrs]
+    )
     fund_addrs: list[clusterlib.AddressRecord] = [
-        a for a in payment_addrs if cluster_obj.g_query.get_address_balance(a.address) < drop_amount
+        a for a in payment_addrs if balances[a.address] < drop_amount
     ]
     if fund_addrs:
         clusterlib_utils.fund_from_faucet(
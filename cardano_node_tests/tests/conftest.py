@@ -16,20 +16,24 @@ from xdist import workermanage
 
 from cardano_node_tests.cluster_management import cluster_management
 from cardano_node_tests.cluster_management import resources_management
+from cardano_node_tests.cluster_management import spare_instances
 from cardano_node_tests.utils import artifacts
 from cardano_node_tests.utils import cluster_nodes
 from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import dbsync_conn
 from cardano_node_tests.utils import dbsync_queries
 from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import lock_broker
 from cardano_node_tests.utils import locking
 from cardano_node_tests.utils import submit_utils
 from cardano_node_tests.utils import temptools
 from cardano_node_tests.utils import testnet_cleanup
+from cardano_node_tests.utils import timings
 from cardano_node_tests.utils.versions import VERSIONS
 
 LOGGER = logging.getLogger(__name__)
 INTERRUPTED_NAME = ".session_interrupted"
+LOCK_BROKER_KEY = pytest.StashKey[lock_broker.LockBroker]()
 
 # Make sure there's enough time to stop all cluster instances at the end of session
 workermanage.NodeManager.EXIT_TIMEOUT = 30  # pyright: ignore[reportAttributeAccessIssue]
@@ -65,8 +69,34 @@ def pytest_addoption(parser: tp.Any) -> None:
     )
 
 
+def _start_lock_broker(config: tp.Any) -> None:
+    """Start the lock broker in the pytest-xdist controller process.
+
+    The workers are started after this hook, so they inherit the env variable with path
+    to the broker socket.
+    """
+    if not configuration.LOCK_BROKER:
+        return
+    # Start only on the controller, and only when tests run on multiple workers
+    if hasattr(config, "workerinput") or not config.getoption("numprocesses", default=None):
+        return
+
+    broker = lock_broker.LockBroker(
+        socket_path=lock_broker.get_socket_path(name=str(temptools.get_basetemp()))
+    )
+    try:
+        broker.start()
+    except (OSError, RuntimeError):
+        # The workers use lock files when the broker socket is not set
+        LOGGER.warning("Failed to start the lock broker, using lock files.", exc_info=True)
+        return
+    config.stash[LOCK_BROKER_KEY] = broker
+    os.environ[lock_broker.SOCKET_ENV] = str(broker.socket_path)
+
+
 def pytest_configure(config: tp.Any) -> None:
     helpers.check_cardano_node_socket_path()
+    _start_lock_broker(config)
 
     # Don't bother collecting metadata if all tests are skipped
     if config.getvalue("skipall"):
@@ -135,6 +165,13 @@ def pytest_configure(config: tp.Any) -> None:
         LOGGER.warning(" WARNING: Using `cardano-node` from custom path!")
 
 
+def pytest_unconfigure(config: tp.Any) -> None:
+    broker = config.stash.get(LOCK_BROKER_KEY, None)
+    if broker:
+        broker.stop()
+        shutil.rmtree(broker.socket_path.parent, ignore_errors=True)
+
+
 def _skip_all_tests(config: tp.Any, items: list) -> bool:
     """Skip all tests if specified on command line.
 
@@ -202,6 +239,38 @@ def pytest_keyboard_interrupt() -> None:
     (session_basetemp / INTERRUPTED_NAME).touch()
 
 
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_protocol(item: tp.Any) -> tp.Generator[None, object, object]:
+    """Record time spent in the test, including setup and teardown of fixtures."""
+    if not configuration.TIMINGS:
+        return (yield)
+
+    timings.set_current_test(item.nodeid)
+    try:
+        with timings.span("test"):
+            return (yield)
+    finally:
+        timings.set_current_test("")
+        timings.flush()
+
+
+def pytest_sessionfinish(session: tp.Any) -> None:
+    """Merge timings recorded by all pytest workers and save the report."""
+    # Pytest workers only save the recorded timings, the report is saved by the controller
+    if not configuration.TIMINGS or hasattr(session.config, "workerinput"):
+        return
+
+    # Root of the Pytest temporary directory, `PytestTempDirs` are not initialized on controller
+    pytest_root_tmp = pl.Path(session.config._tmp_path_factory.getbasetemp())
+    timings_dir = pytest_root_tmp / timings.TIMINGS_DIR_NAME
+    if not timings_dir.is_dir():
+        return
+
+    dest_dir = session.config.getoption(artifacts.ARTIFACTS_BASE_DIR_ARG) or pytest_root_tmp
+    pl.Path(dest_dir).mkdir(parents=True, exist_ok=True)
+    timings.save_report(timings_dir=timings_dir, dest_dir=pl.Path(dest_dir))
+
+
 @pytest.fixture(scope="session")
 def init_pytest_temp_dirs(tmp_path_factory: TempPathFactory) -> None:
     """Init `PytestTempDirs`."""
@@ -224,14 +293,14 @@ def close_dbconn() -> tp.Generator[None]:
 
 
 def _save_all_cluster_instances_artifacts(
-    cluster_manager_obj: cluster_management.ClusterManager,
+    cluster_manager_obj: cluster_management.ClusterManager, *, keeps_running: bool = False
 ) -> None:
     """Save artifacts of all cluster instances after all tests are finished."""
     cluster_manager_obj.log("running `_save_all_cluster_instances_artifacts`")
 
     # Stop all cluster instances
     with helpers.ignore_interrupt():
-        cluster_manager_obj.save_all_clusters_artifacts()
+        cluster_manager_obj.save_all_clusters_artifacts(keeps_running=keeps_running)
 
 
 def _stop_all_cluster_instances(cluster_manager_obj: cluster_management.ClusterManager) -> None:
@@ -295,6 +364,10 @@ def testenv_setup_teardown(worker_id: str, request: FixtureRequest) -> tp.Genera
 
     yield
 
+    # Background respins of spare instances need to finish before cluster instances are stopped.
+    # Wait outside of the lock, as the respins need the lock to finish.
+    spare_instances.wait_for_respins()
+
     with locking.FileLockIfXdist(f"{pytest_root_tmp}/{cluster_management.CLUSTER_LOCK}"):
         # Remove file indicating that testing session on this worker is running
         (pytest_root_tmp / f"{running_session_glob}_{worker_id}").unlink()
@@ -319,10 +392,14 @@ def testenv_setup_teardown(worker_id: str, request: FixtureRequest) -> tp.Genera
                 artifacts_base_dir = request.config.getoption(artifacts.ARTIFACTS_BASE_DIR_ARG)
                 if artifacts_base_dir:
                     state_dir = cluster_nodes.get_cluster_env().state_dir
-                    artifacts.save_cluster_artifacts(save_dir=pytest_root_tmp, state_dir=state_dir)
+                    artifacts.save_cluster_artifacts(
+                        save_dir=pytest_root_tmp, state_dir=state_dir, keeps_running=True
+                    )
             elif configuration.KEEP_CLUSTERS_RUNNING:
                 # Keep cluster instances running. Stopping them would need to be handled manually.
-                _save_all_cluster_instances_artifacts(cluster_manager_obj=cluster_manager_obj)
+                _save_all_cluster_instances_artifacts(
+                    cluster_manager_obj=cluster_manager_obj, keeps_running=True
+                )
             else:
                 _save_all_cluster_instances_artifacts(cluster_manager_obj=cluster_manager_obj)
                 _stop_all_cluster_instances(cluster_manager_obj=cluster_manager_obj)
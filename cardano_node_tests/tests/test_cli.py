@@ -24,6 +24,7 @@ from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import dbsync_queries
 from cardano_node_tests.utils import helpers
 from cardano_node_tests.utils import logfiles
+from cardano_node_tests.utils import shelley_keys
 from cardano_node_tests.utils.versions import VERSIONS
 
 LOGGER = logging.getLogger(__name__)
@@ -876,6 +877,67 @@ class TestKey:
                 issues.node_4914.finish_test()
             raise
 
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.smoke
+    def test_inprocess_keys(self, cluster: clusterlib.ClusterLib):
+        """Check that keys and addresses generated in-process match `cardano-cli` output.
+
+        The in-process generation is used by fixtures when `INPROCESS_KEYS` is set.
+
+        * Generate stake and payment key pairs and addresses in-process
+        * Derive verification keys from the signing keys with `cardano-cli key verification-key`
+        * Check that the verification key files are identical to the in-process ones
+        * Check that key hashes match `cardano-cli address key-hash` output
+        * Build the addresses with `cardano-cli` and check they match the in-process ones
+        """
+        temp_template = common.get_test_id(cluster)
+
+        stake_rec = shelley_keys.create_stake_addr_records(
+            f"{temp_template}_inproc", cluster_obj=cluster
+        )[0]
+        payment_recs = shelley_keys.create_payment_addr_records(
+            f"{temp_template}_inproc_enterprise",
+            f"{temp_template}_inproc_base",
+            cluster_obj=cluster,
+            stake_vkey_files=[None, stake_rec.vkey_file],
+        )
+
+        for key_type, addr_rec in (
+            (shelley_keys.STAKE, stake_rec),
+            (shelley_keys.PAYMENT, payment_recs[0]),
+            (shelley_keys.PAYMENT, payment_recs[1]),
+        ):
+            cli_vkey_file = cluster.g_key.gen_verification_key(
+                key_name=f"{addr_rec.vkey_file.stem}_cli", signing_key_file=addr_rec.skey_file
+            )
+            assert cli_vkey_file.read_bytes() == addr_rec.vkey_file.read_bytes(), (
+                f"Verification key file '{addr_rec.vkey_file}' differs from `cardano-cli` output"
+            )
+
+            vkey_hash = shelley_keys.get_key_hash(shelley_keys.read_key(addr_rec.vkey_file)).hex()
+            if key_type == shelley_keys.STAKE:
+                cli_vkey_hash = cluster.g_stake_address.get_stake_vkey_hash(
+                    stake_vkey_file=addr_rec.vkey_file
+                )
+            else:
+                cli_vkey_hash = cluster.g_address.get_payment_vkey_hash(
+                    payment_vkey_file=addr_rec.vkey_file
+                )
+            assert vkey_hash == cli_vkey_hash, f"Unexpected key hash: {vkey_hash}"
+
+        cli_stake_address = cluster.g_stake_address.gen_stake_addr(
+            addr_name=f"{temp_template}_cli", stake_vkey_file=stake_rec.vkey_file
+        )
+        assert stake_rec.address == cli_stake_address
+
+        for i, payment_rec in enumerate(payment_recs):
+            cli_address = cluster.g_address.gen_payment_addr(
+                addr_name=f"{temp_template}_cli{i}",
+                payment_vkey_file=payment_rec.vkey_file,
+                stake_vkey_file=stake_rec.vkey_file if i else None,
+            )
+            assert payment_rec.address == cli_address
+
     @allure.link(helpers.get_vcs_link())
     @pytest.mark.smoke
     def test_non_extended_key_error(self, cluster: clusterlib.ClusterLib):
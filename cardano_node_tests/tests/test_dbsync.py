@@ -321,6 +321,54 @@ class TestDBSync:
             "PlutusV2 cost model is not the expected one"
         )
 
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.smoke
+    def test_tx_records_bulk(
+        self,
+        cluster: clusterlib.ClusterLib,
+        cluster_manager: cluster_management.ClusterManager,
+    ):
+        """Check that data of multiple Txs fetched at once match the data fetched per Tx.
+
+        * Submit several transactions with different number of outputs
+        * Fetch data of all the transactions from db-sync at once and check the transactions
+        * Fetch data of each transaction separately
+        * Check that the data are the same
+        """
+        temp_template = common.get_test_id(cluster)
+
+        payment_addrs = clusterlib_utils.create_payment_addr_records(
+            *[f"{temp_template}_{i}" for i in range(4)],
+            cluster_obj=cluster,
+        )
+        src_addr = payment_addrs[0]
+        clusterlib_utils.fund_from_faucet(
+            src_addr,
+            cluster_obj=cluster,
+            all_faucets=cluster_manager.cache.addrs_data,
+            amount=20_000_000,
+        )
+
+        tx_files = clusterlib.TxFiles(signing_key_files=[src_addr.skey_file])
+        tx_outputs = [
+            cluster.g_transaction.send_tx(
+                src_address=src_addr.address,
+                tx_name=f"{temp_template}_{i}",
+                txouts=[
+                    clusterlib.TxOut(address=a.address, amount=1_500_000)
+                    for a in payment_addrs[1 : i + 2]
+                ],
+                tx_files=tx_files,
+            )
+            for i in range(3)
+        ]
+
+        bulk_records = dbsync_utils.check_txs(cluster_obj=cluster, tx_raw_outputs=tx_outputs)
+        single_records = [dbsync_utils.get_tx_record_retry(txhash=r.tx_hash) for r in bulk_records]
+
+        assert [len(r.txouts) for r in bulk_records] == [2, 3, 4], "Unexpected number of outputs"
+        assert bulk_records == single_records, "Bulk and per Tx records differ"
+
     @allure.link(helpers.get_vcs_link())
     @pytest.mark.xdist_split(common.XdSplits.heavy)
     @pytest.mark.testnets
@@ -214,7 +214,7 @@ class TestNodeReconnect:
 
                 # Start the node2
                 cluster_nodes.start_nodes([node2])
-                time.sleep(5)
+                cluster_nodes.wait_for_nodes_ready([node2], timeout=5)
                 self._node_synced(cluster_obj=cluster, node=node2)
 
                 # Submit a Tx number 2 on the node2
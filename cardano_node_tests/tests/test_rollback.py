@@ -19,6 +19,7 @@ from cardano_node_tests.tests import common
 from cardano_node_tests.utils import cluster_nodes
 from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import readiness
 from cardano_node_tests.utils.versions import VERSIONS
 
 LOGGER = logging.getLogger(__name__)
@@ -307,8 +308,18 @@ class TestRollback:
             # Restore the cluster topology
             self.restore_cluster(backup_topology=backup_topology)
 
-            # Wait a bit for rollback to happen
-            time.sleep(10)
+            # Wait for rollback to happen
+            def _consensus_restored() -> bool:
+                return all(
+                    self.node_query_utxo(cluster_obj=cluster, node="pool1", tx_raw_output=t)
+                    == self.node_query_utxo(
+                        cluster_obj=cluster, node=LAST_POOL_NAME, tx_raw_output=t
+                    )
+                    for t in tx_outputs[-2:]
+                )
+
+            if not readiness.poll(_consensus_restored, timeout=10):
+                LOGGER.warning("Consensus was not restored in 10 seconds after topology restore.")
 
             if ROLLBACK_PAUSE:
                 print("PHASE3: single cluster with restored topology")
@@ -497,8 +497,7 @@ class TestBasic:
                 "TX fee doesn't fit the expected interval"
             )
 
-        for tx_out in tx_outputs:
-            dbsync_utils.check_tx(cluster_obj=cluster, tx_raw_output=tx_out)
+        dbsync_utils.check_txs(cluster_obj=cluster, tx_raw_outputs=tx_outputs)
 
     @allure.link(helpers.get_vcs_link())
     @submit_utils.PARAM_SUBMIT_METHOD
@@ -591,8 +590,7 @@ class TestBasic:
                 )
             )
 
-        for tx_out in tx_outputs:
-            dbsync_utils.check_tx(cluster_obj=cluster, tx_raw_output=tx_out)
+        dbsync_utils.check_txs(cluster_obj=cluster, tx_raw_outputs=tx_outputs)
 
     @allure.link(helpers.get_vcs_link())
     @submit_utils.PARAM_SUBMIT_METHOD
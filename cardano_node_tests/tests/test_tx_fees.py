@@ -13,6 +13,8 @@ from packaging import version
 
 from cardano_node_tests.cluster_management import cluster_management
 from cardano_node_tests.tests import common
+from cardano_node_tests.utils import clusterlib_utils
+from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import helpers
 from cardano_node_tests.utils import web
 from cardano_node_tests.utils.versions import VERSIONS
@@ -209,6 +211,59 @@ class TestFee:
             f"Incorrect balance for destination address `{dst_address}`"
         )
 
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.smoke
+    @pytest.mark.testnets
+    def test_inprocess_fee(
+        self,
+        cluster: clusterlib.ClusterLib,
+        payment_addrs: list[clusterlib.AddressRecord],
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Send a transaction with fee calculated in-process.
+
+        * Calculate expected fee for transaction sending 2 ADA using `calculate-min-fee`
+        * Build the transaction with `INPROCESS_FEE` enabled, so the fee is calculated
+          without `calculate-min-fee`, and cross-check the calculated fee with
+          `calculate-min-fee` (`INPROCESS_FEE_VERIFY`)
+        * Submit the transaction and verify it succeeds
+        * Check that the fee calculated in-process matches the expected fee
+        """
+        temp_template = common.get_test_id(cluster)
+        amount = 2_000_000
+
+        src_address = payment_addrs[0].address
+        dst_address = payment_addrs[1].address
+
+        txouts = [clusterlib.TxOut(address=dst_address, amount=amount)]
+        tx_files = clusterlib.TxFiles(signing_key_files=[payment_addrs[0].skey_file])
+        expected_fee = cluster.g_transaction.calculate_tx_fee(
+            src_address=src_address,
+            tx_name=temp_template,
+            txouts=txouts,
+            tx_files=tx_files,
+        )
+
+        monkeypatch.setattr(configuration, "INPROCESS_FEE", True)
+        monkeypatch.setattr(configuration, "INPROCESS_FEE_VERIFY", True)
+        tx_raw_output = clusterlib_utils.build_and_submit_tx(
+            cluster_obj=cluster,
+            name_template=temp_template,
+            src_address=src_address,
+            txouts=txouts,
+            tx_files=tx_files,
+        )
+
+        assert tx_raw_output.fee == expected_fee, (
+            f"The fee calculated in-process ({tx_raw_output.fee}) doesn't match "
+            f"the expected fee ({expected_fee})"
+        )
+
+        out_utxos = cluster.g_query.get_utxo(tx_raw_output=tx_raw_output)
+        assert clusterlib.filter_utxos(utxos=out_utxos, address=dst_address)[0].amount == amount, (
+            f"Incorrect balance for destination address `{dst_address}`"
+        )
+
 
 class TestExpectedFees:
     """Test expected fees."""
@@ -98,8 +98,9 @@ def get_custom_drep(
     if cluster_nodes.get_cluster_type().type != cluster_nodes.ClusterType.LOCAL:
         pytest.skip("runs only on local cluster")
 
+    # The DRep is used only as a delegation target, so it can be shared by all pytest workers
     fixture_cache: cluster_management.FixtureCache[governance_utils.DRepRegistration | None]
-    with cluster_manager.cache_fixture(key=caching_key) as fixture_cache:
+    with cluster_manager.cache_fixture(key=caching_key, shared=True) as fixture_cache:
         if fixture_cache.value is not None:
             return fixture_cache.value  # type: ignore[no-any-return]
 
@@ -1,13 +1,26 @@
-"""Functionality for collecting testing artifacts."""
+"""Functionality for collecting testing artifacts.
 
+Files are hardlinked to the artifacts dirs where possible and copied otherwise. Files of cluster
+instances that keep running after the artifacts are collected are always copied, as tests can
+modify the files in place (e.g. the operational certificates). Files that were already collected,
+i.e. the destination file has the same mtime (and size), are skipped, so collecting artifacts of
+the same cluster instance repeatedly handles only the new log segments.
+"""
+
+import concurrent.futures
+import gzip
 import json
 import logging
+import multiprocessing
+import os
 import pathlib as pl
 import shutil
+import typing as tp
 
 from _pytest.config import Config
 from cardano_clusterlib import clusterlib
 
+from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import helpers
 
 LOGGER = logging.getLogger(__name__)
@@ -15,22 +28,36 @@ LOGGER = logging.getLogger(__name__)
 CLI_COVERAGE_ARG = "--cli-coverage-dir"
 ARTIFACTS_BASE_DIR_ARG = "--artifacts-base-dir"
 CLUSTER_INSTANCE_ID_FILENAME = "cluster_instance_id.log"
+COMPRESSED_SUFFIX = ".gz"
+
+# Log files that are written to while the cluster is running
+LIVE_LOG_GLOBS = ("*.stdout", "*.stderr", "*.log")
+# Rotated log segments
+ROTATED_LOG_GLOBS = ("*.stdout.[0-9]*", "*.stderr.[0-9]*")
 
 
 def save_cli_coverage(
     *, cluster_obj: clusterlib.ClusterLib, pytest_config: Config
 ) -> pl.Path | None:
-    """Save CLI coverage info."""
+    """Save CLI coverage and profiling info."""
     cli_coverage_dir = pytest_config.getoption(CLI_COVERAGE_ARG)
     if not (cli_coverage_dir and hasattr(cluster_obj, "cli_coverage") and cluster_obj.cli_coverage):  # pyright: ignore [reportAttributeAccessIssue]
         return None
 
-    json_file = (
-        pl.Path(cli_coverage_dir) / f"cli_coverage_{helpers.get_timestamped_rand_str()}.json"
-    )
+    rand_str = helpers.get_timestamped_rand_str()
+    json_file = pl.Path(cli_coverage_dir) / f"cli_coverage_{rand_str}.json"
     with open(json_file, "w", encoding="utf-8") as out_json:
         json.dump(cluster_obj.cli_coverage, out_json, indent=4)  # pyright: ignore [reportAttributeAccessIssue]
     LOGGER.info(f"Coverage file saved to '{cli_coverage_dir}'.")
+
+    # Save CLI profiling info next to the coverage info
+    cli_profile = getattr(cluster_obj, "cli_profile", None)
+    if cli_profile:
+        with open(
+            pl.Path(cli_coverage_dir) / f"cli_profile_{rand_str}.json", "w", encoding="utf-8"
+        ) as out_json:
+            json.dump(cli_profile, out_json, indent=4)
+
     return json_file
 
 
@@ -48,8 +75,122 @@ def save_start_script_coverage(*, log_file: pl.Path, pytest_config: Config) -> p
     return dest_file
 
 
-def save_cluster_artifacts(*, save_dir: pl.Path, state_dir: pl.Path) -> None:
-    """Save cluster artifacts (logs, certs, etc.)."""
+def _is_collected(*, src: pl.Path, dst: pl.Path, compressed: bool = False) -> bool:
+    """Check if the source file was already collected to the destination file."""
+    try:
+        dst_stat = dst.stat()
+    except FileNotFoundError:
+        return False
+    src_stat = src.stat()
+    return dst_stat.st_mtime_ns == src_stat.st_mtime_ns and (
+        compressed or dst_stat.st_size == src_stat.st_size
+    )
+
+
+def _copy_file(src: str, dst: str) -> str:
+    """Copy file, unless it was already collected."""
+    src_path, dst_path = pl.Path(src), pl.Path(dst)
+    if not _is_collected(src=src_path, dst=dst_path):
+        shutil.copy2(src_path, dst_path)
+    return dst
+
+
+def _link_or_copy_file(src: str, dst: str) -> str:
+    """Hardlink file, or copy it when it's not possible (e.g. on different filesystem).
+
+    Suitable only for files that are not going to be modified in place.
+    """
+    src_path, dst_path = pl.Path(src), pl.Path(dst)
+    if _is_collected(src=src_path, dst=dst_path):
+        return dst
+
+    dst_path.unlink(missing_ok=True)
+    try:
+        os.link(src_path, dst_path)
+    except OSError:
+        shutil.copy2(src_path, dst_path)
+    return dst
+
+
+def _compress_file(src: str, dst: str) -> str:
+    """Compress file with gzip, unless it was already collected."""
+    src_path, dst_path = pl.Path(src), pl.Path(dst)
+    if _is_collected(src=src_path, dst=dst_path, compressed=True):
+        return dst
+
+    src_stat = src_path.stat()
+    with open(src_path, "rb") as in_fp, gzip.open(dst_path, "wb", compresslevel=6) as out_fp:
+        shutil.copyfileobj(in_fp, out_fp, length=1024 * 1024)
+    # The mtime of the compressed file identifies the collected version of the source file
+    os.utime(dst_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+    return dst
+
+
+def _copy_tree(*, src_dir: pl.Path, dst_dir: pl.Path, hardlink: bool = True) -> None:
+    """Copy directory tree, hardlinking files where possible."""
+
+    def _ignore_collected_symlinks(dirname: str, names: list[str]) -> set[str]:
+        dst = dst_dir / pl.Path(dirname).relative_to(src_dir)
+        return {n for n in names if (dst / n).is_symlink()}
+
+    shutil.copytree(
+        src_dir,
+        dst_dir,
+        symlinks=True,
+        ignore=_ignore_collected_symlinks,
+        copy_function=_link_or_copy_file if hardlink else _copy_file,
+        ignore_dangling_symlinks=True,
+        dirs_exist_ok=True,
+    )
+
+
+def _get_collect_func(
+    *, fpath: pl.Path, cluster_stopped: bool, hardlink: bool
+) -> tp.Callable[[str, str], str]:
+    """Return function for collecting the file."""
+    is_live_log = any(fpath.match(g) for g in LIVE_LOG_GLOBS)
+    is_log = is_live_log or any(fpath.match(g) for g in ROTATED_LOG_GLOBS)
+    compress_bytes = configuration.ARTIFACTS_COMPRESS_MB * 1024 * 1024
+
+    if is_log and compress_bytes and fpath.stat().st_size >= compress_bytes:
+        return _compress_file
+    if (is_live_log and not cluster_stopped) or not hardlink:
+        return _copy_file
+    return _link_or_copy_file
+
+
+def _run_collect_tasks(tasks: list[tuple[tp.Callable[[str, str], str], str, str]]) -> None:
+    """Run the tasks for collecting files, possibly in parallel."""
+    if configuration.ARTIFACTS_WORKERS <= 1 or len(tasks) < 2:
+        for func, src, dst in tasks:
+            func(src, dst)
+        return
+
+    # The "forkserver" start method is used, as forking the multi-threaded pytest worker
+    # is not safe
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=configuration.ARTIFACTS_WORKERS,
+        mp_context=multiprocessing.get_context("forkserver"),
+    ) as executor:
+        futures = [executor.submit(func, src, dst) for func, src, dst in tasks]
+        for future in concurrent.futures.as_completed(futures):
+            future.result()
+
+
+def save_cluster_artifacts(
+    *,
+    save_dir: pl.Path,
+    state_dir: pl.Path,
+    cluster_stopped: bool = False,
+    keeps_running: bool = False,
+) -> None:
+    """Save cluster artifacts (logs, certs, etc.).
+
+    Artifacts of the same cluster instance are saved to the same dir, and files that were already
+    saved are skipped. Log files of running cluster are copied, as they are still written to.
+    When the cluster keeps running after the artifacts are saved, all files are copied, as tests
+    can modify them in place. Large log files are compressed when `ARTIFACTS_COMPRESS_MB` is set.
+    """
     dir_rand_str = ""
     cluster_instance_id_log = state_dir / CLUSTER_INSTANCE_ID_FILENAME
     if cluster_instance_id_log.exists():
@@ -58,7 +199,7 @@ def save_cluster_artifacts(*, save_dir: pl.Path, state_dir: pl.Path) -> None:
     dir_rand_str = dir_rand_str or helpers.get_rand_str(8)
 
     destdir = save_dir / "cluster_artifacts" / f"{state_dir.name}_{dir_rand_str}"
-    destdir.mkdir(parents=True)
+    destdir.mkdir(parents=True, exist_ok=True)
 
     files_list = [
         *state_dir.glob("*.stdout"),
@@ -70,15 +211,24 @@ def save_cluster_artifacts(*, save_dir: pl.Path, state_dir: pl.Path) -> None:
     ]
     dirs_to_copy = ("nodes", "shelley")
 
+    tasks = []
     for fpath in files_list:
-        shutil.copy(fpath, destdir)
+        collect_func = _get_collect_func(
+            fpath=fpath, cluster_stopped=cluster_stopped, hardlink=not keeps_running
+        )
+        dst_name = (
+            f"{fpath.name}{COMPRESSED_SUFFIX}" if collect_func is _compress_file else fpath.name
+        )
+        tasks.append((collect_func, str(fpath), str(destdir / dst_name)))
+    _run_collect_tasks(tasks)
+
     for dname in dirs_to_copy:
         src_dir = state_dir / dname
         if not src_dir.exists():
             continue
-        shutil.copytree(src_dir, destdir / dname, symlinks=True, ignore_dangling_symlinks=True)
+        _copy_tree(src_dir=src_dir, dst_dir=destdir / dname, hardlink=not keeps_running)
 
-    if not destdir.iterdir():
+    if not any(destdir.iterdir()):
         destdir.rmdir()
         return
 
@@ -101,5 +251,6 @@ def copy_artifacts(*, pytest_tmp_dir: pl.Path, pytest_config: Config) -> None:
     if destdir.resolve().is_dir():
         shutil.rmtree(destdir)
 
-    shutil.copytree(pytest_tmp_dir, destdir, symlinks=True, ignore_dangling_symlinks=True)
+    # The tests are finished, so the files are not going to change and can be hardlinked
+    _copy_tree(src_dir=pytest_tmp_dir, dst_dir=destdir)
     LOGGER.info(f"Collected artifacts copied to '{artifacts_dir}'.")
@@ -18,6 +18,7 @@ from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import custom_clusterlib
 from cardano_node_tests.utils import faucet
 from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import readiness
 
 LOGGER = logging.getLogger(__name__)
 
@@ -338,14 +339,20 @@ def get_instance_num() -> int:
     return instance_num
 
 
-def get_cluster_env() -> ClusterEnv:
-    """Get cardano cluster environment."""
+def get_cluster_env(*, instance_num: int | None = None) -> ClusterEnv:
+    """Get cardano cluster environment.
+
+    Get environment of the current cluster instance, or of the given cluster instance.
+    """
     # VERSIONS executes cardano-node and cardano-cli, and the binaries may not be available.
     # Importing VERSIONS here allows to delay the execution until it's really needed, and avoid
     # potential issues with missing binaries when the module is imported.
     from cardano_node_tests.utils.versions import VERSIONS  # noqa: PLC0415
 
-    socket_path = pl.Path(os.environ["CARDANO_NODE_SOCKET_PATH"])
+    if instance_num is None:
+        socket_path = pl.Path(os.environ["CARDANO_NODE_SOCKET_PATH"])
+    else:
+        socket_path = get_cardano_node_socket_path(instance_num=instance_num)
     state_dir = socket_path.parent
     work_dir = state_dir.parent
     instance_num = int(state_dir.name.replace(STATE_CLUSTER, "") or 0)
@@ -389,7 +396,7 @@ def reload_supervisor_config(
 
     # Wait for potential nodes restart
     if delay > 0:
-        time.sleep(delay)
+        wait_for_nodes_ready(instance_num=instance_num, timeout=delay)
 
 
 def start_cluster(cmd: str, args: list[str]) -> clusterlib.ClusterLib:
@@ -416,7 +423,7 @@ def restart_all_nodes(
 
     # Wait for nodes to start
     if delay > 0:
-        time.sleep(delay)
+        wait_for_nodes_ready(instance_num=instance_num, timeout=delay)
 
 
 def services_action(
@@ -457,7 +464,7 @@ def restart_nodes(
 
     # Wait for nodes to start
     if delay > 0:
-        time.sleep(delay)
+        wait_for_nodes_ready(node_names, instance_num=instance_num, timeout=delay)
 
 
 def services_status(
@@ -501,6 +508,95 @@ def services_status(
     return statuses
 
 
+def get_cluster_pids(*, instance_num: int | None = None) -> list[int]:
+    """Return PIDs of supervisor and of the services running on the running cluster.
+
+    Return empty list when the PIDs cannot be obtained, e.g. when the cluster is not running.
+    """
+    try:
+        supervisor_pid = int(run_supervisorctl(args=["pid"], instance_num=instance_num).decode())
+        statuses = services_status(instance_num=instance_num)
+    except Exception:
+        return []
+
+    return [supervisor_pid, *(s.pid for s in statuses if s.pid)]
+
+
+def wait_for_cluster_stop(
+    pids: list[int], *, instance_num: int | None = None, timeout: float = 10
+) -> bool:
+    """Wait until processes of the stopped cluster exit and until the cluster ports are released.
+
+    Returns:
+        bool: True if the cluster stopped before the timeout expired.
+    """
+    if instance_num is None:
+        instance_num = get_instance_num()
+    ports = get_cluster_type().cluster_scripts.get_instance_ports(instance_num=instance_num)
+    port_nums = [ports.supervisor, ports.webserver, ports.submit_api, *ports.node_ports]
+
+    def _stopped() -> bool:
+        return not (
+            any(readiness.is_process_running(p) for p in pids)
+            or any(readiness.is_port_listening(p) for p in port_nums)
+        )
+
+    stopped = readiness.poll(_stopped, timeout=timeout)
+    if not stopped:
+        LOGGER.warning(f"Cluster instance '{instance_num}' didn't stop in {timeout} seconds.")
+    return stopped
+
+
+def wait_for_nodes_ready(
+    node_names: list[str] | None = None, *, instance_num: int | None = None, timeout: float
+) -> bool:
+    """Wait until the Cardano nodes of the running cluster are ready.
+
+    The node is ready when it accepts connections on its socket and its tip advances.
+    Wait for all nodes of the cluster type by default.
+
+    Returns:
+        bool: True if the nodes are ready before the timeout expired.
+    """
+    deadline = time.monotonic() + timeout
+
+    if node_names is None:
+        node_names = sorted(get_cluster_type().NODES)
+    if not node_names:
+        LOGGER.warning("No cluster nodes to wait for.")
+        return False
+
+    state_dir = get_cluster_env(instance_num=instance_num).state_dir
+    sockets = [state_dir / f"{n}.socket" for n in node_names]
+    cluster_obj = get_cluster_type().get_cluster_obj()
+
+    def _get_block(socket_path: pl.Path) -> int:
+        tip = json.loads(
+            cluster_obj.g_query.query_cli(["tip"], cli_sub_args=["--socket-path", str(socket_path)])
+        )
+        return int(tip.get("block") or 0)
+
+    # Block number of the first tip of each node that didn't advance yet
+    first_blocks: dict[pl.Path, int | None] = dict.fromkeys(sockets)
+
+    def _tips_advanced() -> bool:
+        for socket_path, first_block in list(first_blocks.items()):
+            block = _get_block(socket_path)
+            if first_block is None:
+                first_blocks[socket_path] = block
+            elif block > first_block:
+                del first_blocks[socket_path]
+        return not first_blocks
+
+    ready = readiness.poll(
+        lambda: all(readiness.is_socket_available(s) for s in sockets),
+        timeout=deadline - time.monotonic(),
+    ) and readiness.poll(_tips_advanced, timeout=deadline - time.monotonic())
+    if not ready:
+        LOGGER.warning(f"Cluster nodes {node_names} were not ready in {timeout} seconds.")
+    return ready
+
+
 def load_pools_data(*, cluster_obj: clusterlib.ClusterLib) -> dict:
     """Load data for pools existing in the cluster environment."""
     data_dir = get_cluster_env().state_dir / "nodes"
@@ -3,6 +3,7 @@
 import base64
 import dataclasses
 import enum
+import functools
 import itertools
 import json
 import logging
@@ -17,9 +18,15 @@ import cbor2
 from cardano_clusterlib import clusterlib
 from cardano_clusterlib import txtools as cl_txtools
 
-from cardano_node_tests.utils import custom_clusterlib
+from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import key_pool
+from cardano_node_tests.utils import ledger_state_utils
+from cardano_node_tests.utils import shelley_keys
 from cardano_node_tests.utils import submit_utils
+from cardano_node_tests.utils import timings
+from cardano_node_tests.utils import tx_fee
+from cardano_node_tests.utils import utxo_index
 from cardano_node_tests.utils.faucet import fund_from_faucet  # noqa: F401 # for compatibility
 
 LOGGER = logging.getLogger(__name__)
@@ -144,44 +151,9 @@ def build_and_submit_tx(
             if raw_fee is None and not txins
             else None
         )
-        fee = (
-            raw_fee
-            if raw_fee is not None
-            else cluster_obj.g_transaction.calculate_tx_fee(
-                src_address=src_address,
-                tx_name=name_template,
-                txins=txins,
-                txouts=txouts,
-                readonly_reference_txins=readonly_reference_txins,
-                script_txins=script_txins,
-                return_collateral_txouts=return_collateral_txouts,
-                total_collateral_amount=total_collateral_amount,
-                mint=mint,
-                tx_files=tx_files,
-                complex_certs=complex_certs,
-                complex_proposals=complex_proposals,
-                required_signers=required_signers,
-                required_signer_hashes=required_signer_hashes,
-                withdrawals=withdrawals,
-                script_withdrawals=script_withdrawals,
-                script_votes=script_votes,
-                deposit=deposit,
-                current_treasury_value=current_treasury_value,
-                treasury_donation=treasury_donation,
-                invalid_hereafter=invalid_hereafter,
-                invalid_before=invalid_before,
-                src_addr_utxos=src_addr_utxos,
-                witness_count_add=witness_count_add,
-                byron_witness_count=byron_witness_count,
-                reference_script_size=reference_script_size,
-                join_txouts=join_txouts,
-                destination_dir=destination_dir,
-            )
-        )
-
-        tx_output = cluster_obj.g_transaction.build_raw_tx(
+        build_raw_func = functools.partial(
+            cluster_obj.g_transaction.build_raw_tx,
             src_address=src_address,
-            tx_name=name_template,
             txins=txins,
             txouts=txouts,
             readonly_reference_txins=readonly_reference_txins,
@@ -192,7 +164,6 @@ def build_and_submit_tx(
             tx_files=tx_files,
             complex_certs=complex_certs,
             complex_proposals=complex_proposals,
-            fee=fee,
             required_signers=required_signers,
             required_signer_hashes=required_signer_hashes,
             withdrawals=withdrawals,
@@ -207,6 +178,53 @@ def build_and_submit_tx(
             join_txouts=join_txouts,
             destination_dir=destination_dir,
         )
+
+        if raw_fee is None and configuration.INPROCESS_FEE:
+            # Calculate the fee without calling `cardano-cli transaction calculate-min-fee`
+            tx_output = tx_fee.build_raw_with_min_fee(
+                cluster_obj=cluster_obj,
+                build_func=build_raw_func,
+                tx_name=name_template,
+                witness_count=len(tx_files.signing_key_files) + witness_count_add,
+                byron_witness_count=byron_witness_count,
+                reference_script_size=reference_script_size,
+            )
+        else:
+            fee = (
+                raw_fee
+                if raw_fee is not None
+                else cluster_obj.g_transaction.calculate_tx_fee(
+                    src_address=src_address,
+                    tx_name=name_template,
+                    txins=txins,
+                    txouts=txouts,
+                    readonly_reference_txins=readonly_reference_txins,
+                    script_txins=script_txins,
+                    return_collateral_txouts=return_collateral_txouts,
+                    total_collateral_amount=total_collateral_amount,
+                    mint=mint,
+                    tx_files=tx_files,
+                    complex_certs=complex_certs,
+                    complex_proposals=complex_proposals,
+                    required_signers=required_signers,
+                    required_signer_hashes=required_signer_hashes,
+                    withdrawals=withdrawals,
+                    script_withdrawals=script_withdrawals,
+                    script_votes=script_votes,
+                    deposit=deposit,
+                    current_treasury_value=current_treasury_value,
+                    treasury_donation=treasury_donation,
+                    invalid_hereafter=invalid_hereafter,
+                    invalid_before=invalid_before,
+                    src_addr_utxos=src_addr_utxos,
+                    witness_count_add=witness_count_add,
+                    byron_witness_count=byron_witness_count,
+                    reference_script_size=reference_script_size,
+                    join_txouts=join_txouts,
+                    destination_dir=destination_dir,
+                )
+            )
+            tx_output = build_raw_func(tx_name=name_template, fee=fee)
     elif build_method == BuildMethods.BUILD_EST:
         skip_asset_balancing = True if cli_asset_balancing is None else cli_asset_balancing
         tx_output = cluster_obj.g_transaction.build_estimate_tx(
@@ -296,6 +314,7 @@ def build_and_submit_tx(
         tx_file=tx_signed,
         txins=tx_output.txins,
     )
+    utxo_index.apply_tx(cluster_obj=cluster_obj, tx_raw_output=tx_output)
 
     return tx_output
 
@@ -440,7 +459,21 @@ def create_payment_addr_records(
     destination_dir: cl_types.FileType = ".",
 ) -> list[clusterlib.AddressRecord]:
     """Create new payment address(es)."""
-    if key_gen_method == KeyGenMethods.DIRECT:
+    if key_gen_method == KeyGenMethods.DIRECT and configuration.INPROCESS_KEYS:
+        addrs = shelley_keys.create_payment_addr_records(
+            *names,
+            cluster_obj=cluster_obj,
+            stake_vkey_files=[stake_vkey_file] * len(names),
+            destination_dir=destination_dir,
+        )
+    elif key_gen_method == KeyGenMethods.DIRECT and configuration.KEY_POOL_SIZE:
+        addrs = key_pool.create_payment_addr_records(
+            *names,
+            cluster_obj=cluster_obj,
+            stake_vkey_files=[stake_vkey_file] * len(names),
+            destination_dir=destination_dir,
+        )
+    elif key_gen_method == KeyGenMethods.DIRECT:
         addrs = [
             cluster_obj.g_address.gen_payment_addr_and_keys(
                 name=name,
@@ -475,12 +508,21 @@ def create_stake_addr_records(
     destination_dir: cl_types.FileType = ".",
 ) -> list[clusterlib.AddressRecord]:
     """Create new stake address(es)."""
-    addrs = [
-        cluster_obj.g_stake_address.gen_stake_addr_and_keys(
-            name=name, destination_dir=destination_dir
+    if configuration.INPROCESS_KEYS:
+        addrs = shelley_keys.create_stake_addr_records(
+            *names, cluster_obj=cluster_obj, destination_dir=destination_dir
         )
-        for name in names
-    ]
+    elif configuration.KEY_POOL_SIZE:
+        addrs = key_pool.create_stake_addr_records(
+            *names, cluster_obj=cluster_obj, destination_dir=destination_dir
+        )
+    else:
+        addrs = [
+            cluster_obj.g_stake_address.gen_stake_addr_and_keys(
+                name=name, destination_dir=destination_dir
+            )
+            for name in names
+        ]
 
     LOGGER.debug(f"Created {len(addrs)} stake address(es)")
     return addrs
@@ -495,6 +537,27 @@ def create_pool_users(
     destination_dir: cl_types.FileType = ".",
 ) -> list[clusterlib.PoolUser]:
     """Create PoolUsers."""
+    # Create all the addresses at once, so the addresses are built concurrently
+    if (
+        configuration.KEY_POOL_SIZE
+        and not configuration.INPROCESS_KEYS
+        and payment_key_gen_method == KeyGenMethods.DIRECT
+    ):
+        names = [f"{name_template}_addr_{i}" for i in range(1, no_of_addr + 1)]
+        stake_addr_recs = key_pool.create_stake_addr_records(
+            *names, cluster_obj=cluster_obj, destination_dir=destination_dir
+        )
+        payment_addr_recs = key_pool.create_payment_addr_records(
+            *names,
+            cluster_obj=cluster_obj,
+            stake_vkey_files=[r.vkey_file for r in stake_addr_recs],
+            destination_dir=destination_dir,
+        )
+        return [
+            clusterlib.PoolUser(payment=p, stake=s)
+            for p, s in zip(payment_addr_recs, stake_addr_recs)
+        ]
+
     pool_users = []
     for i in range(1, no_of_addr + 1):
         # Create key pairs and addresses
@@ -1057,59 +1120,19 @@ def new_tokens(
     return tokens_to_mint
 
 
-def _get_ledger_state_cmd(*, cluster_obj: clusterlib.ClusterLib) -> str:
-    cardano_cli_args = [
-        "cardano-cli",
-        "latest",
-        "query",
-        "ledger-state",
-        *cluster_obj.magic_args,
-    ]
-    ledger_state_cmd = " ".join(cardano_cli_args)
-
-    # Record cli coverage
-    if hasattr(cluster_obj, "cli_coverage"):
-        custom_clusterlib.record_cli_coverage(
-            cli_args=cardano_cli_args,
-            coverage_dict=cluster_obj.cli_coverage,  # type: ignore[invalid-argument-type]
-        )
-
-    return ledger_state_cmd
-
-
 def get_delegation_state(*, cluster_obj: clusterlib.ClusterLib) -> dict:
     """Get `delegationState` section of ledger state."""
-    ledger_state_cmd = _get_ledger_state_cmd(cluster_obj=cluster_obj)
-
-    # Get rid of a huge amount of data we don't have any use for
-    cmd = (
-        f"{ledger_state_cmd} | jq -n --stream -c "
-        "'fromstream(3|truncate_stream(inputs|select(.[0][2] == \"delegationState\")))'"
+    ledger_state = ledger_state_utils.get_ledger_state(cluster_obj=cluster_obj)
+    deleg_state: dict = (
+        ledger_state.get("stateBefore", {}).get("esLState", {}).get("delegationState") or {}
     )
-
-    deleg_state_raw = helpers.run_in_bash(cmd).decode("utf-8").strip()
-    if not deleg_state_raw:
-        return {}
-
-    deleg_state: dict = json.loads(deleg_state_raw)
     return deleg_state
 
 
 def get_blocks_before(*, cluster_obj: clusterlib.ClusterLib) -> dict[str, int]:
     """Get `blocksBefore` section of ledger state with bech32 encoded pool ids."""
-    ledger_state_cmd = _get_ledger_state_cmd(cluster_obj=cluster_obj)
-
-    # Get rid of a huge amount of data we don't have any use for
-    cmd = (
-        f"{ledger_state_cmd} | jq -n --stream -c "
-        "'fromstream(1|truncate_stream(inputs|select(.[0][0] == \"blocksBefore\")))'"
-    )
-
-    blocks_before_raw = helpers.run_in_bash(cmd).decode("utf-8").strip()
-    if not blocks_before_raw:
-        return {}
-
-    blocks_before: dict = json.loads(blocks_before_raw)
+    ledger_state = ledger_state_utils.get_ledger_state(cluster_obj=cluster_obj)
+    blocks_before: dict = ledger_state.get("blocksBefore") or {}
     return {
         helpers.encode_bech32(prefix="pool", data=key): val for key, val in blocks_before.items()
     }
@@ -1117,19 +1140,9 @@ def get_blocks_before(*, cluster_obj: clusterlib.ClusterLib) -> dict[str, int]:
 
 def get_ledger_state(*, cluster_obj: clusterlib.ClusterLib) -> dict:
     """Return the current ledger state info."""
-    ledger_state_cmd = _get_ledger_state_cmd(cluster_obj=cluster_obj)
-
+    ledger_state = ledger_state_utils.get_ledger_state(cluster_obj=cluster_obj)
     # Get rid of a huge amount of data we don't have any use for
-    cmd = (
-        f"{ledger_state_cmd} | jq -n --stream -c "
-        "'fromstream(inputs|select((length == 2 and .[0][1] == \"esLState\")|not))'"
-    )
-
-    ledger_state_raw = helpers.run_in_bash(cmd).decode("utf-8").strip()
-    if not ledger_state_raw:
-        return {}
-
-    ledger_state: dict = json.loads(ledger_state_raw)
+    ledger_state.get("stateBefore", {}).pop("esLState", None)
     return ledger_state
 
 
@@ -1142,22 +1155,34 @@ def save_ledger_state(
 ) -> pl.Path:
     """Save ledger state to file.
 
+    The format of the file is selected by `LEDGER_STATE_SNAPSHOT`, see
+    `ledger_state_utils.LedgerStateSnapshot` for reading the ZIP snapshots.
+
     Args:
         cluster_obj: An instance of `clusterlib.ClusterLib`.
         state_name: A name of the ledger state (can be epoch number, etc.).
         ledger_state: A dict with ledger state to save (optional).
-        destination_dir: A path to directory for storing the state JSON file (optional).
+        destination_dir: A path to directory for storing the state file (optional).
 
     Returns:
-        Path: A path to the generated state JSON file.
+        Path: A path to the generated state file.
     """
-    json_file = pl.Path(destination_dir) / f"{state_name}_ledger_state.json"
     ledger_state = ledger_state or get_ledger_state(cluster_obj=cluster_obj)
+
+    if configuration.LEDGER_STATE_SNAPSHOT != "json":
+        return ledger_state_utils.save_snapshot(
+            ledger_state=ledger_state,
+            out_file=pl.Path(destination_dir) / f"{state_name}_ledger_state.zip",
+            delta=configuration.LEDGER_STATE_SNAPSHOT == "zip-delta",
+        )
+
+    json_file = pl.Path(destination_dir) / f"{state_name}_ledger_state.json"
     with open(json_file, "w", encoding="utf-8") as fp_out:
         json.dump(ledger_state, fp_out, indent=4)
     return json_file
 
 
+@timings.span("wait_for_epoch_interval")
 def wait_for_epoch_interval(
     *,
     cluster_obj: clusterlib.ClusterLib,
@@ -58,6 +58,44 @@ MAX_TESTS_PER_CLUSTER = helpers.get_env_int("MAX_TESTS_PER_CLUSTER", 8)
 CLUSTERS_COUNT = helpers.get_env_int("CLUSTERS_COUNT", 0)
 CLUSTERS_COUNT = CLUSTERS_COUNT or min(XDIST_WORKERS_COUNT, DEFAULT_MAX_CLUSTERS) or 1
 
+# Number of spare cluster instances that are started in the background and swapped in place of
+# cluster instances that need respin, no spare instances are used when set to 0
+SPARE_CLUSTERS = helpers.get_env_int("SPARE_CLUSTERS", 0)
+
+# Respin local cluster instances by restoring a snapshot of the chain state taken after the first
+# start of each cluster instance, instead of starting the cluster from genesis
+CHAIN_SNAPSHOTS = helpers.is_truthy_env_var("CHAIN_SNAPSHOTS")
+
+# Wake up workers waiting for a cluster instance as soon as a status file changes, instead of
+# polling the status files in fixed intervals
+EVENT_DRIVEN_SCHEDULING = helpers.is_truthy_env_var("EVENT_DRIVEN_SCHEDULING")
+
+# Number of processes used by each pytest worker for searching log files for errors.
+# The log files are searched serially when set to 0 or 1 (default). The process pool helps
+# only when there are idle CPU cores, otherwise it is slower than the serial search.
+LOGS_SEARCH_WORKERS = helpers.get_env_int("LOGS_SEARCH_WORKERS", 0)
+
+# Search log files for errors using memory mapped files
+LOGS_SEARCH_MMAP = helpers.is_truthy_env_var("LOGS_SEARCH_MMAP")
+
+# Search cluster logs for errors continuously in a background thread, instead of searching
+# everything written to the logs only after each test. Used only on pytest-xdist workers.
+LOGS_WATCHER = helpers.is_truthy_env_var("LOGS_WATCHER")
+
+# Number of processes used for collecting cluster artifacts. The artifacts are collected
+# serially when set to 0 or 1.
+ARTIFACTS_WORKERS = helpers.get_env_int("ARTIFACTS_WORKERS", 0)
+# Compress collected log files that are larger than the given number of MB, nothing is
+# compressed when set to 0
+ARTIFACTS_COMPRESS_MB = helpers.get_env_int("ARTIFACTS_COMPRESS_MB", 0)
+
+# Queue pytest workers waiting for locks in the lock broker instead of polling lock files.
+# Selection of cluster instances and resources is still serialized on the global cluster lock.
+LOCK_BROKER = helpers.is_truthy_env_var("LOCK_BROKER")
+
+# Share values of fixtures cached with `cache_fixture(shared=True)` among pytest workers
+SHARED_FIXTURE_CACHE = helpers.is_truthy_env_var("SHARED_FIXTURE_CACHE")
+
 DEV_CLUSTER_RUNNING = helpers.is_truthy_env_var("DEV_CLUSTER_RUNNING")
 FORBID_RESTART = helpers.is_truthy_env_var("FORBID_RESTART")
 
@@ -76,6 +114,50 @@ if not BOOTSTRAP_DIR and NUM_POOLS < 3:
 
 HAS_DBSYNC = bool(os.environ.get("DBSYNC_SCHEMA_DIR"))
 HAS_SMASH = HAS_DBSYNC and helpers.is_truthy_env_var("SMASH")
+# Number of threads used for running independent db-sync queries concurrently.
+# The queries run serially when set to 0 or 1.
+DBSYNC_QUERY_WORKERS = helpers.get_env_int("DBSYNC_QUERY_WORKERS", 0)
+# Number of rows fetched at a time by server-side cursors in db-sync range queries.
+# All rows are fetched at once, using client-side cursors, when set to 0.
+DBSYNC_CURSOR_ITERSIZE = helpers.get_env_int("DBSYNC_CURSOR_ITERSIZE", 2000)
+# Validate rows returned by db-sync range queries against the row types
+DBSYNC_VALIDATE_ROWS = helpers.is_truthy_env_var("DBSYNC_VALIDATE_ROWS")
+
+# Submit funding from faucets in batched transactions that don't wait for confirmation
+# of previous funding transactions
+FAUCET_PIPELINING = helpers.is_truthy_env_var("FAUCET_PIPELINING")
+
+# Max age of records in the local UTxO index, nothing is cached when set to 0
+UTXO_INDEX_MAX_AGE_SEC = helpers.get_env_int("UTXO_INDEX_MAX_AGE_SEC", 0)
+
+# Calculate fee of `build-raw` transactions in-process instead of `calculate-min-fee` CLI call
+INPROCESS_FEE = helpers.is_truthy_env_var("INPROCESS_FEE")
+# Check that the fee calculated in-process matches the fee calculated by `cardano-cli`
+INPROCESS_FEE_VERIFY = helpers.is_truthy_env_var("INPROCESS_FEE_VERIFY")
+
+# Format of ledger state snapshots saved by tests - indented JSON ("json"), ZIP archive with
+# compressed sections ("zip"), or ZIP archive with only sections that changed since the previous
+# snapshot ("zip-delta")
+LEDGER_STATE_SNAPSHOT = os.environ.get("LEDGER_STATE_SNAPSHOT") or "json"
+if LEDGER_STATE_SNAPSHOT not in ("json", "zip", "zip-delta"):
+    __msg = f"Invalid LEDGER_STATE_SNAPSHOT: {LEDGER_STATE_SNAPSHOT}"
+    raise RuntimeError(__msg)
+
+# Generate key pairs and derive addresses for fixtures in-process instead of using `cardano-cli`
+INPROCESS_KEYS = helpers.is_truthy_env_var("INPROCESS_KEYS")
+# Check that addresses derived in-process match addresses built by `cardano-cli`
+INPROCESS_KEYS_VERIFY = helpers.is_truthy_env_var("INPROCESS_KEYS_VERIFY")
+
+# Number of payment and stake key pairs pre-generated in the background by each pytest worker,
+# nothing is pre-generated when set to 0
+KEY_POOL_SIZE = helpers.get_env_int("KEY_POOL_SIZE", 0)
+
+# Cache results of read-only queries - comma-separated list of queries (see
+# `custom_clusterlib.CACHED_QUERIES`), or "all"
+QUERY_CACHE = os.environ.get("QUERY_CACHE") or ""
+
+# Record time spent in tests and in framework phases, and save timings report and trace file
+TIMINGS = helpers.is_truthy_env_var("TIMINGS")
 
 DONT_OVERWRITE_OUTFILES = helpers.is_truthy_env_var("DONT_OVERWRITE_OUTFILES")
 
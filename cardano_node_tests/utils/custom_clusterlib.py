@@ -1,16 +1,54 @@
 """Custom `ClusterLib` extended with functionality that is useful for testing."""
 
+import copy
+import itertools
 import logging
+import math
 import os
 import pathlib as pl
+import subprocess
+import threading
+import time
 import typing as tp
 
 from cardano_clusterlib import clusterlib
+from cardano_clusterlib import clusterlib_helpers
 from cardano_clusterlib import consts
+from cardano_clusterlib import query_group
 from cardano_clusterlib import transaction_group
 
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import timings
+
 LOGGER = logging.getLogger(__name__)
 
+# Resolution of CLI latency histograms, bucket `i` contains durations up to `10 ** (i / N)` ms
+CLI_PROFILE_BUCKETS_PER_DECADE = 20
+
+# Results cached in the "block" scope are valid until a new block can be created, results cached
+# in the "epoch" scope are valid until the end of the epoch
+BLOCK_SCOPE = "block"
+EPOCH_SCOPE = "epoch"
+# Queries that can be cached, and scope of the cached results
+CACHED_QUERIES = {
+    "tip": BLOCK_SCOPE,
+    "stake_addr_info": BLOCK_SCOPE,
+    "epoch": EPOCH_SCOPE,
+    "protocol_params": EPOCH_SCOPE,
+}
+# Key of query cache stats in the CLI profile
+QUERY_CACHE_STATS_KEY = "_query_cache"
+
+
+class CLIProcessError(clusterlib.CLIError):
+    """The `cardano-cli` command failed, with the exit code and output of the command."""
+
+    def __init__(self, msg: str, *, returncode: int, stdout: bytes, stderr: bytes) -> None:
+        super().__init__(msg)
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+
 
 def record_cli_coverage(*, cli_args: list[str], coverage_dict: dict) -> None:
     """Record coverage info for CLI commands.
@@ -47,6 +85,63 @@ def record_cli_coverage(*, cli_args: list[str], coverage_dict: dict) -> None:
             parent_dict = cur_dict
 
 
+def get_cli_subcommand(cli_args: list[str]) -> str:
+    """Get subcommand path of CLI command, e.g. "cardano-cli latest query utxo"."""
+    args = (a for a in cli_args if a != consts.SUBCOMMAND_MARK)
+    return " ".join(itertools.takewhile(lambda a: not a.startswith("-"), args))
+
+
+def record_cli_profile(
+    *,
+    subcommand: str,
+    duration: float,
+    status: str,
+    stdout_size: int,
+    stderr_size: int,
+    profile_dict: dict,
+    returncode: int | None = None,
+) -> None:
+    """Record profiling info for CLI commands.
+
+    Args:
+        subcommand: A subcommand path of the command, as returned by `get_cli_subcommand`.
+        duration: A wall-clock duration of the command, in seconds.
+        status: A status of the command - "ok", "failed" or "timed_out".
+        stdout_size: A size of the command stdout, in bytes.
+        stderr_size: A size of the command stderr, in bytes.
+        profile_dict: A dictionary with profiling info.
+        returncode: An exit code of the failed command (optional).
+    """
+    rec = profile_dict.get(subcommand)
+    # Initialize record if it doesn't exist yet. All values are numbers, so records
+    # from multiple files can be merged by adding the values.
+    if not rec:
+        rec = profile_dict[subcommand] = {
+            "count": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "total_sec": 0.0,
+            "stdout_bytes": 0,
+            "stderr_bytes": 0,
+            "histogram": {},
+            "exit_codes": {},
+        }
+
+    rec["count"] += 1
+    if status != "ok":
+        rec[status] += 1
+    rec["total_sec"] += duration
+    rec["stdout_bytes"] += stdout_size
+    rec["stderr_bytes"] += stderr_size
+    if returncode:
+        exit_codes = rec.setdefault("exit_codes", {})
+        exit_codes[str(returncode)] = exit_codes.get(str(returncode), 0) + 1
+
+    duration_ms = max(duration * 1000, 1.0)
+    bucket = str(math.ceil(math.log10(duration_ms) * CLI_PROFILE_BUCKETS_PER_DECADE))
+    rec["histogram"][bucket] = rec["histogram"].get(bucket, 0) + 1
+
+
 def create_submitted_file(*, tx_file: clusterlib.FileType) -> None:
     """Create a `.submitted` status file when the Tx was successfully submitted."""
     tx_path = pl.Path(tx_file)
@@ -60,6 +155,105 @@ def create_submitted_file(*, tx_file: clusterlib.FileType) -> None:
         raise RuntimeError(err) from exc
 
 
+def get_enabled_queries(queries_str: str) -> frozenset[str]:
+    """Get queries to cache from comma-separated list of queries, or "all"."""
+    if queries_str == "all":
+        return frozenset(CACHED_QUERIES)
+
+    queries = frozenset(q.strip() for q in queries_str.split(",") if q.strip())
+    unknown = queries.difference(CACHED_QUERIES)
+    if unknown:
+        msg = f"Unknown queries to cache: {', '.join(sorted(unknown))}"
+        raise ValueError(msg)
+    return queries
+
+
+class QueryCache:
+    """Cache of results of read-only queries, invalidated when the chain moves on.
+
+    Results in the "block" scope expire after one slot, the tip cannot change sooner. Results in
+    the "epoch" scope are valid until the tip moves to the next epoch. Close to the end of the
+    epoch, the epoch of the current tip is checked before a cached result is used. Waiting for
+    a new block invalidates the "block" scope, waiting for a new epoch invalidates both scopes.
+    """
+
+    # The tip can lag behind the current slot, so the epoch of the tip is checked this many
+    # expected block intervals before the estimated end of the epoch
+    EPOCH_END_CHECK_BLOCKS = 10
+
+    def __init__(self, clusterlib_obj: "ClusterLib", enabled_queries: tp.Iterable[str]) -> None:
+        self._clusterlib_obj = clusterlib_obj
+        self.enabled_queries = frozenset(enabled_queries)
+        # Cache key -> (scope, expiration time, epoch of the tip, value)
+        self._entries: dict[tuple, tuple[str, float, int, tp.Any]] = {}
+        self._lock = threading.Lock()
+
+    def _get_stats(self, query: str) -> dict[str, int]:
+        all_stats = self._clusterlib_obj.cli_profile.setdefault(QUERY_CACHE_STATS_KEY, {})
+        stats: dict[str, int] = all_stats.setdefault(query, {"hits": 0, "misses": 0})
+        return stats
+
+    def _get_expiration(self, scope: str) -> tuple[float, int]:
+        """Return expiration time and epoch of the tip for a result that is about to be queried.
+
+        The tip is queried before the result, so the result is never older than the tip.
+        """
+        now = time.monotonic()
+        if scope == BLOCK_SCOPE:
+            return now + float(self._clusterlib_obj.slot_length), -1
+
+        tip = self._clusterlib_obj.g_query.get_tip()
+        block_interval = float(self._clusterlib_obj.slot_length) / float(
+            self._clusterlib_obj.genesis.get("activeSlotsCoeff") or 1
+        )
+        expiration = (
+            now
+            + self._clusterlib_obj.time_to_epoch_end(tip=tip)
+            - self.EPOCH_END_CHECK_BLOCKS * block_interval
+        )
+        return expiration, int(tip["epoch"])
+
+    def _is_valid(self, entry: tuple[str, float, int, tp.Any]) -> bool:
+        scope, expiration, epoch, __ = entry
+        if expiration > time.monotonic():
+            return True
+        # The result is valid for as long as the tip is in the same epoch
+        return (
+            scope == EPOCH_SCOPE and int(self._clusterlib_obj.g_query.get_tip()["epoch"]) == epoch
+        )
+
+    def get[T](self, *, query: str, func: tp.Callable[[], T], args: tuple = ()) -> T:
+        """Return cached result of the `query`, run the `func` if there's no valid result."""
+        if query not in self.enabled_queries:
+            return func()
+
+        key = (query, *args)
+        with self._lock:
+            entry = self._entries.get(key)
+        stats = self._get_stats(query)
+        if entry and self._is_valid(entry):
+            stats["hits"] += 1
+            # Every caller gets its own copy of the data
+            return tp.cast("T", copy.deepcopy(entry[3]))
+
+        stats["misses"] += 1
+        scope = CACHED_QUERIES[query]
+        expiration, epoch = self._get_expiration(scope)
+        value = func()
+        with self._lock:
+            self._entries[key] = (scope, expiration, epoch, copy.deepcopy(value))
+        return value
+
+    def invalidate(self, scope: str = "") -> None:
+        """Invalidate results in the `scope`, or all results when no scope is given."""
+        with self._lock:
+            if not scope:
+                self._entries.clear()
+                return
+            for key in [k for k, e in self._entries.items() if e[0] == scope]:
+                del self._entries[key]
+
+
 class ClusterLib(clusterlib.ClusterLib):
     def __init__(
         self,
@@ -75,8 +269,13 @@ class ClusterLib(clusterlib.ClusterLib):
             command_era=command_era,
         )
         self.cli_coverage: dict[str, tp.Any] = {}
+        self.cli_profile: dict[str, dict] = {}
         self._cli_command = "cardano-cli"
 
+        self.query_cache = QueryCache(
+            clusterlib_obj=self, enabled_queries=get_enabled_queries(configuration.QUERY_CACHE)
+        )
+
     @property
     def g_transaction(self) -> transaction_group.TransactionGroup:
         """Transaction group."""
@@ -84,6 +283,13 @@ class ClusterLib(clusterlib.ClusterLib):
             self._transaction_group = TransactionGroup(clusterlib_obj=self)
         return self._transaction_group
 
+    @property
+    def g_query(self) -> query_group.QueryGroup:
+        """Query group."""
+        if not self._query_group:
+            self._query_group = QueryGroup(clusterlib_obj=self, query_cache=self.query_cache)
+        return self._query_group
+
     def cli(
         self, cli_args: list[str], timeout: float | None = None, add_default_args: bool = True
     ) -> clusterlib.CLIOut:
@@ -108,7 +314,163 @@ class ClusterLib(clusterlib.ClusterLib):
 
         record_cli_coverage(cli_args=cli_args_strs_all, coverage_dict=self.cli_coverage)
 
-        return super().cli(cli_args=cli_args_strs_all, timeout=timeout, add_default_args=False)
+        subcommand = get_cli_subcommand(cli_args_strs_all)
+        stdout_size = stderr_size = 0
+        returncode = None
+        status = "failed"
+        start = time.perf_counter()
+        try:
+            with timings.span("cli", cmd=subcommand):
+                cli_out = self._run_cli(cli_args_strs_all=cli_args_strs_all, timeout=timeout)
+            status = "ok"
+            stdout_size, stderr_size = len(cli_out.stdout), len(cli_out.stderr)
+            # Submitted transactions can change results of queries once they are in a block
+            if "submit" in subcommand.split():
+                self.query_cache.invalidate(scope=BLOCK_SCOPE)
+        except CLIProcessError as exc:
+            stdout_size, stderr_size = len(exc.stdout), len(exc.stderr)
+            returncode = exc.returncode
+            raise
+        except subprocess.TimeoutExpired:
+            status = "timed_out"
+            raise
+        finally:
+            record_cli_profile(
+                subcommand=subcommand,
+                duration=time.perf_counter() - start,
+                status=status,
+                stdout_size=stdout_size,
+                stderr_size=stderr_size,
+                profile_dict=self.cli_profile,
+                returncode=returncode,
+            )
+
+        return cli_out
+
+    def _run_cli(self, cli_args_strs_all: list[str], timeout: float) -> clusterlib.CLIOut:
+        """Run the command the same way as `clusterlib.ClusterLib.cli`.
+
+        Unlike the base class, the failure is reported with `CLIProcessError`, so the exit code
+        and output of the failed command are available for profiling.
+        """
+        cli_args_strs = [arg for arg in cli_args_strs_all if arg != consts.SUBCOMMAND_MARK]
+
+        cmd_str = clusterlib_helpers._format_cli_args(cli_args=cli_args_strs)
+        clusterlib_helpers._write_cli_log(clusterlib_obj=self, command=cmd_str)
+        LOGGER.debug("Running `%s`", cmd_str)
+
+        # Re-run the command when running into
+        # Network.Socket.connect: <socket: X>: resource exhausted (Resource temporarily unavailable)
+        # or
+        # MuxError (MuxIOException writev: resource vanished (Broken pipe)) "(sendAll errored)"
+        attempt = 0
+        while True:
+            attempt += 1
+            with subprocess.Popen(
+                cli_args_strs, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            ) as p:
+                try:
+                    stdout, stderr = p.communicate(timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    # The child is not killed on timeout, and `Popen.__exit__` would wait for it
+                    # indefinitely
+                    p.kill()
+                    p.communicate()
+                    raise
+
+            if p.returncode == 0:
+                return clusterlib.CLIOut(stdout or b"", stderr or b"")
+
+            stderr_dec = stderr.decode()
+            err_msg = (
+                f"An error occurred running a CLI command `{cmd_str}` on path "
+                f"`{pl.Path.cwd()}`: {stderr_dec}"
+            )
+            retry = "resource exhausted" in stderr_dec or "resource vanished" in stderr_dec
+            if not retry or attempt >= 3:
+                raise CLIProcessError(
+                    err_msg, returncode=p.returncode, stdout=stdout or b"", stderr=stderr or b""
+                )
+            LOGGER.error(err_msg)
+            time.sleep(0.4)
+
+    def wait_for_new_block(self, new_blocks: int = 1) -> int:
+        """Wait for new block(s) to be created, invalidate cached query results."""
+        self.query_cache.invalidate(scope=BLOCK_SCOPE)
+        try:
+            return super().wait_for_new_block(new_blocks=new_blocks)
+        finally:
+            self.query_cache.invalidate(scope=BLOCK_SCOPE)
+
+    def wait_for_block(self, block: int) -> int:
+        """Wait for block number, invalidate cached query results."""
+        self.query_cache.invalidate(scope=BLOCK_SCOPE)
+        try:
+            return super().wait_for_block(block=block)
+        finally:
+            self.query_cache.invalidate(scope=BLOCK_SCOPE)
+
+    def wait_for_slot(self, slot: int) -> int:
+        """Wait for slot number, invalidate cached query results."""
+        self.query_cache.invalidate(scope=BLOCK_SCOPE)
+        try:
+            return super().wait_for_slot(slot=slot)
+        finally:
+            self.query_cache.invalidate(scope=BLOCK_SCOPE)
+
+    def wait_for_new_epoch(self, new_epochs: int = 1, padding_seconds: int = 0) -> int:
+        """Wait for new epoch(s), record the time spent waiting."""
+        self.query_cache.invalidate()
+        try:
+            with timings.span("wait_for_epoch"):
+                return super().wait_for_new_epoch(
+                    new_epochs=new_epochs, padding_seconds=padding_seconds
+                )
+        finally:
+            self.query_cache.invalidate()
+
+    def wait_for_epoch(
+        self, epoch_no: int, padding_seconds: int = 0, future_is_ok: bool = True
+    ) -> int:
+        """Wait for epoch no, record the time spent waiting."""
+        self.query_cache.invalidate()
+        try:
+            with timings.span("wait_for_epoch"):
+                return super().wait_for_epoch(
+                    epoch_no=epoch_no, padding_seconds=padding_seconds, future_is_ok=future_is_ok
+                )
+        finally:
+            self.query_cache.invalidate()
+
+
+class QueryGroup(query_group.QueryGroup):
+    """Query group with results of selected read-only queries cached, see `QueryCache`."""
+
+    def __init__(self, clusterlib_obj: ClusterLib, query_cache: QueryCache) -> None:
+        super().__init__(clusterlib_obj=clusterlib_obj)
+        self.query_cache = query_cache
+
+    def get_tip(self) -> dict[str, tp.Any]:
+        """Return current tip - last block successfully applied to the ledger."""
+        return self.query_cache.get(query="tip", func=super().get_tip)
+
+    def get_epoch(self, tip: dict[str, tp.Any] | None = None) -> int:
+        """Return epoch of last block that was successfully applied to the ledger."""
+        if tip:
+            return super().get_epoch(tip=tip)
+        return self.query_cache.get(query="epoch", func=super().get_epoch)
+
+    def get_protocol_params(self) -> dict:
+        """Return the current protocol parameters."""
+        return self.query_cache.get(query="protocol_params", func=super().get_protocol_params)
+
+    def get_stake_addr_info(self, stake_addr: str) -> clusterlib.StakeAddrInfo:
+        """Return the current delegations and reward accounts filtered by stake address."""
+        return self.query_cache.get(
+            query="stake_addr_info",
+            func=lambda: super(QueryGroup, self).get_stake_addr_info(stake_addr=stake_addr),
+            args=(stake_addr,),
+        )
 
 
 class TransactionGroup(transaction_group.TransactionGroup):
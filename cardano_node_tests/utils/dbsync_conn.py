@@ -1,10 +1,29 @@
-"""Functionality for interacting with db-sync database in postgres."""
+"""Functionality for interacting with db-sync database in postgres.
 
+Connections are pooled per cluster instance, with at most `POOL_MAX_CONNS` connections in each
+pool. A connection is checked out of the pool by the `connection` context manager and it is
+returned to the pool when the context is left, so no connection stays with a thread that
+finished its queries.
+
+Nested `connection` contexts in the same thread (e.g. queries inside of
+`dbsync_queries.db_transaction`) use the same connection. Other threads get other connections,
+so independent queries can run concurrently.
+
+The connections are in autocommit mode, unless in the middle of `db_transaction`. A connection
+returned to the pool is therefore not in a transaction, and the health and age checks apply
+when the connection is checked out again.
+"""
+
+import contextlib
+import dataclasses
 import logging
+import threading
+import time
 import typing as tp
 
 import psycopg2
 import psycopg2.extensions
+import psycopg2.pool
 
 from cardano_node_tests.utils import cluster_nodes
 from cardano_node_tests.utils import configuration
@@ -12,54 +31,179 @@ from cardano_node_tests.utils import helpers
 
 LOGGER = logging.getLogger(__name__)
 
+# Connections older than this are replaced by new ones when checked out of the pool
+CONN_MAX_AGE_SEC = 30 * 60
 
-class DBSyncCache:
-    """Cache connection to db-sync database for each cluster instance."""
+# Max number of connections to the db-sync database of a cluster instance. One connection for
+# the thread running the test, the rest for the threads running queries concurrently.
+POOL_MAX_CONNS = max(configuration.DBSYNC_QUERY_WORKERS, 1) + 1
+
+
+class _LazyConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """Pool that opens connections only when needed, and keeps up to `maxconn` of them open."""
 
-    conns: tp.ClassVar[dict[int, psycopg2.extensions.connection | None]] = {0: None}
+    def __init__(self, maxconn: int, *args: tp.Any, **kwargs: tp.Any) -> None:
+        super().__init__(0, maxconn, *args, **kwargs)
+        # Returned connections are kept open only while there are less than `minconn` idle ones
+        self.minconn = maxconn
 
 
-def _conn(*, instance_num: int) -> psycopg2.extensions.connection:
-    # Call `psycopg2.connect` with an empty string so it uses PG* env variables.
-    # Temporarily set PGDATABASE env var to the database corresponding to `instance_num`.
-    with helpers.environ({"PGDATABASE": f"{configuration.DBSYNC_DB}{instance_num}"}):
-        conn = psycopg2.connect("")
-    DBSyncCache.conns[instance_num] = conn
+@dataclasses.dataclass
+class _InstancePool:
+    pool: _LazyConnectionPool
+    # `ThreadedConnectionPool` fails instead of waiting when all connections are checked out
+    slots: threading.BoundedSemaphore
+    # Creation time of each connection in the pool, by connection id
+    created: dict[int, float] = dataclasses.field(default_factory=dict)
+
+
+@dataclasses.dataclass
+class _HeldConn:
+    conn: psycopg2.extensions.connection
+
+
+class DBSyncCache:
+    """Cache connection pools to db-sync database for each cluster instance."""
+
+    pools: tp.ClassVar[dict[int, _InstancePool]] = {}
+    lock: tp.ClassVar[threading.Lock] = threading.Lock()
+    # Connections checked out by the current thread, by instance number
+    held: tp.ClassVar[threading.local] = threading.local()
+
+
+def _get_pool(*, instance_num: int) -> _InstancePool:
+    with DBSyncCache.lock:
+        instance_pool = DBSyncCache.pools.get(instance_num)
+        if instance_pool is None:
+            # Call `psycopg2.connect` with an empty string so it uses PG* env variables.
+            # Set PGDATABASE env var to the database corresponding to `instance_num`.
+            with helpers.environ({"PGDATABASE": f"{configuration.DBSYNC_DB}{instance_num}"}):
+                pool = _LazyConnectionPool(POOL_MAX_CONNS, "")
+            instance_pool = _InstancePool(
+                pool=pool, slots=threading.BoundedSemaphore(POOL_MAX_CONNS)
+            )
+            DBSyncCache.pools[instance_num] = instance_pool
+        return instance_pool
+
+
+def _get_held() -> dict[int, _HeldConn]:
+    held: dict[int, _HeldConn] | None = getattr(DBSyncCache.held, "conns", None)
+    if held is None:
+        held = DBSyncCache.held.conns = {}
+    return held
+
+
+def _is_healthy(*, conn: psycopg2.extensions.connection, created: float) -> bool:
+    """Check that the connection can be reused, without a round trip to the database."""
+    if conn.closed:
+        return False
+    if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+        return False
+    return time.monotonic() - created <= CONN_MAX_AGE_SEC
+
+
+def _discard(*, instance_pool: _InstancePool, conn: psycopg2.extensions.connection) -> None:
+    instance_pool.created.pop(id(conn), None)
+    try:
+        instance_pool.pool.putconn(conn, close=True)
+    except psycopg2.Error as err:
+        LOGGER.warning(f"Unable to close connection to db-sync database: {err}")
+
+
+def _checkout(*, instance_pool: _InstancePool) -> psycopg2.extensions.connection:
+    """Get healthy connection from the pool, replace connections that are not healthy."""
+    while True:
+        conn = instance_pool.pool.getconn()
+        created = instance_pool.created.get(id(conn))
+        if created is None:
+            # New connection
+            instance_pool.created[id(conn)] = time.monotonic()
+            break
+        if _is_healthy(conn=conn, created=created):
+            break
+        _discard(instance_pool=instance_pool, conn=conn)
+
+    conn.autocommit = True
     return conn
 
 
-def _close(*, instance_num: int, conn: psycopg2.extensions.connection | None) -> None:
-    if conn is None or conn.closed == 1:
+def _checkin(*, instance_pool: _InstancePool, conn: psycopg2.extensions.connection) -> None:
+    """Return the connection to the pool, never with an open transaction."""
+    if not conn.closed and (
+        conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+    ):
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            _discard(instance_pool=instance_pool, conn=conn)
+            return
+    if conn.closed:
+        _discard(instance_pool=instance_pool, conn=conn)
         return
-
-    LOGGER.info(f"Closing connection to db-sync database {configuration.DBSYNC_DB}{instance_num}.")
     try:
+        instance_pool.pool.putconn(conn)
+    except psycopg2.pool.PoolError:
+        # The pool was closed in the meantime
         conn.close()
-    except psycopg2.Error as err:
-        LOGGER.warning(
-            "Unable to close connection to db-sync database "
-            f"{configuration.DBSYNC_DB}{instance_num}: {err}"
-        )
 
 
-def conn() -> psycopg2.extensions.connection:
+@contextlib.contextmanager
+def connection() -> tp.Iterator[psycopg2.extensions.connection]:
+    """Check out a connection to db-sync database of the current cluster instance.
+
+    The connection is returned to the pool when the outermost context of the thread is left.
+    """
     instance_num = cluster_nodes.get_instance_num()
-    conn = DBSyncCache.conns.get(instance_num)
+    held = _get_held()
+    held_conn = held.get(instance_num)
+    if held_conn is not None:
+        yield held_conn.conn
+        return
 
-    if conn is None or conn.closed == 1:
-        return _conn(instance_num=instance_num)
+    instance_pool = _get_pool(instance_num=instance_num)
+    instance_pool.slots.acquire()
+    try:
+        held_conn = held[instance_num] = _HeldConn(conn=_checkout(instance_pool=instance_pool))
+        try:
+            yield held_conn.conn
+        finally:
+            del held[instance_num]
+            _checkin(instance_pool=instance_pool, conn=held_conn.conn)
+    finally:
+        instance_pool.slots.release()
 
-    return conn
+
+def in_transaction() -> bool:
+    """Check if the current thread is in the middle of `db_transaction`."""
+    held_conn = _get_held().get(cluster_nodes.get_instance_num())
+    return held_conn is not None and not held_conn.conn.autocommit
 
 
 def reconn() -> psycopg2.extensions.connection:
+    """Replace the connection checked out by the current thread with a new one.
+
+    Must be called inside of the `connection` context.
+    """
     instance_num = cluster_nodes.get_instance_num()
-    conn = DBSyncCache.conns.get(instance_num)
-    _close(instance_num=instance_num, conn=conn)
-    conn = _conn(instance_num=instance_num)
-    return conn
+    held_conn = _get_held()[instance_num]
+    instance_pool = _get_pool(instance_num=instance_num)
+    _discard(instance_pool=instance_pool, conn=held_conn.conn)
+    held_conn.conn = _checkout(instance_pool=instance_pool)
+    return held_conn.conn
 
 
 def close_all() -> None:
-    for instance_num, conn in DBSyncCache.conns.items():
-        _close(instance_num=instance_num, conn=conn)
+    with DBSyncCache.lock:
+        pools = list(DBSyncCache.pools.items())
+        DBSyncCache.pools.clear()
+    for instance_num, instance_pool in pools:
+        LOGGER.info(
+            f"Closing connections to db-sync database {configuration.DBSYNC_DB}{instance_num}."
+        )
+        try:
+            instance_pool.pool.closeall()
+        except psycopg2.Error as err:
+            LOGGER.warning(
+                "Unable to close connections to db-sync database "
+                f"{configuration.DBSYNC_DB}{instance_num}: {err}"
+            )
@@ -1,7 +1,10 @@
 """SQL queries to db-sync database."""
 
+import asyncio
 import contextlib
 import decimal
+import functools
+import itertools
 import typing as tp
 
 import psycopg2
@@ -14,6 +17,8 @@ from cardano_node_tests.utils import dbsync_conn
 
 _CONF_ARBITRARY_T_ALLOWED: pydantic.ConfigDict = {"arbitrary_types_allowed": True}
 
+_CURSOR_IDS = itertools.count()
+
 
 @pydantic.dataclasses.dataclass(frozen=True, config=_CONF_ARBITRARY_T_ALLOWED)
 class PoolDataDBRow:
@@ -226,8 +231,7 @@ class RedeemerDBRow:
     value: dict
 
 
-@pydantic.dataclasses.dataclass(frozen=True)
-class ADAPotsDBRow:
+class ADAPotsDBRow(tp.NamedTuple):
     id: int
     slot_no: int
     epoch_no: int
@@ -242,8 +246,7 @@ class ADAPotsDBRow:
     block_id: int
 
 
-@pydantic.dataclasses.dataclass(frozen=True)
-class RewardDBRow:
+class RewardDBRow(tp.NamedTuple):
     address: str
     type: str
     amount: decimal.Decimal
@@ -252,19 +255,17 @@ class RewardDBRow:
     pool_id: str | None = ""
 
 
-@pydantic.dataclasses.dataclass(frozen=True, config=_CONF_ARBITRARY_T_ALLOWED)
-class UTxODBRow:
+class UTxODBRow(tp.NamedTuple):
     tx_hash: memoryview
     utxo_ix: int
     payment_address: str
     stake_address: str | None
     has_script: bool
-    value: int
+    value: decimal.Decimal
     data_hash: memoryview | None
 
 
-@pydantic.dataclasses.dataclass(frozen=True)
-class BlockDBRow:
+class BlockDBRow(tp.NamedTuple):
     id: int
     epoch_no: int | None
     slot_no: int | None
@@ -352,11 +353,10 @@ class ParamProposalDBRow:
     min_fee_ref_script_cost_per_byte: float | None
 
 
-@pydantic.dataclasses.dataclass(frozen=True)
-class EpochDBRow:
+class EpochDBRow(tp.NamedTuple):
     id: int
-    out_sum: int
-    fees: int
+    out_sum: decimal.Decimal
+    fees: decimal.Decimal
     tx_count: int
     blk_count: int
     epoch_number: int
@@ -608,51 +608,105 @@ class EpochStateDBRow:
     epoch_no: int
 
 
-@contextlib.contextmanager
-def execute(*, query: str, vars: tp.Sequence = ()) -> tp.Iterator[psycopg2.extensions.cursor]:
-    cur = None
-    try:
-        cur = dbsync_conn.conn().cursor()
+def _get_cursor(
+    *, conn: psycopg2.extensions.connection, server_side: bool
+) -> psycopg2.extensions.cursor:
+    itersize = configuration.DBSYNC_CURSOR_ITERSIZE
+    if not (server_side and itersize > 0):
+        return conn.cursor()
+
+    # Named cursor is a server-side cursor, the rows are fetched from the server in batches
+    # of `itersize` rows while iterating over the cursor.
+    # The cursor is declared `WITH HOLD`, so it survives commit of the transaction and
+    # it can be used also when the connection is in autocommit mode.
+    cur = conn.cursor(name=f"cnt_cursor_{next(_CURSOR_IDS)}", withhold=True)
+    cur.itersize = itersize
+    return cur
 
+
+@contextlib.contextmanager
+def execute(
+    *, query: str, vars: tp.Sequence = (), server_side: bool = False
+) -> tp.Iterator[psycopg2.extensions.cursor]:
+    """Execute the query and return the cursor.
+
+    When `server_side` is True, the rows are not transferred from the server all at once,
+    but in batches while iterating over the cursor. Iterate over the cursor instead of calling
+    `fetchone`, which would fetch the rows one by one.
+    """
+    with dbsync_conn.connection() as conn:
+        cur = _get_cursor(conn=conn, server_side=server_side)
         try:
-            cur.execute(query, vars)
-            conn_alive = True
-        except psycopg2.Error:
-            conn_alive = False
+            try:
+                cur.execute(query, vars)
+            except psycopg2.Error:
+                # Reconnecting in the middle of a transaction would silently break the transaction
+                if dbsync_conn.in_transaction():
+                    raise
+                cur.close()
+                cur = _get_cursor(conn=dbsync_conn.reconn(), server_side=server_side)
+                cur.execute(query, vars)
+
+            yield cur
+        finally:
+            cur.close()
 
-        if not conn_alive:
-            cur = dbsync_conn.reconn().cursor()
-            cur.execute(query, vars)
 
-        if cur is None:
-            err = "Failed to acquire database cursor."
-            raise RuntimeError(err)
+async def aquery[T](query_func: tp.Callable[..., tp.Iterable[T]], /, **kwargs: tp.Any) -> list[T]:
+    """Run the `query_*` function in a thread and return all its rows.
+
+    Asyncio variant of the `query_*` functions. Each query checks out its own connection from
+    the connection pool, so queries awaited together (e.g. with `asyncio.gather`) run
+    concurrently.
+    """
+    return await asyncio.to_thread(lambda: list(query_func(**kwargs)))
+
+
+@functools.cache
+def _get_row_validator[T: tuple](row_cls: type[T]) -> pydantic.TypeAdapter[T]:
+    return pydantic.TypeAdapter(row_cls, config=_CONF_ARBITRARY_T_ALLOWED)
 
-        yield cur
-    finally:
-        if cur is not None:
-            cur.close()
+
+def _decode_rows[T: tuple](*, cur: psycopg2.extensions.cursor, row_cls: type[T]) -> tp.Generator[T]:
+    """Decode rows returned by the cursor into named tuples.
+
+    The rows are validated against the row type only when `DBSYNC_VALIDATE_ROWS` is set,
+    as the validation is expensive for large number of rows.
+    """
+    if configuration.DBSYNC_VALIDATE_ROWS:
+        validator = _get_row_validator(row_cls=row_cls)
+        for result in cur:
+            yield validator.validate_python(result)
+    else:
+        for result in cur:
+            yield row_cls(*result)
 
 
 @contextlib.contextmanager
 def db_transaction() -> tp.Iterator[None]:
-    """Transaction manager that works with connection pool."""
-    conn = None
-    try:
-        conn = dbsync_conn.conn()
-        # Only modify autocommit if not already in a transaction
-        if conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_IDLE:
-            conn.autocommit = False
-        yield
-        conn.commit()
-    except Exception:
-        if conn and not conn.closed:
-            conn.rollback()
-        raise
-    finally:
-        if conn and not conn.closed:
-            conn.autocommit = True  # Reset to default psycopg2 behavior
-            # Don't close the connection - let execute() manage it
+    """Run all queries made by the current thread in a single transaction.
+
+    The connection is kept checked out of the connection pool for the whole transaction.
+    Queries that run in other threads (e.g. in the thread pool of `dbsync_utils`) use other
+    connections, so they are not part of the transaction.
+    """
+    with dbsync_conn.connection() as conn:
+        # Nested transaction is part of the outer transaction
+        if dbsync_conn.in_transaction():
+            yield
+            return
+
+        conn.autocommit = False
+        try:
+            yield
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            if not conn.closed:
+                conn.autocommit = True
 
 
 class SchemaVersion:
@@ -679,10 +733,19 @@ class SchemaVersion:
         return cls._stages
 
 
-def query_tx(*, txhash: str) -> tp.Generator[TxDBRow]:
-    """Query a transaction in db-sync."""
+def _get_bytea_array(hexes: tp.Sequence[str]) -> list[bytes]:
+    """Return list of hex strings as a value for `bytea` array query parameter."""
+    return [bytes.fromhex(h) for h in hexes]
+
+
+def query_tx_bulk(*, txhashes: tp.Sequence[str]) -> tp.Generator[tuple[str, TxDBRow]]:
+    """Query multiple transactions in db-sync.
+
+    Yield tuples of transaction hash and a row.
+    """
     query = (
         "SELECT"
+        " tx.hash,"
         " tx.id, tx.hash, tx.block_id, tx.block_index, tx.out_sum, tx.fee, tx.deposit, tx.size,"
         " tx.invalid_before, tx.invalid_hereafter, tx.treasury_donation,"
         " tx_out.id, tx_out.tx_id, tx_out.index, tx_out.address, tx_out.address_has_script,"
@@ -711,18 +774,31 @@ def query_tx(*, txhash: str) -> tp.Generator[TxDBRow]:
         "LEFT JOIN multi_asset join_ma_mint ON ma_tx_mint.ident = join_ma_mint.id "
         "LEFT JOIN datum ON tx_out.inline_datum_id = datum.id "
         "LEFT JOIN script ON tx_out.reference_script_id = script.id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
+    if not txhashes:
+        return
+
+    with execute(query=query, vars=(_get_bytea_array(txhashes),)) as cur:
         while (result := cur.fetchone()) is not None:
-            yield TxDBRow(*result)
+            yield result[0].hex(), TxDBRow(*result[1:])
 
 
-def query_tx_ins(*, txhash: str) -> tp.Generator[TxInDBRow]:
-    """Query transaction txins in db-sync."""
+def query_tx(*, txhash: str) -> tp.Generator[TxDBRow]:
+    """Query a transaction in db-sync."""
+    for __, row in query_tx_bulk(txhashes=[txhash]):
+        yield row
+
+
+def query_tx_ins_bulk(*, txhashes: tp.Sequence[str]) -> tp.Generator[tuple[str, TxInDBRow]]:
+    """Query txins of multiple transactions in db-sync.
+
+    Yield tuples of transaction hash and a row.
+    """
     query = (
         "SELECT"
+        " jtx_in.hash,"
         " tx_out.id, tx_out.index, tx_out.address, tx_out.value, jtx_out_id.hash,"
         " script.hash, script.json, script.bytes, script.type,"
         " ma_tx_out.id, join_ma_out.policy, join_ma_out.name, ma_tx_out.quantity "
@@ -734,18 +810,33 @@ def query_tx_ins(*, txhash: str) -> tp.Generator[TxInDBRow]:
         "LEFT JOIN ma_tx_out ON tx_out.id = ma_tx_out.tx_out_id "
         "LEFT JOIN multi_asset join_ma_out ON ma_tx_out.ident = join_ma_out.id "
         "LEFT JOIN script ON script.id = tx_out.reference_script_id "
-        "WHERE jtx_in.hash = %s;"
+        "WHERE jtx_in.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
+    if not txhashes:
+        return
+
+    with execute(query=query, vars=(_get_bytea_array(txhashes),)) as cur:
         while (result := cur.fetchone()) is not None:
-            yield TxInDBRow(*result)
+            yield result[0].hex(), TxInDBRow(*result[1:])
 
 
-def query_collateral_tx_ins(*, txhash: str) -> tp.Generator[TxInNoMADBRow]:
-    """Query transaction collateral txins in db-sync."""
+def query_tx_ins(*, txhash: str) -> tp.Generator[TxInDBRow]:
+    """Query transaction txins in db-sync."""
+    for __, row in query_tx_ins_bulk(txhashes=[txhash]):
+        yield row
+
+
+def query_collateral_tx_ins_bulk(
+    *, txhashes: tp.Sequence[str]
+) -> tp.Generator[tuple[str, TxInNoMADBRow]]:
+    """Query collateral txins of multiple transactions in db-sync.
+
+    Yield tuples of transaction hash and a row.
+    """
     query = (
         "SELECT"
+        " jtx_col.hash,"
         " tx_out.id, tx_out.index, tx_out.address, tx_out.value, jtx_out_id.hash,"
         " script.hash, script.json, script.bytes, script.type "
         "FROM collateral_tx_in "
@@ -755,18 +846,33 @@ def query_collateral_tx_ins(*, txhash: str) -> tp.Generator[TxInNoMADBRow]:
         "LEFT JOIN tx jtx_col ON jtx_col.id = collateral_tx_in.tx_in_id "
         "LEFT JOIN tx jtx_out_id ON jtx_out_id.id = tx_out.tx_id "
         "LEFT JOIN script ON script.id = tx_out.reference_script_id "
-        "WHERE jtx_col.hash = %s;"
+        "WHERE jtx_col.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
+    if not txhashes:
+        return
+
+    with execute(query=query, vars=(_get_bytea_array(txhashes),)) as cur:
         while (result := cur.fetchone()) is not None:
-            yield TxInNoMADBRow(*result)
+            yield result[0].hex(), TxInNoMADBRow(*result[1:])
 
 
-def query_reference_tx_ins(*, txhash: str) -> tp.Generator[TxInNoMADBRow]:
-    """Query transaction reference txins in db-sync."""
+def query_collateral_tx_ins(*, txhash: str) -> tp.Generator[TxInNoMADBRow]:
+    """Query transaction collateral txins in db-sync."""
+    for __, row in query_collateral_tx_ins_bulk(txhashes=[txhash]):
+        yield row
+
+
+def query_reference_tx_ins_bulk(
+    *, txhashes: tp.Sequence[str]
+) -> tp.Generator[tuple[str, TxInNoMADBRow]]:
+    """Query reference txins of multiple transactions in db-sync.
+
+    Yield tuples of transaction hash and a row.
+    """
     query = (
         "SELECT "
+        " jtx_ref.hash,"
         " tx_out.id, tx_out.index, tx_out.address, tx_out.value, jtx_out_id.hash,"
         " script.hash, script.json, script.bytes, script.type "
         "FROM reference_tx_in "
@@ -776,192 +882,360 @@ def query_reference_tx_ins(*, txhash: str) -> tp.Generator[TxInNoMADBRow]:
         "LEFT JOIN tx jtx_ref ON jtx_ref.id = reference_tx_in.tx_in_id "
         "LEFT JOIN tx jtx_out_id ON jtx_out_id.id = tx_out.tx_id "
         "LEFT JOIN script ON script.id = tx_out.reference_script_id "
-        "WHERE jtx_ref.hash = %s;"
+        "WHERE jtx_ref.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
+    if not txhashes:
+        return
+
+    with execute(query=query, vars=(_get_bytea_array(txhashes),)) as cur:
         while (result := cur.fetchone()) is not None:
-            yield TxInNoMADBRow(*result)
+            yield result[0].hex(), TxInNoMADBRow(*result[1:])
 
 
-def query_collateral_tx_outs(*, txhash: str) -> tp.Generator[CollateralTxOutDBRow]:
-    """Query transaction collateral txouts in db-sync."""
+def query_reference_tx_ins(*, txhash: str) -> tp.Generator[TxInNoMADBRow]:
+    """Query transaction reference txins in db-sync."""
+    for __, row in query_reference_tx_ins_bulk(txhashes=[txhash]):
+        yield row
+
+
+def query_collateral_tx_outs_bulk(
+    *, txhashes: tp.Sequence[str]
+) -> tp.Generator[tuple[str, CollateralTxOutDBRow]]:
+    """Query collateral txouts of multiple transactions in db-sync.
+
+    Yield tuples of transaction hash and a row.
+    """
     query = (
         "SELECT "
+        " jtx_col.hash,"
         " collateral_tx_out.id, collateral_tx_out.index, collateral_tx_out.address,"
         " collateral_tx_out.value, jtx_out_id.hash "
         "FROM collateral_tx_out "
         "LEFT JOIN tx jtx_col ON jtx_col.id = collateral_tx_out.tx_id "
         "LEFT JOIN tx jtx_out_id ON jtx_out_id.id = collateral_tx_out.tx_id "
-        "WHERE jtx_col.hash = %s;"
+        "WHERE jtx_col.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
+    if not txhashes:
+        return
+
+    with execute(query=query, vars=(_get_bytea_array(txhashes),)) as cur:
         while (result := cur.fetchone()) is not None:
-            yield CollateralTxOutDBRow(*result)
+            yield result[0].hex(), CollateralTxOutDBRow(*result[1:])
 
 
-def query_scripts(*, txhash: str) -> tp.Generator[ScriptDBRow]:
-    """Query transaction scripts in db-sync."""
+def query_collateral_tx_outs(*, txhash: str) -> tp.Generator[CollateralTxOutDBRow]:
+    """Query transaction collateral txouts in db-sync."""
+    for __, row in query_collateral_tx_outs_bulk(txhashes=[txhash]):
+        yield row
+
+
+def query_scripts_bulk(*, txhashes: tp.Sequence[str]) -> tp.Generator[tuple[str, ScriptDBRow]]:
+    """Query scripts of multiple transactions in db-sync.
+
+    Yield tuples of transaction hash and a row.
+    """
     query = (
         "SELECT"
+        " tx.hash,"
         " script.id, script.tx_id, script.hash, script.type, script.serialised_size "
         "FROM script "
         "LEFT JOIN tx ON tx.id = script.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
+    if not txhashes:
+        return
+
+    with execute(query=query, vars=(_get_bytea_array(txhashes),)) as cur:
         while (result := cur.fetchone()) is not None:
-            yield ScriptDBRow(*result)
+            yield result[0].hex(), ScriptDBRow(*result[1:])
 
 
-def query_redeemers(*, txhash: str) -> tp.Generator[RedeemerDBRow]:
-    """Query transaction redeemers in db-sync."""
+def query_scripts(*, txhash: str) -> tp.Generator[ScriptDBRow]:
+    """Query transaction scripts in db-sync."""
+    for __, row in query_scripts_bulk(txhashes=[txhash]):
+        yield row
+
+
+def query_redeemers_bulk(*, txhashes: tp.Sequence[str]) -> tp.Generator[tuple[str, RedeemerDBRow]]:
+    """Query redeemers of multiple transactions in db-sync.
+
+    Yield tuples of transaction hash and a row.
+    """
     query = (
         "SELECT"
+        " tx.hash,"
         " redeemer.id, redeemer.tx_id, redeemer.unit_mem, redeemer.unit_steps, redeemer.fee,"
         " redeemer.purpose, redeemer.script_hash, redeemer_data.value "
         "FROM redeemer "
         "LEFT JOIN tx ON tx.id = redeemer.tx_id "
         "LEFT JOIN redeemer_data ON redeemer_data.id = redeemer.redeemer_data_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
+    if not txhashes:
+        return
+
+    with execute(query=query, vars=(_get_bytea_array(txhashes),)) as cur:
         while (result := cur.fetchone()) is not None:
-            yield RedeemerDBRow(*result)
+            yield result[0].hex(), RedeemerDBRow(*result[1:])
 
 
-def query_tx_metadata(*, txhash: str) -> tp.Generator[MetadataDBRow]:
-    """Query transaction metadata in db-sync."""
+def query_redeemers(*, txhash: str) -> tp.Generator[RedeemerDBRow]:
+    """Query transaction redeemers in db-sync."""
+    for __, row in query_redeemers_bulk(txhashes=[txhash]):
+        yield row
+
+
+def query_tx_metadata_bulk(
+    *, txhashes: tp.Sequence[str]
+) -> tp.Generator[tuple[str, MetadataDBRow]]:
+    """Query metadata of multiple transactions in db-sync.
+
+    Yield tuples of transaction hash and a row.
+    """
     query = (
         "SELECT"
+        " tx.hash,"
         " tx_metadata.id, tx_metadata.key, tx_metadata.json, tx_metadata.bytes,"
         " tx_metadata.tx_id "
         "FROM tx_metadata "
         "INNER JOIN tx ON tx.id = tx_metadata.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
+    if not txhashes:
+        return
+
+    with execute(query=query, vars=(_get_bytea_array(txhashes),)) as cur:
         while (result := cur.fetchone()) is not None:
-            yield MetadataDBRow(*result)
+            yield result[0].hex(), MetadataDBRow(*result[1:])
 
 
-def query_tx_reserve(*, txhash: str) -> tp.Generator[ADAStashDBRow]:
-    """Query transaction reserve record in db-sync."""
+def query_tx_metadata(*, txhash: str) -> tp.Generator[MetadataDBRow]:
+    """Query transaction metadata in db-sync."""
+    for __, row in query_tx_metadata_bulk(txhashes=[txhash]):
+        yield row
+
+
+def query_tx_reserve_bulk(*, txhashes: tp.Sequence[str]) -> tp.Generator[tuple[str, ADAStashDBRow]]:
+    """Query reserve records of multiple transactions in db-sync.
+
+    Yield tuples of transaction hash and a row.
+    """
     query = (
         "SELECT"
+        " tx.hash,"
         " reserve.id, stake_address.view, reserve.cert_index, reserve.amount, reserve.tx_id "
         "FROM reserve "
         "INNER JOIN stake_address ON reserve.addr_id = stake_address.id "
         "INNER JOIN tx ON tx.id = reserve.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
+    if not txhashes:
+        return
+
+    with execute(query=query, vars=(_get_bytea_array(txhashes),)) as cur:
         while (result := cur.fetchone()) is not None:
-            yield ADAStashDBRow(*result)
+            yield result[0].hex(), ADAStashDBRow(*result[1:])
 
 
-def query_tx_treasury(*, txhash: str) -> tp.Generator[ADAStashDBRow]:
-    """Query transaction treasury record in db-sync."""
+def query_tx_reserve(*, txhash: str) -> tp.Generator[ADAStashDBRow]:
+    """Query transaction reserve record in db-sync."""
+    for __, row in query_tx_reserve_bulk(txhashes=[txhash]):
+        yield row
+
+
+def query_tx_treasury_bulk(
+    *, txhashes: tp.Sequence[str]
+) -> tp.Generator[tuple[str, ADAStashDBRow]]:
+    """Query treasury records of multiple transactions in db-sync.
+
+    Yield tuples of transaction hash and a row.
+    """
     query = (
         "SELECT"
+        " tx.hash,"
         " treasury.id, stake_address.view, treasury.cert_index,"
         " treasury.amount, treasury.tx_id "
         "FROM treasury "
         "INNER JOIN stake_address ON treasury.addr_id = stake_address.id "
         "INNER JOIN tx ON tx.id = treasury.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
+    if not txhashes:
+        return
+
+    with execute(query=query, vars=(_get_bytea_array(txhashes),)) as cur:
         while (result := cur.fetchone()) is not None:
-            yield ADAStashDBRow(*result)
+            yield result[0].hex(), ADAStashDBRow(*result[1:])
 
 
-def query_tx_pot_transfers(*, txhash: str) -> tp.Generator[PotTransferDBRow]:
-    """Query transaction MIR certificate records in db-sync."""
+def query_tx_treasury(*, txhash: str) -> tp.Generator[ADAStashDBRow]:
+    """Query transaction treasury record in db-sync."""
+    for __, row in query_tx_treasury_bulk(txhashes=[txhash]):
+        yield row
+
+
+def query_tx_pot_transfers_bulk(
+    *, txhashes: tp.Sequence[str]
+) -> tp.Generator[tuple[str, PotTransferDBRow]]:
+    """Query MIR certificate records of multiple transactions in db-sync.
+
+    Yield tuples of transaction hash and a row.
+    """
     query = (
         "SELECT"
+        " tx.hash,"
         " pot_transfer.id, pot_transfer.cert_index, pot_transfer.treasury,"
         " pot_transfer.reserves, pot_transfer.tx_id "
         "FROM pot_transfer "
         "INNER JOIN tx ON tx.id = pot_transfer.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
+    if not txhashes:
+        return
+
+    with execute(query=query, vars=(_get_bytea_array(txhashes),)) as cur:
         while (result := cur.fetchone()) is not None:
-            yield PotTransferDBRow(*result)
+            yield result[0].hex(), PotTransferDBRow(*result[1:])
 
 
-def query_tx_stake_reg(*, txhash: str) -> tp.Generator[StakeAddrDBRow]:
-    """Query stake registration record in db-sync."""
+def query_tx_pot_transfers(*, txhash: str) -> tp.Generator[PotTransferDBRow]:
+    """Query transaction MIR certificate records in db-sync."""
+    for __, row in query_tx_pot_transfers_bulk(txhashes=[txhash]):
+        yield row
+
+
+def query_tx_stake_reg_bulk(
+    *, txhashes: tp.Sequence[str]
+) -> tp.Generator[tuple[str, StakeAddrDBRow]]:
+    """Query stake registration records of multiple transactions in db-sync.
+
+    Yield tuples of transaction hash and a row.
+    """
     query = (
         "SELECT"
+        " tx.hash,"
         " stake_registration.addr_id, stake_address.view, stake_registration.tx_id "
         "FROM stake_registration "
         "INNER JOIN stake_address ON stake_registration.addr_id = stake_address.id "
         "INNER JOIN tx ON tx.id = stake_registration.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
+    if not txhashes:
+        return
+
+    with execute(query=query, vars=(_get_bytea_array(txhashes),)) as cur:
         while (result := cur.fetchone()) is not None:
-            yield StakeAddrDBRow(*result)
+            yield result[0].hex(), StakeAddrDBRow(*result[1:])
 
 
-def query_tx_stake_dereg(*, txhash: str) -> tp.Generator[StakeAddrDBRow]:
-    """Query stake deregistration record in db-sync."""
+def query_tx_stake_reg(*, txhash: str) -> tp.Generator[StakeAddrDBRow]:
+    """Query stake registration record in db-sync."""
+    for __, row in query_tx_stake_reg_bulk(txhashes=[txhash]):
+        yield row
+
+
+def query_tx_stake_dereg_bulk(
+    *, txhashes: tp.Sequence[str]
+) -> tp.Generator[tuple[str, StakeAddrDBRow]]:
+    """Query stake deregistration records of multiple transactions in db-sync.
+
+    Yield tuples of transaction hash and a row.
+    """
     query = (
         "SELECT"
+        " tx.hash,"
         " stake_deregistration.addr_id, stake_address.view, stake_deregistration.tx_id "
         "FROM stake_deregistration "
         "INNER JOIN stake_address ON stake_deregistration.addr_id = stake_address.id "
         "INNER JOIN tx ON tx.id = stake_deregistration.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
+    if not txhashes:
+        return
+
+    with execute(query=query, vars=(_get_bytea_array(txhashes),)) as cur:
         while (result := cur.fetchone()) is not None:
-            yield StakeAddrDBRow(*result)
+            yield result[0].hex(), StakeAddrDBRow(*result[1:])
 
 
-def query_tx_stake_deleg(*, txhash: str) -> tp.Generator[StakeDelegDBRow]:
-    """Query stake registration record in db-sync."""
+def query_tx_stake_dereg(*, txhash: str) -> tp.Generator[StakeAddrDBRow]:
+    """Query stake deregistration record in db-sync."""
+    for __, row in query_tx_stake_dereg_bulk(txhashes=[txhash]):
+        yield row
+
+
+def query_tx_stake_deleg_bulk(
+    *, txhashes: tp.Sequence[str]
+) -> tp.Generator[tuple[str, StakeDelegDBRow]]:
+    """Query stake delegation records of multiple transactions in db-sync.
+
+    Yield tuples of transaction hash and a row.
+    """
     query = (
         "SELECT"
+        " tx.hash,"
         " tx.id, delegation.active_epoch_no, pool_hash.view AS pool_view,"
         " stake_address.view AS address_view "
         "FROM delegation "
         "INNER JOIN stake_address ON delegation.addr_id = stake_address.id "
         "INNER JOIN tx ON tx.id = delegation.tx_id "
         "INNER JOIN pool_hash ON pool_hash.id = delegation.pool_hash_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
+    if not txhashes:
+        return
+
+    with execute(query=query, vars=(_get_bytea_array(txhashes),)) as cur:
         while (result := cur.fetchone()) is not None:
-            yield StakeDelegDBRow(*result)
+            yield result[0].hex(), StakeDelegDBRow(*result[1:])
 
 
-def query_tx_withdrawal(*, txhash: str) -> tp.Generator[WithdrawalDBRow]:
-    """Query reward withdrawal record in db-sync."""
+def query_tx_stake_deleg(*, txhash: str) -> tp.Generator[StakeDelegDBRow]:
+    """Query stake registration record in db-sync."""
+    for __, row in query_tx_stake_deleg_bulk(txhashes=[txhash]):
+        yield row
+
+
+def query_tx_withdrawal_bulk(
+    *, txhashes: tp.Sequence[str]
+) -> tp.Generator[tuple[str, WithdrawalDBRow]]:
+    """Query reward withdrawal records of multiple transactions in db-sync.
+
+    Yield tuples of transaction hash and a row.
+    """
     query = (
         "SELECT"
+        " tx.hash,"
         " tx.id, stake_address.view, amount "
         "FROM withdrawal "
         "INNER JOIN stake_address ON withdrawal.addr_id = stake_address.id "
         "INNER JOIN tx ON tx.id = withdrawal.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
+    if not txhashes:
+        return
+
+    with execute(query=query, vars=(_get_bytea_array(txhashes),)) as cur:
         while (result := cur.fetchone()) is not None:
-            yield WithdrawalDBRow(*result)
+            yield result[0].hex(), WithdrawalDBRow(*result[1:])
+
+
+def query_tx_withdrawal(*, txhash: str) -> tp.Generator[WithdrawalDBRow]:
+    """Query reward withdrawal record in db-sync."""
+    for __, row in query_tx_withdrawal_bulk(txhashes=[txhash]):
+        yield row
 
 
 def query_ada_pots(*, epoch_from: int = 0, epoch_to: int = 99999999) -> tp.Generator[ADAPotsDBRow]:
@@ -975,9 +1249,8 @@ def query_ada_pots(*, epoch_from: int = 0, epoch_to: int = 99999999) -> tp.Gener
         "ORDER BY id;"
     )
 
-    with execute(query=query, vars=(epoch_from, epoch_to)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield ADAPotsDBRow(*result)
+    with execute(query=query, vars=(epoch_from, epoch_to), server_side=True) as cur:
+        yield from _decode_rows(cur=cur, row_cls=ADAPotsDBRow)
 
 
 def query_address_reward(
@@ -994,9 +1267,8 @@ def query_address_reward(
         "WHERE (stake_address.view = %s) AND (reward.spendable_epoch BETWEEN %s AND %s) ;"
     )
 
-    with execute(query=query, vars=(address, epoch_from, epoch_to)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield RewardDBRow(*result)
+    with execute(query=query, vars=(address, epoch_from, epoch_to), server_side=True) as cur:
+        yield from _decode_rows(cur=cur, row_cls=RewardDBRow)
 
 
 def query_address_reward_rest(
@@ -1012,9 +1284,8 @@ def query_address_reward_rest(
         "WHERE (stake_address.view = %s) AND (reward_rest.spendable_epoch BETWEEN %s AND %s) ;"
     )
 
-    with execute(query=query, vars=(address, epoch_from, epoch_to)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield RewardDBRow(*result)
+    with execute(query=query, vars=(address, epoch_from, epoch_to), server_side=True) as cur:
+        yield from _decode_rows(cur=cur, row_cls=RewardDBRow)
 
 
 def query_utxo(*, address: str) -> tp.Generator[UTxODBRow]:
@@ -1033,9 +1304,8 @@ def query_utxo(*, address: str) -> tp.Generator[UTxODBRow]:
         "ORDER BY tx_out.id;"
     )
 
-    with execute(query=query, vars=(address,)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield UTxODBRow(*result)
+    with execute(query=query, vars=(address,), server_side=True) as cur:
+        yield from _decode_rows(cur=cur, row_cls=UTxODBRow)
 
 
 def query_pool_data(*, pool_id_bech32: str) -> tp.Generator[PoolDataDBRow]:
@@ -1176,9 +1446,8 @@ def query_blocks(
         "ORDER BY block.id;"
     )
 
-    with execute(query=query, vars=query_vars) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield BlockDBRow(*result)
+    with execute(query=query, vars=query_vars, server_side=True) as cur:
+        yield from _decode_rows(cur=cur, row_cls=BlockDBRow)
 
 
 def query_table_names() -> list[str]:
@@ -1278,18 +1547,32 @@ def query_param_proposal(*, txhash: str = "") -> ParamProposalDBRow:
         return ParamProposalDBRow(*results)
 
 
-def query_extra_key_witness(*, txhash: str) -> tp.Generator[memoryview]:
-    """Query extra key witness records in db-sync."""
+def query_extra_key_witness_bulk(
+    *, txhashes: tp.Sequence[str]
+) -> tp.Generator[tuple[str, memoryview]]:
+    """Query extra key witness records of multiple transactions in db-sync.
+
+    Yield tuples of transaction hash and a row.
+    """
     query = (
-        "SELECT extra_key_witness.hash "
+        "SELECT tx.hash, extra_key_witness.hash "
         "FROM extra_key_witness "
         "INNER JOIN tx ON tx.id = extra_key_witness.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
+    if not txhashes:
+        return
+
+    with execute(query=query, vars=(_get_bytea_array(txhashes),)) as cur:
         while (result := cur.fetchone()) is not None:
-            yield result[0]
+            yield result[0].hex(), result[1]
+
+
+def query_extra_key_witness(*, txhash: str) -> tp.Generator[memoryview]:
+    """Query extra key witness records in db-sync."""
+    for __, row in query_extra_key_witness_bulk(txhashes=[txhash]):
+        yield row
 
 
 def query_epoch(*, epoch_from: int = 0, epoch_to: int = 99999999) -> tp.Generator[EpochDBRow]:
@@ -1303,9 +1586,8 @@ def query_epoch(*, epoch_from: int = 0, epoch_to: int = 99999999) -> tp.Generato
         "WHERE (no BETWEEN %s AND %s);"
     )
 
-    with execute(query=query, vars=query_vars) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield EpochDBRow(*result)
+    with execute(query=query, vars=query_vars, server_side=True) as cur:
+        yield from _decode_rows(cur=cur, row_cls=EpochDBRow)
 
 
 def query_committee_registration(*, cold_key: str) -> tp.Generator[CommitteeRegistrationDBRow]:
@@ -1584,7 +1866,7 @@ def delete_reserved_pool_tickers() -> int:
 
     with execute(query=query) as cur:
         affected_rows = cur.rowcount or 0
-        dbsync_conn.conn().commit()
+        cur.connection.commit()
         return affected_rows
 
 
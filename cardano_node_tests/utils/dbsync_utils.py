@@ -1,5 +1,6 @@
 """Functionality for interacting with db-sync."""
 
+import concurrent.futures
 import enum
 import functools
 import itertools
@@ -11,6 +12,7 @@ from cardano_clusterlib import clusterlib
 
 from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import dbsync_check_tx
+from cardano_node_tests.utils import dbsync_conn
 from cardano_node_tests.utils import dbsync_queries
 from cardano_node_tests.utils import dbsync_types
 from cardano_node_tests.utils import governance_utils
@@ -188,8 +190,27 @@ def get_pool_data(*, pool_id_bech32: str) -> dbsync_types.PoolDataRecord | None:
     return pool_data
 
 
-def get_prelim_tx_record(*, txhash: str) -> dbsync_types.TxPrelimRecord:
-    """Get first batch of transaction data from db-sync."""
+def _group_by_txhash[T](rows: tp.Iterable[tuple[str, T]]) -> dict[str, list[T]]:
+    """Group rows returned by a bulk query by transaction hash."""
+    grouped: dict[str, list[T]] = {}
+    for txhash, row in rows:
+        grouped.setdefault(txhash, []).append(row)
+    return grouped
+
+
+def _fetch_grouped(
+    *,
+    query_func: tp.Callable[..., tp.Iterable[tuple[str, tp.Any]]],
+    txhashes: tp.Sequence[str],
+) -> dict[str, list[tp.Any]]:
+    """Run a bulk query and group the returned rows by transaction hash."""
+    return _group_by_txhash(query_func(txhashes=txhashes))
+
+
+def _compile_prelim_tx_record(
+    *, txhash: str, rows: tp.Iterable[dbsync_queries.TxDBRow]
+) -> dbsync_types.TxPrelimRecord:
+    """Compile first batch of transaction data from `query_tx` rows."""
     utxo_out: list[dbsync_types.UTxORecord] = []
     seen_tx_out_ids = set()
     ma_utxo_out: list[dbsync_types.UTxORecord] = []
@@ -199,7 +220,7 @@ def get_prelim_tx_record(*, txhash: str) -> dbsync_types.TxPrelimRecord:
     tx_id = -1
 
     query_row = None
-    for query_row in dbsync_queries.query_tx(txhash=txhash):
+    for query_row in rows:
         if tx_id == -1:
             tx_id = query_row.tx_id
         if tx_id != query_row.tx_id:
@@ -277,13 +298,18 @@ def get_prelim_tx_record(*, txhash: str) -> dbsync_types.TxPrelimRecord:
     return txdata
 
 
-def get_txins(*, txhash: str) -> list[dbsync_types.UTxORecord]:
-    """Get txins of a transaction from db-sync."""
+def get_prelim_tx_record(*, txhash: str) -> dbsync_types.TxPrelimRecord:
+    """Get first batch of transaction data from db-sync."""
+    return _compile_prelim_tx_record(txhash=txhash, rows=dbsync_queries.query_tx(txhash=txhash))
+
+
+def _compile_txins(*, rows: tp.Iterable[dbsync_queries.TxInDBRow]) -> list[dbsync_types.UTxORecord]:
+    """Compile txins of a transaction from `query_tx_ins` rows."""
     txins: list[dbsync_types.UTxORecord] = []
     seen_txins_out_ids = set()
     seen_txins_ma_ids = set()
 
-    for txins_row in dbsync_queries.query_tx_ins(txhash=txhash):
+    for txins_row in rows:
         # Lovelace inputs
         if txins_row.tx_out_id and txins_row.tx_out_id not in seen_txins_out_ids:
             seen_txins_out_ids.add(txins_row.tx_out_id)
@@ -321,141 +347,132 @@ def get_txins(*, txhash: str) -> list[dbsync_types.UTxORecord]:
     return txins
 
 
-def get_tx_record(*, txhash: str) -> dbsync_types.TxRecord:  # noqa: C901
-    """Get transaction data from db-sync.
-
-    Compile data from multiple SQL queries to get as much information about the TX as possible.
-    """
-    txdata = get_prelim_tx_record(txhash=txhash)
-    txins = get_txins(txhash=txhash)
-
-    metadata = []
-    if txdata.last_row.metadata_count:
-        metadata = [
-            dbsync_types.MetadataRecord(key=int(r.key), json=r.json, bytes=r.bytes)
-            for r in dbsync_queries.query_tx_metadata(txhash=txhash)
-        ]
+def get_txins(*, txhash: str) -> list[dbsync_types.UTxORecord]:
+    """Get txins of a transaction from db-sync."""
+    return _compile_txins(rows=dbsync_queries.query_tx_ins(txhash=txhash))
+
+
+# Bulk queries for the optional parts of transaction data, together with the name of the counter
+# in `TxDBRow` that says if there is anything to query
+_TX_SECTIONS_QUERIES: tp.Final = {
+    "metadata": ("metadata_count", dbsync_queries.query_tx_metadata_bulk),
+    "reserve": ("reserve_count", dbsync_queries.query_tx_reserve_bulk),
+    "treasury": ("treasury_count", dbsync_queries.query_tx_treasury_bulk),
+    "pot_transfers": ("pot_transfer_count", dbsync_queries.query_tx_pot_transfers_bulk),
+    "stake_registration": ("stake_reg_count", dbsync_queries.query_tx_stake_reg_bulk),
+    "stake_deregistration": ("stake_dereg_count", dbsync_queries.query_tx_stake_dereg_bulk),
+    "stake_delegation": ("stake_deleg_count", dbsync_queries.query_tx_stake_deleg_bulk),
+    "withdrawals": ("withdrawal_count", dbsync_queries.query_tx_withdrawal_bulk),
+    "collaterals": ("collateral_count", dbsync_queries.query_collateral_tx_ins_bulk),
+    "collateral_outputs": ("collateral_out_count", dbsync_queries.query_collateral_tx_outs_bulk),
+    "reference_inputs": ("reference_input_count", dbsync_queries.query_reference_tx_ins_bulk),
+    "scripts": ("script_count", dbsync_queries.query_scripts_bulk),
+    "redeemers": ("redeemer_count", dbsync_queries.query_redeemers_bulk),
+    "extra_key_witness": ("extra_key_witness_count", dbsync_queries.query_extra_key_witness_bulk),
+}
+
+
+def _compile_tx_record(
+    *,
+    txdata: dbsync_types.TxPrelimRecord,
+    txins: list[dbsync_types.UTxORecord],
+    sections: dict[str, list[tp.Any]],
+) -> dbsync_types.TxRecord:
+    """Compile transaction data from rows returned by the queries in `_TX_SECTIONS_QUERIES`."""
+    metadata = [
+        dbsync_types.MetadataRecord(key=int(r.key), json=r.json, bytes=r.bytes)
+        for r in sections["metadata"]
+    ]
 
-    reserve = []
-    if txdata.last_row.reserve_count:
-        reserve = [
-            dbsync_types.ADAStashRecord(
-                address=str(r.addr_view), cert_index=int(r.cert_index), amount=int(r.amount)
-            )
-            for r in dbsync_queries.query_tx_reserve(txhash=txhash)
-        ]
+    reserve = [
+        dbsync_types.ADAStashRecord(
+            address=str(r.addr_view), cert_index=int(r.cert_index), amount=int(r.amount)
+        )
+        for r in sections["reserve"]
+    ]
 
-    treasury = []
-    if txdata.last_row.treasury_count:
-        treasury = [
-            dbsync_types.ADAStashRecord(
-                address=str(r.addr_view), cert_index=int(r.cert_index), amount=int(r.amount)
-            )
-            for r in dbsync_queries.query_tx_treasury(txhash=txhash)
-        ]
+    treasury = [
+        dbsync_types.ADAStashRecord(
+            address=str(r.addr_view), cert_index=int(r.cert_index), amount=int(r.amount)
+        )
+        for r in sections["treasury"]
+    ]
 
-    pot_transfers = []
-    if txdata.last_row.pot_transfer_count:
-        pot_transfers = [
-            dbsync_types.PotTransferRecord(treasury=int(r.treasury), reserves=int(r.reserves))
-            for r in dbsync_queries.query_tx_pot_transfers(txhash=txhash)
-        ]
+    pot_transfers = [
+        dbsync_types.PotTransferRecord(treasury=int(r.treasury), reserves=int(r.reserves))
+        for r in sections["pot_transfers"]
+    ]
 
-    stake_registration = []
-    if txdata.last_row.stake_reg_count:
-        stake_registration = [r.view for r in dbsync_queries.query_tx_stake_reg(txhash=txhash)]
+    stake_registration = [r.view for r in sections["stake_registration"]]
 
-    stake_deregistration = []
-    if txdata.last_row.stake_dereg_count:
-        stake_deregistration = [r.view for r in dbsync_queries.query_tx_stake_dereg(txhash=txhash)]
+    stake_deregistration = [r.view for r in sections["stake_deregistration"]]
 
-    stake_delegation = []
-    if txdata.last_row.stake_deleg_count:
-        stake_delegation = [
-            dbsync_types.DelegationRecord(
-                address=r.address, pool_id=r.pool_id, active_epoch_no=r.active_epoch_no
-            )
-            for r in dbsync_queries.query_tx_stake_deleg(txhash=txhash)
-            if (r.address and r.pool_id and r.active_epoch_no)
-        ]
+    stake_delegation = [
+        dbsync_types.DelegationRecord(
+            address=r.address, pool_id=r.pool_id, active_epoch_no=r.active_epoch_no
+        )
+        for r in sections["stake_delegation"]
+        if (r.address and r.pool_id and r.active_epoch_no)
+    ]
 
-    withdrawals = []
-    if txdata.last_row.withdrawal_count:
-        withdrawals = [
-            clusterlib.TxOut(address=r.address, amount=int(r.amount))
-            for r in dbsync_queries.query_tx_withdrawal(txhash=txhash)
-        ]
+    withdrawals = [
+        clusterlib.TxOut(address=r.address, amount=int(r.amount)) for r in sections["withdrawals"]
+    ]
 
-    collaterals = []
-    if txdata.last_row.collateral_count:
-        collaterals = [
-            dbsync_types.UTxORecord(
-                utxo_hash=r.tx_hash.hex(),
-                utxo_ix=int(r.utxo_ix),
-                amount=int(r.value),
-                address=str(r.address),
-                reference_script_hash=r.reference_script_hash.hex()
-                if r.reference_script_hash
-                else "",
-            )
-            for r in dbsync_queries.query_collateral_tx_ins(txhash=txhash)
-        ]
+    collaterals = [
+        dbsync_types.UTxORecord(
+            utxo_hash=r.tx_hash.hex(),
+            utxo_ix=int(r.utxo_ix),
+            amount=int(r.value),
+            address=str(r.address),
+            reference_script_hash=r.reference_script_hash.hex() if r.reference_script_hash else "",
+        )
+        for r in sections["collaterals"]
+    ]
 
-    collateral_outputs = []
-    if txdata.last_row.collateral_out_count:
-        collateral_outputs = [
-            clusterlib.UTXOData(
-                utxo_hash=r.tx_hash.hex(),
-                utxo_ix=int(r.utxo_ix),
-                amount=int(r.value),
-                address=str(r.address),
-            )
-            for r in dbsync_queries.query_collateral_tx_outs(txhash=txhash)
-        ]
+    collateral_outputs = [
+        clusterlib.UTXOData(
+            utxo_hash=r.tx_hash.hex(),
+            utxo_ix=int(r.utxo_ix),
+            amount=int(r.value),
+            address=str(r.address),
+        )
+        for r in sections["collateral_outputs"]
+    ]
 
-    reference_inputs = []
-    if txdata.last_row.reference_input_count:
-        reference_inputs = [
-            dbsync_types.UTxORecord(
-                utxo_hash=r.tx_hash.hex(),
-                utxo_ix=int(r.utxo_ix),
-                amount=int(r.value),
-                address=str(r.address),
-                reference_script_hash=r.reference_script_hash.hex()
-                if r.reference_script_hash
-                else "",
-            )
-            for r in dbsync_queries.query_reference_tx_ins(txhash=txhash)
-        ]
+    reference_inputs = [
+        dbsync_types.UTxORecord(
+            utxo_hash=r.tx_hash.hex(),
+            utxo_ix=int(r.utxo_ix),
+            amount=int(r.value),
+            address=str(r.address),
+            reference_script_hash=r.reference_script_hash.hex() if r.reference_script_hash else "",
+        )
+        for r in sections["reference_inputs"]
+    ]
 
-    scripts = []
-    if txdata.last_row.script_count:
-        scripts = [
-            dbsync_types.ScriptRecord(
-                hash=r.hash.hex(),
-                type=str(r.type),
-                serialised_size=int(r.serialised_size) if r.serialised_size else 0,
-            )
-            for r in dbsync_queries.query_scripts(txhash=txhash)
-        ]
+    scripts = [
+        dbsync_types.ScriptRecord(
+            hash=r.hash.hex(),
+            type=str(r.type),
+            serialised_size=int(r.serialised_size) if r.serialised_size else 0,
+        )
+        for r in sections["scripts"]
+    ]
 
-    redeemers = []
-    if txdata.last_row.redeemer_count:
-        redeemers = [
-            dbsync_types.RedeemerRecord(
-                unit_mem=int(r.unit_mem),
-                unit_steps=int(r.unit_steps),
-                fee=int(r.fee),
-                purpose=str(r.purpose),
-                script_hash=r.script_hash.hex(),
-                value=r.value,
-            )
-            for r in dbsync_queries.query_redeemers(txhash=txhash)
-        ]
+    redeemers = [
+        dbsync_types.RedeemerRecord(
+            unit_mem=int(r.unit_mem),
+            unit_steps=int(r.unit_steps),
+            fee=int(r.fee),
+            purpose=str(r.purpose),
+            script_hash=r.script_hash.hex(),
+            value=r.value,
+        )
+        for r in sections["redeemers"]
+    ]
 
-    extra_key_witness = []
-    if txdata.last_row.extra_key_witness_count:
-        extra_key_witness = [r.hex() for r in dbsync_queries.query_extra_key_witness(txhash=txhash)]
+    extra_key_witness = [r.hex() for r in sections["extra_key_witness"]]
 
     record = dbsync_types.TxRecord(
         tx_id=int(txdata.last_row.tx_id),
@@ -495,6 +512,95 @@ def get_tx_record(*, txhash: str) -> dbsync_types.TxRecord:  # noqa: C901
     return record
 
 
+@functools.cache
+def _get_query_executor() -> concurrent.futures.Executor | None:
+    """Return thread pool for running independent queries, or `None` when running serially.
+
+    Each thread uses its own connection to db-sync database (see `dbsync_conn`).
+    """
+    if configuration.DBSYNC_QUERY_WORKERS <= 1:
+        return None
+    return concurrent.futures.ThreadPoolExecutor(
+        max_workers=configuration.DBSYNC_QUERY_WORKERS, thread_name_prefix="dbsync-query"
+    )
+
+
+def _run_queries[T](queries: dict[str, tp.Callable[[], T]]) -> dict[str, T]:
+    """Run independent queries, possibly concurrently, and return results by query name.
+
+    Inside of `dbsync_queries.db_transaction`, the queries run serially in the current thread,
+    so they are part of the transaction.
+    """
+    executor = _get_query_executor()
+    if executor is None or len(queries) < 2 or dbsync_conn.in_transaction():
+        return {name: q() for name, q in queries.items()}
+    futures = {name: executor.submit(q) for name, q in queries.items()}
+    return {name: f.result() for name, f in futures.items()}
+
+
+def get_tx_records(*, txhashes: tp.Sequence[str]) -> list[dbsync_types.TxRecord]:
+    """Get data of multiple transactions from db-sync.
+
+    All the data are fetched using a fixed number of SQL queries, no matter how many transactions
+    there are. Records are returned in the same order as `txhashes`.
+    """
+    # Hashes returned by db-sync are lowercase
+    txhashes = [h.lower() for h in txhashes]
+    unique_txhashes = list(dict.fromkeys(txhashes))
+
+    tx_rows = _group_by_txhash(dbsync_queries.query_tx_bulk(txhashes=unique_txhashes))
+    missing = [h for h in unique_txhashes if h not in tx_rows]
+    if missing:
+        msg = f"No results were returned by the TX SQL query for {missing}."
+        raise RuntimeError(msg)
+
+    prelim_records = {
+        h: _compile_prelim_tx_record(txhash=h, rows=tx_rows[h]) for h in unique_txhashes
+    }
+
+    # The queries for txins and for the optional sections are independent of each other
+    queries: dict[str, tp.Callable[[], dict[str, list[tp.Any]]]] = {
+        "txins": functools.partial(
+            _fetch_grouped,
+            query_func=dbsync_queries.query_tx_ins_bulk,
+            txhashes=unique_txhashes,
+        )
+    }
+    for section, (count_attr, query_func) in _TX_SECTIONS_QUERIES.items():
+        # Query only the transactions that have some data in the section
+        section_txhashes = [
+            h for h in unique_txhashes if getattr(prelim_records[h].last_row, count_attr)
+        ]
+        if section_txhashes:
+            queries[section] = functools.partial(
+                _fetch_grouped, query_func=query_func, txhashes=section_txhashes
+            )
+    sections_rows = _run_queries(queries)
+    txins_rows = sections_rows.pop("txins")
+
+    records = {
+        h: _compile_tx_record(
+            txdata=prelim_records[h],
+            txins=_compile_txins(rows=txins_rows.get(h, [])),
+            sections={
+                section: sections_rows.get(section, {}).get(h, [])
+                for section in _TX_SECTIONS_QUERIES
+            },
+        )
+        for h in unique_txhashes
+    }
+
+    return [records[h] for h in txhashes]
+
+
+def get_tx_record(*, txhash: str) -> dbsync_types.TxRecord:
+    """Get transaction data from db-sync.
+
+    Compile data from multiple SQL queries to get as much information about the TX as possible.
+    """
+    return get_tx_records(txhashes=[txhash])[0]
+
+
 def retry_query(*, query_func: tp.Callable, timeout: int = 20) -> tp.Any:
     """Wait a bit and retry a query until response is returned.
 
@@ -521,25 +627,28 @@ def retry_query(*, query_func: tp.Callable, timeout: int = 20) -> tp.Any:
     return response
 
 
-def get_tx_record_retry(*, txhash: str, retry_num: int = 3) -> dbsync_types.TxRecord:
-    """Retry `get_tx_record` when data is anticipated and are not available yet.
+def get_tx_records_retry(
+    *, txhashes: tp.Sequence[str], retry_num: int = 3
+) -> list[dbsync_types.TxRecord]:
+    """Retry `get_tx_records` when data is anticipated and are not available yet.
 
     Under load it might be necessary to wait a bit and retry the query.
     """
     retry_num = max(retry_num, 0)
     response = None
+    txhashes_str = ", ".join(f"'{h}'" for h in txhashes)
 
     # First try + number of retries
     for r in range(1 + retry_num):
         if r > 0:
             sleep_time = 2 + r * r
             LOGGER.warning(
-                f"Sleeping {sleep_time}s before repeating TX SQL query for '{txhash}' "
+                f"Sleeping {sleep_time}s before repeating TX SQL query for {txhashes_str} "
                 f"for the {r} time."
             )
             time.sleep(sleep_time)
         try:
-            response = get_tx_record(txhash=txhash)
+            response = get_tx_records(txhashes=txhashes)
             break
         except RuntimeError:
             if r == retry_num:
@@ -549,6 +658,14 @@ def get_tx_record_retry(*, txhash: str, retry_num: int = 3) -> dbsync_types.TxRe
     return response
 
 
+def get_tx_record_retry(*, txhash: str, retry_num: int = 3) -> dbsync_types.TxRecord:
+    """Retry `get_tx_record` when data is anticipated and are not available yet.
+
+    Under load it might be necessary to wait a bit and retry the query.
+    """
+    return get_tx_records_retry(txhashes=[txhash], retry_num=retry_num)[0]
+
+
 def get_tx(
     *, cluster_obj: clusterlib.ClusterLib, tx_raw_output: clusterlib.TxRawOutput, retry_num: int = 3
 ) -> dbsync_types.TxRecord | None:
@@ -575,6 +692,29 @@ def check_tx(
     return response
 
 
+def check_txs(
+    *,
+    cluster_obj: clusterlib.ClusterLib,
+    tx_raw_outputs: tp.Sequence[clusterlib.TxRawOutput],
+    retry_num: int = 3,
+) -> list[dbsync_types.TxRecord]:
+    """Check multiple transactions in db-sync.
+
+    Data of all the transactions are fetched from db-sync at once.
+    """
+    if not configuration.HAS_DBSYNC:
+        return []
+
+    txhashes = [cluster_obj.g_transaction.get_txid(tx_body_file=r.out_file) for r in tx_raw_outputs]
+    responses = get_tx_records_retry(txhashes=txhashes, retry_num=retry_num)
+
+    for tx_raw_output, response in zip(tx_raw_outputs, responses, strict=True):
+        dbsync_check_tx.check_tx(
+            cluster_obj=cluster_obj, tx_raw_output=tx_raw_output, response=response
+        )
+    return responses
+
+
 def check_tx_phase_2_failure(
     *,
     cluster_obj: clusterlib.ClusterLib,
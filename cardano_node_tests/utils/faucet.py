@@ -1,17 +1,342 @@
+"""Funding of addresses from faucet addresses.
+
+By default, each funding transaction is built, submitted and confirmed while holding a lock on
+the faucet address. With many pytest workers, the workers wait on each other's confirmations.
+
+With `FAUCET_PIPELINING`, funding requests are queued in a per-faucet directory and the worker
+that gets the faucet lock submits all queued requests in a single multi-output transaction.
+The faucet UTxOs are tracked locally and the change output of a submitted transaction is spent
+by the next transaction right away, without waiting for confirmation. Each worker then waits for
+confirmation of its own funding transaction outside of the lock.
+"""
+
 import contextlib
+import dataclasses
 import logging
+import pathlib as pl
+import pickle
 import random
+import shutil
+import typing as tp
 
 import cardano_clusterlib.types as cl_types
 from cardano_clusterlib import clusterlib
 
+from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import helpers
 from cardano_node_tests.utils import locking
 from cardano_node_tests.utils import temptools
+from cardano_node_tests.utils import timings
+from cardano_node_tests.utils import utxo_index
 
 LOGGER = logging.getLogger(__name__)
 
+FUNDING_DIR_NAME = "faucet_funding"
+FAUCET_UTXOS_FILE_NAME = "faucet_utxos.pickle"
+# Max number of funding outputs in a single transaction
+FUNDING_MAX_TXOUTS = 50
+# Max number of new blocks to wait for the funding transaction to be confirmed
+FUNDING_CONFIRM_BLOCKS = 10
+
+
+@dataclasses.dataclass(frozen=True)
+class _FundingResult:
+    tx_raw_output: clusterlib.TxRawOutput | None
+    tx_signed_file: pl.Path | None
+    # Index of the first output of the request in the funding transaction
+    first_txout_ix: int = 0
+    error: str = ""
+
+
+def _get_faucet_lock(src_address: str) -> contextlib.AbstractContextManager:
+    lock: contextlib.AbstractContextManager = locking.FileLockIfXdist(
+        f"{temptools.get_basetemp()}/{src_address}.lock"
+    )
+    return lock
+
+
+def _get_funding_dir(src_address: str) -> pl.Path:
+    # The tracked faucet UTxOs are valid only for the current testing session
+    funding_dir = temptools.get_pytest_shared_tmp() / FUNDING_DIR_NAME / src_address
+    funding_dir.mkdir(parents=True, exist_ok=True)
+    return funding_dir
+
+
+def forget_tracked_utxos(src_address: str) -> None:
+    """Forget the tracked UTxOs and queued funding requests of the faucet address.
+
+    Needed when the UTxOs of the faucet address change without the faucet knowing about it,
+    e.g. when the chain is rolled back by restoring a chain snapshot.
+    """
+    funding_dir = temptools.get_pytest_shared_tmp() / FUNDING_DIR_NAME / src_address
+    shutil.rmtree(funding_dir, ignore_errors=True)
+
+
+def _write_pickle(path: pl.Path, data: object) -> None:
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "wb") as out_fp:
+        pickle.dump(data, out_fp)
+    tmp_path.replace(path)
+
+
+def _read_pickle(path: pl.Path) -> tp.Any:
+    with open(path, "rb") as in_fp:
+        return pickle.load(in_fp)
+
+
+def _get_txouts_to_fund(
+    *dst_addrs: clusterlib.AddressRecord,
+    cluster_obj: clusterlib.ClusterLib,
+    amount: list[int],
+    force: bool,
+) -> list[clusterlib.TxOut]:
+    """Return outputs for addresses that don't have the required balance yet."""
+    if force:
+        return [clusterlib.TxOut(address=d.address, amount=a) for d, a in zip(dst_addrs, amount)]
+
+    balances = utxo_index.get_balances(
+        cluster_obj=cluster_obj, addresses=[d.address for d in dst_addrs]
+    )
+    return [
+        clusterlib.TxOut(address=d.address, amount=a)
+        for d, a in zip(dst_addrs, amount)
+        if balances[d.address] < a
+    ]
+
+
+def _get_faucet_utxos(
+    *, cluster_obj: clusterlib.ClusterLib, src_address: str, funding_dir: pl.Path
+) -> list[clusterlib.UTXOData]:
+    """Return locally tracked faucet UTxOs, or query them if they are not tracked yet.
+
+    The tracked UTxOs include change outputs of transactions that are not confirmed yet.
+    Only UTxOs with nothing but Lovelace are used for funding.
+    """
+    utxos_file = funding_dir / FAUCET_UTXOS_FILE_NAME
+    if utxos_file.exists():
+        return list(_read_pickle(utxos_file))
+
+    utxos = cluster_obj.g_query.get_utxo(address=src_address)
+    not_ada_only = {
+        f"{u.utxo_hash}#{u.utxo_ix}"
+        for u in utxos
+        if u.coin != clusterlib.DEFAULT_COIN
+        or u.datum_hash
+        or u.inline_datum_hash
+        or u.reference_script
+    }
+    return [u for u in utxos if f"{u.utxo_hash}#{u.utxo_ix}" not in not_ada_only]
+
+
+def _submit_funding_tx(
+    *,
+    cluster_obj: clusterlib.ClusterLib,
+    faucet_data: dict,
+    faucet_utxos: list[clusterlib.UTXOData],
+    txouts: list[clusterlib.TxOut],
+    tx_name: str,
+    destination_dir: clusterlib.FileType,
+) -> tuple[clusterlib.TxRawOutput, pl.Path]:
+    """Build, sign and submit the funding transaction."""
+    src_address = faucet_data["payment"].address
+    tx_files = clusterlib.TxFiles(signing_key_files=[faucet_data["payment"].skey_file])
+    fee = cluster_obj.g_transaction.calculate_tx_fee(
+        src_address=src_address,
+        tx_name=tx_name,
+        txins=faucet_utxos,
+        txouts=txouts,
+        tx_files=tx_files,
+        join_txouts=False,
+        destination_dir=destination_dir,
+    )
+    # Add 10% to the estimated fee, the same as `send_tx` does
+    tx_raw_output = cluster_obj.g_transaction.build_raw_tx(
+        src_address=src_address,
+        tx_name=tx_name,
+        txins=faucet_utxos,
+        txouts=txouts,
+        tx_files=tx_files,
+        fee=int(fee * 1.1),
+        join_txouts=False,
+        destination_dir=destination_dir,
+    )
+    tx_signed_file = cluster_obj.g_transaction.sign_tx(
+        tx_body_file=tx_raw_output.out_file,
+        tx_name=tx_name,
+        signing_key_files=tx_files.signing_key_files,
+        destination_dir=destination_dir,
+    )
+    cluster_obj.g_transaction.submit_tx_bare(tx_file=tx_signed_file)
+    return tx_raw_output, tx_signed_file
+
+
+def _submit_funding_requests(
+    *,
+    cluster_obj: clusterlib.ClusterLib,
+    faucet_data: dict,
+    funding_dir: pl.Path,
+    own_request_file: pl.Path,
+    tx_name: str,
+    destination_dir: clusterlib.FileType,
+) -> None:
+    """Submit queued funding requests in a single transaction.
+
+    Needs to be called under the faucet lock. The own request of the caller is always submitted,
+    the other queued requests are added in the order they were queued. The result is written
+    for every processed request.
+    """
+    src_address = faucet_data["payment"].address
+    utxos_file = funding_dir / FAUCET_UTXOS_FILE_NAME
+
+    own_request_txouts = _read_pickle(own_request_file)
+    requests: list[tuple[pl.Path, list[clusterlib.TxOut]]] = [
+        (own_request_file, own_request_txouts)
+    ]
+    txouts: list[clusterlib.TxOut] = list(own_request_txouts)
+    for request_file in sorted(funding_dir.glob("*.request"), key=lambda p: p.stat().st_mtime):
+        if request_file == own_request_file:
+            continue
+        request_txouts = _read_pickle(request_file)
+        if len(txouts) + len(request_txouts) > FUNDING_MAX_TXOUTS:
+            break
+        requests.append((request_file, request_txouts))
+        txouts.extend(request_txouts)
+
+    tx_raw_output = tx_signed_file = None
+    error = ""
+    # When the submission fails, the tracked UTxOs might be out of sync (e.g. the faucet was
+    # spent by something else). Retry once with the UTxOs queried from the chain.
+    for r in range(2):
+        try:
+            faucet_utxos = _get_faucet_utxos(
+                cluster_obj=cluster_obj, src_address=src_address, funding_dir=funding_dir
+            )
+            tx_raw_output, tx_signed_file = _submit_funding_tx(
+                cluster_obj=cluster_obj,
+                faucet_data=faucet_data,
+                faucet_utxos=faucet_utxos,
+                txouts=txouts,
+                tx_name=f"{tx_name}_r{r}" if r else tx_name,
+                destination_dir=destination_dir,
+            )
+        except Exception as exc:
+            utxos_file.unlink(missing_ok=True)
+            error = f"Failed to submit funding transaction: {exc}"
+            if r == 0:
+                LOGGER.warning(f"{error}\nRetrying with faucet UTxOs queried from chain.")
+                continue
+            LOGGER.exception(error)
+            break
+
+        error = ""
+        # The change output is always the last one and it is spent by the next funding
+        # transaction, even before this transaction is confirmed
+        change_txouts = tx_raw_output.txouts[len(txouts) :]
+        txid = cluster_obj.g_transaction.get_txid(tx_body_file=tx_raw_output.out_file)
+        _write_pickle(
+            utxos_file,
+            [
+                clusterlib.UTXOData(
+                    utxo_hash=txid,
+                    utxo_ix=len(txouts) + i,
+                    amount=t.amount,
+                    address=t.address,
+                    coin=t.coin,
+                )
+                for i, t in enumerate(change_txouts)
+            ],
+        )
+        break
+
+    first_txout_ix = 0
+    for request_file, request_txouts in requests:
+        _write_pickle(
+            request_file.with_suffix(".result"),
+            _FundingResult(
+                tx_raw_output=tx_raw_output,
+                tx_signed_file=tx_signed_file,
+                first_txout_ix=first_txout_ix,
+                error=error,
+            ),
+        )
+        request_file.unlink()
+        first_txout_ix += len(request_txouts)
+
+
+def _wait_for_funding(*, cluster_obj: clusterlib.ClusterLib, result: _FundingResult) -> None:
+    """Wait until the funding transaction is confirmed, resubmit it if needed."""
+    assert result.tx_raw_output and result.tx_signed_file
+    txid = cluster_obj.g_transaction.get_txid(tx_body_file=result.tx_raw_output.out_file)
+    txin = f"{txid}#{result.first_txout_ix}"
+
+    for r in range(1, FUNDING_CONFIRM_BLOCKS + 1):
+        cluster_obj.wait_for_new_block()
+        if cluster_obj.g_query.get_utxo(txin=txin):
+            return
+        # The transaction might have been dropped from mempool, try to submit it again.
+        # Resubmitting fails when the transaction is already in mempool.
+        if r % 3 == 0:
+            LOGGER.warning(f"Resubmitting funding transaction '{txid}'.")
+            with contextlib.suppress(clusterlib.CLIError):
+                cluster_obj.g_transaction.submit_tx_bare(tx_file=result.tx_signed_file)
+
+    msg = f"Funding transaction '{txid}' didn't make it to the chain."
+    raise clusterlib.CLIError(msg)
+
 
+def _select_faucet(all_faucets: dict[str, dict]) -> dict:
+    """Select the "user" faucet with the fewest queued funding requests."""
+    all_user_keys = [k for k in all_faucets if k.startswith("user")]
+    random.shuffle(all_user_keys)
+    selected_user_key = min(
+        all_user_keys,
+        key=lambda k: len(
+            list(_get_funding_dir(all_faucets[k]["payment"].address).glob("*.request"))
+        ),
+    )
+    return all_faucets[selected_user_key]
+
+
+def _fund_pipelined(
+    *,
+    cluster_obj: clusterlib.ClusterLib,
+    faucet_data: dict,
+    fund_txouts: list[clusterlib.TxOut],
+    tx_name: str,
+    destination_dir: clusterlib.FileType,
+) -> clusterlib.TxRawOutput:
+    """Queue the funding request and wait until it is submitted and confirmed."""
+    src_address = faucet_data["payment"].address
+    funding_dir = _get_funding_dir(src_address)
+    request_file = funding_dir / f"{helpers.get_timestamped_rand_str()}.request"
+    result_file = request_file.with_suffix(".result")
+    _write_pickle(request_file, fund_txouts)
+
+    # The worker that gets the lock first submits all the queued requests, so it is likely
+    # that the request was already submitted by another worker once the lock is acquired.
+    with _get_faucet_lock(src_address):
+        if not result_file.exists():
+            _submit_funding_requests(
+                cluster_obj=cluster_obj,
+                faucet_data=faucet_data,
+                funding_dir=funding_dir,
+                own_request_file=request_file,
+                tx_name=tx_name,
+                destination_dir=destination_dir,
+            )
+        result: _FundingResult = _read_pickle(result_file)
+    result_file.unlink()
+
+    if result.error:
+        raise clusterlib.CLIError(result.error)
+    assert result.tx_raw_output
+
+    _wait_for_funding(cluster_obj=cluster_obj, result=result)
+    utxo_index.apply_tx(cluster_obj=cluster_obj, tx_raw_output=result.tx_raw_output)
+    return result.tx_raw_output
+
+
+@timings.span("fund_from_faucet")
 def fund_from_faucet(
     *dst_addrs: clusterlib.AddressRecord,
     cluster_obj: clusterlib.ClusterLib,
@@ -30,28 +355,40 @@ def fund_from_faucet(
     if isinstance(amount, int):
         amount = [amount] * len(dst_addrs)
 
-    fund_txouts = [
-        clusterlib.TxOut(address=d.address, amount=a)
-        for d, a in zip(dst_addrs, amount)
-        if force or cluster_obj.g_query.get_address_balance(d.address) < a
-    ]
+    fund_txouts = _get_txouts_to_fund(
+        *dst_addrs, cluster_obj=cluster_obj, amount=amount, force=force
+    )
     if not fund_txouts:
         return None
 
+    pipelined = configuration.FAUCET_PIPELINING and not faucet_data
     if not faucet_data and all_faucets:
-        # Randomly select one of the "user" faucets
-        all_user_keys = [k for k in all_faucets if k.startswith("user")]
-        selected_user_key = random.choice(all_user_keys)
-        faucet_data = all_faucets[selected_user_key]
+        if pipelined:
+            faucet_data = _select_faucet(all_faucets)
+        else:
+            # Randomly select one of the "user" faucets
+            all_user_keys = [k for k in all_faucets if k.startswith("user")]
+            selected_user_key = random.choice(all_user_keys)
+            faucet_data = all_faucets[selected_user_key]
 
     if not faucet_data:
         msg = "Faucet data are not available."
         raise ValueError(msg)
 
+    tx_name = tx_name or helpers.get_timestamped_rand_str()
+    tx_name = f"{tx_name}_funding"
+
+    if pipelined:
+        return _fund_pipelined(
+            cluster_obj=cluster_obj,
+            faucet_data=faucet_data,
+            fund_txouts=fund_txouts,
+            tx_name=tx_name,
+            destination_dir=destination_dir,
+        )
+
     src_address = faucet_data["payment"].address
-    with locking.FileLockIfXdist(f"{temptools.get_basetemp()}/{src_address}.lock"):
-        tx_name = tx_name or helpers.get_timestamped_rand_str()
-        tx_name = f"{tx_name}_funding"
+    with _get_faucet_lock(src_address):
         fund_tx_files = clusterlib.TxFiles(signing_key_files=[faucet_data["payment"].skey_file])
 
         tx_raw_output = cluster_obj.g_transaction.send_tx(
@@ -61,6 +398,7 @@ def fund_from_faucet(
             tx_files=fund_tx_files,
             destination_dir=destination_dir,
         )
+    utxo_index.apply_tx(cluster_obj=cluster_obj, tx_raw_output=tx_raw_output)
 
     return tx_raw_output
 
@@ -82,7 +420,7 @@ def return_funds_to_faucet(
     if isinstance(amount, int):
         amount = [amount] * len(src_addrs)
 
-    with locking.FileLockIfXdist(f"{temptools.get_basetemp()}/{faucet_addr}.lock"):
+    with _get_faucet_lock(faucet_addr):
         try:
             logging.disable(logging.ERROR)
             for addr, amount_rec in zip(src_addrs, amount):
@@ -0,0 +1,302 @@
+"""Pool of pre-generated payment and stake key pairs.
+
+Each key pair generated by `cardano-cli` costs a subprocess spawn, and fixtures that create
+many addresses spend a lot of time just spawning `cardano-cli`. When `KEY_POOL_SIZE` is set,
+each pytest worker keeps up to that many payment and stake key pairs pre-generated by
+a background thread pool. Key pairs are handed out renamed to the requested names, and the pool
+is refilled in the background. Addresses for multiple key pairs are built concurrently.
+
+Keys don't depend on a cluster instance, so the pre-generated key pairs stay valid after
+the cluster instance is respun. The background threads use their own `ClusterLib` instance,
+so they don't modify CLI coverage and profile of the instance used by tests. The background
+generation is stopped with `stop` before CLI coverage is saved and before the cluster instance
+is respun.
+
+Tests that exercise the key generation commands call `cardano-cli` directly, not through
+this module.
+"""
+
+import concurrent.futures
+import functools
+import itertools
+import logging
+import pathlib as pl
+import shutil
+import threading
+import typing as tp
+
+from _pytest.config import Config
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import artifacts
+from cardano_node_tests.utils import cluster_nodes
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import temptools
+
+LOGGER = logging.getLogger(__name__)
+
+PAYMENT = "payment"
+STAKE = "stake"
+# Suffix of key file names, as used by `cardano-clusterlib`
+KEY_SUFFIXES = {PAYMENT: "", STAKE: "_stake"}
+
+# Number of threads for generating key pairs in the background
+FILL_THREADS = 2
+# Number of threads for generating missing key pairs and building addresses
+BUILD_THREADS = 4
+
+
+class KeyPool:
+    """Key pairs that are ready to be handed out."""
+
+    ready: tp.ClassVar[dict[str, list[clusterlib.KeyPair]]] = {PAYMENT: [], STAKE: []}
+    pending: tp.ClassVar[dict[str, int]] = {PAYMENT: 0, STAKE: 0}
+    counter: tp.ClassVar[itertools.count] = itertools.count()
+    lock: tp.ClassVar[threading.Lock] = threading.Lock()
+    # Executor and `ClusterLib` instance used for generating key pairs in the background
+    fill_executor: tp.ClassVar[concurrent.futures.Executor | None] = None
+    fill_cluster_obj: tp.ClassVar[clusterlib.ClusterLib | None] = None
+
+
+@functools.cache
+def _get_build_executor() -> concurrent.futures.Executor:
+    return concurrent.futures.ThreadPoolExecutor(
+        max_workers=BUILD_THREADS, thread_name_prefix="key-pool-build"
+    )
+
+
+def _get_pool_dir() -> pl.Path:
+    pool_dir = temptools.get_pytest_worker_tmp() / "key_pool"
+    pool_dir.mkdir(exist_ok=True)
+    return pool_dir
+
+
+def _gen_key_pair(
+    *, cluster_obj: clusterlib.ClusterLib, key_type: str, key_name: str, destination_dir: pl.Path
+) -> clusterlib.KeyPair:
+    if key_type == STAKE:
+        return cluster_obj.g_stake_address.gen_stake_key_pair(
+            key_name=key_name, destination_dir=destination_dir
+        )
+    return cluster_obj.g_address.gen_payment_key_pair(
+        key_name=key_name, destination_dir=destination_dir
+    )
+
+
+def _fill_one(*, cluster_obj: clusterlib.ClusterLib, key_type: str) -> None:
+    key_pair = None
+    try:
+        key_pair = _gen_key_pair(
+            cluster_obj=cluster_obj,
+            key_type=key_type,
+            key_name=f"pooled{next(KeyPool.counter)}",
+            destination_dir=_get_pool_dir(),
+        )
+    except Exception:
+        LOGGER.exception("Failed to generate key pair for the key pool")
+    finally:
+        with KeyPool.lock:
+            KeyPool.pending[key_type] -= 1
+            if key_pair:
+                KeyPool.ready[key_type].append(key_pair)
+
+
+def refill() -> None:
+    """Start generating key pairs in the background, up to `KEY_POOL_SIZE` of each type."""
+    # Key pairs generated in-process don't need to be pre-generated
+    if configuration.KEY_POOL_SIZE <= 0 or configuration.INPROCESS_KEYS:
+        return
+
+    with KeyPool.lock:
+        if KeyPool.fill_cluster_obj is None:
+            KeyPool.fill_cluster_obj = cluster_nodes.get_cluster_type().get_cluster_obj()
+        if KeyPool.fill_executor is None:
+            KeyPool.fill_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=FILL_THREADS, thread_name_prefix="key-pool-fill"
+            )
+        cluster_obj = KeyPool.fill_cluster_obj
+        executor = KeyPool.fill_executor
+
+    for key_type in (PAYMENT, STAKE):
+        with KeyPool.lock:
+            missing = (
+                configuration.KEY_POOL_SIZE
+                - len(KeyPool.ready[key_type])
+                - KeyPool.pending[key_type]
+            )
+            if missing <= 0:
+                continue
+            KeyPool.pending[key_type] += missing
+        for __ in range(missing):
+            executor.submit(_fill_one, cluster_obj=cluster_obj, key_type=key_type)
+
+
+def stop() -> clusterlib.ClusterLib | None:
+    """Stop generating key pairs in the background.
+
+    Key pairs that are being generated are waited for, the rest is cancelled. The next `refill`
+    starts with a new `ClusterLib` instance.
+
+    Returns:
+        clusterlib.ClusterLib | None: The instance that was used for generating the key pairs,
+            so its CLI coverage can be saved.
+    """
+    with KeyPool.lock:
+        executor, KeyPool.fill_executor = KeyPool.fill_executor, None
+        cluster_obj, KeyPool.fill_cluster_obj = KeyPool.fill_cluster_obj, None
+
+    if executor:
+        executor.shutdown(wait=True, cancel_futures=True)
+        # Cancelled fills didn't decrease the number of pending key pairs
+        with KeyPool.lock:
+            for key_type in KeyPool.pending:
+                KeyPool.pending[key_type] = 0
+
+    return cluster_obj
+
+
+def stop_and_save_cli_coverage(*, pytest_config: Config) -> None:
+    """Stop generating key pairs in the background and save CLI coverage of the generation."""
+    cluster_obj = stop()
+    if cluster_obj:
+        artifacts.save_cli_coverage(cluster_obj=cluster_obj, pytest_config=pytest_config)
+
+
+def _take_key_pair(
+    *,
+    cluster_obj: clusterlib.ClusterLib,
+    key_type: str,
+    key_name: str,
+    pooled_pair: clusterlib.KeyPair,
+    destination_dir: pl.Path,
+) -> clusterlib.KeyPair:
+    """Move pre-generated key pair to the destination, with the requested name."""
+    suffix = KEY_SUFFIXES[key_type]
+    vkey_file = destination_dir / f"{key_name}{suffix}.vkey"
+    skey_file = destination_dir / f"{key_name}{suffix}.skey"
+    if not cluster_obj.overwrite_outfiles:
+        for out_file in (vkey_file, skey_file):
+            if out_file.exists():
+                msg = f"The expected file `{out_file}` already exist."
+                raise clusterlib.CLIError(msg)
+
+    shutil.move(pooled_pair.vkey_file, vkey_file)
+    shutil.move(pooled_pair.skey_file, skey_file)
+    return clusterlib.KeyPair(vkey_file=vkey_file, skey_file=skey_file)
+
+
+def get_key_pairs(
+    *names: str,
+    cluster_obj: clusterlib.ClusterLib,
+    key_type: str,
+    destination_dir: clusterlib.FileType = ".",
+) -> list[clusterlib.KeyPair]:
+    """Get key pairs with the given names.
+
+    Key pairs are taken from the pool, key pairs that are not available in the pool are
+    generated concurrently.
+    """
+    dest_dir = pl.Path(destination_dir).expanduser()
+    with KeyPool.lock:
+        pooled_pairs = KeyPool.ready[key_type][: len(names)]
+        del KeyPool.ready[key_type][: len(names)]
+
+    executor = _get_build_executor()
+    futures = [
+        executor.submit(
+            _gen_key_pair,
+            cluster_obj=cluster_obj,
+            key_type=key_type,
+            key_name=name,
+            destination_dir=dest_dir,
+        )
+        for name in names[len(pooled_pairs) :]
+    ]
+    refill()
+
+    key_pairs = [
+        _take_key_pair(
+            cluster_obj=cluster_obj,
+            key_type=key_type,
+            key_name=name,
+            pooled_pair=pooled_pair,
+            destination_dir=dest_dir,
+        )
+        for name, pooled_pair in zip(names, pooled_pairs)
+    ]
+    key_pairs.extend(f.result() for f in futures)
+
+    LOGGER.debug(f"Taken {len(pooled_pairs)} of {len(names)} {key_type} key pair(s) from pool")
+    return key_pairs
+
+
+def create_stake_addr_records(
+    *names: str,
+    cluster_obj: clusterlib.ClusterLib,
+    destination_dir: clusterlib.FileType = ".",
+) -> list[clusterlib.AddressRecord]:
+    """Create new stake address(es) using key pairs from the pool."""
+    key_pairs = get_key_pairs(
+        *names, cluster_obj=cluster_obj, key_type=STAKE, destination_dir=destination_dir
+    )
+    executor = _get_build_executor()
+    futures = [
+        executor.submit(
+            cluster_obj.g_stake_address.gen_stake_addr,
+            addr_name=name,
+            stake_vkey_file=key_pair.vkey_file,
+            destination_dir=destination_dir,
+        )
+        for name, key_pair in zip(names, key_pairs)
+    ]
+    return [
+        clusterlib.AddressRecord(
+            address=f.result(), vkey_file=key_pair.vkey_file, skey_file=key_pair.skey_file
+        )
+        for f, key_pair in zip(futures, key_pairs)
+    ]
+
+
+def create_payment_addr_records(
+    *names: str,
+    cluster_obj: clusterlib.ClusterLib,
+    stake_vkey_files: tp.Sequence[clusterlib.FileType | None] = (),
+    destination_dir: clusterlib.FileType = ".",
+) -> list[clusterlib.AddressRecord]:
+    """Create new payment address(es) using key pairs from the pool.
+
+    Args:
+        *names: Names of the addresses and key pairs.
+        cluster_obj: An instance of `clusterlib.ClusterLib`.
+        stake_vkey_files: Paths to stake vkey files, one for each address (optional).
+        destination_dir: A path to directory for storing artifacts (optional).
+
+    Returns:
+        list[clusterlib.AddressRecord]: Data containers containing the addresses and key pairs.
+    """
+    if stake_vkey_files and len(stake_vkey_files) != len(names):
+        msg = "Number of stake vkey files doesn't match number of addresses."
+        raise ValueError(msg)
+
+    key_pairs = get_key_pairs(
+        *names, cluster_obj=cluster_obj, key_type=PAYMENT, destination_dir=destination_dir
+    )
+    executor = _get_build_executor()
+    futures = [
+        executor.submit(
+            cluster_obj.g_address.gen_payment_addr,
+            addr_name=name,
+            payment_vkey_file=key_pair.vkey_file,
+            stake_vkey_file=stake_vkey_file,
+            destination_dir=destination_dir,
+        )
+        for name, key_pair, stake_vkey_file in zip(
+            names, key_pairs, stake_vkey_files or [None] * len(names)
+        )
+    ]
+    return [
+        clusterlib.AddressRecord(
+            address=f.result(), vkey_file=key_pair.vkey_file, skey_file=key_pair.skey_file
+        )
+        for f, key_pair in zip(futures, key_pairs)
+    ]
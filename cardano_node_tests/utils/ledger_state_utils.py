@@ -0,0 +1,353 @@
+"""Extraction of sections of ledger state.
+
+The ledger state can have hundreds of MB on long-running testnets, most of it is the UTxO set
+in `stateBefore.esLState`. The ledger state is queried to a file and the selected sections are
+extracted in a single pass over the memory-mapped file. Data that is not selected is skipped
+without being decoded.
+
+The extracted ledger state is cached by chain tip, so callers that need several sections of
+the ledger state at the same tip query the node only once.
+
+Ledger state snapshots saved by tests can be stored as ZIP archives with compact JSON of each
+section of the ledger state in a separate member, so sections can be loaded individually.
+With delta snapshots, sections that didn't change since the previous snapshot saved to the same
+directory are not stored again, the snapshot manifest refers to the previous snapshot instead.
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pathlib as pl
+import re
+import tempfile
+import threading
+import typing as tp
+import zipfile
+
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import cluster_nodes
+from cardano_node_tests.utils import temptools
+
+LOGGER = logging.getLogger(__name__)
+
+# Sections of ledger state used by the framework. The selection is either `True` (the whole
+# value), `False` (skip the value), or a dict with selection for keys of an object, where
+# the "*" key applies to keys that are not listed. Keys that are not listed and there's no "*"
+# key are selected.
+LEDGER_STATE_SELECTION: dict[str, tp.Any] = {
+    "stateBefore": {"esLState": {"delegationState": True, "*": False}}
+}
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MANIFEST = "manifest.json"
+# Keys of these objects are stored as separate sections of ledger state snapshots
+SNAPSHOT_SPLIT_KEYS = ("stateBefore",)
+# The speed of compression matters more than the size
+SNAPSHOT_COMPRESSLEVEL = 1
+
+_WS_RE = re.compile(rb"\s*")
+_STRING_RE = re.compile(rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"')
+_SCALAR_RE = re.compile(rb"[^,\]}\s]+")
+# Everything up to and including the next bracket that is not part of a string,
+# the group matches opening brackets
+_BRACKET_RE = re.compile(
+    rb'[^"\[\]{}]*+(?:"[^"\\]*+(?:\\.[^"\\]*+)*+"[^"\[\]{}]*+)*+(?:([\[{])|[\]}])'
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class _CacheEntry:
+    tip_key: tuple[int | None, str | None]
+    state_json: bytes
+
+
+class LedgerStateCache:
+    """Cache extracted ledger state for each cluster instance."""
+
+    entries: tp.ClassVar[dict[int, _CacheEntry]] = {}
+    lock: tp.ClassVar[threading.Lock] = threading.Lock()
+
+
+class SnapshotsCache:
+    """Cache manifest sections of the last delta snapshot saved to each directory."""
+
+    last_sections: tp.ClassVar[dict[pl.Path, dict[str, dict]]] = {}
+    lock: tp.ClassVar[threading.Lock] = threading.Lock()
+
+
+def _match_end(regex: re.Pattern, buf: bytes | mmap.mmap, pos: int) -> int:
+    match = regex.match(buf, pos)
+    if not match or match.end() == pos:
+        msg = f"Invalid JSON data at position {pos}."
+        raise ValueError(msg)
+    return match.end()
+
+
+def _skip_ws(buf: bytes | mmap.mmap, pos: int) -> int:
+    return _WS_RE.match(buf, pos).end()  # type: ignore[union-attr]
+
+
+def _skip_value(buf: bytes | mmap.mmap, pos: int) -> int:
+    """Return position right after the JSON value that starts at `pos`."""
+    char = buf[pos : pos + 1]
+    if char == b'"':
+        return _match_end(_STRING_RE, buf, pos)
+    if char not in (b"{", b"["):
+        return _match_end(_SCALAR_RE, buf, pos)
+
+    depth = 0
+    for match in _BRACKET_RE.finditer(buf, pos):
+        if match.lastindex:
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 0:
+            return match.end()
+
+    msg = f"Unexpected end of JSON data, the value starts at position {pos}."
+    raise ValueError(msg)
+
+
+def _extract_value(
+    *, buf: bytes | mmap.mmap, pos: int, selection: bool | dict, out: list[bytes]
+) -> int:
+    """Append selected parts of the JSON value at `pos` to `out`.
+
+    Return position right after the value.
+    """
+    if not (isinstance(selection, dict) and buf[pos : pos + 1] == b"{"):
+        end = _skip_value(buf, pos)
+        out.append(buf[pos:end])
+        return end
+
+    out.append(b"{")
+    pos = _skip_ws(buf, pos + 1)
+    while buf[pos : pos + 1] != b"}":
+        if buf[pos : pos + 1] == b",":
+            pos = _skip_ws(buf, pos + 1)
+
+        key_end = _match_end(_STRING_RE, buf, pos)
+        key_raw = buf[pos:key_end]
+        pos = _skip_ws(buf, key_end)
+        if buf[pos : pos + 1] != b":":
+            msg = f"Invalid JSON data at position {pos}."
+            raise ValueError(msg)
+        pos = _skip_ws(buf, pos + 1)
+
+        key_selection = selection.get(json.loads(key_raw), selection.get("*", True))
+        if key_selection is False:
+            pos = _skip_value(buf, pos)
+        else:
+            if out[-1] != b"{":
+                out.append(b",")
+            out.extend((key_raw, b":"))
+            pos = _extract_value(buf=buf, pos=pos, selection=key_selection, out=out)
+        pos = _skip_ws(buf, pos)
+
+    out.append(b"}")
+    return pos + 1
+
+
+def extract(data: bytes | mmap.mmap, *, selection: bool | dict) -> bytes:
+    """Return JSON document with only the selected parts of the `data` JSON document."""
+    out: list[bytes] = []
+    pos = _skip_ws(data, 0)
+    if pos == len(data):
+        return b""
+    _extract_value(buf=data, pos=pos, selection=selection, out=out)
+    return b"".join(out)
+
+
+def _query_ledger_state(*, cluster_obj: clusterlib.ClusterLib) -> bytes:
+    """Query the ledger state and extract the selected sections."""
+    with tempfile.TemporaryDirectory(dir=temptools.get_basetemp()) as tmp_dir:
+        out_file = pl.Path(tmp_dir) / "ledger_state.json"
+        cluster_obj.g_query.query_cli(["ledger-state"], cli_sub_args=("--out-file", str(out_file)))
+        with open(out_file, "rb") as in_fp:
+            if os.fstat(in_fp.fileno()).st_size == 0:
+                return b""
+            with mmap.mmap(in_fp.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                return extract(buf, selection=LEDGER_STATE_SELECTION)
+
+
+def get_ledger_state(*, cluster_obj: clusterlib.ClusterLib) -> dict:
+    """Return the sections of ledger state selected by `LEDGER_STATE_SELECTION`.
+
+    The ledger state is queried again only when the chain tip changed since the last query.
+    """
+    instance_num = cluster_nodes.get_instance_num()
+    tip = cluster_obj.g_query.get_tip()
+    tip_key = (tip.get("slot"), tip.get("hash"))
+
+    with LedgerStateCache.lock:
+        cached = LedgerStateCache.entries.get(instance_num)
+
+    if cached and cached.tip_key == tip_key:
+        state_json = cached.state_json
+    else:
+        state_json = _query_ledger_state(cluster_obj=cluster_obj)
+        # Without any block, the tip doesn't identify the ledger state
+        if tip_key[0] is not None:
+            with LedgerStateCache.lock:
+                LedgerStateCache.entries[instance_num] = _CacheEntry(
+                    tip_key=tip_key, state_json=state_json
+                )
+
+    if not state_json:
+        return {}
+
+    # Every caller gets its own copy of the data
+    ledger_state: dict = json.loads(state_json)
+    return ledger_state
+
+
+def _get_snapshot_sections(ledger_state: dict) -> dict[str, tp.Any]:
+    """Split ledger state to sections that are stored separately."""
+    sections: dict[str, tp.Any] = {}
+    for key, value in ledger_state.items():
+        if key in SNAPSHOT_SPLIT_KEYS and isinstance(value, dict) and value:
+            sections.update({f"{key}/{k}": v for k, v in value.items()})
+        else:
+            sections[key] = value
+    return sections
+
+
+def _get_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def _get_member_name(name: str, rec: dict) -> str:
+    return rec.get("member") or f"{name}.json"
+
+
+def _read_members(archive: pl.Path) -> dict[str, bytes]:
+    """Read members of an existing snapshot archive, except of the manifest."""
+    if not archive.exists():
+        return {}
+    with zipfile.ZipFile(archive) as zf:
+        return {n: zf.read(n) for n in zf.namelist() if n != SNAPSHOT_MANIFEST}
+
+
+def _is_in_base(
+    *, name: str, rec: dict, dest_dir: pl.Path, base_members: dict[str, set[str]]
+) -> bool:
+    """Check that the section referred to by the manifest record exists in the base archive."""
+    if rec["file"] not in base_members:
+        try:
+            with zipfile.ZipFile(dest_dir / rec["file"]) as zf:
+                base_members[rec["file"]] = set(zf.namelist())
+        except (OSError, zipfile.BadZipFile):
+            base_members[rec["file"]] = set()
+    return _get_member_name(name=name, rec=rec) in base_members[rec["file"]]
+
+
+def save_snapshot(*, ledger_state: dict, out_file: pl.Path, delta: bool = False) -> pl.Path:
+    """Save ledger state snapshot to ZIP archive.
+
+    When an existing archive is overwritten, its members are kept in the new archive, as other
+    delta snapshots can refer to them.
+
+    Args:
+        ledger_state: A dict with ledger state to save.
+        out_file: A path to the ZIP archive.
+        delta: Whether to refer to sections of the previous snapshot saved to the same directory
+            instead of storing sections that didn't change (optional).
+
+    Returns:
+        Path: A path to the ZIP archive.
+    """
+    dest_dir = out_file.parent.resolve()
+    with SnapshotsCache.lock:
+        prev_sections = SnapshotsCache.last_sections.get(dest_dir, {}) if delta else {}
+
+    old_members = _read_members(out_file)
+    base_members: dict[str, set[str]] = {}
+
+    manifest_sections: dict[str, dict] = {}
+    tmp_file = out_file.with_name(f".{out_file.name}.tmp")
+    with zipfile.ZipFile(
+        tmp_file, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=SNAPSHOT_COMPRESSLEVEL
+    ) as zf:
+        for name, value in _get_snapshot_sections(ledger_state).items():
+            data = json.dumps(value, separators=(",", ":")).encode("utf-8")
+            digest = _get_digest(data)
+
+            prev_rec = prev_sections.get(name)
+            if (
+                prev_rec
+                and prev_rec["digest"] == digest
+                # The archive that is being overwritten cannot be the base
+                and prev_rec["file"] != out_file.name
+                and _is_in_base(
+                    name=name, rec=prev_rec, dest_dir=dest_dir, base_members=base_members
+                )
+            ):
+                manifest_sections[name] = prev_rec
+                continue
+
+            rec = {"digest": digest, "file": out_file.name}
+            member = f"{name}.json"
+            old_data = old_members.get(member)
+            if old_data is not None and _get_digest(old_data) != digest:
+                # Keep the old member of the overwritten archive
+                member = f"{name}.{digest}.json"
+                rec["member"] = member
+            manifest_sections[name] = rec
+
+            if member not in old_members:
+                zf.writestr(member, data)
+
+        for member, old_data in old_members.items():
+            zf.writestr(member, old_data)
+
+        manifest = {"version": SNAPSHOT_VERSION, "sections": manifest_sections}
+        zf.writestr(SNAPSHOT_MANIFEST, json.dumps(manifest, indent=2))
+
+    tmp_file.replace(out_file)
+
+    if delta:
+        with SnapshotsCache.lock:
+            SnapshotsCache.last_sections[dest_dir] = manifest_sections
+
+    return out_file
+
+
+class LedgerStateSnapshot:
+    """Ledger state snapshot saved by `save_snapshot`, with sections loaded on demand."""
+
+    def __init__(self, path: pl.Path) -> None:
+        self.path = path
+        with zipfile.ZipFile(path) as zf:
+            manifest = json.loads(zf.read(SNAPSHOT_MANIFEST))
+        if manifest.get("version") != SNAPSHOT_VERSION:
+            msg = f"Unsupported version of ledger state snapshot '{path}'."
+            raise ValueError(msg)
+        self.manifest_sections: dict[str, dict] = manifest["sections"]
+
+    @property
+    def sections(self) -> list[str]:
+        """Names of sections, e.g. "blocksBefore" or "stateBefore/esSnapshots"."""
+        return list(self.manifest_sections)
+
+    def load_section(self, name: str) -> tp.Any:
+        """Load a single section of the ledger state."""
+        rec = self.manifest_sections[name]
+        archive = self.path.parent / rec["file"]
+        with zipfile.ZipFile(archive) as zf:
+            return json.loads(zf.read(_get_member_name(name=name, rec=rec)))
+
+    def load(self) -> dict:
+        """Load the whole ledger state."""
+        ledger_state: dict = {}
+        for name in self.manifest_sections:
+            key, __, subkey = name.partition("/")
+            value = self.load_section(name)
+            if subkey:
+                ledger_state.setdefault(key, {})[subkey] = value
+            else:
+                ledger_state[key] = value
+        return ledger_state
@@ -0,0 +1,283 @@
+"""Lock broker for coordination of pytest workers.
+
+The lock broker is a replacement for lock files, it is not a scheduler of cluster instances
+and resources. It changes how the workers wait for a lock, not how many of them need to wait.
+
+By default, pytest workers coordinate through lock files (see `locking.FileLockIfXdist`).
+Waiting for a file lock means polling the lock file, and the lock is not handed out in any
+particular order. With many workers waiting for the same lock, this results in busy-waiting
+and in some workers being starved.
+
+The lock broker is an optional asyncio server running in the pytest-xdist controller process.
+Workers connect to it over a Unix socket and ask it for named locks. Waiting workers are queued
+and the lock is handed over to the next worker in the queue as soon as it is released, without
+any polling. When a worker dies, its connection is closed, all the locks it held are released
+and its queued requests are dropped.
+
+Selection of cluster instance and resources still runs in the workers while they hold the global
+cluster lock, and the status files are still the source of truth. The scheduling decisions are
+therefore still serialized on the global cluster lock, with or without the broker.
+
+Protocol: each request and response is a single line of JSON.
+
+* `{"op": "acquire", "name": <lock name>, "owner": <worker id>}` -> `{"ok": true}` once granted
+* `{"op": "release", "name": <lock name>}` -> `{"ok": true}`
+"""
+
+import asyncio
+import collections
+import contextlib
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import pathlib as pl
+import socket
+import threading
+import time
+import typing as tp
+
+LOGGER = logging.getLogger(__name__)
+
+# Env variable with path to the broker socket, set by the controller for the workers
+SOCKET_ENV = "CNT_LOCK_BROKER_SOCKET"
+
+
+def get_socket_path(name: str) -> pl.Path:
+    """Return short path for the broker socket.
+
+    Path of a Unix socket is limited to 108 bytes, so the socket can't be placed in the
+    (possibly deeply nested) pytest temporary directory.
+    """
+    digest = hashlib.sha256(f"{name}_{os.getpid()}".encode()).hexdigest()[:16]
+    return pl.Path("/tmp") / f"cnt_lock_broker_{digest}.sock"
+
+
+@dataclasses.dataclass
+class _LockState:
+    owner: asyncio.StreamWriter | None = None
+    waiters: collections.deque[tuple[asyncio.StreamWriter, asyncio.Future]] = dataclasses.field(
+        default_factory=collections.deque
+    )
+
+
+@dataclasses.dataclass
+class BrokerStats:
+    """Statistics of the lock broker."""
+
+    grants: int = 0
+    contended_grants: int = 0
+    wait_sec: float = 0.0
+    max_wait_sec: float = 0.0
+
+
+class LockBroker:
+    """Lock broker server, runs its event loop in a background thread."""
+
+    def __init__(self, socket_path: pl.Path) -> None:
+        self.socket_path = socket_path
+        self.stats = BrokerStats()
+        self._locks: dict[str, _LockState] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._thread: threading.Thread | None = None
+        self._start_error: BaseException | None = None
+
+    def _grant(self, name: str, writer: asyncio.StreamWriter, wait_sec: float = 0.0) -> None:
+        self._locks[name].owner = writer
+        self.stats.grants += 1
+        if wait_sec:
+            self.stats.contended_grants += 1
+            self.stats.wait_sec += wait_sec
+            self.stats.max_wait_sec = max(self.stats.max_wait_sec, wait_sec)
+
+    def _release(self, name: str, writer: asyncio.StreamWriter) -> None:
+        state = self._locks.get(name)
+        if state is None or state.owner is not writer:
+            return
+
+        state.owner = None
+        while state.waiters:
+            next_writer, fut = state.waiters.popleft()
+            if not fut.done():
+                state.owner = next_writer
+                fut.set_result(None)
+                break
+
+    async def _acquire(
+        self, name: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        state = self._locks.setdefault(name, _LockState())
+        if state.owner is None:
+            self._grant(name=name, writer=writer)
+            return
+
+        start = time.monotonic()
+        fut = asyncio.get_running_loop().create_future()
+        waiter = (writer, fut)
+        state.waiters.append(waiter)
+
+        # The client doesn't send anything while waiting for the grant, so any read finishes
+        # only when the client disconnects. Don't keep dead clients in the queue.
+        disconnected = asyncio.ensure_future(reader.read(1))
+        try:
+            # Ownership is set by `_release` of the previous owner
+            await asyncio.wait({fut, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # The reader can be used again only after the pending read is finished
+            disconnected.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await disconnected
+        if not fut.done():
+            fut.cancel()
+            state.waiters.remove(waiter)
+            msg = f"Client disconnected while waiting for lock '{name}'."
+            raise ConnectionError(msg)
+
+        self._grant(name=name, writer=writer, wait_sec=time.monotonic() - start)
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while line := await reader.readline():
+                request = json.loads(line)
+                op = request.get("op")
+                name = request.get("name") or ""
+                if op == "acquire":
+                    await self._acquire(name=name, reader=reader, writer=writer)
+                elif op == "release":
+                    self._release(name=name, writer=writer)
+                else:
+                    writer.write(b'{"ok": false, "error": "unknown operation"}\n')
+                    await writer.drain()
+                    continue
+                writer.write(b'{"ok": true}\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError, json.JSONDecodeError):
+            pass
+        finally:
+            # Release all locks held by the client and drop its queued requests
+            for name, state in self._locks.items():
+                for waiter in [w for w in state.waiters if w[0] is writer]:
+                    waiter[1].cancel()
+                    state.waiters.remove(waiter)
+                self._release(name=name, writer=writer)
+            writer.close()
+
+    async def _serve(self, started: threading.Event) -> None:
+        self._server = await asyncio.start_unix_server(
+            self._handle_client, path=str(self.socket_path)
+        )
+        started.set()
+        async with self._server:
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._server.serve_forever()
+
+    def start(self) -> None:
+        """Start the broker in a background thread and wait until it accepts connections."""
+        started = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        def _run() -> None:
+            assert self._loop
+            try:
+                self._loop.run_until_complete(self._serve(started=started))
+            except Exception as exc:
+                self._start_error = exc
+                started.set()
+
+        self._thread = threading.Thread(target=_run, name="lock-broker", daemon=True)
+        self._thread.start()
+        if not started.wait(timeout=30):
+            msg = f"Lock broker didn't start on '{self.socket_path}'."
+            raise RuntimeError(msg)
+        if self._start_error:
+            self._server = None
+            raise self._start_error
+        LOGGER.info(f"Lock broker listening on '{self.socket_path}'.")
+
+    def stop(self) -> None:
+        """Stop the broker."""
+        if not (self._loop and self._server and self._thread):
+            return
+
+        self._loop.call_soon_threadsafe(self._server.close)
+        self._thread.join(timeout=10)
+        self.socket_path.unlink(missing_ok=True)
+        LOGGER.info(
+            f"Lock broker stopped, {self.stats.grants} locks granted, "
+            f"{self.stats.contended_grants} after waiting {self.stats.wait_sec:.1f}s in total "
+            f"(max {self.stats.max_wait_sec:.1f}s)."
+        )
+
+
+class BrokerLock:
+    """Lock granted by the lock broker.
+
+    Drop-in replacement for `filelock.FileLock` when used as a context manager. The lock file
+    path is used just as a name of the lock, no file is created.
+    """
+
+    def __init__(self, lock_file: str | os.PathLike, socket_path: str = "") -> None:
+        self.lock_file = str(lock_file)
+        self.socket_path = socket_path or os.environ.get(SOCKET_ENV) or ""
+        self.owner = os.environ.get("PYTEST_XDIST_WORKER") or str(os.getpid())
+        self._sock: socket.socket | None = None
+        self._sock_file: tp.BinaryIO | None = None
+        self._counter = 0
+
+    @property
+    def is_locked(self) -> bool:
+        return self._counter > 0
+
+    def _request(self, op: str) -> None:
+        assert self._sock and self._sock_file
+        request = {"op": op, "name": self.lock_file, "owner": self.owner}
+        self._sock.sendall(json.dumps(request).encode() + b"\n")
+        response = self._sock_file.readline()
+        if not response or not json.loads(response).get("ok"):
+            msg = f"Lock broker failed to {op} lock '{self.lock_file}': {response!r}"
+            raise RuntimeError(msg)
+
+    def acquire(self) -> "BrokerLock":
+        if self._counter == 0:
+            if not self.socket_path:
+                msg = f"Lock broker socket is not set, the `{SOCKET_ENV}` env variable is empty."
+                raise RuntimeError(msg)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.socket_path)
+            self._sock = sock
+            self._sock_file = sock.makefile("rb")
+            try:
+                self._request(op="acquire")
+            except BaseException:
+                self._close()
+                raise
+        self._counter += 1
+        return self
+
+    def release(self) -> None:
+        if self._counter == 0:
+            return
+        self._counter -= 1
+        if self._counter == 0:
+            try:
+                self._request(op="release")
+            finally:
+                self._close()
+
+    def _close(self) -> None:
+        if self._sock_file:
+            self._sock_file.close()
+            self._sock_file = None
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+
+    def __enter__(self) -> "BrokerLock":
+        return self.acquire()
+
+    def __exit__(self, *args: object) -> None:
+        self.release()
@@ -1,18 +1,23 @@
 import contextlib
 import logging
+import os
 import typing as tp
 
 from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import lock_broker
 
 # Use dummy locking if not executing with multiple workers.
 # When running with multiple workers, operations with shared resources (like faucet addresses)
 # need to be locked to single worker (otherwise e.g. balances would not check).
-if configuration.IS_XDIST:
+if configuration.IS_XDIST and os.environ.get(lock_broker.SOCKET_ENV):
+    # The locks are granted by the lock broker running in the pytest-xdist controller process
+    FileLockIfXdist: tp.Any = lock_broker.BrokerLock
+elif configuration.IS_XDIST:
     from filelock import FileLock
 
     # Suppress messages from filelock
     logging.getLogger("filelock").setLevel(logging.WARNING)
 
-    FileLockIfXdist: tp.Any = FileLock
+    FileLockIfXdist = FileLock
 else:
     FileLockIfXdist = contextlib.nullcontext
@@ -1,20 +1,28 @@
+import concurrent.futures
 import contextlib
 import dataclasses
 import fnmatch
 import functools
 import io
 import itertools
+import json
 import logging
+import mmap
+import multiprocessing
 import os
 import pathlib as pl
 import re
+import threading
 import time
 import typing as tp
 from collections import deque
 
+from cardano_node_tests.utils import artifacts
 from cardano_node_tests.utils import cluster_nodes
+from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import framework_log
 from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import lock_broker
 from cardano_node_tests.utils import locking
 from cardano_node_tests.utils import temptools
 
@@ -25,6 +33,10 @@ ROTATED_RE = re.compile(r".+\.[0-9]+")  # Detect rotated log file
 # NOTE: The regex needs to be unanchored.
 ERRORS_RE = re.compile("error|fail", re.IGNORECASE)
 ERRORS_IGNORE_FILE_NAME = ".errors_to_ignore"
+# Errors found by the background logs watcher, one JSON record per line
+ERRORS_FINDINGS_FILE_NAME = "errors_findings.jsonl"
+# How often the background logs watcher searches the cluster logs
+LOGS_WATCHER_INTERVAL_SEC = 2.0
 
 ERRORS_IGNORED = [
     # New tracing system
@@ -173,30 +185,72 @@ def _get_ignore_rules_lock_file(instance_num: int) -> pl.Path:
     return temptools.get_basetemp() / f"{ERRORS_IGNORE_FILE_NAME}_{instance_num}.lock"
 
 
-def _get_ignore_rules(
-    cluster_env: cluster_nodes.ClusterEnv, timestamp: float
-) -> list[tuple[str, str]]:
-    """Get rules (file glob and regex) for ignored errors."""
-    rules: list[tuple[str, str]] = []
+def _get_ignore_rules_files_key(state_dir: pl.Path) -> tuple[tuple[str, int, int], ...]:
+    """Return key identifying the current content of the ignore rules files."""
+    key = []
+    for rules_file in sorted(state_dir.glob(f"{ERRORS_IGNORE_FILE_NAME}_*")):
+        with contextlib.suppress(FileNotFoundError):
+            st = rules_file.stat()
+            key.append((rules_file.name, st.st_mtime_ns, st.st_size))
+    return tuple(key)
+
+
+# Parsed ignore rules (file glob, expire time, regex) per state dir, together with the key of
+# the rules files they were parsed from
+_IGNORE_RULES_CACHE: dict[
+    pl.Path, tuple[tuple[tuple[str, int, int], ...], list[tuple[str, float, str]]]
+] = {}
+
+
+def _load_ignore_rules(cluster_env: cluster_nodes.ClusterEnv) -> list[tuple[str, float, str]]:
+    """Load all ignore rules (file glob, expire time, regex) for the cluster instance.
+
+    The rules files are read again only when some of them was added, changed or deleted.
+    """
+    state_dir = cluster_env.state_dir
+    cached = _IGNORE_RULES_CACHE.get(state_dir)
+    if cached and cached[0] == _get_ignore_rules_files_key(state_dir=state_dir):
+        return cached[1]
+
+    rules: list[tuple[str, float, str]] = []
     lock_file = _get_ignore_rules_lock_file(instance_num=cluster_env.instance_num)
 
     with locking.FileLockIfXdist(lock_file):
-        for rules_file in cluster_env.state_dir.glob(f"{ERRORS_IGNORE_FILE_NAME}_*"):
-            with open(rules_file, encoding="utf-8") as infile:
+        key = _get_ignore_rules_files_key(state_dir=state_dir)
+        for rules_file_name, __, __ in key:
+            with open(state_dir / rules_file_name, encoding="utf-8") as infile:
                 for line in infile:
                     if ";;" not in line:
                         continue
                     files_glob, skip_after_str, regex = line.split(";;")
-                    skip_after = float(skip_after_str)
-                    # Skip the rule if it is expired. The `timestamp` is the time of the last log
-                    # search, so the expire time is compared to the time of the last log check.
-                    if 0 < skip_after < timestamp:
-                        continue
-                    rules.append((files_glob, regex.rstrip("\n")))
+                    rules.append((files_glob, float(skip_after_str), regex.rstrip("\n")))
 
+    _IGNORE_RULES_CACHE[state_dir] = (key, rules)
     return rules
 
 
+def _filter_ignore_rules(
+    rules: list[tuple[str, float, str]], timestamp: float
+) -> list[tuple[str, str]]:
+    """Get rules (file glob and regex) for ignored errors that are not expired."""
+    # Skip the rule if it is expired. The `timestamp` is the time of the last log
+    # search, so the expire time is compared to the time of the last log check.
+    return [
+        (files_glob, regex)
+        for files_glob, skip_after, regex in rules
+        if not 0 < skip_after < timestamp
+    ]
+
+
+def _get_ignore_rules(
+    cluster_env: cluster_nodes.ClusterEnv, timestamp: float
+) -> list[tuple[str, str]]:
+    """Get rules (file glob and regex) for ignored errors."""
+    return _filter_ignore_rules(
+        rules=_load_ignore_rules(cluster_env=cluster_env), timestamp=timestamp
+    )
+
+
 def _get_offset_file(logfile: pl.Path) -> pl.Path:
     """Return path to the file that stores the seek offset for the given log file."""
     return logfile.parent / f".{logfile.name}.offset"
@@ -214,11 +268,11 @@ def _get_ignore_regex(
     ignore_rules: list[tuple[str, str]], regexes: list[str], logfile: pl.Path
 ) -> str:
     """Combine together regex for the given log file using file specific and global ignore rules."""
-    regex_set = set(regexes)
-    for record in ignore_rules:
-        files_glob, regex = record
-        if fnmatch.filter([logfile.name], files_glob):
-            regex_set.add(regex)
+    # Keep the order of the regexes stable, so the same rules result in the same regex
+    regex_set = dict.fromkeys(regexes)
+    for files_glob, regex in ignore_rules:
+        if fnmatch.fnmatchcase(logfile.name, files_glob):
+            regex_set[regex] = None
     return "|".join(regex_set) or "nothing_to_ignore"
 
 
@@ -322,6 +376,47 @@ def _should_ignore_error(
     return False
 
 
+@dataclasses.dataclass(frozen=True)
+class _ErrorsMatcher:
+    """Compiled bytes regexes for searching errors in a log file."""
+
+    errors_b: re.Pattern[bytes]
+    ignored_b: re.Pattern[bytes] | None
+    look_back_pairs: list[tuple[re.Pattern[bytes], re.Pattern[bytes]]]
+
+    def is_error(self, line_b: bytes) -> bool:
+        """Check if the line is an error that is not ignored.
+
+        The errors regex is cheap and most lines don't match it, so it is checked first.
+        The much bigger ignore regex runs only on the error lines.
+        """
+        return bool(self.errors_b.search(line_b)) and not (
+            self.ignored_b and self.ignored_b.search(line_b)
+        )
+
+
+@functools.lru_cache(maxsize=256)
+def _get_errors_matcher(
+    errors_re: re.Pattern[str],
+    errors_ignored_re: re.Pattern[str] | None = None,
+    look_back_items: tuple[tuple[str, str], ...] = (),
+    encoding: str = "utf-8",
+) -> _ErrorsMatcher:
+    """Return compiled `_ErrorsMatcher`.
+
+    The matcher is cached, so it is compiled again only when the ignore rules change.
+    """
+    errors_b = _compile_bytes_from_pattern(pat=errors_re, encoding=encoding)
+    assert errors_b
+    return _ErrorsMatcher(
+        errors_b=errors_b,
+        ignored_b=_compile_bytes_from_pattern(pat=errors_ignored_re, encoding=encoding),
+        look_back_pairs=_compile_look_back_map_bytes(
+            m=dict(look_back_items), flags=errors_re.flags, encoding=encoding
+        ),
+    )
+
+
 def _validated_start(seek: int | None, size: int) -> int:
     """Return a safe starting byte offset.
 
@@ -349,13 +444,14 @@ def _search_log_lines(  # noqa: C901
     - Decodes only matched lines for output.
     - Persists a byte offset at a line boundary for the live logfile.
     """
-    errs_b = _compile_bytes_from_pattern(pat=errors_re, encoding=encoding)
-    if not errs_b:
-        return []
-    ign_b = _compile_bytes_from_pattern(pat=errors_ignored_re, encoding=encoding)
-    lb_pairs = _compile_look_back_map_bytes(
-        m=look_back_map, flags=errors_re.flags, encoding=encoding
+    matcher = _get_errors_matcher(
+        errors_re=errors_re,
+        errors_ignored_re=errors_ignored_re,
+        look_back_items=tuple((look_back_map or {}).items()),
+        encoding=encoding,
     )
+    errs_b = matcher.errors_b
+    lb_pairs = matcher.look_back_pairs
 
     results: list[tuple[pl.Path, str]] = []
     last_offset_bytes = -1
@@ -393,12 +489,8 @@ def _search_log_lines(  # noqa: C901
                     continue
 
                 for line_b in lines_b:
-                    # Fast ignore
-                    if ign_b and ign_b.search(line_b):
-                        look_back.append(line_b)
-                        continue
-                    # Not an error -> just update context
-                    if not errs_b.search(line_b):
+                    # Not an error, or ignored error -> just update context
+                    if not matcher.is_error(line_b):
                         look_back.append(line_b)
                         continue
                     # Error: maybe ignore based on mapping
@@ -426,6 +518,114 @@ def _search_log_lines(  # noqa: C901
     return results
 
 
+def _get_look_back_lines(
+    mm: mmap.mmap, line_start: int, region_start: int, num: int
+) -> list[bytes]:
+    """Return up to `num` lines preceding the line starting at `line_start`."""
+    lines: list[bytes] = []
+    end = line_start
+    while len(lines) < num and end > region_start:
+        # `end - 1` is the newline that terminates the previous line
+        start = max(mm.rfind(b"\n", region_start, end - 1) + 1, region_start)
+        lines.append(mm[start : end - 1].removesuffix(b"\r"))
+        end = start
+    lines.reverse()
+    return lines
+
+
+def _search_log_lines_mmap(
+    logfile: pl.Path,
+    rotated_logs: list[RotableLog],
+    errors_re: re.Pattern[str],  # The the error regex needs to be unanchored
+    *,
+    errors_ignored_re: re.Pattern[str] | None = None,
+    look_back_map: dict[str, str] | None = None,
+    look_back_lines: int = 10,
+    encoding: str = "utf-8",
+) -> list[tuple[pl.Path, str]]:
+    """Search for error lines using memory mapped log files.
+
+    Same results as `_search_log_lines`, but the error regex runs directly over the mapped file.
+    Lines (and look-back lines) are extracted only around the actual matches, so there are no
+    per-line allocations in regions without errors.
+
+    Lines are terminated by LF (or CRLF). The file must not be truncated while it is mapped,
+    which holds for log files that are rotated by renaming.
+    """
+    matcher = _get_errors_matcher(
+        errors_re=errors_re,
+        errors_ignored_re=errors_ignored_re,
+        look_back_items=tuple((look_back_map or {}).items()),
+        encoding=encoding,
+    )
+    errs_b = matcher.errors_b
+    lb_pairs = matcher.look_back_pairs
+
+    results: list[tuple[pl.Path, str]] = []
+    last_offset_bytes = -1
+
+    for rec in rotated_logs:
+        path = rec.logfile
+
+        with path.open("rb") as fb:
+            _validate_inode(rec)
+            size = os.fstat(fb.fileno()).st_size
+            start = _validated_start(seek=rec.seek, size=size)
+            _resume_at_line_boundary(fb=fb, pos=start, size=size)
+            region_start = fb.tell()
+
+            if size == 0 or region_start >= size:
+                if path == logfile:
+                    last_offset_bytes = region_start
+                continue
+
+            with mmap.mmap(fb.fileno(), length=size, access=mmap.ACCESS_READ) as mm:
+                # Only complete lines are searched, the incomplete last line is searched next time
+                region_end = mm.rfind(b"\n", region_start) + 1 or region_start
+
+                pos = region_start
+                while pos < region_end:
+                    match = errs_b.search(mm, pos, region_end)
+                    if not match:
+                        break
+
+                    line_start = mm.rfind(b"\n", region_start, match.start()) + 1 or region_start
+                    line_end = mm.find(b"\n", match.start(), region_end)
+                    pos = line_end + 1
+                    line_b = mm[line_start:line_end].removesuffix(b"\r")
+
+                    # The match can span multiple lines, check the line itself
+                    if not matcher.is_error(line_b):
+                        continue
+                    # Error: maybe ignore based on mapping
+                    if lb_pairs and _should_ignore_error(
+                        line_b=line_b,
+                        lookback=deque(
+                            _get_look_back_lines(
+                                mm=mm,
+                                line_start=line_start,
+                                region_start=region_start,
+                                num=look_back_lines,
+                            )
+                        ),
+                        pairs=lb_pairs,
+                    ):
+                        continue
+
+                    line = line_b.decode(encoding, errors="surrogateescape")
+                    results.append((path, line))
+
+            # Persist next offset for the "live" logfile at a line boundary
+            if path == logfile:
+                last_offset_bytes = region_end
+
+    if last_offset_bytes >= 0:
+        offset_file = _get_offset_file(logfile=logfile)
+        offset_file.write_text(str(last_offset_bytes), encoding="utf-8")
+
+    return results
+
+
 def add_ignore_rule(
     *, files_glob: str, regex: str, ignore_file_id: str, skip_after: float = 0.0
 ) -> None:
@@ -660,118 +860,279 @@ def expect_messages(regex_pairs: list[tuple[str, str]]) -> tp.Iterator[None]:
         raise AssertionError(errors_joined) from None
 
 
-def search_cluster_logs() -> list[tuple[pl.Path, str]]:
-    """Search cluster logs for errors."""
-    cluster_env = cluster_nodes.get_cluster_env()
-    lock_file = temptools.get_basetemp() / f"search_cluster_{cluster_env.instance_num}.lock"
+def _get_seek_and_timestamp(logfile: pl.Path) -> tuple[int, float]:
+    """Get seek offset (from where to start searching) and timestamp of last search."""
+    offset_file = _get_offset_file(logfile=logfile)
+    if offset_file.exists():
+        return _read_seek(offset_file=offset_file), offset_file.stat().st_mtime
+    return 0, 0.0
 
-    def _search(
-        logfile: pl.Path, seek: int, timestamp: float, errors_ignored: str
-    ) -> list[tuple[pl.Path, str]]:
-        return _search_log_lines(
-            logfile=logfile,
-            rotated_logs=_get_rotated_logs(logfile=logfile, seek=seek, timestamp=timestamp),
-            errors_re=ERRORS_RE,
-            errors_ignored_re=re.compile(errors_ignored),
-            look_back_map=ERRORS_LOOK_BACK_MAP,
+
+_LockFactory = tp.Callable[[], contextlib.AbstractContextManager]
+
+
+def _get_lock_factory(lock_file: pl.Path) -> _LockFactory:
+    """Return factory of lock on the `lock_file`.
+
+    The lock type is resolved in the current process, so the factory can be used in a process
+    that doesn't share the env and state of the pytest worker.
+    """
+    if locking.FileLockIfXdist is lock_broker.BrokerLock:
+        return functools.partial(
+            lock_broker.BrokerLock, lock_file, socket_path=os.environ[lock_broker.SOCKET_ENV]
         )
+    return functools.partial(locking.FileLockIfXdist, lock_file)
 
-    with locking.FileLockIfXdist(lock_file):
-        errors = []
-        for logfile in cluster_env.state_dir.glob("*.std*"):
-            # Skip if the log file is status file or rotated log
-            if logfile.name.endswith(".offset") or ROTATED_RE.match(logfile.name):
-                continue
 
-            # Get seek offset (from where to start searching) and timestamp of last search
-            offset_file = _get_offset_file(logfile=logfile)
-            if offset_file.exists():
-                seek = _read_seek(offset_file=offset_file)
-                timestamp = offset_file.stat().st_mtime
-            else:
-                seek = 0
-                timestamp = 0.0
+def _get_findings_file(cluster_env: cluster_nodes.ClusterEnv) -> pl.Path:
+    return cluster_env.state_dir / ERRORS_FINDINGS_FILE_NAME
 
-            # Get ignore rules for the log file
-            ignore_rules = _get_ignore_rules(
-                cluster_env=cluster_env, timestamp=timestamp or time.time()
-            )
-            errors_ignored = _get_ignore_regex(
-                ignore_rules=ignore_rules, regexes=ERRORS_IGNORED, logfile=logfile
-            )
 
-            # Search for errors in the log file
-            errors.extend(
-                _retry_search(
-                    functools.partial(
-                        _search,
-                        logfile=logfile,
-                        seek=seek,
-                        timestamp=timestamp,
-                        errors_ignored=errors_ignored,
-                    )
-                )
-            )
+def _get_findings_lock_file(instance_num: int) -> pl.Path:
+    return temptools.get_basetemp() / f"{ERRORS_FINDINGS_FILE_NAME}_{instance_num}.lock"
 
-    return errors
 
+def _record_findings(
+    *,
+    findings_file: pl.Path,
+    lock: _LockFactory,
+    errors: list[tuple[pl.Path, str]],
+    timestamp: float,
+) -> None:
+    """Append errors found in cluster logs to the findings file.
 
-def search_framework_log() -> list[tuple[pl.Path, str]]:
-    """Search framework log for errors."""
-    # It is not necessary to lock the `framework.log` file because there is one log file per worker.
-    # Each worker is checking only its own log file.
-    logfile = framework_log.get_framework_log_path()
+    The `timestamp` is the time of the previous search of the log file. It is needed for
+    evaluating expiration of the ignore rules when the findings are consumed.
+    """
+    if not errors:
+        return
 
-    # Get seek offset (from where to start searching) and timestamp of last search
-    offset_file = _get_offset_file(logfile=logfile)
-    if offset_file.exists():
-        seek = _read_seek(offset_file=offset_file)
-        timestamp = offset_file.stat().st_mtime
-    else:
-        seek = 0
-        timestamp = 0.0
+    records = "".join(
+        f"{json.dumps({'timestamp': timestamp, 'logfile': str(p), 'line': line})}\n"
+        for p, line in errors
+    )
+    with lock(), open(findings_file, "a", encoding="utf-8") as outfile:
+        outfile.write(records)
 
-    def _search() -> list[tuple[pl.Path, str]]:
-        return _search_log_lines(
-            logfile=logfile,
-            rotated_logs=_get_rotated_logs(logfile=logfile, seek=seek, timestamp=timestamp),
-            errors_re=ERRORS_RE,
-        )
 
-    # Search for errors in the log file
-    errors = _retry_search(_search)
+def _consume_findings(cluster_env: cluster_nodes.ClusterEnv) -> list[tuple[pl.Path, str]]:
+    """Return errors recorded in the findings file since the last call, apply ignore rules.
+
+    Each finding is returned just once, no matter which pytest worker consumes it. That is
+    the same behavior as with the offset files when searching the log files directly.
+    """
+    findings_file = _get_findings_file(cluster_env=cluster_env)
+    offset_file = _get_offset_file(logfile=findings_file)
+
+    with locking.FileLockIfXdist(_get_findings_lock_file(instance_num=cluster_env.instance_num)):
+        if not findings_file.exists():
+            return []
+        seek = _read_seek(offset_file=offset_file)
+        with open(findings_file, "rb") as infile:
+            infile.seek(seek)
+            data = infile.read()
+        offset_file.write_text(str(seek + len(data)), encoding="utf-8")
+
+    errors: list[tuple[pl.Path, str]] = []
+    for record_line in data.splitlines():
+        record = json.loads(record_line)
+        logfile = pl.Path(record["logfile"])
+        ignore_rules = _get_ignore_rules(cluster_env=cluster_env, timestamp=record["timestamp"])
+        if ignore_rules and re.search(
+            _get_ignore_regex(ignore_rules=ignore_rules, regexes=[], logfile=logfile),
+            record["line"],
+        ):
+            continue
+        errors.append((logfile, record["line"]))
 
     return errors
 
 
-def search_supervisord_logs() -> list[tuple[pl.Path, str]]:
-    """Search cluster logs for errors."""
-    cluster_env = cluster_nodes.get_cluster_env()
-    lock_file = temptools.get_basetemp() / f"search_supervisord_{cluster_env.instance_num}.lock"
+def _search_logfile_errors(
+    logfile: pl.Path,
+    errors_re: re.Pattern[str],
+    *,
+    lock: _LockFactory | None = None,
+    ignore_rules: list[tuple[str, float, str]] | None = None,
+    findings_file: pl.Path | None = None,
+    findings_lock: _LockFactory = contextlib.nullcontext,
+    use_mmap: bool = False,
+) -> list[tuple[pl.Path, str]]:
+    """Search a single log file for errors, starting from the last recorded offset.
 
-    with locking.FileLockIfXdist(lock_file):
-        logfile = cluster_env.state_dir / "supervisord.log"
+    When `ignore_rules` are passed, the log file is a cluster log, and the static ignore rules
+    and the ignore rules for the cluster instance are applied.
 
-        # Get seek offset (from where to start searching) and timestamp of last search
-        offset_file = _get_offset_file(logfile=logfile)
-        if offset_file.exists():
-            seek = _read_seek(offset_file=offset_file)
-            timestamp = offset_file.stat().st_mtime
-        else:
-            seek = 0
-            timestamp = 0.0
+    When `findings_file` is passed, only the static ignore rules are applied and the errors
+    are appended to the findings file of the cluster instance instead of being returned.
+    The ignore rules added by tests are applied when the findings are consumed, as the tests
+    adding the rules may be still running.
+
+    All the inputs, including the lock type and the search engine, are passed as arguments.
+    The function doesn't depend on configuration, env or caches of the pytest worker, so it
+    can run in a process pool.
+    """
+    with lock() if lock else contextlib.nullcontext():
+        seek, timestamp = _get_seek_and_timestamp(logfile=logfile)
+        timestamp_or_now = timestamp or time.time()
+
+        errors_ignored_re = None
+        look_back_map = None
+        if ignore_rules is not None:
+            # Get ignore rules for the log file
+            errors_ignored_re = re.compile(
+                _get_ignore_regex(
+                    ignore_rules=_filter_ignore_rules(
+                        rules=ignore_rules, timestamp=timestamp_or_now
+                    ),
+                    regexes=ERRORS_IGNORED,
+                    logfile=logfile,
+                )
+            )
+            look_back_map = ERRORS_LOOK_BACK_MAP
+
+        search_func = _search_log_lines_mmap if use_mmap else _search_log_lines
 
         def _search() -> list[tuple[pl.Path, str]]:
-            return _search_log_lines(
+            return search_func(
                 logfile=logfile,
                 rotated_logs=_get_rotated_logs(logfile=logfile, seek=seek, timestamp=timestamp),
-                errors_re=SUPERVISORD_ERRORS_RE,
+                errors_re=errors_re,
+                errors_ignored_re=errors_ignored_re,
+                look_back_map=look_back_map,
             )
 
-        # Search for errors in the log file
         errors = _retry_search(_search)
 
-    return errors
+        # Record the findings while still holding the log file lock. Anybody who searches
+        # the log file afterwards will find the errors in the findings file.
+        if findings_file is not None:
+            _record_findings(
+                findings_file=findings_file,
+                lock=findings_lock,
+                errors=errors,
+                timestamp=timestamp_or_now,
+            )
+            return []
+
+        return errors
+
+
+@functools.cache
+def _get_search_executor() -> concurrent.futures.Executor | None:
+    """Return process pool for searching log files, or `None` when searching serially.
+
+    The pool is created once per pytest worker and reused for all tests. The "forkserver" start
+    method is used, as forking the multi-threaded pytest worker is not safe.
+    """
+    if configuration.LOGS_SEARCH_WORKERS <= 1:
+        return None
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=configuration.LOGS_SEARCH_WORKERS,
+        mp_context=multiprocessing.get_context("forkserver"),
+    )
+
+
+def _run_searches(
+    searches: list[tp.Callable[[], list[tuple[pl.Path, str]]]],
+) -> list[tuple[pl.Path, str]]:
+    """Run the searches, possibly in parallel, and merge the results in the original order."""
+    executor = _get_search_executor()
+    if executor is None or len(searches) < 2:
+        results = [s() for s in searches]
+    else:
+        futures = [executor.submit(s) for s in searches]
+        results = [f.result() for f in futures]
+    return list(itertools.chain.from_iterable(results))
+
+
+def _get_cluster_logs_searches(
+    cluster_env: cluster_nodes.ClusterEnv, record_findings: bool = False
+) -> list[tp.Callable[[], list[tuple[pl.Path, str]]]]:
+    """Return searches for errors in cluster logs, one search per log file."""
+    searches: list[tp.Callable[[], list[tuple[pl.Path, str]]]] = []
+    # Ignore rules added by tests are applied when the findings are consumed
+    ignore_rules = [] if record_findings else _load_ignore_rules(cluster_env=cluster_env)
+    findings_kwargs: dict[str, tp.Any] = (
+        {
+            "findings_file": _get_findings_file(cluster_env=cluster_env),
+            "findings_lock": _get_lock_factory(
+                _get_findings_lock_file(instance_num=cluster_env.instance_num)
+            ),
+        }
+        if record_findings
+        else {}
+    )
+    for logfile in sorted(cluster_env.state_dir.glob("*.std*")):
+        # Skip if the log file is status file or rotated log
+        if logfile.name.endswith(".offset") or ROTATED_RE.match(logfile.name):
+            continue
+
+        # Each log file has its own lock, so different workers can search different log files
+        # of the same cluster instance at the same time.
+        lock_file = (
+            temptools.get_basetemp()
+            / f"search_cluster_{cluster_env.instance_num}_{logfile.name}.lock"
+        )
+        searches.append(
+            functools.partial(
+                _search_logfile_errors,
+                logfile=logfile,
+                errors_re=ERRORS_RE,
+                lock=_get_lock_factory(lock_file),
+                ignore_rules=ignore_rules,
+                use_mmap=configuration.LOGS_SEARCH_MMAP,
+                **findings_kwargs,
+            )
+        )
+
+    return searches
+
+
+def _get_framework_log_search() -> tp.Callable[[], list[tuple[pl.Path, str]]]:
+    # It is not necessary to lock the `framework.log` file because there is one log file per worker.
+    # Each worker is checking only its own log file.
+    return functools.partial(
+        _search_logfile_errors,
+        logfile=framework_log.get_framework_log_path(),
+        errors_re=ERRORS_RE,
+        use_mmap=configuration.LOGS_SEARCH_MMAP,
+    )
+
+
+def _get_supervisord_log_search(
+    cluster_env: cluster_nodes.ClusterEnv,
+) -> tp.Callable[[], list[tuple[pl.Path, str]]]:
+    return functools.partial(
+        _search_logfile_errors,
+        logfile=cluster_env.state_dir / "supervisord.log",
+        errors_re=SUPERVISORD_ERRORS_RE,
+        lock=_get_lock_factory(
+            temptools.get_basetemp() / f"search_supervisord_{cluster_env.instance_num}.lock"
+        ),
+        use_mmap=configuration.LOGS_SEARCH_MMAP,
+    )
+
+
+def search_cluster_logs() -> list[tuple[pl.Path, str]]:
+    """Search cluster logs for errors."""
+    cluster_env = cluster_nodes.get_cluster_env()
+    if configuration.LOGS_WATCHER:
+        # Only the part of the logs not yet searched by the logs watcher is searched here
+        _run_searches(_get_cluster_logs_searches(cluster_env=cluster_env, record_findings=True))
+        return _consume_findings(cluster_env=cluster_env)
+    return _run_searches(_get_cluster_logs_searches(cluster_env=cluster_env))
+
+
+def search_framework_log() -> list[tuple[pl.Path, str]]:
+    """Search framework log for errors."""
+    return _get_framework_log_search()()
+
+
+def search_supervisord_logs() -> list[tuple[pl.Path, str]]:
+    """Search cluster logs for errors."""
+    cluster_env = cluster_nodes.get_cluster_env()
+    return _get_supervisord_log_search(cluster_env=cluster_env)()
 
 
 def clean_ignore_rules(*, ignore_file_id: str) -> None:
@@ -789,12 +1150,103 @@ def clean_ignore_rules(*, ignore_file_id: str) -> None:
 
 def get_logfiles_errors() -> str:
     """Get errors found in cluster artifacts."""
-    errors = search_cluster_logs()
-    errors.extend(search_framework_log())
-    errors.extend(search_supervisord_logs())
+    cluster_env = cluster_nodes.get_cluster_env()
+    errors = _run_searches(
+        [
+            *_get_cluster_logs_searches(
+                cluster_env=cluster_env, record_findings=configuration.LOGS_WATCHER
+            ),
+            _get_framework_log_search(),
+            _get_supervisord_log_search(cluster_env=cluster_env),
+        ]
+    )
+    if configuration.LOGS_WATCHER:
+        errors = [*_consume_findings(cluster_env=cluster_env), *errors]
     if not errors:
         return ""
 
     err = [f"{e[0]}: {e[1]}" for e in errors]
     err_joined = "\n".join(err)
     return err_joined
+
+
+class LogsWatcher:
+    """Search cluster logs for errors continuously in a background thread.
+
+    The errors are recorded to the findings file of the cluster instance. When a test finishes,
+    only the findings and the part of the logs written since the last search by the watcher need
+    to be processed, instead of all the log lines written during the test.
+
+    The watcher stops itself once the cluster instance it was started for is respun.
+    """
+
+    def __init__(
+        self, cluster_env: cluster_nodes.ClusterEnv, interval: float = LOGS_WATCHER_INTERVAL_SEC
+    ) -> None:
+        self.cluster_env = cluster_env
+        self.interval = interval
+        self._cluster_instance_id = self._get_cluster_instance_id()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _get_cluster_instance_id(self) -> str:
+        instance_id_file = self.cluster_env.state_dir / artifacts.CLUSTER_INSTANCE_ID_FILENAME
+        try:
+            return instance_id_file.read_text(encoding="utf-8").strip()
+        except OSError:
+            return ""
+
+    def _is_current(self) -> bool:
+        """Check that the cluster instance was not respun since the watcher was started."""
+        return self._get_cluster_instance_id() == self._cluster_instance_id
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            if not self._is_current():
+                LOGGER.debug(f"c{self.cluster_env.instance_num}: logs watcher, instance respun.")
+                break
+            searches = _get_cluster_logs_searches(
+                cluster_env=self.cluster_env, record_findings=True
+            )
+            for search in searches:
+                try:
+                    search()
+                except Exception as err:
+                    # Anything that was not searched will be searched at the end of the test
+                    LOGGER.debug(f"c{self.cluster_env.instance_num}: logs watcher: {err}")
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name=f"logs-watcher-c{self.cluster_env.instance_num}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=30)
+
+
+_LOGS_WATCHERS: dict[int, LogsWatcher] = {}
+
+
+def stop_logs_watcher(instance_num: int) -> None:
+    """Stop logs watcher started by this process for the cluster instance."""
+    watcher = _LOGS_WATCHERS.pop(instance_num, None)
+    if watcher:
+        watcher.stop()
+
+
+def start_logs_watcher(cluster_env: cluster_nodes.ClusterEnv) -> None:
+    """Start logs watcher for a (re)started cluster instance."""
+    stop_logs_watcher(instance_num=cluster_env.instance_num)
+
+    # Without xdist, the file locks are no-op and the watcher would race with the searches
+    # in the main thread over the offset files and the findings file
+    if not configuration.IS_XDIST:
+        LOGGER.debug("Logs watcher is used only when running on pytest-xdist workers.")
+        return
+
+    watcher = LogsWatcher(cluster_env=cluster_env)
+    watcher.start()
+    _LOGS_WATCHERS[cluster_env.instance_num] = watcher
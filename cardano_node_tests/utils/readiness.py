@@ -0,0 +1,74 @@
+"""Active probes for readiness of processes, ports and sockets.
+
+The probes are polled with a short exponential backoff, so the caller can continue as soon as
+the condition holds, instead of sleeping for a fixed time that needs to cover the worst case.
+"""
+
+import logging
+import pathlib as pl
+import socket
+import time
+import typing as tp
+
+LOGGER = logging.getLogger(__name__)
+
+
+def poll(
+    condition: tp.Callable[[], bool],
+    *,
+    timeout: float,
+    delay: float = 0.2,
+    max_delay: float = 2.0,
+) -> bool:
+    """Poll the condition until it holds or until the timeout expires.
+
+    Exception raised by the condition means that the condition doesn't hold yet.
+
+    Returns:
+        bool: True if the condition holds, False if the timeout expired.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if condition():
+                return True
+        except Exception as exc:
+            LOGGER.debug(f"Readiness probe failed: {exc}")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+
+def is_process_running(pid: int) -> bool:
+    """Check if process with the given PID is running (zombie processes are not running)."""
+    try:
+        stat = pl.Path(f"/proc/{pid}/stat").read_text(encoding="utf-8")
+    except OSError:
+        return False
+
+    # The process state follows the command name, and the command name can contain spaces
+    state = stat.rsplit(")", 1)[-1].split()[0]
+    return state not in ("Z", "X")
+
+
+def is_port_listening(port: int, *, host: str = "127.0.0.1") -> bool:
+    """Check if anything accepts connections on the given TCP port."""
+    try:
+        with socket.create_connection((host, port), timeout=1):
+            return True
+    except OSError:
+        return False
+
+
+def is_socket_available(socket_path: pl.Path) -> bool:
+    """Check if anything accepts connections on the given UNIX socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(1)
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
@@ -0,0 +1,289 @@
+"""In-process generation of Shelley key pairs and addresses.
+
+Generating a key pair and building an address with `cardano-cli` costs a subprocess spawn each.
+When `INPROCESS_KEYS` is set, fixtures generate Ed25519 payment and stake key pairs with
+libsodium (through `pynacl`) and derive enterprise, base and reward addresses in-process.
+The key files are TextEnvelope files byte-compatible with the files written by `cardano-cli`,
+and the addresses are saved to the same `.addr` files as `cardano-clusterlib` saves them to.
+
+The address format is described in CIP-19:
+
+* header byte - address type in the high nibble, network id in the low nibble
+* payment credential - Blake2b-224 hash of the payment verification key
+* stake credential - Blake2b-224 hash of the stake verification key
+
+Tests that exercise the key generation and address commands call `cardano-cli` directly,
+not through this module.
+"""
+
+import hashlib
+import json
+import logging
+import pathlib as pl
+import typing as tp
+
+import cbor2
+import nacl.signing
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import configuration
+
+LOGGER = logging.getLogger(__name__)
+
+PAYMENT = "payment"
+STAKE = "stake"
+# Suffix of key and address file names, as used by `cardano-clusterlib`
+FILE_SUFFIXES = {PAYMENT: "", STAKE: "_stake"}
+
+# TextEnvelope types and descriptions of signing and verification keys, as written by `cardano-cli`
+_ENVELOPES = {
+    PAYMENT: (
+        ("PaymentSigningKeyShelley_ed25519", "Payment Signing Key"),
+        ("PaymentVerificationKeyShelley_ed25519", "Payment Verification Key"),
+    ),
+    STAKE: (
+        ("StakeSigningKeyShelley_ed25519", "Stake Signing Key"),
+        ("StakeVerificationKeyShelley_ed25519", "Stake Verification Key"),
+    ),
+}
+
+# Address types (high nibble of the header byte) for addresses with key hash credentials
+ADDR_TYPE_BASE = 0b0000
+ADDR_TYPE_ENTERPRISE = 0b0110
+ADDR_TYPE_REWARD = 0b1110
+
+KEY_HASH_SIZE = 28
+
+_BECH32_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+_BECH32_GENERATOR = (0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3)
+
+
+def _bech32_polymod(values: tp.Iterable[int]) -> int:
+    chk = 1
+    for value in values:
+        top = chk >> 25
+        chk = (chk & 0x1FFFFFF) << 5 ^ value
+        for i, gen in enumerate(_BECH32_GENERATOR):
+            if (top >> i) & 1:
+                chk ^= gen
+    return chk
+
+
+def _bech32_hrp_expand(hrp: str) -> list[int]:
+    return [ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp]
+
+
+def _convert_bits(data: tp.Iterable[int], *, from_bits: int, to_bits: int, pad: bool) -> list[int]:
+    acc = 0
+    bits = 0
+    result = []
+    maxv = (1 << to_bits) - 1
+    for value in data:
+        acc = (acc << from_bits) | value
+        bits += from_bits
+        while bits >= to_bits:
+            bits -= to_bits
+            result.append((acc >> bits) & maxv)
+    if pad and bits:
+        result.append((acc << (to_bits - bits)) & maxv)
+    elif not pad and (bits >= from_bits or (acc << (to_bits - bits)) & maxv):
+        msg = "Invalid padding of bech32 data."
+        raise ValueError(msg)
+    return result
+
+
+def encode_bech32(*, prefix: str, data: str) -> str:
+    """Convert hex data to bech32 string, same as `helpers.encode_bech32` but in-process."""
+    values = _convert_bits(bytes.fromhex(data), from_bits=8, to_bits=5, pad=True)
+    polymod = _bech32_polymod([*_bech32_hrp_expand(prefix), *values, 0, 0, 0, 0, 0, 0]) ^ 1
+    checksum = [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
+    return f"{prefix}1{''.join(_BECH32_CHARSET[v] for v in (*values, *checksum))}"
+
+
+def decode_bech32(bech32: str) -> str:
+    """Convert bech32 string to hex data, same as `helpers.decode_bech32` but in-process."""
+    bech32 = bech32.strip().lower()
+    prefix, sep, data_part = bech32.rpartition("1")
+    if not (prefix and sep and len(data_part) >= 6):
+        msg = f"Invalid bech32 string: '{bech32}'."
+        raise ValueError(msg)
+    try:
+        values = [_BECH32_CHARSET.index(c) for c in data_part]
+    except ValueError as exc:
+        msg = f"Invalid character in bech32 string: '{bech32}'."
+        raise ValueError(msg) from exc
+    if _bech32_polymod([*_bech32_hrp_expand(prefix), *values]) != 1:
+        msg = f"Invalid checksum of bech32 string: '{bech32}'."
+        raise ValueError(msg)
+    return bytes(_convert_bits(values[:-6], from_bits=5, to_bits=8, pad=False)).hex()
+
+
+def get_key_hash(vkey: bytes) -> bytes:
+    """Get Blake2b-224 hash of a verification key."""
+    return hashlib.blake2b(vkey, digest_size=KEY_HASH_SIZE).digest()
+
+
+def read_key(key_file: clusterlib.FileType) -> bytes:
+    """Read raw key bytes from a TextEnvelope key file."""
+    with open(pl.Path(key_file).expanduser(), encoding="utf-8") as infile:
+        envelope = json.load(infile)
+    return bytes(cbor2.loads(bytes.fromhex(envelope["cborHex"])))
+
+
+def _write_envelope(*, out_file: pl.Path, envelope: tuple[str, str], key: bytes) -> None:
+    content = {
+        "type": envelope[0],
+        "description": envelope[1],
+        "cborHex": cbor2.dumps(key).hex(),
+    }
+    out_file.write_text(f"{json.dumps(content, indent=4)}\n", encoding="utf-8")
+
+
+def _check_files_exist(*out_files: pl.Path, cluster_obj: clusterlib.ClusterLib) -> None:
+    if cluster_obj.overwrite_outfiles:
+        return
+    for out_file in out_files:
+        if out_file.exists():
+            msg = f"The expected file `{out_file}` already exist."
+            raise clusterlib.CLIError(msg)
+
+
+def gen_key_pair(
+    *,
+    cluster_obj: clusterlib.ClusterLib,
+    key_type: str,
+    key_name: str,
+    destination_dir: clusterlib.FileType = ".",
+) -> clusterlib.KeyPair:
+    """Generate payment or stake key pair in-process."""
+    dest_dir = pl.Path(destination_dir).expanduser()
+    suffix = FILE_SUFFIXES[key_type]
+    vkey_file = dest_dir / f"{key_name}{suffix}.vkey"
+    skey_file = dest_dir / f"{key_name}{suffix}.skey"
+    _check_files_exist(vkey_file, skey_file, cluster_obj=cluster_obj)
+
+    signing_key = nacl.signing.SigningKey.generate()
+    skey_envelope, vkey_envelope = _ENVELOPES[key_type]
+    _write_envelope(out_file=skey_file, envelope=skey_envelope, key=bytes(signing_key))
+    _write_envelope(out_file=vkey_file, envelope=vkey_envelope, key=bytes(signing_key.verify_key))
+    return clusterlib.KeyPair(vkey_file=vkey_file, skey_file=skey_file)
+
+
+def get_network_id(cluster_obj: clusterlib.ClusterLib) -> int:
+    """Get network id used in address header - 1 for mainnet, 0 for testnets."""
+    return 1 if "--mainnet" in cluster_obj.magic_args else 0
+
+
+def get_payment_address(
+    *, payment_vkey: bytes, stake_vkey: bytes | None = None, network_id: int = 0
+) -> str:
+    """Get enterprise address, or base address when stake key is given."""
+    addr_type = ADDR_TYPE_BASE if stake_vkey else ADDR_TYPE_ENTERPRISE
+    addr_bytes = bytes([addr_type << 4 | network_id]) + get_key_hash(payment_vkey)
+    if stake_vkey:
+        addr_bytes += get_key_hash(stake_vkey)
+    return encode_bech32(prefix="addr" if network_id else "addr_test", data=addr_bytes.hex())
+
+
+def get_stake_address(*, stake_vkey: bytes, network_id: int = 0) -> str:
+    """Get reward address."""
+    addr_bytes = bytes([ADDR_TYPE_REWARD << 4 | network_id]) + get_key_hash(stake_vkey)
+    return encode_bech32(prefix="stake" if network_id else "stake_test", data=addr_bytes.hex())
+
+
+def _save_address(*, cluster_obj: clusterlib.ClusterLib, address: str, out_file: pl.Path) -> None:
+    _check_files_exist(out_file, cluster_obj=cluster_obj)
+    out_file.write_text(address, encoding="utf-8")
+
+
+def _verify_address(*, address: str, cli_address: str, out_file: pl.Path) -> None:
+    if cli_address != address:
+        msg = (
+            f"Address derived in-process ({address}) doesn't match address built "
+            f"by `cardano-cli` ({cli_address}) for '{out_file}'."
+        )
+        raise AssertionError(msg)
+
+
+def create_stake_addr_records(
+    *names: str,
+    cluster_obj: clusterlib.ClusterLib,
+    destination_dir: clusterlib.FileType = ".",
+) -> list[clusterlib.AddressRecord]:
+    """Create new stake address(es) with key pairs generated in-process."""
+    dest_dir = pl.Path(destination_dir).expanduser()
+    network_id = get_network_id(cluster_obj)
+    addr_recs = []
+    for name in names:
+        key_pair = gen_key_pair(
+            cluster_obj=cluster_obj, key_type=STAKE, key_name=name, destination_dir=dest_dir
+        )
+        address = get_stake_address(stake_vkey=read_key(key_pair.vkey_file), network_id=network_id)
+        out_file = dest_dir / f"{name}_stake.addr"
+        if configuration.INPROCESS_KEYS_VERIFY:
+            # Let `cardano-cli` write the address file and check it matches
+            cli_address = cluster_obj.g_stake_address.gen_stake_addr(
+                addr_name=name, stake_vkey_file=key_pair.vkey_file, destination_dir=dest_dir
+            )
+            _verify_address(address=address, cli_address=cli_address, out_file=out_file)
+        else:
+            _save_address(cluster_obj=cluster_obj, address=address, out_file=out_file)
+        addr_recs.append(
+            clusterlib.AddressRecord(
+                address=address, vkey_file=key_pair.vkey_file, skey_file=key_pair.skey_file
+            )
+        )
+    return addr_recs
+
+
+def create_payment_addr_records(
+    *names: str,
+    cluster_obj: clusterlib.ClusterLib,
+    stake_vkey_files: tp.Sequence[clusterlib.FileType | None] = (),
+    destination_dir: clusterlib.FileType = ".",
+) -> list[clusterlib.AddressRecord]:
+    """Create new payment address(es) with key pairs generated in-process.
+
+    Args:
+        *names: Names of the addresses and key pairs.
+        cluster_obj: An instance of `clusterlib.ClusterLib`.
+        stake_vkey_files: Paths to stake vkey files, one for each address (optional).
+        destination_dir: A path to directory for storing artifacts (optional).
+
+    Returns:
+        list[clusterlib.AddressRecord]: Data containers containing the addresses and key pairs.
+    """
+    if stake_vkey_files and len(stake_vkey_files) != len(names):
+        msg = "Number of stake vkey files doesn't match number of addresses."
+        raise ValueError(msg)
+
+    dest_dir = pl.Path(destination_dir).expanduser()
+    network_id = get_network_id(cluster_obj)
+    addr_recs = []
+    for name, stake_vkey_file in zip(names, stake_vkey_files or [None] * len(names)):
+        key_pair = gen_key_pair(
+            cluster_obj=cluster_obj, key_type=PAYMENT, key_name=name, destination_dir=dest_dir
+        )
+        address = get_payment_address(
+            payment_vkey=read_key(key_pair.vkey_file),
+            stake_vkey=read_key(stake_vkey_file) if stake_vkey_file else None,
+            network_id=network_id,
+        )
+        out_file = dest_dir / f"{name}.addr"
+        if configuration.INPROCESS_KEYS_VERIFY:
+            # Let `cardano-cli` write the address file and check it matches
+            cli_address = cluster_obj.g_address.gen_payment_addr(
+                addr_name=name,
+                payment_vkey_file=key_pair.vkey_file,
+                stake_vkey_file=stake_vkey_file,
+                destination_dir=dest_dir,
+            )
+            _verify_address(address=address, cli_address=cli_address, out_file=out_file)
+        else:
+            _save_address(cluster_obj=cluster_obj, address=address, out_file=out_file)
+        addr_recs.append(
+            clusterlib.AddressRecord(
+                address=address, vkey_file=key_pair.vkey_file, skey_file=key_pair.skey_file
+            )
+        )
+    return addr_recs
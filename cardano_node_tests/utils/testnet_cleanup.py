@@ -21,6 +21,7 @@ from cardano_node_tests.utils import cluster_nodes
 from cardano_node_tests.utils import defragment_utxos
 from cardano_node_tests.utils import helpers
 from cardano_node_tests.utils import tx_view
+from cardano_node_tests.utils import utxo_index
 
 LOGGER = logging.getLogger(__name__)
 
@@ -181,8 +182,11 @@ def get_tx_inputs(
     are spendable reference inputs.
     """
     recs = []
+    addrs_utxos = utxo_index.get_utxos(
+        cluster_obj=cluster_obj, addresses=[a.address for a in src_addrs]
+    )
     for a in src_addrs:
-        utxos = cluster_obj.g_query.get_utxo(address=a.address)
+        utxos = addrs_utxos[a.address]
         utxos_ids_excluded = {
             f"{u.utxo_hash}#{u.utxo_ix}" for u in utxos if u.coin != clusterlib.DEFAULT_COIN
         }
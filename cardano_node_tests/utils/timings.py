@@ -0,0 +1,363 @@
+"""Time accounting of tests and of framework phases.
+
+When `TIMINGS` is set, time spent in phases of interest (waiting for a cluster instance,
+respinning, funding, running `cardano-cli`, waiting for epochs, searching logs for errors) is
+recorded as spans. Each span carries monotonic timestamps, the test that was running, the pytest
+worker and the cluster instance. Spans are buffered and flushed after each test to a per-worker
+file with JSON lines.
+
+At the end of the testing session, the per-worker files are merged to a text report with top
+consumers of time, histograms of durations for each phase and the critical path, and to a trace
+file in Chrome trace event format that can be opened in Perfetto (https://ui.perfetto.dev) or
+in `chrome://tracing`.
+
+Spans can be nested. Besides the total duration, each span records its "self" time, i.e. time
+that was not spent in nested spans, so the time accounted to phases doesn't overlap.
+"""
+
+import collections
+import contextlib
+import json
+import logging
+import os
+import pathlib as pl
+import statistics
+import threading
+import time
+import typing as tp
+
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import temptools
+
+LOGGER = logging.getLogger(__name__)
+
+TIMINGS_DIR_NAME = "timings"
+REPORT_FILENAME = "timings_report.txt"
+TRACE_FILENAME = "timings_trace.json"
+
+# Records are written to the worker file when the buffer has this many records, even if the test
+# is not finished yet
+FLUSH_COUNT = 5000
+# Number of records listed in top consumers sections of the report
+TOP_COUNT = 20
+# Upper bounds of histogram buckets, in seconds
+HISTOGRAM_BOUNDS = (0.01, 0.1, 1, 10, 100, 1000)
+HISTOGRAM_WIDTH = 40
+
+
+class _Recorder:
+    """Buffer of recorded spans and the state needed for recording."""
+
+    records: tp.ClassVar[list[dict]] = []
+    current_test: tp.ClassVar[str] = ""
+    lock: tp.ClassVar[threading.Lock] = threading.Lock()
+    # Stack of nested spans, each item is total duration of child spans in ns
+    local: tp.ClassVar[threading.local] = threading.local()
+
+
+def _get_worker_id() -> str:
+    return os.environ.get("PYTEST_XDIST_WORKER") or "master"
+
+
+def _get_instance_num() -> int:
+    """Get number of the cluster instance that is used by the current worker, if any.
+
+    Same as `cluster_nodes.get_instance_num`, which cannot be imported here because of circular
+    imports.
+    """
+    socket_path = os.environ.get("CARDANO_NODE_SOCKET_PATH")
+    if not socket_path:
+        return -1
+    instance_str = pl.Path(socket_path).parent.name.replace("state-cluster", "")
+    return int(instance_str) if instance_str.isdigit() else 0
+
+
+def _get_stack() -> list[list[int]]:
+    stack: list[list[int]] | None = getattr(_Recorder.local, "stack", None)
+    if stack is None:
+        stack = []
+        _Recorder.local.stack = stack
+    return stack
+
+
+def set_current_test(nodeid: str) -> None:
+    """Set the test that the recorded spans belong to."""
+    _Recorder.current_test = nodeid
+
+
+def get_timings_dir() -> pl.Path:
+    """Return directory where the pytest workers save the recorded spans."""
+    timings_dir = temptools.get_pytest_root_tmp() / TIMINGS_DIR_NAME
+    timings_dir.mkdir(parents=True, exist_ok=True)
+    return timings_dir
+
+
+@contextlib.contextmanager
+def span(phase: str, **args: tp.Any) -> tp.Iterator[None]:
+    """Record time spent in the `phase`.
+
+    Can be used both as a context manager and as a decorator. Nothing is recorded unless
+    `TIMINGS` is set.
+
+    Args:
+        phase: A name of the phase, e.g. "respin" or "cli".
+        **args: Additional data saved with the span, must be serializable to JSON.
+    """
+    if not configuration.TIMINGS:
+        yield
+        return
+
+    stack = _get_stack()
+    children_ns = [0]
+    stack.append(children_ns)
+    start_ns = time.monotonic_ns()
+    try:
+        yield
+    finally:
+        dur_ns = time.monotonic_ns() - start_ns
+        stack.pop()
+        if stack:
+            stack[-1][0] += dur_ns
+
+        record = {
+            "phase": phase,
+            "ts": start_ns,
+            "dur": dur_ns,
+            "self": dur_ns - children_ns[0],
+            "test": _Recorder.current_test,
+            "worker": _get_worker_id(),
+            "instance": _get_instance_num(),
+        }
+        if threading.current_thread() is not threading.main_thread():
+            record["thread"] = threading.get_ident()
+        if args:
+            record["args"] = args
+
+        with _Recorder.lock:
+            _Recorder.records.append(record)
+            need_flush = len(_Recorder.records) >= FLUSH_COUNT
+        if need_flush:
+            flush()
+
+
+def flush() -> None:
+    """Append the buffered spans to the file of the current worker."""
+    with _Recorder.lock:
+        if not _Recorder.records:
+            return
+        records = _Recorder.records
+        _Recorder.records = []
+
+    try:
+        timings_dir = get_timings_dir()
+    except RuntimeError:
+        # Pytest temporary directories are not initialized, there's nowhere to save the records
+        return
+
+    lines = [json.dumps(r, separators=(",", ":")) for r in records]
+    with open(timings_dir / f"{_get_worker_id()}.jsonl", "a", encoding="utf-8") as out_fp:
+        out_fp.write("\n".join(lines) + "\n")
+
+
+def load_records(timings_dir: pl.Path) -> list[dict]:
+    """Load and merge spans saved by all pytest workers."""
+    records: list[dict] = []
+    for worker_file in sorted(timings_dir.glob("*.jsonl")):
+        with open(worker_file, encoding="utf-8") as in_fp:
+            records.extend(json.loads(line) for line in in_fp if line.strip())
+    records.sort(key=lambda r: r["ts"])
+    return records
+
+
+def _fmt_sec(ns: float) -> str:
+    return f"{ns / 1e9:.3f}s"
+
+
+def _get_percentiles(durations: list[int]) -> tuple[float, float]:
+    """Return 50th and 90th percentile of durations."""
+    if len(durations) == 1:
+        return durations[0], durations[0]
+    deciles = statistics.quantiles(durations, n=10, method="inclusive")
+    return deciles[4], deciles[8]
+
+
+def _get_histogram(durations: list[int]) -> list[str]:
+    counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+    for dur in durations:
+        sec = dur / 1e9
+        idx = next((i for i, b in enumerate(HISTOGRAM_BOUNDS) if sec < b), len(HISTOGRAM_BOUNDS))
+        counts[idx] += 1
+
+    labels = [f"< {b}s" for b in HISTOGRAM_BOUNDS] + [f">= {HISTOGRAM_BOUNDS[-1]}s"]
+    max_count = max(counts) or 1
+    return [
+        f"    {label:>10} {count:>8} {'#' * round(HISTOGRAM_WIDTH * count / max_count)}"
+        for label, count in zip(labels, counts)
+        if count
+    ]
+
+
+def _get_phases_section(records: list[dict]) -> list[str]:
+    by_phase: dict[str, list[dict]] = collections.defaultdict(list)
+    for rec in records:
+        by_phase[rec["phase"]].append(rec)
+
+    lines = [
+        "Phases (self time excludes nested phases):",
+        f"  {'phase':<24} {'count':>8} {'total':>12} {'self':>12} {'p50':>10} {'p90':>10}"
+        f" {'max':>10}",
+    ]
+    by_self = sorted(by_phase.items(), key=lambda i: sum(r["self"] for r in i[1]), reverse=True)
+    for phase, phase_recs in by_self:
+        durations = sorted(r["dur"] for r in phase_recs)
+        p50, p90 = _get_percentiles(durations)
+        lines.append(
+            f"  {phase:<24} {len(durations):>8} {_fmt_sec(sum(durations)):>12}"
+            f" {_fmt_sec(sum(r['self'] for r in phase_recs)):>12} {_fmt_sec(p50):>10}"
+            f" {_fmt_sec(p90):>10} {_fmt_sec(durations[-1]):>10}"
+        )
+
+    lines.append("")
+    lines.append("Histograms of phase durations:")
+    for phase, phase_recs in by_self:
+        lines.append(f"  {phase}:")
+        lines.extend(_get_histogram([r["dur"] for r in phase_recs]))
+    return lines
+
+
+def _get_top_section(records: list[dict]) -> list[str]:
+    test_recs = [r for r in records if r["phase"] == "test"]
+    self_by_test: dict[tuple[str, str], int] = collections.defaultdict(int)
+    for rec in records:
+        if rec["phase"] != "test":
+            self_by_test[(rec["test"], rec["phase"])] += rec["self"]
+
+    lines = [f"Top {TOP_COUNT} tests by wall time:"]
+    for rec in sorted(test_recs, key=lambda r: r["dur"], reverse=True)[:TOP_COUNT]:
+        phases = sorted(
+            ((p, d) for (t, p), d in self_by_test.items() if t == rec["test"]),
+            key=lambda i: i[1],
+            reverse=True,
+        )
+        phases_str = ", ".join(f"{p} {_fmt_sec(d)}" for p, d in phases[:4])
+        lines.append(
+            f"  {_fmt_sec(rec['dur']):>12}  {rec['test']} [{rec['worker']}, c{rec['instance']}]"
+        )
+        if phases_str:
+            lines.append(f"{'':>16}{phases_str}")
+
+    lines.append("")
+    lines.append(f"Top {TOP_COUNT} spans by self time:")
+    spans = sorted((r for r in records if r["phase"] != "test"), key=lambda r: -r["self"])
+    lines.extend(
+        f"  {_fmt_sec(r['self']):>12}  {r['phase']} in {r['test'] or '<no test>'}"
+        f" [{r['worker']}, c{r['instance']}]"
+        for r in spans[:TOP_COUNT]
+    )
+    return lines
+
+
+def _get_critical_path_section(records: list[dict]) -> list[str]:
+    """Get the worker that finished last, together with what it spent its time on.
+
+    Each worker runs its tests serially, so the worker that finished last determines the wall
+    time of the whole session.
+    """
+    session_start = records[0]["ts"]
+    worker_end: dict[str, int] = collections.defaultdict(int)
+    for rec in records:
+        worker_end[rec["worker"]] = max(worker_end[rec["worker"]], rec["ts"] + rec["dur"])
+    critical_worker = max(worker_end, key=lambda w: worker_end[w])
+    worker_recs = [r for r in records if r["worker"] == critical_worker]
+
+    test_recs = [r for r in worker_recs if r["phase"] == "test"]
+    busy_ns = sum(r["dur"] for r in test_recs)
+    wall_ns = worker_end[critical_worker] - session_start
+
+    self_by_phase: dict[str, int] = collections.defaultdict(int)
+    for rec in worker_recs:
+        self_by_phase[rec["phase"]] += rec["self"]
+
+    lines = [
+        f"Critical path: worker {critical_worker}, wall time {_fmt_sec(wall_ns)},"
+        f" in tests {_fmt_sec(busy_ns)}, outside of tests {_fmt_sec(wall_ns - busy_ns)}",
+    ]
+    for phase, self_ns in sorted(self_by_phase.items(), key=lambda i: i[1], reverse=True):
+        lines.append(f"  {_fmt_sec(self_ns):>12}  {phase}")
+    lines.append(f"  Tests ({len(test_recs)}):")
+    lines.extend(
+        f"  {_fmt_sec(r['dur']):>12}  {r['test']} [c{r['instance']}]"
+        for r in sorted(test_recs, key=lambda r: r["dur"], reverse=True)[:TOP_COUNT]
+    )
+    return lines
+
+
+def get_report(records: list[dict]) -> str:
+    """Get text report of the recorded spans."""
+    if not records:
+        return "No timings were recorded.\n"
+
+    sections = [
+        _get_phases_section(records),
+        _get_top_section(records),
+        _get_critical_path_section(records),
+    ]
+    return "\n\n".join("\n".join(s) for s in sections) + "\n"
+
+
+def get_trace(records: list[dict]) -> dict:
+    """Get the recorded spans in Chrome trace event format."""
+    if not records:
+        return {"traceEvents": []}
+
+    start_ns = records[0]["ts"]
+    tids: dict[tuple[str, int], int] = {}
+    events: list[dict] = []
+    for rec in records:
+        thread_key = (rec["worker"], rec.get("thread", 0))
+        tid = tids.get(thread_key)
+        if tid is None:
+            tid = tids[thread_key] = len(tids) + 1
+            thread_name = rec["worker"] if not thread_key[1] else f"{rec['worker']}/{tid}"
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": 1,
+                    "tid": tid,
+                    "args": {"name": thread_name},
+                }
+            )
+        events.append(
+            {
+                "name": rec["phase"],
+                "cat": rec["phase"],
+                "ph": "X",
+                "ts": (rec["ts"] - start_ns) / 1000,
+                "dur": rec["dur"] / 1000,
+                "pid": 1,
+                "tid": tid,
+                "args": {"test": rec["test"], "instance": rec["instance"], **rec.get("args", {})},
+            }
+        )
+
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def save_report(*, timings_dir: pl.Path, dest_dir: pl.Path) -> pl.Path | None:
+    """Merge spans saved by all pytest workers and save the report and the trace file.
+
+    Returns:
+        Path | None: A path to the report file, or None if no spans were recorded.
+    """
+    records = load_records(timings_dir)
+    if not records:
+        return None
+
+    report_file = dest_dir / REPORT_FILENAME
+    report_file.write_text(get_report(records), encoding="utf-8")
+    with open(dest_dir / TRACE_FILENAME, "w", encoding="utf-8") as out_fp:
+        json.dump(get_trace(records), out_fp, separators=(",", ":"))
+
+    LOGGER.info(f"Timings report saved to '{report_file}'.")
+    return report_file
@@ -0,0 +1,258 @@
+"""In-process calculation of minimum transaction fee.
+
+The calculation follows the ledger `estimateMinFeeTx`, the same function that is used by
+`cardano-cli transaction calculate-min-fee`:
+
+* dummy key witnesses are added to the transaction and the size of the transaction is measured
+* min fee = `txFeePerByte` * size + `txFeeFixed`
+* + cost of execution units of all redeemers (`executionUnitPrices`)
+* + tiered fee for reference scripts (`minFeeRefScriptCostPerByte`)
+
+The size is calculated from the original CBOR of the transaction body file, the transaction is
+never re-encoded, so the result doesn't depend on how the CLI encoded the transaction.
+"""
+
+import dataclasses
+import fractions
+import functools
+import json
+import logging
+import math
+import pathlib as pl
+import typing as tp
+
+import cbor2
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import configuration
+
+LOGGER = logging.getLogger(__name__)
+
+# Reference scripts fee tiers, see `tierRefScriptFee` in the ledger
+REF_SCRIPT_SIZE_INCREMENT = 25_600
+REF_SCRIPT_COST_MULTIPLIER = fractions.Fraction(6, 5)
+
+# Max number of builds of the final transaction, more builds are needed only when the fee
+# calculated from the draft transaction is not sufficient for the final transaction
+MAX_FEE_ITERATIONS = 3
+
+# Key witness `[vkey, signature]`
+_DUMMY_VKEY_WITNESS = [bytes(32), bytes(64)]
+# Bootstrap witness `[vkey, signature, chain code, attributes]`
+_DUMMY_BOOTSTRAP_WITNESS = [bytes(32), bytes(64), bytes(32), b"\xa0"]
+# Tag used for encoding sets since the Conway era
+_SET_TAG = 258
+
+
+@dataclasses.dataclass(frozen=True)
+class FeeParams:
+    fee_per_byte: int
+    fee_fixed: int
+    price_memory: fractions.Fraction
+    price_steps: fractions.Fraction
+    ref_script_cost_per_byte: fractions.Fraction
+
+
+def _to_fraction(value: float | int | None) -> fractions.Fraction:
+    # Convert through `str`, so e.g. 0.0577 is 577/10000 and not the binary approximation
+    return fractions.Fraction(str(value or 0))
+
+
+def get_fee_params(pparams: dict) -> FeeParams:
+    """Get fee related values from protocol parameters."""
+    prices = pparams.get("executionUnitPrices") or {}
+    return FeeParams(
+        fee_per_byte=int(pparams["txFeePerByte"]),
+        fee_fixed=int(pparams["txFeeFixed"]),
+        price_memory=_to_fraction(prices.get("priceMemory")),
+        price_steps=_to_fraction(prices.get("priceSteps")),
+        ref_script_cost_per_byte=_to_fraction(pparams.get("minFeeRefScriptCostPerByte")),
+    )
+
+
+@functools.cache
+def _load_fee_params(pparams_file: pl.Path, mtime_ns: int) -> FeeParams:  # noqa: ARG001
+    with open(pparams_file, encoding="utf-8") as in_fp:
+        return get_fee_params(json.load(in_fp))
+
+
+def load_fee_params(*, cluster_obj: clusterlib.ClusterLib) -> FeeParams:
+    """Load fee related protocol parameters from the cached protocol parameters file."""
+    cluster_obj.create_pparams_file()
+    pparams_file = cluster_obj.pparams_file
+    return _load_fee_params(pparams_file, pparams_file.stat().st_mtime_ns)
+
+
+def _get_witnesses_size(*, key_witness_count: int, byron_witness_count: int, tagged: bool) -> int:
+    """Get size of witness set entries for the dummy key witnesses."""
+    size = 0
+    for key, dummy_witness, count in (
+        (0, _DUMMY_VKEY_WITNESS, key_witness_count),
+        (2, _DUMMY_BOOTSTRAP_WITNESS, byron_witness_count),
+    ):
+        if count <= 0:
+            continue
+        witnesses: tp.Any = [dummy_witness] * count
+        if tagged:
+            witnesses = cbor2.CBORTag(_SET_TAG, witnesses)
+        size += len(cbor2.dumps(key)) + len(cbor2.dumps(witnesses))
+    return size
+
+
+def _get_redeemers_exunits(witness_set: dict) -> tuple[int, int]:
+    """Return total memory and steps of all redeemers in the witness set."""
+    redeemers = witness_set.get(5) or []
+    # Since Conway, redeemers can be encoded also as map `{[tag, index]: [data, exunits]}`
+    records = redeemers.values() if isinstance(redeemers, dict) else redeemers
+    mem = steps = 0
+    for r in records:
+        r_mem, r_steps = r[-1]
+        mem += r_mem
+        steps += r_steps
+    return mem, steps
+
+
+def get_ref_scripts_fee(*, fee_params: FeeParams, reference_script_size: int) -> int:
+    """Get tiered fee for reference scripts."""
+    acc = fractions.Fraction(0)
+    tier_price = fee_params.ref_script_cost_per_byte
+    remaining = reference_script_size
+    while remaining >= REF_SCRIPT_SIZE_INCREMENT:
+        acc += REF_SCRIPT_SIZE_INCREMENT * tier_price
+        tier_price *= REF_SCRIPT_COST_MULTIPLIER
+        remaining -= REF_SCRIPT_SIZE_INCREMENT
+    return math.floor(acc + remaining * tier_price)
+
+
+def calculate_min_fee(
+    *,
+    fee_params: FeeParams,
+    tx_file: clusterlib.FileType,
+    witness_count: int,
+    byron_witness_count: int = 0,
+    reference_script_size: int = 0,
+) -> int:
+    """Calculate minimum fee of unwitnessed transaction from the transaction file."""
+    with open(tx_file, encoding="utf-8") as in_fp:
+        tx_envelope = json.load(in_fp)
+    tx_bytes = bytes.fromhex(tx_envelope["cborHex"])
+    tx_loaded = cbor2.loads(tx_bytes)
+    tagged = "Conway" in tx_envelope.get("type", "") or "Dijkstra" in tx_envelope.get("type", "")
+
+    if isinstance(tx_loaded, dict):
+        # Just the transaction body, the rest of the transaction is
+        # `[body, {}, true, null]`, i.e. array header, empty map, bool and null
+        witness_set: dict = {}
+        tx_size = len(tx_bytes) + 4
+    else:
+        witness_set = tx_loaded[1]
+        tx_size = len(tx_bytes)
+        if 0 in witness_set or 2 in witness_set:
+            msg = f"Transaction '{tx_file}' is already witnessed."
+            raise ValueError(msg)
+
+    tx_size += _get_witnesses_size(
+        key_witness_count=witness_count, byron_witness_count=byron_witness_count, tagged=tagged
+    )
+
+    mem, steps = _get_redeemers_exunits(witness_set)
+    scripts_fee = math.ceil(mem * fee_params.price_memory + steps * fee_params.price_steps)
+
+    return (
+        fee_params.fee_per_byte * tx_size
+        + fee_params.fee_fixed
+        + scripts_fee
+        + get_ref_scripts_fee(fee_params=fee_params, reference_script_size=reference_script_size)
+    )
+
+
+def get_tx_body_fee(tx_file: clusterlib.FileType) -> int:
+    """Get the fee from the body of the transaction file."""
+    with open(tx_file, encoding="utf-8") as in_fp:
+        tx_loaded = cbor2.loads(bytes.fromhex(json.load(in_fp)["cborHex"]))
+    tx_body = tx_loaded if isinstance(tx_loaded, dict) else tx_loaded[0]
+    return int(tx_body[2])
+
+
+def get_fee_for_draft(*, fee_params: FeeParams, draft_min_fee: int, draft_fee: int) -> int:
+    """Get fee that covers the transaction built from the draft with the fee itself.
+
+    Apart from the fee, the final transaction differs from the draft only in the amount of
+    the change output. The change decreases by the same amount the fee increases, so the size
+    of the change output can only decrease. Only the size of the fee field is therefore
+    accounted for, and the resulting fee is never lower than the min fee of the final
+    transaction.
+    """
+    draft_fee_size = len(cbor2.dumps(draft_fee))
+    fee = draft_min_fee
+    # The size of CBOR encoded uint can grow at most 4 times, each time the fee is
+    # recalculated, so the loop always ends
+    while True:
+        size_delta = len(cbor2.dumps(fee)) - draft_fee_size
+        new_fee = draft_min_fee + max(size_delta, 0) * fee_params.fee_per_byte
+        if new_fee <= fee:
+            return fee
+        fee = new_fee
+
+
+def build_raw_with_min_fee(
+    *,
+    cluster_obj: clusterlib.ClusterLib,
+    build_func: tp.Callable[..., clusterlib.TxRawOutput],
+    tx_name: str,
+    witness_count: int,
+    byron_witness_count: int = 0,
+    reference_script_size: int = 0,
+) -> clusterlib.TxRawOutput:
+    """Build a transaction using `build_func` with fee calculated in-process.
+
+    The `build_func` is called with `tx_name` and `fee` arguments and is expected to build
+    the transaction with `transaction build-raw`. A draft transaction is built first, and
+    the fee is calculated in-process from the draft, see `get_fee_for_draft`. The final
+    transaction is then built once with the calculated fee. It is built again only when its
+    own min fee is higher, i.e. when it needs more inputs to cover the fee.
+    """
+    fee_params = load_fee_params(cluster_obj=cluster_obj)
+
+    def _get_min_fee(tx_output: clusterlib.TxRawOutput) -> int:
+        min_fee = calculate_min_fee(
+            fee_params=fee_params,
+            tx_file=tx_output.out_file,
+            witness_count=witness_count,
+            byron_witness_count=byron_witness_count,
+            reference_script_size=reference_script_size,
+        )
+        if configuration.INPROCESS_FEE_VERIFY:
+            cli_fee = cluster_obj.g_transaction.estimate_fee(
+                txbody_file=tx_output.out_file,
+                txin_count=len(tx_output.txins),
+                txout_count=len(tx_output.txouts),
+                witness_count=witness_count,
+                byron_witness_count=byron_witness_count,
+                reference_script_size=reference_script_size,
+            )
+            if cli_fee != min_fee:
+                msg = (
+                    f"Fee calculated in-process ({min_fee}) doesn't match fee calculated "
+                    f"by `cardano-cli` ({cli_fee}) for '{tx_output.out_file}'."
+                )
+                raise AssertionError(msg)
+        return min_fee
+
+    draft_output = build_func(tx_name=f"{tx_name}_estimate", fee=cluster_obj.g_transaction.min_fee)
+    fee = get_fee_for_draft(
+        fee_params=fee_params,
+        draft_min_fee=_get_min_fee(draft_output),
+        draft_fee=get_tx_body_fee(draft_output.out_file),
+    )
+
+    for i in range(MAX_FEE_ITERATIONS):
+        tx_output = build_func(tx_name=f"{tx_name}_fee{i}" if i else tx_name, fee=fee)
+        min_fee = _get_min_fee(tx_output)
+        if min_fee <= fee:
+            return tx_output
+        LOGGER.debug(f"Fee {fee} is not sufficient for '{tx_output.out_file}', needs {min_fee}.")
+        fee = min_fee
+
+    msg = f"Failed to find sufficient fee for transaction '{tx_name}'."
+    raise RuntimeError(msg)
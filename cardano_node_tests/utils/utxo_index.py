@@ -0,0 +1,206 @@
+"""Local index of UTxOs of addresses used by the framework.
+
+Every `get_utxo` or `get_address_balance` call spawns a `cardano-cli query utxo` process.
+The index keeps UTxOs of addresses that were queried through it in memory, separately for each
+cluster instance. UTxOs of multiple addresses are always queried with a single `query utxo` call.
+
+Transactions submitted by the framework update the index - spent inputs are removed and produced
+outputs are added. Index entries older than `UTXO_INDEX_MAX_AGE_SEC` are reconciled with
+the node. The index is local to a pytest worker and the addresses can be spent also by other
+workers, or by tests submitting transactions on their own, so the max age needs to be short.
+With the default max age of 0, nothing is cached and the index is used just for querying UTxOs
+of multiple addresses at once.
+"""
+
+import dataclasses
+import logging
+import threading
+import time
+import typing as tp
+
+from cardano_clusterlib import clusterlib
+from cardano_clusterlib import txtools as cl_txtools
+
+from cardano_node_tests.utils import cluster_nodes
+from cardano_node_tests.utils import configuration
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class _AddrEntry:
+    # UTxO records keyed by "<txhash>#<txix>", a single UTxO has a record for each coin
+    utxos: dict[str, list[clusterlib.UTXOData]]
+    synced: float
+
+
+class UTxOIndexCache:
+    """Cache UTxOs of addresses for each cluster instance."""
+
+    entries: tp.ClassVar[dict[int, dict[str, _AddrEntry]]] = {}
+    lock: tp.ClassVar[threading.Lock] = threading.Lock()
+
+
+def _get_utxo_id(utxo: clusterlib.UTXOData) -> str:
+    return f"{utxo.utxo_hash}#{utxo.utxo_ix}"
+
+
+def _is_enabled() -> bool:
+    return configuration.UTXO_INDEX_MAX_AGE_SEC > 0
+
+
+def invalidate(instance_num: int | None = None) -> None:
+    """Drop the index of the given cluster instance, or of all instances."""
+    with UTxOIndexCache.lock:
+        if instance_num is None:
+            UTxOIndexCache.entries.clear()
+        else:
+            UTxOIndexCache.entries.pop(instance_num, None)
+
+
+def get_utxos(
+    *, cluster_obj: clusterlib.ClusterLib, addresses: tp.Sequence[str]
+) -> dict[str, list[clusterlib.UTXOData]]:
+    """Return UTxOs of the given addresses.
+
+    Addresses that are not indexed, or whose index entries are too old, are queried with a single
+    `query utxo` call.
+    """
+    instance_num = cluster_nodes.get_instance_num()
+    addresses = list(dict.fromkeys(addresses))
+    now = time.monotonic()
+
+    with UTxOIndexCache.lock:
+        instance_entries = UTxOIndexCache.entries.setdefault(instance_num, {})
+        to_query = [
+            a
+            for a in addresses
+            if (e := instance_entries.get(a)) is None
+            or now - e.synced > configuration.UTXO_INDEX_MAX_AGE_SEC
+        ]
+
+    queried: dict[str, dict[str, list[clusterlib.UTXOData]]] = {a: {} for a in to_query}
+    if to_query:
+        for u in cluster_obj.g_query.get_utxo(address=to_query):
+            queried[u.address].setdefault(_get_utxo_id(u), []).append(u)
+
+    with UTxOIndexCache.lock:
+        instance_entries = UTxOIndexCache.entries.setdefault(instance_num, {})
+        if _is_enabled():
+            for a, utxos in queried.items():
+                instance_entries[a] = _AddrEntry(utxos=utxos, synced=now)
+
+        return {
+            a: [
+                u
+                for utxo_recs in (
+                    queried[a] if a in queried else instance_entries[a].utxos
+                ).values()
+                for u in utxo_recs
+            ]
+            for a in addresses
+        }
+
+
+def get_balances(
+    *, cluster_obj: clusterlib.ClusterLib, addresses: tp.Sequence[str]
+) -> dict[str, int]:
+    """Return Lovelace balances of the given addresses."""
+    return {
+        a: sum(u.amount for u in utxos if u.coin == clusterlib.DEFAULT_COIN)
+        for a, utxos in get_utxos(cluster_obj=cluster_obj, addresses=addresses).items()
+    }
+
+
+def _get_produced_utxos(
+    *, txid: str, tx_raw_output: clusterlib.TxRawOutput
+) -> list[clusterlib.UTXOData]:
+    """Return UTxO records for outputs of a transaction built with `build-raw`."""
+    txouts = tx_raw_output.txouts
+    joined_txouts = cl_txtools.get_joined_txouts(txouts=txouts)
+    # The `txouts` are either joined by address, or each record is a separate output
+    if tx_raw_output.txouts_count == len(joined_txouts):
+        txouts_with_ix = [(ix, t) for ix, recs in enumerate(joined_txouts) for t in recs]
+    else:
+        txouts_with_ix = list(enumerate(txouts))
+
+    return [
+        clusterlib.UTXOData(
+            utxo_hash=txid,
+            utxo_ix=ix,
+            amount=t.amount,
+            address=t.address,
+            coin=t.coin,
+            datum_hash=t.datum_hash,
+        )
+        for ix, t in txouts_with_ix
+    ]
+
+
+def _is_simple_tx(tx_raw_output: clusterlib.TxRawOutput) -> bool:
+    """Check if outputs of the transaction can be derived from `TxRawOutput`.
+
+    Change of transactions built with `transaction build` is not known, and outputs of
+    transactions with scripts depend on the script result.
+    """
+    return not (
+        tx_raw_output.change_address
+        or tx_raw_output.script_txins
+        or tx_raw_output.mint
+        or tx_raw_output.return_collateral_txouts
+        or any(
+            t.datum_hash_file
+            or t.datum_hash_cbor_file
+            or t.datum_hash_value
+            or t.datum_embed_file
+            or t.datum_embed_cbor_file
+            or t.datum_embed_value
+            or t.inline_datum_file
+            or t.inline_datum_cbor_file
+            or t.inline_datum_value
+            or t.reference_script_file
+            for t in tx_raw_output.txouts
+        )
+    )
+
+
+def apply_tx(*, cluster_obj: clusterlib.ClusterLib, tx_raw_output: clusterlib.TxRawOutput) -> None:
+    """Update the index with a transaction submitted by the framework.
+
+    Spent inputs are removed from the index and produced outputs are added to it. When the outputs
+    can't be derived from `tx_raw_output`, the involved addresses are dropped from the index,
+    so they are queried again next time.
+    """
+    if not _is_enabled():
+        return
+
+    instance_num = cluster_nodes.get_instance_num()
+    with UTxOIndexCache.lock:
+        instance_entries = UTxOIndexCache.entries.get(instance_num) or {}
+        involved = {
+            *(u.address for u in tx_raw_output.txins),
+            *(t.address for t in tx_raw_output.txouts),
+            tx_raw_output.change_address,
+        }.intersection(instance_entries)
+    if not involved:
+        return
+
+    produced: list[clusterlib.UTXOData] = []
+    simple_tx = _is_simple_tx(tx_raw_output)
+    if simple_tx:
+        txid = cluster_obj.g_transaction.get_txid(tx_body_file=tx_raw_output.out_file)
+        produced = _get_produced_utxos(txid=txid, tx_raw_output=tx_raw_output)
+
+    with UTxOIndexCache.lock:
+        instance_entries = UTxOIndexCache.entries.get(instance_num) or {}
+        if not simple_tx:
+            for a in involved:
+                instance_entries.pop(a, None)
+            return
+
+        for u in tx_raw_output.txins:
+            if e := instance_entries.get(u.address):
+                e.utxos.pop(_get_utxo_id(u), None)
+        for u in produced:
+            if e := instance_entries.get(u.address):
+                e.utxos.setdefault(_get_utxo_id(u), []).append(u)
@@ -0,0 +1,73 @@
+import gzip
+import pathlib as pl
+
+import pytest
+
+from cardano_node_tests.utils import artifacts
+
+
+@pytest.fixture
+def state_dir(tmp_path: pl.Path) -> pl.Path:
+    state_dir = tmp_path / "state-cluster0"
+    (state_dir / "nodes").mkdir(parents=True)
+    (state_dir / "nodes" / "node-pool1").write_text("pool1")
+    (state_dir / "nodes" / "current").symlink_to("node-pool1")
+    (state_dir / artifacts.CLUSTER_INSTANCE_ID_FILENAME).write_text("abcd")
+    (state_dir / "genesis.json").write_text("{}")
+    (state_dir / "pool1.stdout").write_bytes(b"log line\n" * 200_000)
+    (state_dir / "pool1.stdout.1").write_text("rotated\n")
+    return state_dir
+
+
+@pytest.mark.parametrize("workers", (0, 2), ids=("serial", "parallel"))
+def test_save_cluster_artifacts(
+    tmp_path: pl.Path, state_dir: pl.Path, monkeypatch: pytest.MonkeyPatch, workers: int
+):
+    monkeypatch.setattr(artifacts.configuration, "ARTIFACTS_COMPRESS_MB", 1)
+    monkeypatch.setattr(artifacts.configuration, "ARTIFACTS_WORKERS", workers)
+    save_dir = tmp_path / "save"
+
+    artifacts.save_cluster_artifacts(save_dir=save_dir, state_dir=state_dir)
+
+    destdir = save_dir / "cluster_artifacts" / "state-cluster0_abcd"
+    # Large log is compressed
+    with gzip.open(destdir / "pool1.stdout.gz") as in_fp:
+        assert in_fp.read() == (state_dir / "pool1.stdout").read_bytes()
+    # Files that don't change are hardlinked
+    assert (destdir / "genesis.json").stat().st_ino == (state_dir / "genesis.json").stat().st_ino
+    assert (destdir / "nodes" / "current").is_symlink()
+
+    # Collect artifacts again, only the changed log is collected
+    gz_mtime = (destdir / "pool1.stdout.gz").stat().st_mtime_ns
+    # Log rotation replaces the file
+    (state_dir / "pool1.stdout.1").unlink()
+    (state_dir / "pool1.stdout.1").write_text("rotated\nrotated again\n")
+    artifacts.save_cluster_artifacts(save_dir=save_dir, state_dir=state_dir)
+
+    assert (destdir / "pool1.stdout.gz").stat().st_mtime_ns == gz_mtime
+    assert (destdir / "pool1.stdout.1").read_text() == "rotated\nrotated again\n"
+
+
+def test_live_logs_copied(tmp_path: pl.Path, state_dir: pl.Path):
+    save_dir = tmp_path / "save"
+
+    artifacts.save_cluster_artifacts(save_dir=save_dir, state_dir=state_dir)
+    live_log = save_dir / "cluster_artifacts" / "state-cluster0_abcd" / "pool1.stdout"
+    assert live_log.stat().st_ino != (state_dir / "pool1.stdout").stat().st_ino
+
+    artifacts.save_cluster_artifacts(save_dir=save_dir, state_dir=state_dir, cluster_stopped=True)
+    # The copy was already collected and it is not replaced
+    assert live_log.stat().st_ino != (state_dir / "pool1.stdout").stat().st_ino
+
+
+def test_running_cluster_files_copied(tmp_path: pl.Path, state_dir: pl.Path):
+    save_dir = tmp_path / "save"
+
+    artifacts.save_cluster_artifacts(save_dir=save_dir, state_dir=state_dir, keeps_running=True)
+    destdir = save_dir / "cluster_artifacts" / "state-cluster0_abcd"
+    # Tests can modify the files of the running cluster in place
+    (state_dir / "nodes" / "node-pool1").write_text("modified")
+    (state_dir / "genesis.json").write_text('{"modified": true}')
+
+    assert (destdir / "nodes" / "node-pool1").read_text() == "pool1"
+    assert (destdir / "genesis.json").read_text() == "{}"
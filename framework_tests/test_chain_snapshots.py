@@ -0,0 +1,139 @@
+import json
+import pathlib as pl
+import pickle
+import shutil
+import socket
+import typing as tp
+
+import pytest
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.cluster_management import chain_snapshots
+from cardano_node_tests.utils import cluster_nodes
+from cardano_node_tests.utils import faucet
+from cardano_node_tests.utils import temptools
+from cardano_node_tests.utils import utxo_index
+from framework_tests import test_faucet
+
+
+def _fake_genesis_hash(*, genesis_file: pl.Path, byron: bool = False) -> str:
+    genesis = json.loads(genesis_file.read_text())
+    return f"byron_{genesis['startTime']}" if byron else f"shelley_{genesis['systemStart']}"
+
+
+@pytest.fixture
+def state_dir(tmp_path: pl.Path, monkeypatch: pytest.MonkeyPatch) -> pl.Path:
+    monkeypatch.setattr(chain_snapshots, "_get_genesis_hash", _fake_genesis_hash)
+    state_dir = tmp_path / "state-cluster0"
+    (state_dir / "byron").mkdir(parents=True)
+    (state_dir / "shelley").mkdir()
+    (state_dir / "byron" / "genesis.json").write_text(json.dumps({"startTime": 1750000000}))
+    (state_dir / "shelley" / "genesis.json").write_text(
+        json.dumps({"systemStart": "2025-06-15T15:06:40Z", "epochLength": 1000})
+    )
+    (state_dir / "cluster_start_time").write_text("1750000000\n")
+    for name in ("bft1", "pool1"):
+        (state_dir / f"config-{name}.json").write_text(
+            json.dumps({"ByronGenesisHash": "", "ShelleyGenesisHash": "", "Protocol": "Cardano"})
+        )
+    (state_dir / "topology-pool1.json").write_text(json.dumps({"localRoots": []}))
+    return state_dir
+
+
+def test_shift_genesis_start(state_dir: pl.Path):
+    chain_snapshots.shift_genesis_start(state_dir=state_dir, shift_sec=3725)
+
+    byron_genesis = json.loads((state_dir / "byron" / "genesis.json").read_text())
+    shelley_genesis = json.loads((state_dir / "shelley" / "genesis.json").read_text())
+    assert byron_genesis["startTime"] == 1750003725
+    assert shelley_genesis == {"systemStart": "2025-06-15T16:08:45Z", "epochLength": 1000}
+    assert (state_dir / "cluster_start_time").read_text() == "1750003725\n"
+
+    for name in ("bft1", "pool1"):
+        config = json.loads((state_dir / f"config-{name}.json").read_text())
+        assert config == {
+            "ByronGenesisHash": "byron_1750003725",
+            "ShelleyGenesisHash": "shelley_2025-06-15T16:08:45Z",
+            "Protocol": "Cardano",
+        }
+    assert json.loads((state_dir / "topology-pool1.json").read_text()) == {"localRoots": []}
+
+
+def test_clean_state_copy(state_dir: pl.Path):
+    (state_dir / "pool1.stdout").write_text("")
+    (state_dir / "start-cluster.log").write_text("")
+    db_dir = state_dir / "db-pool1"
+    db_dir.mkdir()
+    (db_dir / "protocolMagicId").write_text("42")
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.bind(str(state_dir / "pool1.socket"))
+
+    chain_snapshots._clean_state_copy(state_dir)
+
+    assert not (state_dir / "pool1.stdout").exists()
+    assert not (state_dir / "start-cluster.log").exists()
+    assert not (state_dir / "pool1.socket").exists()
+    assert (db_dir / "protocolMagicId").exists()
+    assert (state_dir / "config-pool1.json").exists()
+
+
+def test_needs_capture(tmp_path: pl.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(temptools.PytestTempDirs, "pytest_root_tmp", tmp_path)
+    assert chain_snapshots.needs_capture(0)
+
+    snapshot_dir = chain_snapshots.get_snapshot_dir(instance_num=0)
+    snapshot_dir.mkdir(parents=True)
+    (snapshot_dir / chain_snapshots.CAPTURE_FAILED_FILE).touch()
+    assert not chain_snapshots.needs_capture(0)
+    assert chain_snapshots.needs_capture(1)
+
+
+def test_restore_then_fund(state_dir: pl.Path, tmp_path: pl.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(temptools.PytestTempDirs, "pytest_root_tmp", tmp_path)
+    monkeypatch.setattr(temptools.PytestTempDirs, "pytest_shared_tmp", tmp_path)
+    monkeypatch.setattr(temptools, "get_basetemp", lambda: tmp_path)
+    cluster_env = cluster_nodes.ClusterEnv(
+        socket_path=state_dir / "bft1.socket",
+        state_dir=state_dir,
+        work_dir=tmp_path,
+        instance_num=0,
+        cluster_era="",
+        command_era="",
+    )
+    monkeypatch.setattr(cluster_nodes, "get_cluster_env", lambda **_: cluster_env)
+    monkeypatch.setattr(chain_snapshots, "_resume_cluster", lambda **_: None)
+
+    snapshot_dir = chain_snapshots.get_snapshot_dir(instance_num=0)
+    shutil.copytree(state_dir, snapshot_dir / chain_snapshots.STATE_DIR_NAME)
+    with open(snapshot_dir / chain_snapshots.STATE_DIR_NAME / cluster_nodes.ADDRS_DATA, "wb") as fp:
+        pickle.dump({"faucet": test_faucet.FAUCET_DATA}, fp)
+    addrs_data_dir = tmp_path / "addrs_data"
+    addrs_data_dir.mkdir()
+    (snapshot_dir / chain_snapshots.METADATA_FILE).write_text(
+        json.dumps({"addrs_data_dir": str(addrs_data_dir), "captured_at": 0, "services": []})
+    )
+
+    # The faucet UTxO tracked on the chain that is replaced by the snapshot doesn't exist
+    # on the restored chain
+    cluster_obj: tp.Any = test_faucet.FakeClusterLib(tmp_path=tmp_path)
+    funding_dir = faucet._get_funding_dir(test_faucet.FAUCET_ADDR)
+    stale_utxo = clusterlib.UTXOData(utxo_hash="bb", utxo_ix=0, amount=100_000, address="")
+    faucet._write_pickle(funding_dir / faucet.FAUCET_UTXOS_FILE_NAME, [stale_utxo])
+    cluster_obj.g_transaction.spent.add("bb#0")
+    monkeypatch.setattr(utxo_index.UTxOIndexCache, "entries", {0: {}})
+
+    shutil.rmtree(state_dir)
+    assert chain_snapshots.restore()
+    assert 0 not in utxo_index.UTxOIndexCache.entries
+
+    tx_raw_output = faucet._fund_pipelined(
+        cluster_obj=cluster_obj,
+        faucet_data=test_faucet.FAUCET_DATA,
+        fund_txouts=[clusterlib.TxOut(address="mine", amount=20)],
+        tx_name="test",
+        destination_dir=tmp_path,
+    )
+
+    # The first funding transaction spends UTxOs queried on the restored chain
+    assert len(cluster_obj.g_transaction.built) == 1
+    assert [u.utxo_hash for u in tx_raw_output.txins] == ["aa"]
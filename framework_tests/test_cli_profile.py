@@ -0,0 +1,88 @@
+import json
+import pathlib as pl
+import subprocess
+
+import pytest
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests import cardano_cli_profile
+from cardano_node_tests.utils import custom_clusterlib
+
+# Fake `cardano-cli` that fails with exit code 3 when called with `--fail`
+FAKE_CLI = """#!/bin/sh
+case "$*" in
+  *--fail*) printf 'out' ; printf 'Command failed' >&2 ; exit 3 ;;
+  *--timeout*) exec sleep 5 ;;
+esac
+printf '{"epoch": 1}'
+"""
+
+
+@pytest.fixture
+def cluster_obj(tmp_path: pl.Path) -> custom_clusterlib.ClusterLib:
+    fake_cli = tmp_path / "cardano-cli"
+    fake_cli.write_text(FAKE_CLI)
+    fake_cli.chmod(0o755)
+
+    cluster_obj = custom_clusterlib.ClusterLib.__new__(custom_clusterlib.ClusterLib)
+    cluster_obj.command_era = "latest"
+    cluster_obj.cli_coverage = {}
+    cluster_obj.cli_profile = {}
+    cluster_obj._cli_command = str(fake_cli)
+    cluster_obj._cli_log = ""
+    cluster_obj.query_cache = custom_clusterlib.QueryCache(
+        clusterlib_obj=cluster_obj, enabled_queries=()
+    )
+    return cluster_obj
+
+
+def test_record_cli_profile(cluster_obj: custom_clusterlib.ClusterLib):
+    cluster_obj.cli(["query", "tip", "--testnet-magic", "42"])
+    cluster_obj.cli(["query", "tip", "--testnet-magic", "42"])
+    with pytest.raises(clusterlib.CLIError, match="Command failed") as excinfo:
+        cluster_obj.cli(["query", "tip", "--fail"])
+    with pytest.raises(subprocess.TimeoutExpired):
+        cluster_obj.cli(["query", "utxo", "--timeout"], timeout=0.1)
+
+    assert isinstance(excinfo.value, custom_clusterlib.CLIProcessError)
+    assert excinfo.value.returncode == 3
+
+    subcommand = f"{cluster_obj._cli_command} latest query tip"
+    tip_rec = cluster_obj.cli_profile[subcommand]
+    assert tip_rec["count"] == 3
+    assert tip_rec["failed"] == 1
+    # Output of the failed command is recorded too
+    assert tip_rec["stdout_bytes"] == 2 * 12 + 3
+    assert tip_rec["stderr_bytes"] == 14
+    assert tip_rec["exit_codes"] == {"3": 1}
+    assert sum(tip_rec["histogram"].values()) == 3
+    utxo_rec = cluster_obj.cli_profile[f"{cluster_obj._cli_command} latest query utxo"]
+    assert utxo_rec["timed_out"] == 1
+
+
+def test_report(tmp_path: pl.Path):
+    profiles = []
+    for worker, durations in enumerate(((0.02, 0.03), (0.02, 2.0))):
+        profile: dict = {}
+        for duration in durations:
+            custom_clusterlib.record_cli_profile(
+                subcommand="cardano-cli latest query tip",
+                duration=duration,
+                status="ok",
+                stdout_size=10,
+                stderr_size=0,
+                profile_dict=profile,
+            )
+        profile_file = tmp_path / f"cli_profile_{worker}.json"
+        profile_file.write_text(json.dumps(profile))
+        profiles.append(profile_file)
+
+    report = cardano_cli_profile.get_report(cardano_cli_profile.get_profile(profiles))
+
+    tip_report = report["cardano-cli latest query tip"]
+    assert tip_report["count"] == 4
+    assert tip_report["stdout_bytes"] == 40
+    assert tip_report["total_sec"] == pytest.approx(2.07)
+    # Percentiles are upper bounds of histogram buckets
+    assert 0.02 <= tip_report["p50_sec"] < 0.025
+    assert 2.0 <= tip_report["p99_sec"] < 2.5
@@ -0,0 +1,209 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+import typing as tp
+
+import psycopg2.extensions
+import pytest
+
+from cardano_node_tests.utils import dbsync_conn
+from cardano_node_tests.utils import dbsync_queries
+from cardano_node_tests.utils import dbsync_utils
+
+# Benchmark against a real Postgres database, e.g. `BENCH_PGDATABASE=postgres`
+BENCH_PGDATABASE = os.environ.get("BENCH_PGDATABASE") or ""
+
+
+class FakeConnInfo:
+    def __init__(self, conn: "FakeConn") -> None:
+        self.conn = conn
+
+    @property
+    def transaction_status(self) -> int:
+        return self.conn.tx_status
+
+
+class FakeConn:
+    def __init__(self) -> None:
+        self.closed = 0
+        self.autocommit = False
+        self.tx_status: int = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        self.info = FakeConnInfo(conn=self)
+        self.rollbacks = 0
+
+    def get_transaction_status(self) -> int:
+        return self.tx_status
+
+    def commit(self) -> None:
+        self.tx_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+        self.tx_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self) -> None:
+        self.closed = 1
+
+
+@pytest.fixture
+def fake_connect(monkeypatch: pytest.MonkeyPatch) -> tp.Generator[list[FakeConn]]:
+    created: list[FakeConn] = []
+
+    def _connect(dsn: str) -> FakeConn:
+        assert dsn == ""
+        conn = FakeConn()
+        created.append(conn)
+        return conn
+
+    monkeypatch.setattr(dbsync_conn.psycopg2, "connect", _connect)
+    monkeypatch.setattr(dbsync_conn.DBSyncCache, "pools", {})
+    yield created
+    dbsync_conn.close_all()
+
+
+def _get_conn_in_thread() -> tp.Any:
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+
+        def _get_conn() -> tp.Any:
+            with dbsync_conn.connection() as conn:
+                return conn
+
+        return executor.submit(_get_conn).result()
+
+
+def test_conn_per_thread(fake_connect: list[FakeConn]):
+    with dbsync_conn.connection() as conn:
+        assert conn.autocommit
+        # Nested context uses the same connection
+        with dbsync_conn.connection() as nested_conn:
+            assert nested_conn is conn
+        # Other thread gets other connection while this thread holds its connection
+        assert _get_conn_in_thread() is not conn
+
+    # Connections were returned to the pool and are reused by any thread
+    assert _get_conn_in_thread() in fake_connect
+    with dbsync_conn.connection() as conn:
+        assert conn in fake_connect
+    assert len(fake_connect) == 2
+
+    dbsync_conn.close_all()
+    assert all(c.closed for c in fake_connect)
+
+
+def test_pool_max_conns(fake_connect: list[FakeConn], monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(dbsync_conn, "POOL_MAX_CONNS", 2)
+    held = threading.Semaphore(0)
+    release = threading.Event()
+
+    def _hold_conn() -> None:
+        with dbsync_conn.connection():
+            held.release()
+            release.wait(timeout=10)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(_hold_conn) for __ in range(3)]
+        for __ in range(2):
+            assert held.acquire(timeout=5)
+        # The third thread waits for a connection to be returned to the pool
+        assert not held.acquire(timeout=0.2)
+        release.set()
+        for f in futures:
+            f.result()
+
+    assert len(fake_connect) == 2
+
+
+def test_conn_health(fake_connect: list[FakeConn], monkeypatch: pytest.MonkeyPatch):
+    with dbsync_conn.connection() as conn:
+        # Connection is returned to the pool without an open transaction
+        conn.tx_status = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+    assert conn.rollbacks == 1
+    with dbsync_conn.connection() as same_conn:
+        assert same_conn is conn
+        conn.close()
+
+    # Closed connection is replaced
+    with dbsync_conn.connection() as conn:
+        assert conn is fake_connect[1]
+
+    # Old connection is replaced
+    monkeypatch.setattr(dbsync_conn, "CONN_MAX_AGE_SEC", -1)
+    with dbsync_conn.connection() as new_conn:
+        assert new_conn is not conn
+    assert conn.closed
+    assert len(fake_connect) == 3
+
+
+@pytest.mark.usefixtures("fake_connect")
+def test_transaction_queries_in_caller_thread(monkeypatch: pytest.MonkeyPatch):
+    dbsync_utils._get_query_executor.cache_clear()
+    monkeypatch.setattr(dbsync_utils.configuration, "DBSYNC_QUERY_WORKERS", 2)
+
+    def _get_conn() -> tp.Any:
+        with dbsync_conn.connection() as conn:
+            return conn
+
+    queries = {"a": _get_conn, "b": _get_conn}
+    try:
+        with dbsync_queries.db_transaction():
+            assert dbsync_conn.in_transaction()
+            with dbsync_conn.connection() as conn:
+                assert not conn.autocommit
+            assert set(dbsync_utils._run_queries(queries).values()) == {conn}
+        assert conn.autocommit
+        assert not dbsync_conn.in_transaction()
+    finally:
+        dbsync_utils._get_query_executor.cache_clear()
+
+
+@pytest.mark.usefixtures("fake_connect")
+def test_aquery():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def query_conn(num: int) -> tp.Iterator[tuple[int, int]]:
+        with dbsync_conn.connection() as conn:
+            # Both queries hold a connection at the same time
+            barrier.wait()
+            yield num, id(conn)
+
+    async def _gather() -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+        return await asyncio.gather(
+            dbsync_queries.aquery(query_conn, num=1), dbsync_queries.aquery(query_conn, num=2)
+        )
+
+    results = asyncio.run(_gather())
+    assert [r[0][0] for r in results] == [1, 2]
+    assert results[0][0][1] != results[1][0][1]
+
+
+@pytest.mark.skipif(not BENCH_PGDATABASE, reason="set BENCH_PGDATABASE to run the benchmark")
+def test_bench_concurrent_queries(monkeypatch: pytest.MonkeyPatch):
+    """Compare serial and concurrent execution of independent queries.
+
+    Uses the standard PG* env variables for connecting to Postgres.
+    """
+    monkeypatch.setattr(dbsync_conn.configuration, "DBSYNC_DB", BENCH_PGDATABASE)
+    monkeypatch.setattr(dbsync_conn.cluster_nodes, "get_instance_num", lambda: "")
+
+    def _query() -> int:
+        with dbsync_queries.execute(query="SELECT pg_sleep(0.02), 1;") as cur:
+            return int(cur.fetchone()[1])
+
+    queries = {str(i): _query for i in range(16)}
+
+    timings = {}
+    for name, workers in (("serial", 0), ("concurrent", 8)):
+        dbsync_utils._get_query_executor.cache_clear()
+        monkeypatch.setattr(dbsync_utils.configuration, "DBSYNC_QUERY_WORKERS", workers)
+        start = time.perf_counter()
+        assert sum(dbsync_utils._run_queries(queries).values()) == 16
+        timings[name] = time.perf_counter() - start
+
+    dbsync_utils._get_query_executor.cache_clear()
+    dbsync_conn.close_all()
+    print(
+        f"\n16 queries: serial {timings['serial']:.2f}s, "
+        f"concurrent (8 threads) {timings['concurrent']:.2f}s"
+    )
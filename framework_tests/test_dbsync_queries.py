@@ -0,0 +1,85 @@
+import contextlib
+import decimal
+
+import pydantic
+import pytest
+
+from cardano_node_tests.utils import dbsync_queries
+
+REWARD_ROWS = [
+    ("stake_test1", "member", decimal.Decimal(5), 3, 5, "pool1"),
+    # Rows from the `reward_rest` table don't have the pool id
+    ("stake_test1", "treasury", decimal.Decimal(7), 4, 6),
+]
+
+
+class FakeConn:
+    def __init__(self) -> None:
+        self.cursor_kwargs: dict = {}
+
+    def cursor(self, **kwargs: object) -> "FakeCursor":
+        self.cursor_kwargs = kwargs
+        return FakeCursor()
+
+
+class FakeCursor:
+    itersize = 0
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    def execute(self, query: str, vars: tuple) -> None:
+        assert query and vars
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.parametrize("validate", (False, True), ids=("fast", "validated"))
+def test_decode_rows(monkeypatch: pytest.MonkeyPatch, validate: bool):
+    monkeypatch.setattr(dbsync_queries.configuration, "DBSYNC_VALIDATE_ROWS", validate)
+
+    rewards = list(
+        dbsync_queries._decode_rows(cur=iter(REWARD_ROWS), row_cls=dbsync_queries.RewardDBRow)
+    )
+
+    assert [r.amount for r in rewards] == [5, 7]
+    assert [r.pool_id for r in rewards] == ["pool1", ""]
+
+
+def test_decode_rows_invalid(monkeypatch: pytest.MonkeyPatch):
+    invalid_rows = [("stake_test1", "member", "not a number", 3, 5)]
+
+    # Invalid rows are not detected without validation
+    assert list(
+        dbsync_queries._decode_rows(cur=iter(invalid_rows), row_cls=dbsync_queries.RewardDBRow)
+    )
+
+    monkeypatch.setattr(dbsync_queries.configuration, "DBSYNC_VALIDATE_ROWS", True)
+    with pytest.raises(pydantic.ValidationError):
+        list(
+            dbsync_queries._decode_rows(cur=iter(invalid_rows), row_cls=dbsync_queries.RewardDBRow)
+        )
+
+
+@pytest.mark.parametrize(
+    ("server_side", "itersize", "named"),
+    ((True, 500, True), (True, 0, False), (False, 500, False)),
+)
+def test_execute_cursor(
+    monkeypatch: pytest.MonkeyPatch, server_side: bool, itersize: int, named: bool
+):
+    conn = FakeConn()
+    monkeypatch.setattr(
+        dbsync_queries.dbsync_conn, "connection", lambda: contextlib.nullcontext(conn)
+    )
+    monkeypatch.setattr(dbsync_queries.configuration, "DBSYNC_CURSOR_ITERSIZE", itersize)
+
+    with dbsync_queries.execute(query="SELECT %s;", vars=(1,), server_side=server_side) as cur:
+        pass
+
+    assert cur.closed
+    assert bool(conn.cursor_kwargs.get("name")) is named
+    if named:
+        assert conn.cursor_kwargs["withhold"]
+        assert cur.itersize == itersize
@@ -0,0 +1,83 @@
+import contextlib
+import dataclasses
+import typing as tp
+
+import pytest
+
+from cardano_node_tests.utils import dbsync_queries
+from cardano_node_tests.utils import dbsync_utils
+
+TXHASHES = ("aa" * 32, "bb" * 32)
+
+
+def _tx_row(txhash: str, tx_id: int, **kwargs: tp.Any) -> tuple:
+    values: dict[str, tp.Any] = {
+        f.name: 0 if f.type in (int, "int") else None
+        for f in dataclasses.fields(dbsync_queries.TxDBRow)
+    }
+    values.update(
+        tx_id=tx_id,
+        tx_hash=memoryview(bytes.fromhex(txhash)),
+        block_id=1,
+        block_index=0,
+        out_sum=100,
+        fee=10,
+        tx_out_id=tx_id * 10,
+        tx_out_tx_id=tx_id,
+        utxo_ix=0,
+        tx_out_addr="addr_test1",
+        tx_out_value=100,
+        **kwargs,
+    )
+    return (memoryview(bytes.fromhex(txhash)), *values.values())
+
+
+class FakeCursor:
+    def __init__(self, rows: list[tuple]) -> None:
+        self.rows = rows
+
+    def fetchone(self) -> tuple | None:
+        return self.rows.pop(0) if self.rows else None
+
+
+@pytest.fixture
+def executed_queries(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, list[bytes]]]:
+    executed: list[tuple[str, list[bytes]]] = []
+
+    @contextlib.contextmanager
+    def _execute(*, query: str, vars: tp.Sequence = ()) -> tp.Iterator[FakeCursor]:
+        executed.append((query, vars[0]))
+        rows: list[tuple] = []
+        if "FROM tx " in query:
+            rows = [
+                _tx_row(txhash=TXHASHES[0], tx_id=1, metadata_count=1),
+                _tx_row(txhash=TXHASHES[1], tx_id=2),
+            ]
+        elif "FROM tx_metadata " in query:
+            rows = [
+                (memoryview(bytes.fromhex(TXHASHES[0])), 1, 674, {"msg": "hi"}, memoryview(b""), 1)
+            ]
+        yield FakeCursor(rows=rows)
+
+    monkeypatch.setattr(dbsync_queries, "execute", _execute)
+    return executed
+
+
+def test_get_tx_records(executed_queries: list[tuple[str, list[bytes]]]):
+    records = dbsync_utils.get_tx_records(txhashes=[TXHASHES[1], TXHASHES[0].upper()])
+
+    assert [r.tx_hash for r in records] == [TXHASHES[1], TXHASHES[0]]
+    assert records[1].metadata[0].json == {"msg": "hi"}
+    assert not records[0].metadata
+    assert [len(r.txouts) for r in records] == [1, 1]
+
+    # Transaction, txins and metadata queries. Nothing to query in other sections.
+    assert len(executed_queries) == 3
+    # Only the transaction that has metadata is queried for metadata
+    assert executed_queries[-1][1] == [bytes.fromhex(TXHASHES[0])]
+
+
+def test_get_tx_records_missing(executed_queries: list[tuple[str, list[bytes]]]):
+    with pytest.raises(RuntimeError, match="No results"):
+        dbsync_utils.get_tx_records(txhashes=[TXHASHES[0], "cc" * 32])
+    assert len(executed_queries) == 1
@@ -0,0 +1,183 @@
+import pathlib as pl
+import typing as tp
+
+import pytest
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import faucet
+from cardano_node_tests.utils import temptools
+
+FAUCET_ADDR = "addr_test1_faucet"
+
+
+class FakeQuery:
+    def __init__(self) -> None:
+        self.address_queries = 0
+
+    def get_utxo(self, address: str | list[str] = "", txin: str = "") -> list[clusterlib.UTXOData]:
+        assert address or txin
+        if txin:
+            return [clusterlib.UTXOData(utxo_hash=txin, utxo_ix=0, amount=1, address="")]
+        self.address_queries += 1
+        return [clusterlib.UTXOData(utxo_hash="aa", utxo_ix=0, amount=100_000, address=FAUCET_ADDR)]
+
+
+class FakeTransaction:
+    def __init__(self, tmp_path: pl.Path) -> None:
+        self.tmp_path = tmp_path
+        self.built: list[tuple[list[clusterlib.UTXOData], list[clusterlib.TxOut]]] = []
+        self.spent: set[str] = set()
+
+    def calculate_tx_fee(self, **kwargs: tp.Any) -> int:
+        assert not kwargs["join_txouts"]
+        return 100
+
+    def build_raw_tx(
+        self,
+        *,
+        txins: list[clusterlib.UTXOData],
+        txouts: list[clusterlib.TxOut],
+        fee: int,
+        **kwargs: tp.Any,
+    ) -> clusterlib.TxRawOutput:
+        self.built.append((txins, txouts))
+        change = sum(u.amount for u in txins) - sum(t.amount for t in txouts) - fee
+        out_file = self.tmp_path / f"{kwargs['tx_name']}_{len(self.built)}_tx.body"
+        out_file.write_text(str(len(self.built)))
+        return clusterlib.TxRawOutput(
+            txins=txins,
+            txouts=[*txouts, clusterlib.TxOut(address=FAUCET_ADDR, amount=change)],
+            txouts_count=len(txouts) + 1,
+            tx_files=kwargs["tx_files"],
+            out_file=out_file,
+            build_args=[],
+            fee=fee,
+        )
+
+    def sign_tx(self, tx_body_file: pl.Path, **kwargs: tp.Any) -> pl.Path:
+        assert kwargs
+        return tx_body_file
+
+    def submit_tx_bare(self, tx_file: pl.Path) -> str:
+        txins, __ = self.built[int(tx_file.read_text()) - 1]
+        txins_str = {f"{u.utxo_hash}#{u.utxo_ix}" for u in txins}
+        if txins_str & self.spent:
+            msg = "BadInputsUTxO"
+            raise clusterlib.CLIError(msg)
+        return tx_file.read_text()
+
+    def get_txid(self, tx_body_file: pl.Path) -> str:
+        return f"tx{tx_body_file.read_text()}"
+
+
+class FakeClusterLib:
+    def __init__(self, tmp_path: pl.Path) -> None:
+        self.g_query = FakeQuery()
+        self.g_transaction = FakeTransaction(tmp_path=tmp_path)
+
+    def wait_for_new_block(self, new_blocks: int = 1) -> int:
+        return new_blocks
+
+
+FAUCET_DATA = {
+    "payment": clusterlib.AddressRecord(
+        address=FAUCET_ADDR, vkey_file=pl.Path("vkey"), skey_file=pl.Path("skey")
+    )
+}
+
+
+@pytest.fixture
+def shared_tmp(tmp_path: pl.Path, monkeypatch: pytest.MonkeyPatch) -> pl.Path:
+    monkeypatch.setattr(faucet.temptools, "get_basetemp", lambda: tmp_path)
+    monkeypatch.setattr(temptools.PytestTempDirs, "pytest_shared_tmp", tmp_path)
+    return tmp_path
+
+
+def test_fund_pipelined(shared_tmp: pl.Path):
+    tmp_path = shared_tmp
+    cluster_obj: tp.Any = FakeClusterLib(tmp_path=tmp_path)
+    faucet_data = FAUCET_DATA
+
+    # Requests queued by other workers
+    funding_dir = faucet._get_funding_dir(FAUCET_ADDR)
+    for i in range(2):
+        faucet._write_pickle(
+            funding_dir / f"other{i}.request", [clusterlib.TxOut(address=f"other{i}", amount=10)]
+        )
+
+    tx_raw_output = faucet._fund_pipelined(
+        cluster_obj=cluster_obj,
+        faucet_data=faucet_data,
+        fund_txouts=[clusterlib.TxOut(address="mine", amount=20)],
+        tx_name="test",
+        destination_dir=tmp_path,
+    )
+
+    # All the queued requests were submitted in a single transaction
+    assert len(cluster_obj.g_transaction.built) == 1
+    assert sorted(t.address for t in tx_raw_output.txouts[:3]) == ["mine", "other0", "other1"]
+    assert tx_raw_output.txouts[3].address == FAUCET_ADDR
+    assert not list(funding_dir.glob("*.request"))
+    # Results for the other workers point to their outputs
+    for i in range(2):
+        result = faucet._read_pickle(funding_dir / f"other{i}.result")
+        assert tx_raw_output.txouts[result.first_txout_ix].address == f"other{i}"
+
+    faucet._fund_pipelined(
+        cluster_obj=cluster_obj,
+        faucet_data=faucet_data,
+        fund_txouts=[clusterlib.TxOut(address="mine", amount=20)],
+        tx_name="test",
+        destination_dir=tmp_path,
+    )
+
+    # The next transaction spends the change output of the previous one, without querying
+    # the faucet UTxOs again
+    assert cluster_obj.g_query.address_queries == 1
+    txins, __ = cluster_obj.g_transaction.built[1]
+    assert [(u.utxo_hash, u.utxo_ix, u.amount) for u in txins] == [("tx1", 3, 100_000 - 150)]
+
+
+def test_fund_pipelined_own_request_over_limit(shared_tmp: pl.Path):
+    cluster_obj: tp.Any = FakeClusterLib(tmp_path=shared_tmp)
+
+    # Requests queued by other workers fill the whole transaction
+    funding_dir = faucet._get_funding_dir(FAUCET_ADDR)
+    faucet._write_pickle(
+        funding_dir / "other.request",
+        [clusterlib.TxOut(address="other", amount=10)] * faucet.FUNDING_MAX_TXOUTS,
+    )
+
+    tx_raw_output = faucet._fund_pipelined(
+        cluster_obj=cluster_obj,
+        faucet_data=FAUCET_DATA,
+        fund_txouts=[clusterlib.TxOut(address="mine", amount=20)],
+        tx_name="test",
+        destination_dir=shared_tmp,
+    )
+
+    assert tx_raw_output.txouts[0].address == "mine"
+    # The other request is left for the next funding transaction
+    assert (funding_dir / "other.request").exists()
+
+
+def test_fund_pipelined_stale_utxos(shared_tmp: pl.Path):
+    cluster_obj: tp.Any = FakeClusterLib(tmp_path=shared_tmp)
+
+    # The tracked UTxO was spent by something else
+    funding_dir = faucet._get_funding_dir(FAUCET_ADDR)
+    stale_utxo = clusterlib.UTXOData(utxo_hash="bb", utxo_ix=0, amount=100_000, address="")
+    faucet._write_pickle(funding_dir / faucet.FAUCET_UTXOS_FILE_NAME, [stale_utxo])
+    cluster_obj.g_transaction.spent.add("bb#0")
+
+    tx_raw_output = faucet._fund_pipelined(
+        cluster_obj=cluster_obj,
+        faucet_data=FAUCET_DATA,
+        fund_txouts=[clusterlib.TxOut(address="mine", amount=20)],
+        tx_name="test",
+        destination_dir=shared_tmp,
+    )
+
+    # The transaction was retried with the UTxOs queried from the chain
+    assert cluster_obj.g_query.address_queries == 1
+    assert [u.utxo_hash for u in tx_raw_output.txins] == ["aa"]
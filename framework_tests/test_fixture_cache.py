@@ -0,0 +1,56 @@
+import pathlib as pl
+
+import pytest
+
+from cardano_node_tests.cluster_management import cache
+from cardano_node_tests.cluster_management import manager
+from cardano_node_tests.utils import temptools
+
+
+@pytest.fixture
+def cluster_manager(tmp_path: pl.Path, monkeypatch: pytest.MonkeyPatch) -> manager.ClusterManager:
+    monkeypatch.setattr(temptools.PytestTempDirs, "pytest_shared_tmp", tmp_path)
+    monkeypatch.setattr(manager.configuration, "SHARED_FIXTURE_CACHE", True)
+    monkeypatch.setattr(cache.CacheManager, "cache", {})
+
+    cluster_manager = manager.ClusterManager.__new__(manager.ClusterManager)
+    cluster_manager._cluster_instance_num = 0
+    cluster_manager.cache.last_checksum = "checksum1"
+    return cluster_manager
+
+
+def _get_value(cluster_manager: manager.ClusterManager, created: list[str]) -> str:
+    with cluster_manager.cache_fixture(key="drep", shared=True) as fixture_cache:
+        if fixture_cache.value is not None:
+            return str(fixture_cache.value)
+        created.append("drep1")
+        fixture_cache.value = "drep1"
+    return "drep1"
+
+
+def test_shared_value(cluster_manager: manager.ClusterManager):
+    created: list[str] = []
+    assert _get_value(cluster_manager, created) == "drep1"
+
+    # Another worker with empty local cache gets the shared value
+    cache.CacheManager.cache.clear()
+    cluster_manager.cache.last_checksum = "checksum1"
+    assert _get_value(cluster_manager, created) == "drep1"
+    assert created == ["drep1"]
+    # The value is cached also in the local cache
+    assert cluster_manager.cache.test_data
+
+
+def test_shared_value_respin(cluster_manager: manager.ClusterManager):
+    created: list[str] = []
+    _get_value(cluster_manager, created)
+
+    # The cluster instance was respun
+    cache.CacheManager.cache.clear()
+    cluster_manager.cache.last_checksum = "checksum2"
+    cache.clean_shared_cache(instance_num=0, checksum="checksum2")
+    _get_value(cluster_manager, created)
+
+    assert created == ["drep1", "drep1"]
+    cache_dirs = temptools.get_pytest_shared_tmp() / cache.SHARED_CACHE_DIR_NAME / "c0"
+    assert [d.name for d in cache_dirs.iterdir()] == ["checksum2"]
@@ -0,0 +1,128 @@
+import pathlib as pl
+import threading
+import time
+import typing as tp
+
+import pytest
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import clusterlib_utils
+from cardano_node_tests.utils import key_pool
+
+
+class FakeKeyGroup:
+    def __init__(self, suffix: str) -> None:
+        self.suffix = suffix
+        self.generated: list[str] = []
+        self.lock = threading.Lock()
+
+    def _gen_key_pair(self, key_name: str, destination_dir: pl.Path) -> clusterlib.KeyPair:
+        with self.lock:
+            self.generated.append(key_name)
+        vkey_file = destination_dir / f"{key_name}{self.suffix}.vkey"
+        skey_file = destination_dir / f"{key_name}{self.suffix}.skey"
+        vkey_file.write_text(key_name)
+        skey_file.write_text(key_name)
+        return clusterlib.KeyPair(vkey_file=vkey_file, skey_file=skey_file)
+
+    def gen_payment_key_pair(self, key_name: str, destination_dir: pl.Path) -> clusterlib.KeyPair:
+        return self._gen_key_pair(key_name=key_name, destination_dir=destination_dir)
+
+    def gen_stake_key_pair(self, key_name: str, destination_dir: pl.Path) -> clusterlib.KeyPair:
+        return self._gen_key_pair(key_name=key_name, destination_dir=destination_dir)
+
+    def gen_payment_addr(
+        self,
+        addr_name: str,
+        payment_vkey_file: pl.Path,
+        stake_vkey_file: pl.Path | None,
+        **__: tp.Any,
+    ) -> str:
+        stake_part = f"_{pl.Path(stake_vkey_file).read_text()}" if stake_vkey_file else ""
+        return f"addr_{addr_name}_{payment_vkey_file.read_text()}{stake_part}"
+
+    def gen_stake_addr(self, addr_name: str, stake_vkey_file: pl.Path, **__: tp.Any) -> str:
+        return f"stake_{addr_name}_{stake_vkey_file.read_text()}"
+
+
+class FakeClusterLib:
+    def __init__(self) -> None:
+        self.overwrite_outfiles = False
+        self.g_address = FakeKeyGroup(suffix="")
+        self.g_stake_address = FakeKeyGroup(suffix="_stake")
+
+
+@pytest.fixture
+def cluster_obj(tmp_path: pl.Path, monkeypatch: pytest.MonkeyPatch) -> tp.Iterator[tp.Any]:
+    monkeypatch.setattr(key_pool.temptools.PytestTempDirs, "pytest_worker_tmp", tmp_path)
+    monkeypatch.setattr(key_pool.configuration, "KEY_POOL_SIZE", 3)
+    monkeypatch.setattr(key_pool.KeyPool, "ready", {key_pool.PAYMENT: [], key_pool.STAKE: []})
+    monkeypatch.setattr(key_pool.KeyPool, "pending", {key_pool.PAYMENT: 0, key_pool.STAKE: 0})
+    monkeypatch.setattr(key_pool.KeyPool, "fill_cluster_obj", FakeClusterLib())
+    monkeypatch.setattr(key_pool.KeyPool, "fill_executor", None)
+    yield FakeClusterLib()
+    key_pool.stop()
+
+
+def _wait_for_fill() -> None:
+    for __ in range(100):
+        if not any(key_pool.KeyPool.pending.values()):
+            return
+        time.sleep(0.05)
+    msg = "The key pool was not filled"
+    raise AssertionError(msg)
+
+
+def test_pool_users(cluster_obj: tp.Any, tmp_path: pl.Path):
+    key_pool.refill()
+    _wait_for_fill()
+
+    dest_dir = tmp_path / "test"
+    dest_dir.mkdir()
+    pool_users = clusterlib_utils.create_pool_users(
+        cluster_obj=cluster_obj, name_template="user", no_of_addr=5, destination_dir=dest_dir
+    )
+
+    assert len(pool_users) == 5
+    # Three key pairs of each type come from the pool, the rest is generated on demand
+    assert cluster_obj.g_address.generated.count("user_addr_4") == 1
+    assert "user_addr_1" not in cluster_obj.g_address.generated
+    for i, pool_user in enumerate(pool_users, start=1):
+        assert pool_user.payment.vkey_file == dest_dir / f"user_addr_{i}.vkey"
+        assert pool_user.stake.skey_file == dest_dir / f"user_addr_{i}_stake.skey"
+        stake_key = pool_user.stake.vkey_file.read_text()
+        assert pool_user.payment.address.endswith(f"_{stake_key}")
+        assert pool_user.stake.address == f"stake_user_addr_{i}_{stake_key}"
+
+    # The pool is refilled in the background
+    _wait_for_fill()
+    assert all(len(v) == 3 for v in key_pool.KeyPool.ready.values())
+
+
+def test_existing_file(cluster_obj: tp.Any, tmp_path: pl.Path):
+    key_pool.KeyPool.ready[key_pool.PAYMENT].append(
+        cluster_obj.g_address.gen_payment_key_pair(key_name="pooled", destination_dir=tmp_path)
+    )
+    (tmp_path / "addr1.vkey").write_text("")
+
+    with pytest.raises(clusterlib.CLIError, match="already exist"):
+        key_pool.get_key_pairs(
+            "addr1", cluster_obj=cluster_obj, key_type=key_pool.PAYMENT, destination_dir=tmp_path
+        )
+    _wait_for_fill()
+
+
+def test_stop(cluster_obj: tp.Any):
+    fill_cluster_obj = key_pool.KeyPool.fill_cluster_obj
+    key_pool.refill()
+    assert key_pool.stop() is fill_cluster_obj
+
+    # Nothing is generated in the background after the pool was stopped
+    assert not any(key_pool.KeyPool.pending.values())
+    generated = len(fill_cluster_obj.g_address.generated)
+    time.sleep(0.1)
+    assert len(fill_cluster_obj.g_address.generated) == generated
+    assert len(key_pool.KeyPool.ready[key_pool.PAYMENT]) == generated
+    # The background threads don't use the instance of the tests
+    assert not cluster_obj.g_address.generated
+    assert key_pool.stop() is None
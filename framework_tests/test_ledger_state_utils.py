@@ -0,0 +1,206 @@
+import json
+import os
+import pathlib as pl
+import time
+import typing as tp
+import zipfile
+
+import pytest
+
+from cardano_node_tests.utils import ledger_state_utils
+
+BENCH_LEDGER_STATE_MB = int(os.environ.get("BENCH_LEDGER_STATE_MB") or 0)
+
+LEDGER_STATE = {
+    "blocksBefore": {"pool1": 3},
+    "lastEpoch": 5,
+    "stateBefore": {
+        "esLState": {
+            "delegationState": {"dstate": {"rewards": [1, 2]}},
+            "utxoState": {"utxo": {"tx#0": {"address": 'a"d{r', "value": {"lovelace": 1}}}},
+        },
+        "esSnapshots": {"pstakeMark": [], "note": "]}[{"},
+    },
+}
+
+
+class FakeQuery:
+    def __init__(self) -> None:
+        self.tip = {"slot": 10, "hash": "aa"}
+        self.ledger_state_queries = 0
+
+    def get_tip(self) -> dict:
+        return self.tip
+
+    def query_cli(self, cli_args: list[str], cli_sub_args: tp.Sequence[str]) -> str:
+        assert cli_args == ["ledger-state"]
+        self.ledger_state_queries += 1
+        pl.Path(cli_sub_args[1]).write_text(json.dumps(LEDGER_STATE, indent=2))
+        return ""
+
+
+class FakeClusterLib:
+    def __init__(self) -> None:
+        self.g_query = FakeQuery()
+
+
+@pytest.mark.parametrize("indent", (None, 4), ids=("compact", "pretty"))
+def test_extract(indent: int | None):
+    data = json.dumps(LEDGER_STATE, indent=indent).encode()
+
+    extracted = json.loads(
+        ledger_state_utils.extract(data, selection=ledger_state_utils.LEDGER_STATE_SELECTION)
+    )
+
+    expected = json.loads(json.dumps(LEDGER_STATE))
+    del expected["stateBefore"]["esLState"]["utxoState"]
+    assert extracted == expected
+
+
+def test_extract_invalid():
+    with pytest.raises(ValueError, match="JSON data"):
+        ledger_state_utils.extract(b'{"a": {"b": [1, 2}', selection={"a": False})
+
+
+def test_cached_by_tip():
+    ledger_state_utils.LedgerStateCache.entries.clear()
+    cluster_obj: tp.Any = FakeClusterLib()
+
+    ledger_state = ledger_state_utils.get_ledger_state(cluster_obj=cluster_obj)
+    assert ledger_state["blocksBefore"] == {"pool1": 3}
+    ledger_state["blocksBefore"].clear()
+
+    # Callers get their own copy of cached data
+    assert ledger_state_utils.get_ledger_state(cluster_obj=cluster_obj)["blocksBefore"]
+    assert cluster_obj.g_query.ledger_state_queries == 1
+
+    cluster_obj.g_query.tip = {"slot": 11, "hash": "bb"}
+    ledger_state_utils.get_ledger_state(cluster_obj=cluster_obj)
+    assert cluster_obj.g_query.ledger_state_queries == 2
+    ledger_state_utils.LedgerStateCache.entries.clear()
+
+
+def test_snapshot(tmp_path: pl.Path):
+    out_file = ledger_state_utils.save_snapshot(
+        ledger_state=LEDGER_STATE, out_file=tmp_path / "ep1_ledger_state.zip"
+    )
+
+    snapshot = ledger_state_utils.LedgerStateSnapshot(out_file)
+    assert "stateBefore/esSnapshots" in snapshot.sections
+    assert snapshot.load_section("blocksBefore") == {"pool1": 3}
+    assert snapshot.load() == LEDGER_STATE
+
+
+def test_snapshot_delta(tmp_path: pl.Path):
+    ep2_state = {**LEDGER_STATE, "lastEpoch": 6}
+    ledger_state_utils.save_snapshot(
+        ledger_state=LEDGER_STATE, out_file=tmp_path / "ep1_ledger_state.zip", delta=True
+    )
+    out_file = ledger_state_utils.save_snapshot(
+        ledger_state=ep2_state, out_file=tmp_path / "ep2_ledger_state.zip", delta=True
+    )
+
+    # Only the changed section is stored in the second snapshot
+    with zipfile.ZipFile(out_file) as zf:
+        assert sorted(zf.namelist()) == ["lastEpoch.json", "manifest.json"]
+    assert ledger_state_utils.LedgerStateSnapshot(out_file).load() == ep2_state
+
+
+def test_snapshot_delta_overwrite(tmp_path: pl.Path):
+    ep2_state = {**LEDGER_STATE, "lastEpoch": 6}
+    ep1_file = tmp_path / "ep1_ledger_state.zip"
+    ledger_state_utils.save_snapshot(ledger_state=LEDGER_STATE, out_file=ep1_file, delta=True)
+    ep2_file = ledger_state_utils.save_snapshot(
+        ledger_state=ep2_state, out_file=tmp_path / "ep2_ledger_state.zip", delta=True
+    )
+
+    # Overwrite the archive that the second snapshot refers to, twice
+    ep1_state = {**LEDGER_STATE, "blocksBefore": {"pool1": 4}}
+    for __ in range(2):
+        ledger_state_utils.save_snapshot(ledger_state=ep1_state, out_file=ep1_file, delta=True)
+
+    assert ledger_state_utils.LedgerStateSnapshot(ep1_file).load() == ep1_state
+    assert ledger_state_utils.LedgerStateSnapshot(ep2_file).load() == ep2_state
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def _get_bench_ledger_state(size_mb: int, epoch: int) -> dict:
+    utxo_count = size_mb * 4000
+    return {
+        "blocksBefore": {f"{i:056x}": i + epoch for i in range(100)},
+        "lastEpoch": epoch,
+        "stateBefore": {
+            "esLState": {
+                "utxoState": {
+                    "utxo": {
+                        f"{i:064x}#{i % 3}": {
+                            "address": f"addr_test1{i:058x}",
+                            "value": {"lovelace": i * 1000},
+                        }
+                        for i in range(utxo_count)
+                    }
+                }
+            },
+            "esSnapshots": {"pstakeMark": {f"{i:056x}": i + epoch for i in range(utxo_count // 2)}},
+        },
+    }
+
+
+@pytest.mark.skipif(
+    not BENCH_LEDGER_STATE_MB, reason="set BENCH_LEDGER_STATE_MB to run the benchmark"
+)
+def test_bench_snapshot(tmp_path: pl.Path):
+    """Compare indented JSON and ZIP ledger state snapshots.
+
+    E.g. `BENCH_LEDGER_STATE_MB=200 pytest -s -k test_bench_snapshot framework_tests`.
+    """
+    states = [_get_bench_ledger_state(size_mb=BENCH_LEDGER_STATE_MB, epoch=e) for e in (1, 2)]
+
+    def _save_json(ledger_state: dict, out_file: pl.Path) -> pl.Path:
+        with open(out_file, "w", encoding="utf-8") as fp_out:
+            json.dump(ledger_state, fp_out, indent=4)
+        return out_file
+
+    def _load_json(path: pl.Path) -> dict:
+        with open(path, encoding="utf-8") as fp_in:
+            loaded: dict = json.load(fp_in)
+        return loaded
+
+    results = []
+    for name, save_func, load_func, suffix in (
+        ("json", _save_json, _load_json, "json"),
+        (
+            "zip",
+            lambda s, f: ledger_state_utils.save_snapshot(ledger_state=s, out_file=f),
+            lambda p: ledger_state_utils.LedgerStateSnapshot(p).load(),
+            "zip",
+        ),
+        (
+            "zip-delta",
+            lambda s, f: ledger_state_utils.save_snapshot(ledger_state=s, out_file=f, delta=True),
+            lambda p: ledger_state_utils.LedgerStateSnapshot(p).load(),
+            "zip",
+        ),
+    ):
+        out_dir = tmp_path / name
+        out_dir.mkdir()
+        start = time.perf_counter()
+        out_files = [
+            save_func(s, out_dir / f"ep{i}_ledger_state.{suffix}") for i, s in enumerate(states)
+        ]
+        write_time = time.perf_counter() - start
+        disk_mb = sum(f.stat().st_size for f in out_dir.iterdir()) / 1024**2
+        start = time.perf_counter()
+        load_func(out_files[-1])
+        load_time = time.perf_counter() - start
+        results.append(
+            f"{name}: write {write_time:.2f}s, disk {disk_mb:.1f} MB, load {load_time:.2f}s"
+        )
+
+    section_start = time.perf_counter()
+    ledger_state_utils.LedgerStateSnapshot(tmp_path / "zip" / "ep1_ledger_state.zip").load_section(
+        "blocksBefore"
+    )
+    results.append(f"zip single section load {time.perf_counter() - section_start:.3f}s")
+
+    print("\n2 epoch snapshots: " + "; ".join(results))
@@ -0,0 +1,118 @@
+import pathlib as pl
+import socket
+import threading
+import time
+import typing as tp
+
+import pytest
+
+from cardano_node_tests.utils import lock_broker
+
+
+@pytest.fixture
+def broker(tmp_path: pl.Path) -> tp.Generator[lock_broker.LockBroker]:
+    broker = lock_broker.LockBroker(socket_path=tmp_path / "broker.sock")
+    broker.start()
+    yield broker
+    broker.stop()
+
+
+def test_mutual_exclusion(broker: lock_broker.LockBroker):
+    holders: list[int] = []
+    max_holders = 0
+    counter_lock = threading.Lock()
+
+    def _worker() -> None:
+        nonlocal max_holders
+        for __ in range(20):
+            with lock_broker.BrokerLock("/tmp/.cluster.lock", socket_path=str(broker.socket_path)):
+                with counter_lock:
+                    holders.append(1)
+                    max_holders = max(max_holders, len(holders))
+                time.sleep(0.001)
+                with counter_lock:
+                    holders.pop()
+
+    threads = [threading.Thread(target=_worker) for __ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert max_holders == 1
+    assert broker.stats.grants == 100
+
+
+def test_fifo_order(broker: lock_broker.LockBroker):
+    socket_path = str(broker.socket_path)
+    order: list[int] = []
+
+    first = lock_broker.BrokerLock("lock", socket_path=socket_path).acquire()
+
+    def _waiter(num: int) -> None:
+        with lock_broker.BrokerLock("lock", socket_path=socket_path):
+            order.append(num)
+
+    threads = []
+    for i in range(3):
+        t = threading.Thread(target=_waiter, args=(i,))
+        t.start()
+        threads.append(t)
+        # Make sure the requests are queued in order
+        time.sleep(0.1)
+
+    first.release()
+    for t in threads:
+        t.join()
+
+    assert order == [0, 1, 2]
+
+
+def test_release_on_disconnect(broker: lock_broker.LockBroker):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(str(broker.socket_path))
+    sock.sendall(b'{"op": "acquire", "name": "lock"}\n')
+    assert b'"ok": true' in sock.recv(1024)
+    # Client dies without releasing the lock
+    sock.close()
+
+    with lock_broker.BrokerLock("lock", socket_path=str(broker.socket_path)) as lock:
+        assert lock.is_locked
+
+
+def test_drop_disconnected_waiter(broker: lock_broker.LockBroker):
+    socket_path = str(broker.socket_path)
+    first = lock_broker.BrokerLock("lock", socket_path=socket_path).acquire()
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(socket_path)
+    sock.sendall(b'{"op": "acquire", "name": "lock"}\n')
+    time.sleep(0.1)
+    # Client dies while waiting for the lock
+    sock.close()
+    time.sleep(0.1)
+
+    assert not broker._locks["lock"].waiters
+    first.release()
+    with lock_broker.BrokerLock("lock", socket_path=socket_path) as lock:
+        assert lock.is_locked
+    assert broker.stats.contended_grants == 0
+
+
+def test_socket_path_too_long(tmp_path: pl.Path):
+    long_dir = tmp_path / ("x" * 100)
+    long_dir.mkdir()
+    broker = lock_broker.LockBroker(socket_path=long_dir / "broker.sock")
+    with pytest.raises(OSError, match="too long"):
+        broker.start()
+
+    socket_path = lock_broker.get_socket_path(name=str(long_dir))
+    assert len(str(socket_path)) < 108
+    broker = lock_broker.LockBroker(socket_path=socket_path)
+    broker.start()
+    try:
+        with lock_broker.BrokerLock("lock", socket_path=str(socket_path)) as lock:
+            assert lock.is_locked
+    finally:
+        broker.stop()
+    assert not socket_path.exists()
@@ -0,0 +1,339 @@
+import concurrent.futures
+import multiprocessing
+import os
+import pathlib as pl
+import re
+import time
+import typing as tp
+
+import pytest
+
+from cardano_node_tests.utils import cluster_nodes
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import logfiles
+
+# Size of each synthetic log file used by benchmarks, in MB. Benchmarks are skipped when not set.
+BENCH_LOG_MB = int(os.environ.get("BENCH_LOG_MB") or 0)
+BENCH_LOG_FILES = int(os.environ.get("BENCH_LOG_FILES") or 4)
+
+LINE_INFO = (
+    b'{"at":"2025-01-01T00:00:00.00Z","ns":"ChainDB.AddBlockEvent","data":{"kind":"AddedToCurrent'
+    b'Chain"},"sev":"Info","thread":"42","host":"node"}\n'
+)
+LINE_ERROR = b'{"at":"2025-01-01T00:00:00.00Z","sev":"Error","data":{"kind":"NodeFailure"}}\n'
+LINE_IGNORED = b"[node:cardano.node.ErrorPolicy:Info:42] ErrorPolicySuspendConsumer\n"
+
+
+def _write_log(path: pl.Path, size_mb: int, errors_every_mb: int = 1) -> int:
+    """Write synthetic node log, return number of error lines written."""
+    chunk = LINE_INFO * (1024 * 1024 // len(LINE_INFO))
+    errors = 0
+    with open(path, "wb") as fp:
+        for i in range(size_mb):
+            fp.write(chunk)
+            if i % errors_every_mb == 0:
+                fp.write(LINE_ERROR)
+                fp.write(LINE_IGNORED)
+                errors += 1
+    return errors
+
+
+def _get_cluster_env(state_dir: pl.Path) -> cluster_nodes.ClusterEnv:
+    return cluster_nodes.ClusterEnv(
+        socket_path=state_dir / "relay1.socket",
+        state_dir=state_dir,
+        work_dir=state_dir.parent,
+        instance_num=0,
+        cluster_era="conway",
+        command_era="",
+    )
+
+
+def _search_all(
+    cluster_env: cluster_nodes.ClusterEnv, executor: concurrent.futures.Executor | None
+) -> list[tuple[pl.Path, str]]:
+    for f in cluster_env.state_dir.glob(".*.offset"):
+        f.unlink()
+    searches = logfiles._get_cluster_logs_searches(cluster_env=cluster_env)
+    if executor is None:
+        return logfiles._run_searches(searches)
+
+    logfiles._get_search_executor.cache_clear()
+    orig_executor = logfiles._get_search_executor
+    logfiles._get_search_executor = lambda: executor  # type: ignore[assignment]
+    try:
+        return logfiles._run_searches(searches)
+    finally:
+        logfiles._get_search_executor = orig_executor
+
+
+@pytest.fixture
+def process_pool() -> tp.Generator[concurrent.futures.ProcessPoolExecutor]:
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=4, mp_context=multiprocessing.get_context("forkserver")
+    ) as executor:
+        yield executor
+
+
+def test_search_offsets(tmp_path: pl.Path):
+    logfile = tmp_path / "pool1.stdout"
+    logfile.write_bytes(LINE_INFO + LINE_ERROR + LINE_IGNORED)
+
+    errors = logfiles._search_logfile_errors(
+        logfile=logfile, errors_re=logfiles.ERRORS_RE, ignore_rules=[]
+    )
+    assert errors == [(logfile, LINE_ERROR.decode().rstrip("\n"))]
+
+    # The offset is stored, so the same error is not reported twice
+    assert not logfiles._search_logfile_errors(
+        logfile=logfile, errors_re=logfiles.ERRORS_RE, ignore_rules=[]
+    )
+    # Log files not modified since the last search are skipped, make sure the mtime differs
+    time.sleep(0.05)
+    with open(logfile, "ab") as fp:
+        fp.write(LINE_ERROR)
+    assert (
+        len(
+            logfiles._search_logfile_errors(
+                logfile=logfile, errors_re=logfiles.ERRORS_RE, ignore_rules=[]
+            )
+        )
+        == 1
+    )
+
+
+def test_parallel_search_deterministic(
+    tmp_path: pl.Path, process_pool: concurrent.futures.ProcessPoolExecutor
+):
+    for name in ("pool1.stdout", "pool1.stderr", "pool2.stdout", "relay1.stdout"):
+        _write_log(path=tmp_path / name, size_mb=2)
+    cluster_env = _get_cluster_env(state_dir=tmp_path)
+
+    serial = _search_all(cluster_env=cluster_env, executor=None)
+    parallel = _search_all(cluster_env=cluster_env, executor=process_pool)
+
+    assert len(serial) == 8
+    assert parallel == serial
+
+
+def test_search_inputs_passed_explicitly(
+    tmp_path: pl.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    process_pool: concurrent.futures.ProcessPoolExecutor,
+):
+    for name in ("pool1.stdout", "pool2.stdout"):
+        (tmp_path / name).write_bytes(LINE_INFO + LINE_ERROR + b"ExpectedError\n")
+    (tmp_path / f"{logfiles.ERRORS_IGNORE_FILE_NAME}_gw0").write_text(
+        "pool1.stdout;;0.0;;ExpectedError\n"
+    )
+    cluster_env = _get_cluster_env(state_dir=tmp_path)
+    monkeypatch.setattr(configuration, "LOGS_SEARCH_MMAP", True)
+
+    searches = logfiles._get_cluster_logs_searches(cluster_env=cluster_env)
+    # The settings of the pytest worker are resolved before the search runs in a pool process
+    assert all(s.keywords["use_mmap"] for s in searches)  # type: ignore[attr-defined]
+    errors = [f.result() for f in [process_pool.submit(s) for s in searches]]
+
+    assert errors == [
+        [(tmp_path / "pool1.stdout", LINE_ERROR.decode().rstrip("\n"))],
+        [
+            (tmp_path / "pool2.stdout", LINE_ERROR.decode().rstrip("\n")),
+            (tmp_path / "pool2.stdout", "ExpectedError"),
+        ],
+    ]
+
+
+@pytest.mark.parametrize(
+    "line",
+    (
+        "error",
+        "no problem here",
+        ":Info: error",
+        "error :Info:",
+        "FAILED to do something",
+        "failed",
+        "task failedScripts",
+        "ErrorPolicySuspendConsumer and real error",
+        "real error and ErrorPolicySuspendConsumer",
+    ),
+)
+def test_errors_matcher(line: str):
+    ignored_re = re.compile("|".join([*logfiles.ERRORS_IGNORED, "ailed"]))
+    matcher = logfiles._get_errors_matcher(
+        errors_re=logfiles.ERRORS_RE, errors_ignored_re=ignored_re
+    )
+
+    expected = bool(logfiles.ERRORS_RE.search(line)) and not ignored_re.search(line)
+    assert matcher.is_error(line.encode()) == expected
+
+
+def test_ignore_rules_cache(tmp_path: pl.Path):
+    cluster_env = _get_cluster_env(state_dir=tmp_path)
+    rules_file = tmp_path / f"{logfiles.ERRORS_IGNORE_FILE_NAME}_gw0"
+    rules_file.write_text("*.stdout;;0.0;;SomeError\n*.stderr;;10.0;;ExpiredError\n")
+
+    rules = logfiles._load_ignore_rules(cluster_env=cluster_env)
+    assert logfiles._get_ignore_rules(cluster_env=cluster_env, timestamp=20.0) == [
+        ("*.stdout", "SomeError")
+    ]
+    # Rules files were not changed, the cached rules are returned
+    assert logfiles._load_ignore_rules(cluster_env=cluster_env) is rules
+
+    with open(rules_file, "a", encoding="utf-8") as fp:
+        fp.write("*;;0.0;;OtherError\n")
+    assert len(logfiles._load_ignore_rules(cluster_env=cluster_env)) == 3
+
+    rules_file.unlink()
+    assert not logfiles._load_ignore_rules(cluster_env=cluster_env)
+
+
+def test_findings(tmp_path: pl.Path):
+    logfile = tmp_path / "pool1.stdout"
+    logfile.write_bytes(LINE_INFO + LINE_ERROR + LINE_IGNORED + b"ExpectedError\n")
+    cluster_env = _get_cluster_env(state_dir=tmp_path)
+
+    # The errors are recorded, not returned
+    (search,) = logfiles._get_cluster_logs_searches(cluster_env=cluster_env, record_findings=True)
+    assert not search()
+
+    # The ignore rules added by tests are applied when the findings are consumed
+    rules_file = tmp_path / f"{logfiles.ERRORS_IGNORE_FILE_NAME}_gw0"
+    rules_file.write_text("*.stdout;;0.0;;ExpectedError\n")
+    assert logfiles._consume_findings(cluster_env=cluster_env) == [
+        (logfile, LINE_ERROR.decode().rstrip("\n"))
+    ]
+    # Each finding is consumed just once
+    assert not logfiles._consume_findings(cluster_env=cluster_env)
+
+
+def test_logs_watcher(tmp_path: pl.Path):
+    logfile = tmp_path / "pool1.stdout"
+    logfile.write_bytes(LINE_INFO)
+    cluster_env = _get_cluster_env(state_dir=tmp_path)
+
+    watcher = logfiles.LogsWatcher(cluster_env=cluster_env, interval=0.01)
+    watcher.start()
+    try:
+        with open(logfile, "ab") as fp:
+            fp.write(LINE_ERROR)
+        for __ in range(500):
+            if logfiles._get_findings_file(cluster_env=cluster_env).exists():
+                break
+            time.sleep(0.01)
+    finally:
+        watcher.stop()
+
+    assert logfiles._consume_findings(cluster_env=cluster_env) == [
+        (logfile, LINE_ERROR.decode().rstrip("\n"))
+    ]
+
+
+def test_no_logs_watcher_without_xdist(tmp_path: pl.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(configuration, "IS_XDIST", False)
+    cluster_env = _get_cluster_env(state_dir=tmp_path)
+
+    logfiles.start_logs_watcher(cluster_env=cluster_env)
+    assert cluster_env.instance_num not in logfiles._LOGS_WATCHERS
+
+
+def _search_engine(
+    search_func: tp.Callable, logfile: pl.Path, seek: int = 0
+) -> tuple[list[tuple[pl.Path, str]], str]:
+    """Search the log file, return the errors and the stored offset."""
+    offset_file = logfiles._get_offset_file(logfile=logfile)
+    offset_file.unlink(missing_ok=True)
+    errors = search_func(
+        logfile=logfile,
+        rotated_logs=logfiles._get_rotated_logs(logfile=logfile, seek=seek),
+        errors_re=logfiles.ERRORS_RE,
+        errors_ignored_re=re.compile("|".join(logfiles.ERRORS_IGNORED)),
+        look_back_map={"TraceNoLedgerState": "Switched to a fork"},
+        look_back_lines=3,
+    )
+    return errors, offset_file.read_text()
+
+
+@pytest.mark.parametrize("seek", (0, 5, 40, 10_000))
+def test_mmap_engine_same_results(tmp_path: pl.Path, seek: int):
+    logfile = tmp_path / "pool1.stdout"
+    logfile.write_bytes(
+        b"first line with error\r\n"
+        + LINE_INFO
+        + b"Switched to a fork\n"
+        + LINE_INFO
+        + b"TraceNoLedgerState error\n"
+        + LINE_INFO * 3
+        + b"TraceNoLedgerState error\n"
+        + LINE_IGNORED
+        + b"two errors error on one line\n"
+        + b"\n"
+        + LINE_ERROR
+        + b"incomplete error line"
+    )
+
+    stream = _search_engine(search_func=logfiles._search_log_lines, logfile=logfile, seek=seek)
+    mmapped = _search_engine(
+        search_func=logfiles._search_log_lines_mmap, logfile=logfile, seek=seek
+    )
+
+    assert mmapped == stream
+    if seek == 0:
+        assert len(stream[0]) == 4
+
+
+def test_mmap_engine_empty_file(tmp_path: pl.Path):
+    logfile = tmp_path / "pool1.stdout"
+    logfile.touch()
+    assert _search_engine(search_func=logfiles._search_log_lines_mmap, logfile=logfile) == (
+        [],
+        "0",
+    )
+
+
+@pytest.mark.skipif(not BENCH_LOG_MB, reason="set BENCH_LOG_MB to run the benchmark")
+def test_bench_mmap_engine(tmp_path: pl.Path):
+    """Compare the streaming and the `mmap` search engines.
+
+    E.g. `BENCH_LOG_MB=1024 pytest -s -k test_bench_mmap_engine framework_tests`.
+    """
+    logfile = tmp_path / "pool1.stdout"
+    _write_log(path=logfile, size_mb=BENCH_LOG_MB, errors_every_mb=64)
+
+    timings = {}
+    for name, search_func in (
+        ("stream", logfiles._search_log_lines),
+        ("mmap", logfiles._search_log_lines_mmap),
+    ):
+        start = time.perf_counter()
+        _search_engine(search_func=search_func, logfile=logfile)
+        timings[name] = time.perf_counter() - start
+
+    print(
+        f"\n{BENCH_LOG_MB} MB log file: "
+        f"stream {timings['stream']:.2f}s, mmap {timings['mmap']:.2f}s"
+    )
+
+
+@pytest.mark.skipif(not BENCH_LOG_MB, reason="set BENCH_LOG_MB to run the benchmark")
+def test_bench_parallel_search(
+    tmp_path: pl.Path, process_pool: concurrent.futures.ProcessPoolExecutor
+):
+    """Compare serial and parallel search of cluster logs.
+
+    E.g. `BENCH_LOG_MB=1024 pytest -s -k test_bench_parallel_search framework_tests`.
+    """
+    for i in range(BENCH_LOG_FILES):
+        _write_log(path=tmp_path / f"pool{i}.stdout", size_mb=BENCH_LOG_MB, errors_every_mb=64)
+    cluster_env = _get_cluster_env(state_dir=tmp_path)
+
+    timings = {}
+    for name, executor in (("serial", None), ("parallel", process_pool)):
+        start = time.perf_counter()
+        _search_all(cluster_env=cluster_env, executor=executor)
+        timings[name] = time.perf_counter() - start
+
+    total_mb = BENCH_LOG_MB * BENCH_LOG_FILES
+    print(
+        f"\n{BENCH_LOG_FILES} log files, {total_mb} MB in total: "
+        f"serial {timings['serial']:.2f}s, parallel (4 processes) {timings['parallel']:.2f}s"
+    )
@@ -0,0 +1,99 @@
+import json
+import typing as tp
+
+import pytest
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests import cardano_cli_profile
+from cardano_node_tests.utils import custom_clusterlib
+
+
+@pytest.fixture
+def cluster_obj(monkeypatch: pytest.MonkeyPatch) -> custom_clusterlib.ClusterLib:
+    def _cli(*__: tp.Any, **___: tp.Any) -> clusterlib.CLIOut:
+        tip = {"slot": 1_010, "block": 50, "epoch": 1, "slotInEpoch": 10}
+        return clusterlib.CLIOut(stdout=json.dumps(tip).encode(), stderr=b"")
+
+    monkeypatch.setattr(custom_clusterlib.ClusterLib, "_run_cli", _cli)
+    cluster_obj = custom_clusterlib.ClusterLib.__new__(custom_clusterlib.ClusterLib)
+    cluster_obj.command_era = "latest"
+    cluster_obj.cli_coverage = {}
+    cluster_obj.cli_profile = {}
+    cluster_obj._cli_command = "cardano-cli"
+    cluster_obj._query_group = None
+    cluster_obj.slot_length = 100
+    cluster_obj.epoch_length = 1_000
+    cluster_obj._slots_offset = 0
+    cluster_obj.magic_args = ["--testnet-magic", "42"]
+    cluster_obj.socket_args = []
+    cluster_obj.genesis = {"activeSlotsCoeff": 0.1}
+    cluster_obj.query_cache = custom_clusterlib.QueryCache(
+        clusterlib_obj=cluster_obj, enabled_queries=custom_clusterlib.get_enabled_queries("all")
+    )
+    return cluster_obj
+
+
+def _get_cli_count(cluster_obj: custom_clusterlib.ClusterLib) -> int:
+    rec = cluster_obj.cli_profile.get("cardano-cli latest query tip")
+    return rec["count"] if rec else 0
+
+
+def test_cached(cluster_obj: custom_clusterlib.ClusterLib):
+    tip = cluster_obj.g_query.get_tip()
+    tip["block"] = 0
+    # Callers get their own copy of cached data
+    assert cluster_obj.g_query.get_tip()["block"] == 50
+    assert cluster_obj.g_query.get_epoch() == 1
+    assert _get_cli_count(cluster_obj) == 1
+
+    stats = cluster_obj.cli_profile[custom_clusterlib.QUERY_CACHE_STATS_KEY]
+    # The epoch query and its expiration use the cached tip
+    assert stats["tip"] == {"hits": 3, "misses": 1}
+    assert stats["epoch"] == {"hits": 0, "misses": 1}
+
+    report = cardano_cli_profile.get_report(cluster_obj.cli_profile)
+    assert report[custom_clusterlib.QUERY_CACHE_STATS_KEY]["tip"]["hit_ratio"] == 0.75
+
+
+def test_invalidate(cluster_obj: custom_clusterlib.ClusterLib):
+    cluster_obj.g_query.get_tip()
+    cluster_obj.g_query.get_epoch()
+
+    # Waiting for a new block invalidates only the results in the block scope
+    cluster_obj.query_cache.invalidate(scope=custom_clusterlib.BLOCK_SCOPE)
+    cluster_obj.g_query.get_epoch()
+    assert _get_cli_count(cluster_obj) == 1
+    cluster_obj.g_query.get_tip()
+    assert _get_cli_count(cluster_obj) == 2
+
+    cluster_obj.query_cache.invalidate()
+    cluster_obj.g_query.get_epoch()
+    assert _get_cli_count(cluster_obj) == 3
+
+
+def test_epoch_end(cluster_obj: custom_clusterlib.ClusterLib, monkeypatch: pytest.MonkeyPatch):
+    # The epoch ends in less than 10 expected block intervals, the epoch of the tip is checked
+    cluster_obj.epoch_length = 545
+    cluster_obj.slot_length = 1
+    cluster_obj.query_cache.invalidate()
+    cluster_obj.g_query.get_epoch()
+    cluster_obj.query_cache.invalidate(scope=custom_clusterlib.BLOCK_SCOPE)
+    cluster_obj.g_query.get_epoch()
+    assert _get_cli_count(cluster_obj) == 2
+    stats = cluster_obj.cli_profile[custom_clusterlib.QUERY_CACHE_STATS_KEY]
+    assert stats["epoch"] == {"hits": 1, "misses": 1}
+
+    # The tip moved to the next epoch, the cached result is not valid
+    def _cli(*__: tp.Any, **___: tp.Any) -> clusterlib.CLIOut:
+        tip = {"slot": 1_090, "block": 51, "epoch": 2, "slotInEpoch": 0}
+        return clusterlib.CLIOut(stdout=json.dumps(tip).encode(), stderr=b"")
+
+    monkeypatch.setattr(custom_clusterlib.ClusterLib, "_run_cli", _cli)
+    cluster_obj.query_cache.invalidate(scope=custom_clusterlib.BLOCK_SCOPE)
+    assert cluster_obj.g_query.get_epoch() == 2
+    assert stats["epoch"] == {"hits": 1, "misses": 2}
+
+
+def test_unknown_query():
+    with pytest.raises(ValueError, match="Unknown queries to cache: foo"):
+        custom_clusterlib.get_enabled_queries("tip,foo")
@@ -0,0 +1,65 @@
+import os
+import pathlib as pl
+import socket
+import subprocess
+import time
+
+import pytest
+
+from cardano_node_tests.utils import cluster_nodes
+from cardano_node_tests.utils import readiness
+
+
+def test_poll():
+    calls = []
+
+    def _condition() -> bool:
+        calls.append(1)
+        if len(calls) < 3:
+            msg = "not ready"
+            raise RuntimeError(msg)
+        return True
+
+    assert readiness.poll(_condition, timeout=5, delay=0.01)
+    assert len(calls) == 3
+
+
+def test_poll_timeout():
+    start = time.monotonic()
+    assert not readiness.poll(lambda: False, timeout=0.3, delay=0.05)
+    assert 0.3 <= time.monotonic() - start < 2
+
+
+def test_is_process_running():
+    assert readiness.is_process_running(os.getpid())
+
+    with subprocess.Popen(["sleep", "10"]) as proc:
+        assert readiness.is_process_running(proc.pid)
+        proc.terminate()
+        # The process is a zombie until it is reaped
+        assert readiness.poll(lambda: not readiness.is_process_running(proc.pid), timeout=5)
+
+
+def test_is_port_listening():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        assert not readiness.is_port_listening(port)
+        sock.listen()
+        assert readiness.is_port_listening(port)
+
+
+def test_is_socket_available(tmp_path: pl.Path):
+    socket_path = tmp_path / "node.socket"
+    assert not readiness.is_socket_available(socket_path)
+
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.bind(str(socket_path))
+        assert not readiness.is_socket_available(socket_path)
+        sock.listen()
+        assert readiness.is_socket_available(socket_path)
+
+
+def test_wait_for_no_nodes(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(cluster_nodes, "get_cluster_type", cluster_nodes.ClusterType)
+    assert not cluster_nodes.wait_for_nodes_ready(timeout=5)
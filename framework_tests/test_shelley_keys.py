@@ -0,0 +1,108 @@
+import pathlib as pl
+import typing as tp
+
+import nacl.signing
+import pytest
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import clusterlib_utils
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import shelley_keys
+
+DATA_DIR = pl.Path(__file__).parent.parent / "cardano_node_tests" / "tests" / "data"
+
+# Expected values for golden keys are taken from `cardano_node_tests/tests/test_cli.py`
+PAYMENT_VKEY_HASH = "0dc8e171258165131d45451bf9e2a1be44a97d684ce2f775b7734263"
+STAKE_VKEY_HASH = "a8b8c13cc0b863bc077e0bc6eafdc6f32f43a4513b70378b30ceb7b9"
+ENTERPRISE_ADDRESS = "addr_test1vqxu3ct3ykqk2ycag4z3h70z5xlyf2tadpxw9am4kae5ycc95yzhp"
+BASE_ADDRESS = (
+    "addr_test1qqxu3ct3ykqk2ycag4z3h70z5xlyf2tadpxw9am4kae5ycaghrqnes"
+    "9cvw7qwlstcm40m3hn9ap6g5fmwqmckvxwk7usca596d"
+)
+
+
+class FakeClusterLib:
+    def __init__(self) -> None:
+        self.overwrite_outfiles = False
+        self.magic_args = ["--testnet-magic", "42"]
+
+
+def test_golden_keys():
+    payment_vkey = shelley_keys.read_key(DATA_DIR / "golden_payment.vkey")
+    stake_vkey = shelley_keys.read_key(DATA_DIR / "golden_stake.vkey")
+
+    assert shelley_keys.get_key_hash(payment_vkey).hex() == PAYMENT_VKEY_HASH
+    assert shelley_keys.get_key_hash(stake_vkey).hex() == STAKE_VKEY_HASH
+    assert shelley_keys.get_payment_address(payment_vkey=payment_vkey) == ENTERPRISE_ADDRESS
+    assert (
+        shelley_keys.get_payment_address(payment_vkey=payment_vkey, stake_vkey=stake_vkey)
+        == BASE_ADDRESS
+    )
+
+    stake_address = shelley_keys.get_stake_address(stake_vkey=stake_vkey)
+    assert stake_address.startswith("stake_test1u")
+    assert shelley_keys.decode_bech32(stake_address) == f"e0{STAKE_VKEY_HASH}"
+
+
+def test_bech32():
+    assert shelley_keys.decode_bech32(BASE_ADDRESS)[2:58] == PAYMENT_VKEY_HASH
+    assert (
+        shelley_keys.encode_bech32(
+            prefix="addr_test", data=shelley_keys.decode_bech32(BASE_ADDRESS)
+        )
+        == BASE_ADDRESS
+    )
+    with pytest.raises(ValueError, match="Invalid checksum"):
+        shelley_keys.decode_bech32(f"{BASE_ADDRESS[:-1]}e")
+
+
+def test_key_files_format(tmp_path: pl.Path):
+    """Check that key files have the same format as key files written by `cardano-cli`."""
+    cluster_obj: tp.Any = FakeClusterLib()
+    for key_type, golden_file in (
+        (shelley_keys.PAYMENT, "golden_payment.vkey"),
+        (shelley_keys.STAKE, "golden_stake.vkey"),
+    ):
+        key_pair = shelley_keys.gen_key_pair(
+            cluster_obj=cluster_obj, key_type=key_type, key_name="test", destination_dir=tmp_path
+        )
+        golden_vkey = shelley_keys.read_key(DATA_DIR / golden_file)
+        vkey_content = key_pair.vkey_file.read_text()
+        vkey = shelley_keys.read_key(key_pair.vkey_file)
+        assert vkey_content.replace(vkey.hex(), golden_vkey.hex()) == (
+            (DATA_DIR / golden_file).read_text()
+        )
+
+        # The verification key belongs to the signing key
+        skey = shelley_keys.read_key(key_pair.skey_file)
+        assert bytes(nacl.signing.SigningKey(skey).verify_key) == vkey
+
+    golden_skey = shelley_keys.read_key(DATA_DIR / "golden_normal.skey")
+    skey_content = (tmp_path / "test.skey").read_text()
+    skey = shelley_keys.read_key(tmp_path / "test.skey")
+    assert skey_content.replace(skey.hex(), golden_skey.hex()) == (
+        (DATA_DIR / "golden_normal.skey").read_text()
+    )
+
+
+def test_pool_users(tmp_path: pl.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(configuration, "INPROCESS_KEYS", True)
+    cluster_obj: tp.Any = FakeClusterLib()
+
+    pool_users = clusterlib_utils.create_pool_users(
+        cluster_obj=cluster_obj, name_template="user", no_of_addr=3, destination_dir=tmp_path
+    )
+
+    assert len(pool_users) == 3
+    for i, pool_user in enumerate(pool_users, start=1):
+        assert pool_user.payment.vkey_file == tmp_path / f"user_addr_{i}.vkey"
+        assert pool_user.stake.skey_file == tmp_path / f"user_addr_{i}_stake.skey"
+        assert (tmp_path / f"user_addr_{i}.addr").read_text() == pool_user.payment.address
+        assert (tmp_path / f"user_addr_{i}_stake.addr").read_text() == pool_user.stake.address
+        stake_hash = shelley_keys.decode_bech32(pool_user.stake.address)[2:]
+        assert shelley_keys.decode_bech32(pool_user.payment.address).endswith(stake_hash)
+
+    with pytest.raises(clusterlib.CLIError, match="already exist"):
+        clusterlib_utils.create_payment_addr_records(
+            "user_addr_1", cluster_obj=cluster_obj, destination_dir=tmp_path
+        )
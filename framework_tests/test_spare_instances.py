@@ -0,0 +1,109 @@
+import pathlib as pl
+import typing as tp
+
+import pytest
+
+from cardano_node_tests.cluster_management import spare_instances
+from cardano_node_tests.cluster_management import status_files
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import temptools
+
+PYTEST_CONFIG: tp.Any = None
+
+
+def _fake_respin(*, instance_num: int, worker_id: str, **__: tp.Any) -> None:
+    status_files.rm_respin_progress_files(instance_num=instance_num, worker_id=worker_id)
+    status_files.rm_respin_needed_files(instance_num=instance_num)
+    status_files.get_cluster_running_file(instance_num=instance_num).touch()
+
+
+@pytest.fixture
+def root_tmp(tmp_path: pl.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(temptools.PytestTempDirs, "pytest_root_tmp", tmp_path)
+    # Make sure changes are detected by mtime, not by the "racy" rescan
+    monkeypatch.setattr(status_files.StatusIndex, "RACY_NS", 0)
+    monkeypatch.setattr(configuration, "IS_XDIST", True)
+    monkeypatch.setattr(configuration, "DEV_CLUSTER_RUNNING", False)
+    monkeypatch.setattr(configuration, "FORBID_RESTART", False)
+    monkeypatch.setattr(configuration, "BOOTSTRAP_DIR", "")
+    monkeypatch.setattr(configuration, "SPARE_CLUSTERS", 1)
+    monkeypatch.setattr(spare_instances, "_respin_in_subprocess", _fake_respin)
+    monkeypatch.setattr(spare_instances.SpareInstances, "initialized", False)
+    for i in range(2):
+        status_files.get_instance_dir(instance_num=i).mkdir()
+        status_files.get_cluster_running_file(instance_num=i).touch()
+
+
+@pytest.mark.usefixtures("root_tmp")
+def test_swap_in_spare():
+    # The spare instance was not marked and started yet
+    assert (
+        spare_instances.swap_in_spare(
+            instance_num=0,
+            num_of_instances=2,
+            worker_id="gw0",
+            pytest_config=PYTEST_CONFIG,
+            log_func=print,
+        )
+        == -1
+    )
+
+    spare_instances.init_spares(
+        num_of_instances=2, worker_id="gw0", pytest_config=PYTEST_CONFIG, log_func=print
+    )
+    assert spare_instances.list_spares(instances=range(3)) == {2}
+    spare_instances.wait_for_respins()
+    assert status_files.get_cluster_running_file(instance_num=2).exists()
+
+    status_files.create_respin_needed_file(instance_num=0, worker_id="gw1")
+    status_files.create_curr_mark_file(instance_num=0, worker_id="gw1", mark="m1")
+    assert (
+        spare_instances.swap_in_spare(
+            instance_num=0,
+            num_of_instances=2,
+            worker_id="gw0",
+            pytest_config=PYTEST_CONFIG,
+            log_func=print,
+        )
+        == 2
+    )
+    assert spare_instances.list_spares(instances=range(3)) == {0}
+    assert not status_files.list_curr_mark_files(instance_num=0)
+
+    # The old instance is respun in the background and becomes a ready spare instance
+    spare_instances.wait_for_respins()
+    assert not status_files.list_respin_needed_files(instance_num=0)
+    assert spare_instances._is_ready(0)
+
+
+@pytest.mark.usefixtures("root_tmp")
+def test_init_spares_once(monkeypatch: pytest.MonkeyPatch):
+    started: list[int] = []
+
+    def _fake_background(*, instance_num: int, **__: tp.Any) -> None:
+        started.append(instance_num)
+
+    monkeypatch.setattr(spare_instances, "_respin_in_background", _fake_background)
+    for __ in range(3):
+        spare_instances.init_spares(
+            num_of_instances=2, worker_id="gw0", pytest_config=PYTEST_CONFIG, log_func=print
+        )
+    assert started == [2]
+
+    # Other pytest workers see the spare instances already initialized
+    monkeypatch.setattr(spare_instances.SpareInstances, "initialized", False)
+    spare_instances.init_spares(
+        num_of_instances=2, worker_id="gw1", pytest_config=PYTEST_CONFIG, log_func=print
+    )
+    assert started == [2]
+
+
+@pytest.mark.usefixtures("root_tmp")
+def test_no_spares(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(configuration, "FORBID_RESTART", True)
+    assert spare_instances.get_spares_count() == 0
+
+    spare_instances.init_spares(
+        num_of_instances=2, worker_id="gw0", pytest_config=PYTEST_CONFIG, log_func=print
+    )
+    assert not spare_instances.is_spare(2)
@@ -0,0 +1,98 @@
+import pathlib as pl
+
+import pytest
+
+from cardano_node_tests.cluster_management import status_files
+from cardano_node_tests.utils import temptools
+
+
+@pytest.fixture
+def root_tmp(tmp_path: pl.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(temptools.PytestTempDirs, "pytest_root_tmp", tmp_path)
+    # Make sure changes are detected by mtime, not by the "racy" rescan
+    monkeypatch.setattr(status_files.StatusIndex, "RACY_NS", 0)
+    for i in range(2):
+        status_files.get_instance_dir(instance_num=i).mkdir()
+
+
+def test_parse_resource_name():
+    record = status_files._parse_status_name(
+        name=".resource_locked_@@pool_1@@_%%mark-1%%_gw2",
+        dir_path=pl.Path("/tmp/cluster0"),
+        instance_num=0,
+    )
+    assert record == status_files.StatusRecord(
+        kind=status_files.RESOURCE_LOCKED_GLOB,
+        path=pl.Path("/tmp/cluster0/.resource_locked_@@pool_1@@_%%mark-1%%_gw2"),
+        instance_num=0,
+        worker_id="gw2",
+        mark="mark-1",
+        resource="pool_1",
+    )
+
+
+def test_parse_non_status_name():
+    for name in (".cluster.lock", ".test_running", ".resource_locked_@@pool1", "startup_files"):
+        assert (
+            status_files._parse_status_name(name=name, dir_path=pl.Path("/tmp"), instance_num=0)
+            is None
+        )
+
+
+@pytest.mark.usefixtures("root_tmp")
+def test_list_matches_marks():
+    status_files.create_test_running_file(instance_num=0, worker_id="gw0", test_id="t0")
+    status_files.create_test_running_file(instance_num=0, worker_id="gw1", test_id="t1", mark="m1")
+    status_files.create_test_running_file(instance_num=1, worker_id="gw2", test_id="t2", mark="m2")
+
+    assert len(status_files.list_test_running_files()) == 3
+    assert len(status_files.list_test_running_files(instance_num=0)) == 2
+    assert status_files.list_test_running_files(mark="") == [
+        status_files.get_test_running_file(instance_num=0, worker_id="gw0")
+    ]
+    assert sorted(status_files.get_marks_in_progress()) == ["m1", "m2"]
+    assert status_files.get_marks_in_progress(instance_num=0, worker_id="gw1") == ["m1"]
+    assert status_files.get_test_names(instance_num=1) == ["t2"]
+
+
+@pytest.mark.usefixtures("root_tmp")
+def test_list_resources():
+    status_files.create_resource_locked_files(
+        instance_num=0, worker_id="gw0", lock_names=["pool1", "pool2"]
+    )
+    status_files.create_resource_locked_files(
+        instance_num=0, worker_id="gw1", lock_names=["pool3"], mark="m1"
+    )
+
+    locked_all = status_files.list_resource_locked_files(instance_num=0)
+    assert sorted(status_files.get_resources_from_path(locked_all)) == ["pool1", "pool2", "pool3"]
+    locked_nomark = status_files.list_resource_locked_files(instance_num=0, mark="")
+    assert sorted(status_files.get_resources_from_path(locked_nomark)) == ["pool1", "pool2"]
+    assert len(status_files.list_resource_locked_files(worker_id="gw1", mark="m1")) == 1
+    assert not status_files.list_resource_used_files()
+
+
+@pytest.mark.usefixtures("root_tmp")
+def test_index_updates():
+    index = status_files.get_status_index()
+    assert not status_files.list_respin_needed_files(instance_num=1)
+
+    scans = index.scans
+    assert not status_files.list_respin_needed_files(instance_num=1)
+    assert index.scans == scans
+
+    status_files.create_respin_needed_file(instance_num=1, worker_id="gw0")
+    assert status_files.list_respin_needed_files(instance_num=1)
+    assert index.scans == scans + 1
+
+    status_files.rm_respin_needed_files(instance_num=1)
+    assert not status_files.list_respin_needed_files(instance_num=1)
+
+    status_files.create_prio_in_progress_file(worker_id="gw3")
+    status_files.create_cluster_dead_file(instance_num=0)
+    assert status_files.list_prio_in_progress_files() == [
+        status_files.get_prio_in_progress_file(worker_id="gw3")
+    ]
+    assert status_files.list_cluster_dead_files() == [
+        status_files.get_cluster_dead_file(instance_num=0)
+    ]
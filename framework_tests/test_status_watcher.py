@@ -0,0 +1,38 @@
+import pathlib as pl
+import threading
+import time
+
+from cardano_node_tests.cluster_management import status_watcher
+
+
+def test_wake_on_status_file(tmp_path: pl.Path):
+    with status_watcher.StatusWatcher(dirs=[tmp_path]) as watcher:
+        assert watcher.is_active
+
+        timer = threading.Timer(0.2, (tmp_path / ".test_running_gw0").touch)
+        timer.start()
+        waited = watcher.wait(timeout=10)
+        timer.join()
+
+    assert waited < 5
+    assert watcher.wakeups == 1
+    assert watcher.saved_sec > 0
+
+
+def test_ignore_lock_files(tmp_path: pl.Path):
+    with status_watcher.StatusWatcher(dirs=[tmp_path]) as watcher:
+        (tmp_path / ".cluster.lock").touch()
+        start = time.monotonic()
+        watcher.wait(timeout=0.3)
+
+    assert time.monotonic() - start >= 0.3
+    assert watcher.wakeups == 0
+
+
+def test_clear_pending_events(tmp_path: pl.Path):
+    with status_watcher.StatusWatcher(dirs=[tmp_path]) as watcher:
+        (tmp_path / ".needs_respin_gw0").touch()
+        watcher.clear()
+        watcher.wait(timeout=0.3)
+
+    assert watcher.wakeups == 0
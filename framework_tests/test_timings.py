@@ -0,0 +1,74 @@
+import json
+import pathlib as pl
+import threading
+
+import pytest
+
+from cardano_node_tests.utils import timings
+
+
+@pytest.fixture
+def timings_dir(tmp_path: pl.Path, monkeypatch: pytest.MonkeyPatch) -> pl.Path:
+    monkeypatch.setattr(timings.configuration, "TIMINGS", True)
+    monkeypatch.setattr(timings.temptools.PytestTempDirs, "pytest_root_tmp", tmp_path)
+    monkeypatch.setattr(timings._Recorder, "records", [])
+    return tmp_path / timings.TIMINGS_DIR_NAME
+
+
+@timings.span("respin")
+def _respin() -> None:
+    with timings.span("cli", cmd="latest query tip"):
+        pass
+
+
+def _run_test(nodeid: str, worker: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", worker)
+    monkeypatch.setenv("CARDANO_NODE_SOCKET_PATH", "/tmp/state-cluster2/bft1.socket")
+    timings.set_current_test(nodeid)
+    with timings.span("test"):
+        _respin()
+        thread = threading.Thread(target=_respin)
+        thread.start()
+        thread.join()
+    timings.flush()
+
+
+def test_span(timings_dir: pl.Path, monkeypatch: pytest.MonkeyPatch):
+    _run_test(nodeid="test_a.py::test_a", worker="gw1", monkeypatch=monkeypatch)
+
+    records = timings.load_records(timings_dir)
+    assert [r["phase"] for r in records] == ["test", "respin", "cli", "respin", "cli"]
+    test_rec, respin_rec, cli_rec, *__ = records
+    assert {r["test"] for r in records} == {"test_a.py::test_a"}
+    assert {r["instance"] for r in records} == {2}
+    assert (timings_dir / "gw1.jsonl").exists()
+    assert cli_rec["args"] == {"cmd": "latest query tip"}
+    # Self time doesn't include time spent in nested spans
+    assert respin_rec["self"] == respin_rec["dur"] - cli_rec["dur"]
+    assert test_rec["self"] <= test_rec["dur"] - respin_rec["dur"]
+    assert "thread" in records[-1]
+
+
+def test_disabled(timings_dir: pl.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(timings.configuration, "TIMINGS", False)
+    _run_test(nodeid="test_a.py::test_a", worker="gw1", monkeypatch=monkeypatch)
+    assert not timings_dir.exists()
+
+
+def test_report(timings_dir: pl.Path, tmp_path: pl.Path, monkeypatch: pytest.MonkeyPatch):
+    _run_test(nodeid="test_a.py::test_a", worker="gw0", monkeypatch=monkeypatch)
+    _run_test(nodeid="test_b.py::test_b", worker="gw1", monkeypatch=monkeypatch)
+
+    report_file = timings.save_report(timings_dir=timings_dir, dest_dir=tmp_path)
+
+    assert report_file
+    report = report_file.read_text()
+    assert "Critical path: worker gw1" in report
+    assert "test_a.py::test_a [gw0, c2]" in report
+
+    events = json.loads((tmp_path / timings.TRACE_FILENAME).read_text())["traceEvents"]
+    thread_names = {e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert {"gw0", "gw1"} < thread_names
+    spans = [e for e in events if e["ph"] == "X"]
+    assert len(spans) == 10
+    assert spans[0]["ts"] == 0
@@ -0,0 +1,128 @@
+import fractions
+import json
+import pathlib as pl
+import typing as tp
+
+import cbor2
+import pytest
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import tx_fee
+
+FEE_PARAMS = tx_fee.FeeParams(
+    fee_per_byte=44,
+    fee_fixed=155381,
+    price_memory=fractions.Fraction("0.0577"),
+    price_steps=fractions.Fraction("0.0000721"),
+    ref_script_cost_per_byte=fractions.Fraction(15),
+)
+
+TX_BODY = {0: [[bytes(32), 0]], 1: [[bytes(29), 1_000_000]], 2: 200_000}
+
+
+def _write_tx(tx_file: pl.Path, tx: tp.Any, era: str = "ConwayEra") -> bytes:
+    tx_bytes = cbor2.dumps(tx)
+    tx_file.write_text(
+        json.dumps({"type": f"Unwitnessed Tx {era}", "description": "", "cborHex": tx_bytes.hex()})
+    )
+    return tx_bytes
+
+
+def test_min_fee(tmp_path: pl.Path):
+    tx_file = tmp_path / "tx.body"
+    tx_bytes = _write_tx(tx_file, [TX_BODY, {}, True, None])
+
+    # Key `0` + tag + array of two `[vkey, signature]` witnesses
+    witnesses_size = 1 + 3 + 1 + 2 * (1 + 34 + 66)
+    expected = 44 * (len(tx_bytes) + witnesses_size) + 155381
+    assert (
+        tx_fee.calculate_min_fee(fee_params=FEE_PARAMS, tx_file=tx_file, witness_count=2)
+        == expected
+    )
+
+
+def test_min_fee_redeemers(tmp_path: pl.Path):
+    tx_file = tmp_path / "tx.body"
+    redeemers = {(0, 0): [0, [1_000, 100_000]], (1, 0): [0, [500, 50_000]]}
+    tx_bytes = _write_tx(tx_file, [TX_BODY, {5: redeemers}, True, None])
+
+    # ceil(1500 * 0.0577 + 150000 * 0.0000721) = ceil(86.55 + 10.815)
+    scripts_fee = 98
+    ref_scripts_fee = 15 * 25_600 + 18 * 4_400
+    expected = 44 * len(tx_bytes) + 155381 + scripts_fee + ref_scripts_fee
+    assert (
+        tx_fee.calculate_min_fee(
+            fee_params=FEE_PARAMS, tx_file=tx_file, witness_count=0, reference_script_size=30_000
+        )
+        == expected
+    )
+
+
+def test_min_fee_witnessed(tmp_path: pl.Path):
+    tx_file = tmp_path / "tx.signed"
+    _write_tx(tx_file, [TX_BODY, {0: [tx_fee._DUMMY_VKEY_WITNESS]}, True, None])
+
+    with pytest.raises(ValueError, match="already witnessed"):
+        tx_fee.calculate_min_fee(fee_params=FEE_PARAMS, tx_file=tx_file, witness_count=1)
+
+
+def test_build_raw_with_min_fee(tmp_path: pl.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(tx_fee, "load_fee_params", lambda **__: FEE_PARAMS)
+    built: list[tuple[str, int]] = []
+
+    def _build_func(tx_name: str, fee: int) -> clusterlib.TxRawOutput:
+        built.append((tx_name, fee))
+        out_file = tmp_path / f"{tx_name}_tx.body"
+        # The fee is part of the transaction body, so the size depends on the fee
+        _write_tx(out_file, [{**TX_BODY, 2: fee}, {}, True, None])
+        return clusterlib.TxRawOutput(
+            txins=[],
+            txouts=[],
+            txouts_count=0,
+            tx_files=clusterlib.TxFiles(),
+            out_file=out_file,
+            build_args=[],
+            fee=fee,
+        )
+
+    class FakeTransaction:
+        min_fee = 1
+
+    class FakeClusterLib:
+        g_transaction = FakeTransaction()
+
+    cluster_obj: tp.Any = FakeClusterLib()
+    tx_output = tx_fee.build_raw_with_min_fee(
+        cluster_obj=cluster_obj, build_func=_build_func, tx_name="test", witness_count=1
+    )
+
+    # Only the draft and the final transaction are built
+    assert [b[0] for b in built] == ["test_estimate", "test"]
+    assert built[0][1] == 1
+    # The fee field grows from 1 to 5 bytes, the fee grows by 4 * `txFeePerByte`
+    draft_min_fee = tx_fee.calculate_min_fee(
+        fee_params=FEE_PARAMS, tx_file=tmp_path / "test_estimate_tx.body", witness_count=1
+    )
+    assert tx_output.fee == draft_min_fee + 4 * 44
+    assert tx_output.fee == tx_fee.calculate_min_fee(
+        fee_params=FEE_PARAMS, tx_file=tx_output.out_file, witness_count=1
+    )
+
+
+@pytest.mark.parametrize(
+    ("draft_fee", "draft_min_fee", "expected"),
+    (
+        (155381, 170_000, 170_000),
+        (0, 170_000, 170_000 + 4 * 44),
+        (23, 65_000, 65_000 + 2 * 44),
+        # The fee grows over the 2 bytes uint boundary only because of the fee field size
+        (23, 65_535 - 44, 65_535 - 44 + 4 * 44),
+    ),
+)
+def test_fee_for_draft(draft_fee: int, draft_min_fee: int, expected: int):
+    assert (
+        tx_fee.get_fee_for_draft(
+            fee_params=FEE_PARAMS, draft_min_fee=draft_min_fee, draft_fee=draft_fee
+        )
+        == expected
+    )
@@ -0,0 +1,86 @@
+import dataclasses
+import pathlib as pl
+import typing as tp
+
+import pytest
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import utxo_index
+
+
+class FakeQuery:
+    def __init__(self) -> None:
+        self.queries: list[list[str]] = []
+
+    def get_utxo(self, address: list[str]) -> list[clusterlib.UTXOData]:
+        self.queries.append(address)
+        return [
+            clusterlib.UTXOData(utxo_hash=f"{a}_tx", utxo_ix=0, amount=10, address=a)
+            for a in address
+        ]
+
+
+class FakeTransaction:
+    def get_txid(self, tx_body_file: pl.Path) -> str:
+        return tx_body_file.stem
+
+
+class FakeClusterLib:
+    def __init__(self) -> None:
+        self.g_query = FakeQuery()
+        self.g_transaction = FakeTransaction()
+
+
+@pytest.fixture
+def cluster_obj() -> tp.Generator[tp.Any]:
+    utxo_index.invalidate()
+    yield FakeClusterLib()
+    utxo_index.invalidate()
+
+
+def test_bulk_query(cluster_obj: tp.Any):
+    balances = utxo_index.get_balances(cluster_obj=cluster_obj, addresses=["a", "b", "a"])
+    assert balances == {"a": 10, "b": 10}
+    assert cluster_obj.g_query.queries == [["a", "b"]]
+
+    # Nothing is cached by default
+    utxo_index.get_balances(cluster_obj=cluster_obj, addresses=["a"])
+    assert len(cluster_obj.g_query.queries) == 2
+
+
+def test_apply_tx(cluster_obj: tp.Any, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(utxo_index.configuration, "UTXO_INDEX_MAX_AGE_SEC", 60)
+    utxos = utxo_index.get_utxos(cluster_obj=cluster_obj, addresses=["a", "b"])
+
+    tx_raw_output = clusterlib.TxRawOutput(
+        txins=utxos["a"],
+        txouts=[
+            clusterlib.TxOut(address="b", amount=2),
+            clusterlib.TxOut(address="c", amount=1),
+            clusterlib.TxOut(address="b", amount=3),
+            clusterlib.TxOut(address="a", amount=3),
+        ],
+        txouts_count=3,
+        tx_files=clusterlib.TxFiles(),
+        out_file=pl.Path("tx1.body"),
+        fee=1,
+        build_args=[],
+    )
+    utxo_index.apply_tx(cluster_obj=cluster_obj, tx_raw_output=tx_raw_output)
+
+    utxos = utxo_index.get_utxos(cluster_obj=cluster_obj, addresses=["a", "b"])
+    assert len(cluster_obj.g_query.queries) == 1
+    # Outputs to the same address were joined into a single output
+    assert [(u.utxo_hash, u.utxo_ix, u.amount) for u in utxos["a"]] == [("tx1", 2, 3)]
+    assert [(u.utxo_hash, u.utxo_ix, u.amount) for u in utxos["b"]] == [
+        ("b_tx", 0, 10),
+        ("tx1", 0, 5),
+    ]
+
+    # Outputs of transactions built with `transaction build` are not known
+    utxo_index.apply_tx(
+        cluster_obj=cluster_obj,
+        tx_raw_output=dataclasses.replace(tx_raw_output, change_address="a"),
+    )
+    utxo_index.get_utxos(cluster_obj=cluster_obj, addresses=["a", "b"])
+    assert cluster_obj.g_query.queries[-1] == ["a", "b"]
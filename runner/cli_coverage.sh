@@ -32,3 +32,20 @@ get_coverage() {
 
 echo "Generating CLI coverage report to $output_file"
 get_coverage "$output_file" || : > "$output_file"
+
+get_profile() {
+  if [ "$(echo "$coverage_dir"/cli_profile_*)" = "$coverage_dir/cli_profile_*" ]; then
+    return 1
+  fi
+  oldpwd="$PWD"
+  cd "$tests_repo"
+  retval=0
+  PYTHONPATH="$PWD:${PYTHONPATH:-}" cardano_node_tests/cardano_cli_profile.py \
+    -i "$coverage_dir"/cli_profile_* -o "$1" || retval=1
+  cd "$oldpwd"
+  return "$retval"
+}
+
+profile_file="$(dirname "$output_file")/cli_profile.json"
+echo "Generating CLI profiling report to $profile_file"
+get_profile "$profile_file" || :
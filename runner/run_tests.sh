@@ -132,7 +132,7 @@ cleanup_previous_run() {
   if [[ "$CLEANUP" == "yes" ]]; then
     # Remove previous reports and coverage artifacts.
     rm -f "$REPORTS_DIR"/{*-attachment.txt,*-result.json,*-container.json,testrun-report.*} || true
-    rm -f "$COVERAGE_DIR"/cli_coverage_* || true
+    rm -f "$COVERAGE_DIR"/{cli_coverage_*,cli_profile_*} || true
   fi
 }
 